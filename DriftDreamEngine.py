@@ -11,9 +11,12 @@ import uuid
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
-from collections import defaultdict
+from collections import defaultdict, deque
+import bisect
 import math
 
+from symbolic_store import SymbolicStore, store_path_for, load_legacy_json, iso_to_epoch
+
 
 @dataclass
 class DreamEntry:
@@ -47,19 +50,92 @@ class DreamContext:
     time_context: str  # 'dawn', 'dusk', 'deep_night', 'liminal'
 
 
+class _RollingDreamWindow:
+    """
+    Incremental aggregates over dreams newer than a sliding cutoff.
+    Dreams enter on the right as they are recorded and leave on the left as
+    the cutoff advances, so each blend query only touches what changed.
+    """
+    
+    def __init__(self, days_back: int, pair_coherence):
+        self.days_back = days_back
+        self._pair_coherence = pair_coherence
+        self.dreams: deque = deque()  # (epoch, DreamEntry) in journal order
+        self.symbol_frequency: Dict[str, int] = defaultdict(int)
+        self.mood_patterns: Dict[str, int] = defaultdict(int)
+        self.resolution_trends: Dict[str, int] = defaultdict(int)
+        self.metaphor_themes: Dict[str, int] = defaultdict(int)
+        self.intensity_sum = 0.0
+        self.lucidity_sum = 0.0
+        self.coherence_sum = 0.0
+    
+    def add(self, epoch: float, dream: 'DreamEntry'):
+        if self.dreams:
+            self.coherence_sum += self._pair_coherence(self.dreams[-1][1], dream)
+        self.dreams.append((epoch, dream))
+        self._count(dream, 1)
+    
+    def advance(self, cutoff: float):
+        while self.dreams and self.dreams[0][0] < cutoff:
+            _, dream = self.dreams.popleft()
+            if self.dreams:
+                self.coherence_sum -= self._pair_coherence(dream, self.dreams[0][1])
+            self._count(dream, -1)
+    
+    def _count(self, dream: 'DreamEntry', delta: int):
+        for symbol in dream.symbol_sources or []:
+            self._bump(self.symbol_frequency, symbol, delta)
+        for mood in dream.mood_palette:
+            self._bump(self.mood_patterns, mood, delta)
+        self._bump(self.resolution_trends, dream.resolution_state, delta)
+        for metaphor in dream.metaphor_chain:
+            self._bump(self.metaphor_themes, metaphor, delta)
+        self.intensity_sum += delta * dream.emotional_intensity
+        self.lucidity_sum += delta * dream.lucidity_level
+    
+    @staticmethod
+    def _bump(counter: Dict[str, int], key: str, delta: int):
+        counter[key] += delta
+        if counter[key] <= 0:
+            del counter[key]
+    
+    @property
+    def coherence(self) -> float:
+        if len(self.dreams) < 2:
+            return 1.0
+        return self.coherence_sum / (len(self.dreams) - 1)
+
+
 class DriftDreamEngine:
     """Engine for generating symbolic dreams from emotional drift"""
     
     def __init__(self, 
                  dream_journal_file: str = "dream_journal.json",
                  symbol_memory_engine = None,
-                 max_dream_history: int = 100):
+                 max_dream_history: int = 100,
+                 store_path: Optional[str] = None):
         self.dream_journal_file = dream_journal_file
         self.symbol_memory = symbol_memory_engine
         self.max_dream_history = max_dream_history
         
-        # Dream entry storage
+        # Incremental SQLite store; legacy JSON at dream_journal_file is imported once
+        self.store = SymbolicStore(store_path or store_path_for(dream_journal_file))
+        
+        # Dream entry storage (only the most recent max_dream_history are loaded)
         self.dream_journal: List[DreamEntry] = []
+        self._dream_ids: set = set()
+        
+        # Secondary indexes maintained as dreams are recorded. Mood and symbol
+        # indexes hold (epoch, intensity, seq) keys kept in sorted order so
+        # queries read the newest entries without re-sorting or re-parsing.
+        self._dream_epochs: Dict[str, float] = {}
+        self._dreams_by_seq: List[DreamEntry] = []
+        self._mood_index: Dict[str, List[Tuple[float, float, int]]] = defaultdict(list)
+        self._symbol_index: Dict[str, List[Tuple[float, int]]] = defaultdict(list)
+        self._time_buckets: Dict[int, List[int]] = defaultdict(list)  # day -> seqs
+        self._blend_windows: Dict[int, _RollingDreamWindow] = {}
+        self._last_epoch = float('-inf')
+        self._journal_time_ordered = True
         
         # Dream narrative templates organized by mood and resolution
         self.dream_templates = {
@@ -215,45 +291,94 @@ class DriftDreamEngine:
         self.load_dream_journal()
     
     def load_dream_journal(self):
-        """Load existing dream journal"""
+        """Load the recent window of the dream journal, importing legacy JSON on first run"""
         try:
-            with open(self.dream_journal_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            if self.store.is_empty():
+                legacy_data = load_legacy_json(self.dream_journal_file)
+                if legacy_data is None:
+                    print("🌱 Starting fresh dream journal")
+                    return
+                self._import_legacy_data(legacy_data)
             
-            # Reconstruct dream entries
-            for dream_data in data.get('dreams', []):
+            # Older dreams stay on disk; only the recent window is materialized
+            for dream_data in self.store.load_recent('dreams', self.max_dream_history):
                 if dream_data.get('symbol_sources') is None:
                     dream_data['symbol_sources'] = []
                 dream_entry = DreamEntry(**dream_data)
                 self.dream_journal.append(dream_entry)
+                self._dream_ids.add(dream_entry.id)
+                self._index_dream(dream_entry)
             
             print(f"🌙 Loaded {len(self.dream_journal)} dreams from journal")
             
-        except FileNotFoundError:
-            print("🌱 Starting fresh dream journal")
         except Exception as e:
             print(f"⚠️ Error loading dream journal: {e}")
     
     def save_dream_journal(self):
-        """Save dream journal to file"""
+        """Flush new and changed dreams to the store"""
         try:
-            # Keep only recent dreams to manage file size
-            recent_dreams = self.dream_journal[-self.max_dream_history:] if len(self.dream_journal) > self.max_dream_history else self.dream_journal
-            
-            data = {
-                'dreams': [asdict(dream) for dream in recent_dreams],
-                'total_dreams': len(self.dream_journal),
-                'last_saved': datetime.now().isoformat() + 'Z'
-            }
-            
-            with open(self.dream_journal_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            
-            print(f"💾 Saved {len(recent_dreams)} dreams to journal")
+            written = self.store.flush()
+            if written:
+                print(f"💾 Saved {written} dreams to journal")
             
         except Exception as e:
             print(f"❌ Error saving dream journal: {e}")
     
+    def _import_legacy_data(self, data: Dict[str, Any]):
+        """Import a legacy dream_journal.json document into the store"""
+        for dream_data in data.get('dreams', []):
+            self.store.mark_dirty('dreams', dream_data['id'], dream_data,
+                                  sort_key=iso_to_epoch(dream_data.get('dream_timestamp')))
+        self.store.flush()
+        print(f"📦 Imported legacy dream journal from {self.dream_journal_file}")
+    
+    def _append_dream(self, dream_entry: DreamEntry):
+        """Add a dream to the in-memory journal and queue it for saving"""
+        if dream_entry.id not in self._dream_ids:
+            self.dream_journal.append(dream_entry)
+            self._dream_ids.add(dream_entry.id)
+            self._index_dream(dream_entry)
+        
+        self.store.mark_dirty('dreams', dream_entry.id, dream_entry,
+                              sort_key=self._dream_epochs[dream_entry.id])
+    
+    def _index_dream(self, dream_entry: DreamEntry):
+        """Add a dream to the mood, symbol and time-bucket indexes"""
+        epoch = iso_to_epoch(dream_entry.dream_timestamp)
+        seq = len(self._dreams_by_seq)
+        self._dream_epochs[dream_entry.id] = epoch
+        self._dreams_by_seq.append(dream_entry)
+        
+        for mood in set(dream_entry.mood_palette):
+            bisect.insort(self._mood_index[mood], (epoch, dream_entry.emotional_intensity, seq))
+        for symbol in set(dream_entry.symbol_sources or []):
+            bisect.insort(self._symbol_index[symbol], (epoch, seq))
+        self._time_buckets[int(epoch // 86400)].append(seq)
+        
+        if epoch < self._last_epoch:
+            # Out-of-order timestamps break left-eviction, so windows are rebuilt per query
+            self._journal_time_ordered = False
+            self._blend_windows.clear()
+        else:
+            for window in self._blend_windows.values():
+                window.add(epoch, dream_entry)
+        self._last_epoch = max(self._last_epoch, epoch)
+    
+    def _build_blend_window(self, days_back: int, cutoff: float) -> _RollingDreamWindow:
+        """Seed a rolling window from the time-bucket index"""
+        window = _RollingDreamWindow(days_back, self._pair_coherence)
+        first_bucket = int(cutoff // 86400)
+        seqs = sorted(
+            seq for bucket, bucket_seqs in self._time_buckets.items()
+            if bucket >= first_bucket for seq in bucket_seqs
+        )
+        for seq in seqs:
+            dream = self._dreams_by_seq[seq]
+            epoch = self._dream_epochs[dream.id]
+            if epoch >= cutoff:
+                window.add(epoch, dream)
+        return window
+    
     def generate_dream_entry(self, drift_context: DreamContext) -> DreamEntry:
         """
         Generate a new dream entry based on drift context
@@ -313,7 +438,7 @@ class DriftDreamEngine:
         )
         
         # Add to journal
-        self.dream_journal.append(dream_entry)
+        self._append_dream(dream_entry)
         
         # Record symbols in memory engine if available
         if self.symbol_memory:
@@ -363,56 +488,34 @@ class DriftDreamEngine:
         Returns:
             Dream pattern analysis
         """
-        cutoff_date = datetime.now() - timedelta(days=days_back)
+        cutoff = (datetime.now() - timedelta(days=days_back)).timestamp()
         
-        recent_dreams = [
-            dream for dream in self.dream_journal
-            if datetime.fromisoformat(dream.dream_timestamp.replace('Z', '')) >= cutoff_date
-        ]
+        window = self._blend_windows.get(days_back)
+        if window is None:
+            window = self._build_blend_window(days_back, cutoff)
+            if self._journal_time_ordered:
+                self._blend_windows[days_back] = window
+        else:
+            window.advance(cutoff)
         
-        if not recent_dreams:
+        total = len(window.dreams)
+        if not total:
             return {'error': 'No recent dreams to analyze'}
         
-        # Analyze patterns
-        symbol_frequency = defaultdict(int)
-        mood_patterns = defaultdict(int)
-        resolution_trends = defaultdict(int)
-        metaphor_themes = defaultdict(int)
-        
-        for dream in recent_dreams:
-            # Count symbols
-            if dream.symbol_sources:  # Check if not None
-                for symbol in dream.symbol_sources:
-                    symbol_frequency[symbol] += 1
-            
-            # Count moods
-            for mood in dream.mood_palette:
-                mood_patterns[mood] += 1
-            
-            # Count resolutions
-            resolution_trends[dream.resolution_state] += 1
-            
-            # Count metaphor themes
-            for metaphor in dream.metaphor_chain:
-                metaphor_themes[metaphor] += 1
-        
         # Find emerging patterns
-        recurring_symbols = [symbol for symbol, count in symbol_frequency.items() if count >= len(recent_dreams) * 0.3]
-        dominant_moods = sorted(mood_patterns.items(), key=lambda x: x[1], reverse=True)[:3]
-        
-        # Calculate dream coherence (how connected the dreams feel)
-        coherence_score = self._calculate_dream_coherence(recent_dreams)
+        recurring_symbols = [symbol for symbol, count in window.symbol_frequency.items() if count >= total * 0.3]
+        dominant_moods = sorted(window.mood_patterns.items(), key=lambda x: x[1], reverse=True)[:3]
         
         return {
             'analysis_period': f"{days_back} days",
-            'total_dreams': len(recent_dreams),
+            'total_dreams': total,
             'recurring_symbols': recurring_symbols,
             'dominant_moods': [mood for mood, count in dominant_moods],
-            'resolution_balance': dict(resolution_trends),
-            'coherence_score': coherence_score,
-            'dream_intensity_avg': sum(d.emotional_intensity for d in recent_dreams) / len(recent_dreams),
-            'lucidity_trend': sum(d.lucidity_level for d in recent_dreams) / len(recent_dreams),
-            'most_common_metaphors': sorted(metaphor_themes.items(), key=lambda x: x[1], reverse=True)[:5]
+            'resolution_balance': dict(window.resolution_trends),
+            'coherence_score': window.coherence,
+            'dream_intensity_avg': window.intensity_sum / total,
+            'lucidity_trend': window.lucidity_sum / total,
+            'most_common_metaphors': sorted(window.metaphor_themes.items(), key=lambda x: x[1], reverse=True)[:5]
         }
     
     def record_dream_to_journal(self, dream_entry: DreamEntry) -> str:
@@ -430,9 +533,9 @@ class DriftDreamEngine:
             dream_entry.dream_timestamp = datetime.now().isoformat() + 'Z'
         
         # Add to journal
-        self.dream_journal.append(dream_entry)
+        self._append_dream(dream_entry)
         
-        # Save to file
+        # Save to store
         self.save_dream_journal()
         
         print(f"📖 Recorded dream: '{dream_entry.scene_title}' ({dream_entry.resolution_state})")
@@ -444,36 +547,14 @@ class DriftDreamEngine:
         return self.dream_journal[-count:] if len(self.dream_journal) >= count else self.dream_journal
     
     def get_dreams_by_mood(self, mood: str, limit: int = 10) -> List[DreamEntry]:
-        """Get dreams that contain a specific mood"""
-        matching_dreams = [
-            dream for dream in self.dream_journal
-            if mood in dream.mood_palette
-        ]
-        
-        # Sort by recency and emotional intensity
-        matching_dreams.sort(
-            key=lambda d: (
-                datetime.fromisoformat(d.dream_timestamp.replace('Z', '')), 
-                d.emotional_intensity
-            ), 
-            reverse=True
-        )
-        
-        return matching_dreams[:limit]
+        """Get dreams that contain a specific mood, newest and most intense first"""
+        keys = self._mood_index.get(mood, [])
+        return [self._dreams_by_seq[seq] for _, _, seq in reversed(keys[-limit:])] if limit > 0 else []
     
     def get_dreams_by_symbol(self, symbol: str, limit: int = 10) -> List[DreamEntry]:
-        """Get dreams featuring a specific symbol"""
-        matching_dreams = [
-            dream for dream in self.dream_journal
-            if dream.symbol_sources and symbol in dream.symbol_sources
-        ]
-        
-        matching_dreams.sort(
-            key=lambda d: datetime.fromisoformat(d.dream_timestamp.replace('Z', '')),
-            reverse=True
-        )
-        
-        return matching_dreams[:limit]
+        """Get dreams featuring a specific symbol, newest first"""
+        keys = self._symbol_index.get(symbol, [])
+        return [self._dreams_by_seq[seq] for _, seq in reversed(keys[-limit:])] if limit > 0 else []
     
     # Private helper methods
     
@@ -738,32 +819,32 @@ class DriftDreamEngine:
         comparisons = 0
         
         for i in range(len(dreams) - 1):
-            dream1 = dreams[i]
-            dream2 = dreams[i + 1]
-            
-            # Check symbol overlap
-            dream1_symbols = dream1.symbol_sources or []
-            dream2_symbols = dream2.symbol_sources or []
-            symbol_overlap = len(set(dream1_symbols) & set(dream2_symbols))
-            symbol_coherence = symbol_overlap / max(len(dream1_symbols), len(dream2_symbols), 1)
-            
-            # Check mood overlap
-            mood_overlap = len(set(dream1.mood_palette) & set(dream2.mood_palette))
-            mood_coherence = mood_overlap / max(len(dream1.mood_palette), len(dream2.mood_palette), 1)
-            
-            # Check resolution progression
-            resolution_coherence = 0.5
-            if dream1.resolution_state == dream2.resolution_state:
-                resolution_coherence = 0.8
-            elif (dream1.resolution_state == 'unresolved' and dream2.resolution_state == 'transforming') or \
-                 (dream1.resolution_state == 'transforming' and dream2.resolution_state == 'resolved'):
-                resolution_coherence = 1.0
-            
-            dream_coherence = (symbol_coherence + mood_coherence + resolution_coherence) / 3.0
-            coherence_score += dream_coherence
+            coherence_score += self._pair_coherence(dreams[i], dreams[i + 1])
             comparisons += 1
         
         return coherence_score / comparisons if comparisons > 0 else 1.0
+    
+    def _pair_coherence(self, dream1: DreamEntry, dream2: DreamEntry) -> float:
+        """Coherence between two consecutive dreams"""
+        # Check symbol overlap
+        dream1_symbols = dream1.symbol_sources or []
+        dream2_symbols = dream2.symbol_sources or []
+        symbol_overlap = len(set(dream1_symbols) & set(dream2_symbols))
+        symbol_coherence = symbol_overlap / max(len(dream1_symbols), len(dream2_symbols), 1)
+        
+        # Check mood overlap
+        mood_overlap = len(set(dream1.mood_palette) & set(dream2.mood_palette))
+        mood_coherence = mood_overlap / max(len(dream1.mood_palette), len(dream2.mood_palette), 1)
+        
+        # Check resolution progression
+        resolution_coherence = 0.5
+        if dream1.resolution_state == dream2.resolution_state:
+            resolution_coherence = 0.8
+        elif (dream1.resolution_state == 'unresolved' and dream2.resolution_state == 'transforming') or \
+             (dream1.resolution_state == 'transforming' and dream2.resolution_state == 'resolved'):
+            resolution_coherence = 1.0
+        
+        return (symbol_coherence + mood_coherence + resolution_coherence) / 3.0
 
 
 # Example usage and testing
@@ -14,6 +14,9 @@ from collections import defaultdict
 import math
 import random
 
+from symbolic_store import SymbolicStore, LazyRecordMap, store_path_for, load_legacy_json, iso_to_epoch
+from symbol_graph import SymbolGraph
+
 
 @dataclass
 class EmotionalAssociation:
@@ -48,12 +51,16 @@ class SymbolMemoryEngine:
     
     def __init__(self, memory_file: str = "symbol_memory.json", 
                  drift_threshold: float = 0.3, 
-                 stability_decay: float = 0.05):
+                 stability_decay: float = 0.05,
+                 store_path: Optional[str] = None):
         self.memory_file = memory_file
         self.drift_threshold = drift_threshold
         self.stability_decay = stability_decay
         
-        # Core symbol memory storage
+        # Incremental SQLite store; legacy JSON at memory_file is imported once
+        self.store = SymbolicStore(store_path or store_path_for(memory_file))
+        
+        # Core symbol memory storage (cold symbols are loaded on first access)
         self.symbols: Dict[str, SymbolicMemory] = {}
         
         # Emotion-to-symbol mapping for quick lookup
@@ -62,6 +69,12 @@ class SymbolMemoryEngine:
         # Symbol interaction networks (which symbols appear together)
         self.symbol_networks: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
         
+        # Integer-keyed mirror of symbol_networks used for traversal and ranking
+        self.symbol_graph = SymbolGraph()
+        
+        # Memoized meaning phrases, invalidated whenever a symbol changes
+        self._meaning_cache: Dict[str, str] = {}
+        
         # Drift history for tracking meaning evolution
         self.drift_history: List[Dict[str, Any]] = []
         
@@ -84,74 +97,84 @@ class SymbolMemoryEngine:
         self.load_memory()
     
     def load_memory(self):
-        """Load symbol memory from file"""
+        """Load symbol memory from the store, importing legacy JSON on first run"""
         try:
-            with open(self.memory_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-            # Reconstruct symbol memories
-            for symbol_name, symbol_data in data.get('symbols', {}).items():
-                associations = []
-                for assoc_data in symbol_data.get('emotional_associations', []):
-                    associations.append(EmotionalAssociation(**assoc_data))
-                
-                symbol_data['emotional_associations'] = associations
-                self.symbols[symbol_name] = SymbolicMemory(**symbol_data)
+            if self.store.is_empty():
+                legacy_data = load_legacy_json(self.memory_file)
+                if legacy_data is None:
+                    print("🌱 Starting with fresh symbol memory")
+                    self.symbols = LazyRecordMap(self.store, 'symbols', self._symbol_from_dict)
+                    self._initialize_archetypal_symbols()
+                    self.save_memory()
+                    return
+                self._import_legacy_data(legacy_data)
+            
+            # Symbols stay cold until first access
+            self.symbols = LazyRecordMap(self.store, 'symbols', self._symbol_from_dict)
             
             # Reconstruct emotion mapping
-            self.emotion_symbol_map = defaultdict(list, data.get('emotion_symbol_map', {}))
+            meta = self.store.get('meta', 'emotion_symbol_map') or {}
+            self.emotion_symbol_map = defaultdict(list, meta)
             
             # Reconstruct symbol networks
             self.symbol_networks = defaultdict(lambda: defaultdict(float))
-            for symbol, connections in data.get('symbol_networks', {}).items():
+            for symbol, connections in self.store.load_all('symbol_networks').items():
                 for connected_symbol, weight in connections.items():
                     self.symbol_networks[symbol][connected_symbol] = weight
+            self.symbol_graph = SymbolGraph.from_networks(self.symbol_networks)
             
             # Load drift history
-            self.drift_history = data.get('drift_history', [])
+            self.drift_history = list(self.store.load_all('drift_history').values())
             
             print(f"✨ Loaded {len(self.symbols)} symbols from memory")
             
-        except FileNotFoundError:
-            print("🌱 Starting with fresh symbol memory")
-            self._initialize_archetypal_symbols()
         except Exception as e:
             print(f"⚠️ Error loading symbol memory: {e}")
+            self.symbols = {}
             self._initialize_archetypal_symbols()
     
     def save_memory(self):
-        """Save symbol memory to file"""
+        """Flush changed symbols, network edges and drift events to the store"""
         try:
-            # Convert to serializable format
-            data = {
-                'symbols': {},
-                'emotion_symbol_map': dict(self.emotion_symbol_map),
-                'symbol_networks': {},
-                'drift_history': self.drift_history,
-                'last_saved': datetime.now().isoformat() + 'Z'
-            }
-            
-            # Convert symbol memories
-            for symbol_name, symbol_memory in self.symbols.items():
-                symbol_dict = asdict(symbol_memory)
-                # Convert associations to dicts
-                symbol_dict['emotional_associations'] = [
-                    asdict(assoc) for assoc in symbol_memory.emotional_associations
-                ]
-                data['symbols'][symbol_name] = symbol_dict
-            
-            # Convert symbol networks
-            for symbol, connections in self.symbol_networks.items():
-                data['symbol_networks'][symbol] = dict(connections)
-            
-            with open(self.memory_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                
-            print(f"💾 Saved symbol memory ({len(self.symbols)} symbols)")
+            written = self.store.flush()
+            if written:
+                print(f"💾 Saved symbol memory ({written} changed records)")
             
         except Exception as e:
             print(f"❌ Error saving symbol memory: {e}")
     
+    def _import_legacy_data(self, data: Dict[str, Any]):
+        """Import a legacy symbol_memory.json document into the store"""
+        for symbol_name, symbol_data in data.get('symbols', {}).items():
+            self.store.mark_dirty('symbols', symbol_name, symbol_data)
+        
+        self.store.mark_dirty('meta', 'emotion_symbol_map', data.get('emotion_symbol_map', {}))
+        
+        for symbol, connections in data.get('symbol_networks', {}).items():
+            self.store.mark_dirty('symbol_networks', symbol, connections)
+        
+        for index, drift_event in enumerate(data.get('drift_history', [])):
+            self.store.mark_dirty('drift_history', f"{index:08d}", drift_event,
+                                  sort_key=iso_to_epoch(drift_event.get('timestamp')))
+        
+        self.store.flush()
+        print(f"📦 Imported legacy symbol memory from {self.memory_file}")
+    
+    def _symbol_from_dict(self, symbol_data: Dict[str, Any]) -> SymbolicMemory:
+        """Rebuild a SymbolicMemory from its stored form"""
+        symbol_data = dict(symbol_data)
+        symbol_data['emotional_associations'] = [
+            EmotionalAssociation(**assoc_data)
+            for assoc_data in symbol_data.get('emotional_associations', [])
+        ]
+        return SymbolicMemory(**symbol_data)
+    
+    def _mark_symbol_dirty(self, symbol_name: str):
+        """Queue a symbol for the next incremental save"""
+        self._meaning_cache.pop(symbol_name, None)
+        if symbol_name in self.symbols:
+            self.store.mark_dirty('symbols', symbol_name, self.symbols[symbol_name])
+    
     def _initialize_archetypal_symbols(self):
         """Initialize with archetypal symbol meanings"""
         for symbol_name, emotions in self.archetypal_meanings.items():
@@ -176,6 +199,7 @@ class SymbolMemoryEngine:
             )
             
             self.symbols[symbol_name] = symbol_memory
+            self._mark_symbol_dirty(symbol_name)
             self._update_emotion_mapping(symbol_name)
         
         print(f"🌟 Initialized {len(self.symbols)} archetypal symbols")
@@ -239,6 +263,7 @@ class SymbolMemoryEngine:
             
             # Update emotion mapping
             self._update_emotion_mapping(symbol_name)
+            self._mark_symbol_dirty(symbol_name)
             
             # Trigger save periodically
             if symbol.recurrence_count % 5 == 0:
@@ -263,21 +288,29 @@ class SymbolMemoryEngine:
         if symbol_name not in self.symbols:
             return f"An unknown symbol '{symbol_name}' that carries mystery"
         
+        cached = self._meaning_cache.get(symbol_name)
+        if cached is not None:
+            return cached
+        
         symbol = self.symbols[symbol_name]
         
         # If symbol has custom drift meaning, use that
         if symbol.symbolic_drift:
-            return symbol.symbolic_drift
+            meaning = symbol.symbolic_drift
         
         # Otherwise generate meaning from dominant emotions
-        if not symbol.dominant_emotions:
-            return f"The {symbol_name}, carrying unspoken significance"
+        elif not symbol.dominant_emotions:
+            meaning = f"The {symbol_name}, carrying unspoken significance"
         
-        primary_emotion = symbol.dominant_emotions[0]
-        secondary_emotion = symbol.dominant_emotions[1] if len(symbol.dominant_emotions) > 1 else None
+        else:
+            primary_emotion = symbol.dominant_emotions[0]
+            secondary_emotion = symbol.dominant_emotions[1] if len(symbol.dominant_emotions) > 1 else None
+            
+            # Generate poetic meaning based on emotions and symbol name
+            meaning = self._generate_poetic_meaning(symbol_name, primary_emotion, secondary_emotion, symbol.recurrence_count)
         
-        # Generate poetic meaning based on emotions and symbol name
-        return self._generate_poetic_meaning(symbol_name, primary_emotion, secondary_emotion, symbol.recurrence_count)
+        self._meaning_cache[symbol_name] = meaning
+        return meaning
     
     def drift_symbol(self, symbol_name: str, new_emotion: str, context: str = "") -> bool:
         """
@@ -311,6 +344,7 @@ class SymbolMemoryEngine:
         
         # Generate new drift meaning
         self._trigger_symbolic_drift(symbol, new_emotion, context)
+        self._mark_symbol_dirty(symbol_name)
         
         print(f"🌊 Symbol '{symbol_name}' drifted toward '{new_emotion}'")
         self.save_memory()
@@ -355,13 +389,14 @@ class SymbolMemoryEngine:
         
         return results
     
-    def get_symbol_network(self, symbol_name: str, depth: int = 2) -> Dict[str, Any]:
+    def get_symbol_network(self, symbol_name: str, depth: int = 2, top_k: Optional[int] = 10) -> Dict[str, Any]:
         """
         Get the network of symbols connected to a given symbol
         
         Args:
             symbol_name: Center symbol
             depth: Network depth to explore
+            top_k: Maximum symbols kept per hop (None for no pruning)
             
         Returns:
             Network data structure
@@ -369,36 +404,40 @@ class SymbolMemoryEngine:
         if symbol_name not in self.symbols:
             return {'center': symbol_name, 'connections': [], 'error': 'Symbol not found'}
         
-        visited = set()
         network = {'center': symbol_name, 'connections': []}
         
-        def explore_connections(current_symbol, current_depth):
-            if current_depth <= 0 or current_symbol in visited:
-                return
-            
-            visited.add(current_symbol)
-            connections = self.symbol_networks.get(current_symbol, {})
-            
-            for connected_symbol, weight in connections.items():
-                if weight > 0.1:  # Only significant connections
-                    connection_data = {
-                        'symbol': connected_symbol,
-                        'weight': weight,
-                        'meaning': self.get_symbol_meaning(connected_symbol),
-                        'depth': depth - current_depth + 1
-                    }
-                    network['connections'].append(connection_data)
-                    
-                    # Recursive exploration
-                    explore_connections(connected_symbol, current_depth - 1)
-        
-        explore_connections(symbol_name, depth)
+        # Only significant connections (weight > 0.1), each symbol at its shallowest depth
+        for connection in self.symbol_graph.weighted_bfs(symbol_name, depth=depth, top_k=top_k, min_weight=0.1):
+            connection['meaning'] = self.get_symbol_meaning(connection['symbol'])
+            network['connections'].append(connection)
         
         # Sort connections by weight and depth
         network['connections'].sort(key=lambda x: (x['depth'], -x['weight']))
         
         return network
     
+    def get_resonant_symbols(self, seed_symbols: List[str], limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Rank the symbols that resonate most with a set of seed symbols
+        
+        Args:
+            seed_symbols: Symbols currently in play
+            limit: Maximum number of symbols to return
+            
+        Returns:
+            List of symbol data dictionaries ordered by personalized PageRank score
+        """
+        ranked = self.symbol_graph.personalized_pagerank(seed_symbols, limit=limit)
+        
+        return [
+            {
+                'name': name,
+                'score': score,
+                'meaning': self.get_symbol_meaning(name)
+            }
+            for name, score in ranked
+        ]
+    
     def generate_dream_symbols(self, mood_context: Dict[str, Any], count: int = 3) -> List[str]:
         """
         Generate symbols for dream content based on current mood
@@ -517,6 +556,7 @@ class SymbolMemoryEngine:
         )
         
         self.symbols[symbol_name] = symbol
+        self._mark_symbol_dirty(symbol_name)
         print(f"🌱 Created new symbol: '{symbol_name}' ({emotion})")
     
     def _decay_old_associations(self, symbol: SymbolicMemory):
@@ -568,6 +608,7 @@ class SymbolMemoryEngine:
         old_dominant = symbol.dominant_emotions[0] if symbol.dominant_emotions else 'undefined'
         
         # Generate new symbolic meaning
+        self._meaning_cache.pop(symbol.name, None)
         symbol.symbolic_drift = self._generate_drift_meaning(symbol.name, old_dominant, new_emotion, context)
         
         # Reduce stability
@@ -585,6 +626,8 @@ class SymbolMemoryEngine:
         }
         
         self.drift_history.append(drift_event)
+        self.store.mark_dirty('drift_history', f"{len(self.drift_history) - 1:08d}", drift_event,
+                              sort_key=iso_to_epoch(drift_event['timestamp']))
         
         print(f"🌊 Symbol drift: '{symbol.name}' ({old_dominant} → {new_emotion})")
     
@@ -599,6 +642,13 @@ class SymbolMemoryEngine:
                 # Cap at 1.0
                 self.symbol_networks[symbol_name][other_symbol] = min(1.0, self.symbol_networks[symbol_name][other_symbol])
                 self.symbol_networks[other_symbol][symbol_name] = min(1.0, self.symbol_networks[other_symbol][symbol_name])
+                
+                self.symbol_graph.set_edge(symbol_name, other_symbol, self.symbol_networks[symbol_name][other_symbol], symmetric=False)
+                self.symbol_graph.set_edge(other_symbol, symbol_name, self.symbol_networks[other_symbol][symbol_name], symmetric=False)
+                
+                self.store.mark_dirty('symbol_networks', other_symbol, self.symbol_networks[other_symbol])
+        
+        self.store.mark_dirty('symbol_networks', symbol_name, self.symbol_networks[symbol_name])
     
     def _update_emotion_mapping(self, symbol_name: str):
         """Update emotion-to-symbol mapping"""
@@ -615,6 +665,8 @@ class SymbolMemoryEngine:
                 for emotion in symbol.dominant_emotions:
                     if symbol_name not in self.emotion_symbol_map[emotion]:
                         self.emotion_symbol_map[emotion].append(symbol_name)
+            
+            self.store.mark_dirty('meta', 'emotion_symbol_map', self.emotion_symbol_map)
     
     def _generate_poetic_meaning(self, symbol_name: str, primary_emotion: str, 
                                 secondary_emotion: Optional[str], recurrence: int) -> str:
@@ -5,12 +5,12 @@ Provides endpoints for drift history, pattern analysis, and user interaction wit
 
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-import json
-import os
 from datetime import datetime, timedelta
 import uuid
 import random
 
+from json_state_store import JSONStateStore
+
 app = Flask(__name__)
 CORS(app)
 
@@ -19,26 +19,6 @@ DRIFT_HISTORY_FILE = 'drift_history.json'
 DRIFT_ANNOTATIONS_FILE = 'drift_annotations.json'
 DRIFT_CONFIG_FILE = 'drift_config.json'
 
-def load_json_file(filename, default_data):
-    """Load JSON data from file with fallback to default"""
-    try:
-        if os.path.exists(filename):
-            with open(filename, 'r', encoding='utf-8') as f:
-                return json.load(f)
-    except (json.JSONDecodeError, IOError) as e:
-        print(f"Error loading {filename}: {e}")
-    return default_data
-
-def save_json_file(filename, data):
-    """Save JSON data to file"""
-    try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        return True
-    except IOError as e:
-        print(f"Error saving {filename}: {e}")
-        return False
-
 def generate_realistic_drift_entry():
     """Generate a realistic drift journal entry with emotional depth"""
     
@@ -189,12 +169,18 @@ def initialize_drift_data():
     return drift_history, {}, drift_config
 
 # Initialize data
-drift_history, drift_annotations, drift_config = initialize_drift_data()
+default_history, default_annotations, default_config = initialize_drift_data()
+
+# Documents stay resident in memory; writes are coalesced and flushed in the background
+state_store = JSONStateStore()
+drift_history_doc = state_store.document(DRIFT_HISTORY_FILE, default_history)
+drift_annotations_doc = state_store.document(DRIFT_ANNOTATIONS_FILE, default_annotations)
+drift_config_doc = state_store.document(DRIFT_CONFIG_FILE, default_config)
 
-# Load existing data
-drift_history = load_json_file(DRIFT_HISTORY_FILE, drift_history)
-drift_annotations = load_json_file(DRIFT_ANNOTATIONS_FILE, drift_annotations)
-drift_config = load_json_file(DRIFT_CONFIG_FILE, drift_config)
+def time_range_cutoff(time_range):
+    """Translate a range name into (cutoff datetime, days back)"""
+    days_back = {'day': 1, 'week': 7, 'month': 30}.get(time_range, 365)  # year as fallback
+    return datetime.now() - timedelta(days=days_back), days_back
 
 @app.route('/api/drift/history', methods=['GET'])
 def get_drift_history():
@@ -203,23 +189,9 @@ def get_drift_history():
         time_range = request.args.get('range', 'week')
         limit = int(request.args.get('limit', 20))
         
-        # Calculate time cutoff
-        now = datetime.now()
-        if time_range == 'day':
-            cutoff = now - timedelta(days=1)
-        elif time_range == 'week':
-            cutoff = now - timedelta(days=7)
-        elif time_range == 'month':
-            cutoff = now - timedelta(days=30)
-        else:
-            cutoff = now - timedelta(days=365)  # year as fallback
-        
-        # Filter entries by time range
-        filtered_entries = []
-        for entry in drift_history:
-            entry_time = datetime.fromisoformat(entry['timestamp'].replace('Z', ''))
-            if entry_time >= cutoff:
-                filtered_entries.append(entry)
+        # Filter entries by time range using the pre-parsed time index
+        cutoff, _ = time_range_cutoff(time_range)
+        filtered_entries = drift_history_doc.since(cutoff)
         
         # Limit results
         limited_entries = filtered_entries[:limit]
@@ -240,27 +212,9 @@ def get_drift_summary():
     try:
         time_range = request.args.get('range', 'week')
         
-        # Calculate time cutoff
-        now = datetime.now()
-        if time_range == 'day':
-            cutoff = now - timedelta(days=1)
-            days_back = 1
-        elif time_range == 'week':
-            cutoff = now - timedelta(days=7)
-            days_back = 7
-        elif time_range == 'month':
-            cutoff = now - timedelta(days=30)
-            days_back = 30
-        else:
-            cutoff = now - timedelta(days=365)
-            days_back = 365
-        
-        # Filter entries by time range
-        relevant_entries = []
-        for entry in drift_history:
-            entry_time = datetime.fromisoformat(entry['timestamp'].replace('Z', ''))
-            if entry_time >= cutoff:
-                relevant_entries.append(entry)
+        # Filter entries by time range using the pre-parsed time index
+        cutoff, days_back = time_range_cutoff(time_range)
+        relevant_entries = drift_history_doc.since(cutoff)
         
         # Calculate summary statistics
         total_drifts = len(relevant_entries)
@@ -370,27 +324,23 @@ def approve_drift():
             return jsonify({'error': 'drift_id is required', 'status': 'error'}), 400
         
         # Find and update the drift entry
-        updated = False
-        for entry in drift_history:
-            if entry['id'] == drift_id:
-                entry['status'] = 'affirmed'
-                entry['requires_action'] = False
-                entry['approval_timestamp'] = datetime.now().isoformat() + 'Z'
-                updated = True
-                break
-        
-        if not updated:
-            return jsonify({'error': 'Drift entry not found', 'status': 'error'}), 404
+        with drift_history_doc.lock:
+            entry = next((e for e in drift_history_doc.data if e['id'] == drift_id), None)
+            if entry is None:
+                return jsonify({'error': 'Drift entry not found', 'status': 'error'}), 404
+            
+            entry['status'] = 'affirmed'
+            entry['requires_action'] = False
+            entry['approval_timestamp'] = datetime.now().isoformat() + 'Z'
+            
+            # Save updated history (flushed in the background)
+            drift_history_doc.mark_dirty()
         
-        # Save updated history
-        if save_json_file(DRIFT_HISTORY_FILE, drift_history):
-            return jsonify({
-                'message': 'Drift approved successfully',
-                'drift_id': drift_id,
-                'status': 'success'
-            })
-        else:
-            return jsonify({'error': 'Failed to save changes', 'status': 'error'}), 500
+        return jsonify({
+            'message': 'Drift approved successfully',
+            'drift_id': drift_id,
+            'status': 'success'
+        })
             
     except Exception as e:
         return jsonify({'error': str(e), 'status': 'error'}), 500
@@ -406,27 +356,23 @@ def revert_drift():
             return jsonify({'error': 'drift_id is required', 'status': 'error'}), 400
         
         # Find and update the drift entry
-        updated = False
-        for entry in drift_history:
-            if entry['id'] == drift_id:
-                entry['status'] = 'reverted'
-                entry['requires_action'] = False
-                entry['reversion_timestamp'] = datetime.now().isoformat() + 'Z'
-                updated = True
-                break
-        
-        if not updated:
-            return jsonify({'error': 'Drift entry not found', 'status': 'error'}), 404
+        with drift_history_doc.lock:
+            entry = next((e for e in drift_history_doc.data if e['id'] == drift_id), None)
+            if entry is None:
+                return jsonify({'error': 'Drift entry not found', 'status': 'error'}), 404
+            
+            entry['status'] = 'reverted'
+            entry['requires_action'] = False
+            entry['reversion_timestamp'] = datetime.now().isoformat() + 'Z'
+            
+            # Save updated history (flushed in the background)
+            drift_history_doc.mark_dirty()
         
-        # Save updated history
-        if save_json_file(DRIFT_HISTORY_FILE, drift_history):
-            return jsonify({
-                'message': 'Drift reverted successfully',
-                'drift_id': drift_id,
-                'status': 'success'
-            })
-        else:
-            return jsonify({'error': 'Failed to save changes', 'status': 'error'}), 500
+        return jsonify({
+            'message': 'Drift reverted successfully',
+            'drift_id': drift_id,
+            'status': 'success'
+        })
             
     except Exception as e:
         return jsonify({'error': str(e), 'status': 'error'}), 500
@@ -451,31 +397,23 @@ def annotate_drift():
         }
         
         # Add to annotations
-        if drift_id not in drift_annotations:
-            drift_annotations[drift_id] = []
-        drift_annotations[drift_id].append(annotation_entry)
+        with drift_annotations_doc.editing() as drift_annotations:
+            drift_annotations.setdefault(drift_id, []).append(annotation_entry)
         
         # Update drift entry status if it was pending
-        for entry in drift_history:
-            if entry['id'] == drift_id and entry.get('status') == 'pending':
-                entry['status'] = 'annotated'
-                entry['requires_action'] = False
-                break
-        
-        # Save both files
-        save_success = (
-            save_json_file(DRIFT_ANNOTATIONS_FILE, drift_annotations) and
-            save_json_file(DRIFT_HISTORY_FILE, drift_history)
-        )
+        with drift_history_doc.lock:
+            for entry in drift_history_doc.data:
+                if entry['id'] == drift_id and entry.get('status') == 'pending':
+                    entry['status'] = 'annotated'
+                    entry['requires_action'] = False
+                    drift_history_doc.mark_dirty()
+                    break
         
-        if save_success:
-            return jsonify({
-                'message': 'Annotation saved successfully',
-                'annotation_id': annotation_entry['id'],
-                'status': 'success'
-            })
-        else:
-            return jsonify({'error': 'Failed to save annotation', 'status': 'error'}), 500
+        return jsonify({
+            'message': 'Annotation saved successfully',
+            'annotation_id': annotation_entry['id'],
+            'status': 'success'
+        })
             
     except Exception as e:
         return jsonify({'error': str(e), 'status': 'error'}), 500
@@ -485,22 +423,19 @@ def generate_drift_entry():
     """Generate a new drift entry (for testing/simulation)"""
     try:
         new_entry = generate_realistic_drift_entry()
-        drift_history.insert(0, new_entry)  # Add to beginning (newest first)
+        max_entries = drift_config_doc.data.get('max_history_entries', 100)
         
-        # Maintain max history limit
-        max_entries = drift_config.get('max_history_entries', 100)
-        if len(drift_history) > max_entries:
-            drift_history = drift_history[:max_entries]
+        with drift_history_doc.editing() as drift_history:
+            drift_history.insert(0, new_entry)  # Add to beginning (newest first)
+            
+            # Maintain max history limit
+            del drift_history[max_entries:]
         
-        # Save updated history
-        if save_json_file(DRIFT_HISTORY_FILE, drift_history):
-            return jsonify({
-                'message': 'New drift entry generated',
-                'entry': new_entry,
-                'status': 'success'
-            })
-        else:
-            return jsonify({'error': 'Failed to save new entry', 'status': 'error'}), 500
+        return jsonify({
+            'message': 'New drift entry generated',
+            'entry': new_entry,
+            'status': 'success'
+        })
             
     except Exception as e:
         return jsonify({'error': str(e), 'status': 'error'}), 500
@@ -508,30 +443,25 @@ def generate_drift_entry():
 @app.route('/api/drift/config', methods=['GET', 'POST'])
 def drift_configuration():
     """Get or update drift tracking configuration"""
-    global drift_config
-    
     if request.method == 'GET':
-        return jsonify(drift_config)
+        return jsonify(drift_config_doc.data)
     
     try:
         data = request.get_json()
         
-        # Update configuration
-        for key, value in data.items():
-            if key in drift_config:
-                drift_config[key] = value
-        
-        drift_config['last_updated'] = datetime.now().isoformat() + 'Z'
+        with drift_config_doc.editing() as drift_config:
+            # Update configuration
+            for key, value in data.items():
+                if key in drift_config:
+                    drift_config[key] = value
+            
+            drift_config['last_updated'] = datetime.now().isoformat() + 'Z'
         
-        # Save configuration
-        if save_json_file(DRIFT_CONFIG_FILE, drift_config):
-            return jsonify({
-                'message': 'Configuration updated successfully',
-                'config': drift_config,
-                'status': 'success'
-            })
-        else:
-            return jsonify({'error': 'Failed to save configuration', 'status': 'error'}), 500
+        return jsonify({
+            'message': 'Configuration updated successfully',
+            'config': drift_config,
+            'status': 'success'
+        })
             
     except Exception as e:
         return jsonify({'error': str(e), 'status': 'error'}), 500
@@ -539,21 +469,22 @@ def drift_configuration():
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
+    drift_history = drift_history_doc.data
     return jsonify({
         'status': 'healthy',
         'service': 'drift-journal-api',
         'timestamp': datetime.now().isoformat() + 'Z',
         'data_status': {
             'drift_entries': len(drift_history),
-            'annotations': len(drift_annotations),
+            'annotations': len(drift_annotations_doc.data),
             'pending_actions': sum(1 for entry in drift_history if entry.get('requires_action'))
         }
     })
 
 if __name__ == '__main__':
     print("🌊 Drift Journal API Server Starting...")
-    print(f"📊 Loaded {len(drift_history)} drift entries")
-    print(f"📝 Loaded {len(drift_annotations)} annotation threads")
+    print(f"📊 Loaded {len(drift_history_doc.data)} drift entries")
+    print(f"📝 Loaded {len(drift_annotations_doc.data)} annotation threads")
     print("🚀 Server running on http://localhost:5000")
     
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -4,6 +4,7 @@ Fully autonomous emotional quantization system for local LLMs
 
 Components:
 - quant_autopilot: Main autopilot controller
+- job_scheduler: Concurrent, resource-aware job scheduling
 - idle_monitor: System idle state monitoring
 - setup_autopilot: Installation and setup utilities
 
@@ -26,6 +27,11 @@ try:
         QuantizationJob,
         AutopilotRun
     )
+    from .job_scheduler import (
+        JobScheduler,
+        JobFootprint,
+        estimate_job_footprint
+    )
     from .idle_monitor import (
         IdleMonitor,
         IdleConfig,
@@ -41,6 +47,9 @@ __all__ = [
     "AutopilotDatabase", 
     "QuantizationJob",
     "AutopilotRun",
+    "JobScheduler",
+    "JobFootprint",
+    "estimate_job_footprint",
     "IdleMonitor",
     "IdleConfig",
     "SystemMetrics",
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Quantization Job Scheduler
+Admits several quantization jobs at once when their estimated memory, disk and CPU
+footprint fits the machine, runs each in its own subprocess, and pauses or resumes
+those processes as the system switches between active and idle
+"""
+
+import os
+import re
+import sys
+import time
+import logging
+import threading
+import subprocess
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from dataclasses import dataclass, field
+
+import psutil
+
+logger = logging.getLogger("JobScheduler")
+
+# Approximate bits per weight of common quantization methods
+QUANT_BITS_PER_WEIGHT = {
+    "q8_0": 8.5,
+    "q6_k": 6.6,
+    "q5_k_m": 5.7,
+    "q5_0": 5.5,
+    "q4_k_m": 4.8,
+    "q4_0": 4.5,
+    "q3_k_l": 4.3,
+    "q2_k": 3.4,
+    "gptq": 4.5,
+    "awq": 4.5
+}
+
+@dataclass
+class JobFootprint:
+    """Resources a job is expected to need while it runs"""
+    memory_gb: float
+    disk_gb: float
+    cpu_threads: int
+
+@dataclass
+class JobProcess:
+    """A job's subprocess and its resource accounting"""
+    job_id: str
+    process: subprocess.Popen
+    footprint: JobFootprint
+    result_path: Path
+    scheduler_pid: int = field(default_factory=os.getpid)  # Process that spawned the worker
+    paused: bool = False
+    interrupted: bool = False
+    timed_out: bool = False
+    active_seconds: float = 0.0
+    last_resumed: float = field(default_factory=time.monotonic)
+
+def estimate_job_footprint(base_model: str, quantization_method: str, threads: int,
+                           default_model_billions: float = 13.0) -> JobFootprint:
+    """
+    Rough footprint of quantizing and then evaluating one model
+
+    The parameter count comes from the model name (e.g. "13b"). Disk covers the
+    fp16 intermediate plus the quantized output; memory covers loading the
+    quantized model for evaluation plus tool overhead.
+    """
+    match = re.search(r'(\d+(?:\.\d+)?)\s*[bB]\b', base_model)
+    billions = float(match.group(1)) if match else default_model_billions
+    bits = QUANT_BITS_PER_WEIGHT.get(quantization_method.lower(), 8.5)
+
+    quantized_gb = billions * bits / 8
+    return JobFootprint(
+        memory_gb=quantized_gb * 1.2 + 2.0,
+        disk_gb=quantized_gb + billions * 2,
+        cpu_threads=threads
+    )
+
+class JobScheduler:
+    """
+    Resource-aware runner for concurrent quantization jobs
+
+    Args:
+        config: Autopilot configuration (``safety_limits`` and optional ``scheduler`` section)
+        build_command: Returns the worker command line for a job id and result path
+    """
+
+    def __init__(self, config: Dict, build_command: Callable[[str, Path], List[str]]):
+        self.config = config
+        self.build_command = build_command
+        scheduler_config = config.get("scheduler", {})
+
+        self.max_concurrent = max(1, config["safety_limits"].get("max_concurrent_processes", 1))
+        self.memory_reserve_gb = scheduler_config.get("memory_reserve_gb", 4.0)
+        self.disk_reserve_gb = config["safety_limits"].get("disk_space_threshold_gb", 50)
+        self.poll_interval = scheduler_config.get("poll_interval_seconds", 5)
+        self.timeout_seconds = config["safety_limits"].get("timeout_minutes", 120) * 60
+        self.default_model_billions = scheduler_config.get("default_model_billions", 13.0)
+        self.threads_per_job = (scheduler_config.get("threads_per_job") or
+                                max(1, (os.cpu_count() or 1) // self.max_concurrent))
+
+        self.jobs_directory = Path(config["output_paths"]["temp_directory"]) / "jobs"
+        self.jobs_directory.mkdir(parents=True, exist_ok=True)
+        self.disk_path = Path(config["output_paths"]["models_directory"])
+
+        self.running: Dict[str, JobProcess] = {}
+        self._lock = threading.RLock()
+
+    def footprint(self, job) -> JobFootprint:
+        return estimate_job_footprint(job.base_model, job.quantization_method,
+                                      self.threads_per_job, self.default_model_billions)
+
+    def available_resources(self) -> JobFootprint:
+        """Resources left for new jobs after what running jobs have claimed"""
+        with self._lock:
+            memory_gb = psutil.virtual_memory().available / 1024**3 - self.memory_reserve_gb
+            disk_path = self.disk_path if self.disk_path.exists() else Path.cwd()
+            disk_gb = psutil.disk_usage(str(disk_path)).free / 1024**3 - self.disk_reserve_gb
+            threads = os.cpu_count() or 1
+
+            for job_process in self.running.values():
+                # Memory a job already uses is gone from "available"; only its remaining claim counts
+                memory_gb -= max(0.0, job_process.footprint.memory_gb - self._resident_gb(job_process))
+                disk_gb -= job_process.footprint.disk_gb
+                threads -= job_process.footprint.cpu_threads
+
+            return JobFootprint(memory_gb=memory_gb, disk_gb=disk_gb, cpu_threads=threads)
+
+    def free_slots(self) -> int:
+        with self._lock:
+            return self.max_concurrent - len(self.running)
+
+    def admit(self, pending_jobs: List, limit: Optional[int] = None) -> List:
+        """Pending jobs (in priority order) whose footprints fit alongside the running ones"""
+        with self._lock:
+            slots = self.free_slots() if limit is None else min(self.free_slots(), limit)
+            remaining = self.available_resources()
+            # Every job gets at least one thread, even when running jobs already claim them all
+            remaining.cpu_threads = max(remaining.cpu_threads, 0 if self.running else self.threads_per_job)
+            admitted = []
+
+            for job in pending_jobs:
+                if len(admitted) >= slots:
+                    break
+                needed = self.footprint(job)
+                if (needed.memory_gb <= remaining.memory_gb and needed.disk_gb <= remaining.disk_gb and
+                        needed.cpu_threads <= remaining.cpu_threads):
+                    admitted.append(job)
+                    remaining.memory_gb -= needed.memory_gb
+                    remaining.disk_gb -= needed.disk_gb
+                    remaining.cpu_threads -= needed.cpu_threads
+                else:
+                    logger.info(f"📏 Deferring {job.base_model} -> {job.quantization_method}: needs "
+                                f"{needed.memory_gb:.1f}GB RAM / {needed.disk_gb:.1f}GB disk, "
+                                f"{max(remaining.memory_gb, 0):.1f}GB / {max(remaining.disk_gb, 0):.1f}GB free")
+
+            return admitted
+
+    def start(self, job) -> JobProcess:
+        """Launch a job's worker subprocess"""
+        footprint = self.footprint(job)
+        result_path = self.jobs_directory / f"{job.job_id}.result.json"
+        result_path.unlink(missing_ok=True)
+        log_file = open(self.jobs_directory / f"{job.job_id}.log", 'a')
+
+        # Cap the math libraries at this job's share of the cores
+        env = dict(os.environ, OMP_NUM_THREADS=str(footprint.cpu_threads),
+                   MKL_NUM_THREADS=str(footprint.cpu_threads))
+        process = subprocess.Popen(
+            self.build_command(job.job_id, result_path),
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+            env=env,
+            start_new_session=sys.platform != 'win32'
+        )
+        log_file.close()
+
+        job_process = JobProcess(job_id=job.job_id, process=process, footprint=footprint, result_path=result_path)
+        with self._lock:
+            self.running[job.job_id] = job_process
+
+        logger.info(f"🚀 Started job {job.job_id} (pid {process.pid}, {footprint.memory_gb:.1f}GB RAM, "
+                    f"{footprint.cpu_threads} threads)")
+        return job_process
+
+    def wait(self, job_id: str) -> Optional[int]:
+        """
+        Block until a job's process exits
+
+        A job that runs past the timeout is terminated and reported by its
+        exit code with ``timed_out`` set, so it fails rather than being
+        requeued to time out again.
+
+        Returns:
+            The exit code, or None if the job was interrupted by stop_all
+        """
+        job_process = self.running[job_id]
+        try:
+            while True:
+                try:
+                    job_process.process.wait(timeout=self.poll_interval)
+                    break
+                except subprocess.TimeoutExpired:
+                    pass
+
+                with self._lock:
+                    if not job_process.paused:
+                        now = time.monotonic()
+                        job_process.active_seconds += now - job_process.last_resumed
+                        job_process.last_resumed = now
+                # Paused time does not count against the timeout
+                if job_process.active_seconds > self.timeout_seconds:
+                    logger.warning(f"⏰ Job {job_id} exceeded {self.timeout_seconds / 60:.0f} active minutes")
+                    job_process.timed_out = True
+                    self._terminate(job_process)
+                    return job_process.process.returncode
+
+            return None if job_process.interrupted else job_process.process.returncode
+        finally:
+            with self._lock:
+                self.running.pop(job_id, None)
+
+    def pause_all(self) -> List[str]:
+        """Suspend every running job's process tree; returns the paused job ids"""
+        paused = []
+        with self._lock:
+            for job_process in self.running.values():
+                if job_process.paused:
+                    continue
+                if self._signal_tree(job_process, "suspend"):
+                    job_process.active_seconds += time.monotonic() - job_process.last_resumed
+                    job_process.paused = True
+                    paused.append(job_process.job_id)
+        if paused:
+            logger.info(f"⏸️ Paused {len(paused)} job(s) while the system is in use")
+        return paused
+
+    def resume_all(self) -> List[str]:
+        """Continue every paused job; returns the resumed job ids"""
+        resumed = []
+        with self._lock:
+            for job_process in self.running.values():
+                if job_process.paused and self._signal_tree(job_process, "resume"):
+                    job_process.paused = False
+                    job_process.last_resumed = time.monotonic()
+                    resumed.append(job_process.job_id)
+        if resumed:
+            logger.info(f"▶️ Resumed {len(resumed)} paused job(s)")
+        return resumed
+
+    def stop_all(self) -> List[str]:
+        """Terminate all jobs, marking them interrupted rather than failed; returns their ids"""
+        with self._lock:
+            job_processes = list(self.running.values())
+        for job_process in job_processes:
+            job_process.interrupted = True
+            self._terminate(job_process)
+        return [job_process.job_id for job_process in job_processes]
+
+    def _terminate(self, job_process: JobProcess):
+        # A stopped process cannot act on SIGTERM, so continue it first
+        if job_process.paused:
+            self._signal_tree(job_process, "resume")
+            job_process.paused = False
+        self._signal_tree(job_process, "terminate")
+        try:
+            job_process.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self._signal_tree(job_process, "kill")
+            job_process.process.wait()
+
+    def _signal_tree(self, job_process: JobProcess, action: str) -> bool:
+        """Apply a psutil process action (suspend/resume/terminate/kill) to a job and its children"""
+        try:
+            parent = psutil.Process(job_process.process.pid)
+            processes = [parent] + parent.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return False
+
+        for process in processes:
+            try:
+                getattr(process, action)()
+            except psutil.NoSuchProcess:
+                continue
+        return True
+
+    def _resident_gb(self, job_process: JobProcess) -> float:
+        try:
+            parent = psutil.Process(job_process.process.pid)
+            processes = [parent] + parent.children(recursive=True)
+            return sum(process.memory_info().rss for process in processes) / 1024**3
+        except psutil.NoSuchProcess:
+            return 0.0
+
+    def get_status(self) -> List[Dict]:
+        with self._lock:
+            return [{
+                "job_id": job_process.job_id,
+                "pid": job_process.process.pid,
+                "paused": job_process.paused,
+                "active_minutes": round(job_process.active_seconds / 60, 1),
+                "memory_gb": round(job_process.footprint.memory_gb, 1),
+                "disk_gb": round(job_process.footprint.disk_gb, 1)
+            } for job_process in self.running.values()]
+
+def worker_state(pid: Optional[int], job_id: str, scheduler_pid: Optional[int] = None) -> str:
+    """
+    State of a job's worker process recorded by an earlier scheduler
+
+    A worker is owned only while its parent is still the scheduler that
+    spawned it; an orphan is reparented to init or to a subreaper, so any
+    other parent means the scheduler is gone. Workers recorded without a
+    scheduler pid fall back to treating init as the only adoptive parent.
+
+    Returns:
+        "gone" if it no longer runs, "owned" if it runs under the scheduler
+        that started it, "orphaned" if it outlived that scheduler
+    """
+    if not pid:
+        return "gone"
+    try:
+        process = psutil.Process(pid)
+        # Guard against pid reuse: a worker carries its job id on the command line
+        if job_id not in process.cmdline():
+            return "gone"
+        parent = process.parent()
+        if parent is None or not parent.is_running():
+            return "orphaned"
+        if scheduler_pid is not None:
+            return "owned" if parent.pid == scheduler_pid else "orphaned"
+        return "owned" if parent.pid != 1 else "orphaned"
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return "gone"
+
+def terminate_worker(pid: int) -> None:
+    """Stop an orphaned worker process and its children"""
+    try:
+        parent = psutil.Process(pid)
+        processes = [parent] + parent.children(recursive=True)
+    except psutil.NoSuchProcess:
+        return
+    for process in processes:
+        try:
+            process.resume()
+            process.terminate()
+        except psutil.NoSuchProcess:
+            continue
+    psutil.wait_procs(processes, timeout=30)
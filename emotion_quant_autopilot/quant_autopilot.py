@@ -34,6 +34,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 # Import our components
 from idle_monitor import IdleMonitor, create_idle_monitor_from_config
+from job_scheduler import JobScheduler, worker_state, terminate_worker
 from emotional_dataset_builder import EmotionalDatasetBuilder
 from emotion_training_tracker import EmotionTrainingTracker, EmotionalMetrics, QuantLevel, PassType
 
@@ -69,13 +70,25 @@ class QuantizationJob:
 class AutopilotDatabase:
     """Database manager for autopilot operations"""
     
+    # Columns added after the first release, created on existing databases too
+    JOB_PROGRESS_COLUMNS = {
+        "progress": "TEXT DEFAULT '{}'",
+        "attempts": "INTEGER DEFAULT 0",
+        "pid": "INTEGER NULL",
+        "scheduler_pid": "INTEGER NULL"
+    }
+    
     def __init__(self, db_path: str = "emotion_training.db"):
         self.db_path = db_path
         self.init_database()
     
+    def _connect(self) -> sqlite3.Connection:
+        # Job worker processes write to the same database concurrently
+        return sqlite3.connect(self.db_path, timeout=30)
+    
     def init_database(self) -> None:
         """Initialize database schema with autopilot tables"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             # Create autopilot_runs table
@@ -115,11 +128,16 @@ class AutopilotDatabase:
                 )
             """)
             
+            existing_columns = {row[1] for row in cursor.execute("PRAGMA table_info(quantization_queue)")}
+            for column, definition in self.JOB_PROGRESS_COLUMNS.items():
+                if column not in existing_columns:
+                    cursor.execute(f"ALTER TABLE quantization_queue ADD COLUMN {column} {definition}")
+            
             conn.commit()
     
     def add_autopilot_run(self, run: AutopilotRun) -> int:
         """Add autopilot run record"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO autopilot_runs (
@@ -137,7 +155,7 @@ class AutopilotDatabase:
     
     def add_quantization_job(self, job: QuantizationJob) -> int:
         """Add job to quantization queue"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             created_at = job.created_at or datetime.now()
             cursor.execute("""
@@ -152,7 +170,7 @@ class AutopilotDatabase:
     
     def get_pending_jobs(self, limit: int = 10) -> List[QuantizationJob]:
         """Get pending jobs from queue, ordered by priority and creation time"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT job_id, base_model, quantization_method, priority, created_at
@@ -173,9 +191,17 @@ class AutopilotDatabase:
                 ))
             return jobs
     
+    def set_job_status(self, job_id: str, status: str) -> None:
+        """Change a job's status only, e.g. between running and paused"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE quantization_queue SET status = ? WHERE job_id = ?", (status, job_id)
+            )
+            conn.commit()
+    
     def update_job_status(self, job_id: str, status: str, run_id: Optional[str] = None) -> None:
         """Update job status in queue"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             timestamp_field = None
@@ -199,6 +225,79 @@ class AutopilotDatabase:
             
             conn.commit()
     
+    def get_job(self, job_id: str) -> Optional[QuantizationJob]:
+        """Get a queued job by id, whatever its status"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT job_id, base_model, quantization_method, priority, created_at
+                FROM quantization_queue
+                WHERE job_id = ?
+            """, (job_id,))
+            
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return QuantizationJob(
+                job_id=row[0],
+                base_model=row[1],
+                quantization_method=row[2],
+                priority=row[3],
+                created_at=datetime.fromisoformat(row[4])
+            )
+    
+    def mark_job_started(self, job_id: str, run_id: str, pid: int, scheduler_pid: Optional[int] = None) -> None:
+        """Record a job's worker process and the scheduler process that spawned it, and count the attempt"""
+        with self._connect() as conn:
+            conn.execute("""
+                UPDATE quantization_queue
+                SET status = 'running', started_at = ?, run_id = ?, pid = ?, scheduler_pid = ?,
+                    attempts = COALESCE(attempts, 0) + 1
+                WHERE job_id = ?
+            """, (datetime.now().isoformat(), run_id, pid, scheduler_pid, job_id))
+            conn.commit()
+    
+    def get_job_progress(self, job_id: str) -> Dict[str, Any]:
+        """Checkpointed stages of a job, e.g. {"quantized": {...}}"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT progress FROM quantization_queue WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            return json.loads(row[0]) if row and row[0] else {}
+    
+    def update_job_progress(self, job_id: str, stage: str, data: Dict[str, Any]) -> None:
+        """Checkpoint a finished stage so an interrupted job resumes after it"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT progress FROM quantization_queue WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            progress = json.loads(row[0]) if row and row[0] else {}
+            progress[stage] = data
+            conn.execute(
+                "UPDATE quantization_queue SET progress = ? WHERE job_id = ?",
+                (json.dumps(progress, default=str), job_id)
+            )
+            conn.commit()
+    
+    def get_interrupted_jobs(self) -> List[Tuple[QuantizationJob, Optional[int], Optional[int]]]:
+        """Jobs left running or paused by a previous autopilot process, with their worker and scheduler pids"""
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT job_id, pid, scheduler_pid FROM quantization_queue
+                WHERE status IN ('running', 'paused')
+            """).fetchall()
+        return [(self.get_job(job_id), pid, scheduler_pid) for job_id, pid, scheduler_pid in rows]
+    
+    def requeue_job(self, job_id: str) -> None:
+        """Return a job to the queue, keeping its checkpointed progress"""
+        with self._connect() as conn:
+            conn.execute("""
+                UPDATE quantization_queue
+                SET status = 'pending', pid = NULL, scheduler_pid = NULL
+                WHERE job_id = ?
+            """, (job_id,))
+            conn.commit()
+    
     def get_daily_run_count(self, date: Optional[datetime] = None) -> int:
         """Get number of autopilot runs for a given date"""
         if date is None:
@@ -207,7 +306,7 @@ class AutopilotDatabase:
         start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
         end_of_day = start_of_day + timedelta(days=1)
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT COUNT(*) FROM autopilot_runs
@@ -228,12 +327,19 @@ class QuantizationAutopilot:
     - Safety limits and emergency stops
     """
     
-    def __init__(self, config_path: str = "autopilot_config.json"):
+    def __init__(self, config_path: str = "autopilot_config.json", worker_mode: bool = False):
         self.config_path = Path(config_path)
         self.config = self._load_config()
         
         # Initialize components
         self.db = AutopilotDatabase()
+        
+        if worker_mode:
+            # A worker process runs a single job; monitoring and scheduling stay in the parent
+            self._setup_logging()
+            self._setup_directories()
+            return
+        
         self.idle_monitor = create_idle_monitor_from_config(self.config)
         self.dataset_builder = EmotionalDatasetBuilder()
         self.training_tracker = EmotionTrainingTracker()
@@ -243,12 +349,14 @@ class QuantizationAutopilot:
         
         # State management
         self.is_running = False
-        self.current_job: Optional[QuantizationJob] = None
-        self.current_run: Optional[AutopilotRun] = None
+        self.active_jobs: Dict[str, QuantizationJob] = {}
         
         # Setup directories
         self._setup_directories()
         
+        # Jobs run in worker subprocesses, admitted while their resource footprint fits
+        self.scheduler = JobScheduler(self.config, self._worker_command)
+        
         # Setup idle monitoring callbacks
         self.idle_monitor.set_idle_callback(self._on_system_idle)
         self.idle_monitor.set_active_callback(self._on_system_active)
@@ -315,11 +423,9 @@ class QuantizationAutopilot:
     def _check_safety_limits(self) -> bool:
         """Check if it's safe to start a new quantization"""
         # Check daily limits
-        daily_runs = self.db.get_daily_run_count()
-        max_daily = self.config.get("max_active_loops_per_day", 3)
-        
-        if daily_runs >= max_daily:
-            self.logger.info(f"🛑 Daily limit reached: {daily_runs}/{max_daily} runs")
+        if self._remaining_daily_runs() <= 0:
+            max_daily = self.config.get("max_active_loops_per_day", 3)
+            self.logger.info(f"🛑 Daily limit reached: {max_daily} runs started today")
             return False
         
         # Check emergency stop file
@@ -342,47 +448,104 @@ class QuantizationAutopilot:
         
         # Check concurrent processes
         max_concurrent = self.config["safety_limits"]["max_concurrent_processes"]
-        if self.current_job is not None:
-            self.logger.info("⏳ Another quantization job is already running")
+        if self.scheduler.free_slots() <= 0:
+            self.logger.info(f"⏳ {max_concurrent} quantization job(s) already running")
             return False
         
         return True
     
+    def _remaining_daily_runs(self) -> int:
+        """Runs still allowed today; active jobs count since runs are recorded when they finish"""
+        max_daily = self.config.get("max_active_loops_per_day", 3)
+        return max_daily - self.db.get_daily_run_count() - len(self.active_jobs)
+    
     def _on_system_idle(self) -> None:
         """Called when system becomes idle"""
         self.logger.info("💤 System idle detected - checking for queued jobs")
         
+        # Jobs paused while the system was in use continue where they stopped
+        for job_id in self.scheduler.resume_all():
+            self.db.set_job_status(job_id, "running")
+        
         if not self._check_safety_limits():
             return
         
-        # Get next job from queue
-        pending_jobs = self.db.get_pending_jobs(limit=1)
+        # Admit as many queued jobs as fit the remaining memory, disk and CPU
+        pending_jobs = [
+            job for job in self.db.get_pending_jobs(limit=self.scheduler.max_concurrent * 4)
+            if job.job_id not in self.active_jobs
+        ]
         
         if not pending_jobs:
             self.logger.info("📭 No pending jobs in queue")
             return
         
-        job = pending_jobs[0]
-        self.logger.info(f"🎯 Starting quantization job: {job.base_model} -> {job.quantization_method}")
+        jobs = self.scheduler.admit(pending_jobs, limit=self._remaining_daily_runs())
+        if not jobs:
+            self.logger.info("📏 No queued job fits the free memory and disk right now")
+            return
         
-        # Start quantization in background thread
-        thread = threading.Thread(target=self._execute_quantization_job, args=(job,), daemon=True)
-        thread.start()
+        for job in jobs:
+            self.logger.info(f"🎯 Starting quantization job: {job.base_model} -> {job.quantization_method}")
+            self.active_jobs[job.job_id] = job
+            
+            # Each job's worker process is supervised from a background thread
+            thread = threading.Thread(target=self._execute_quantization_job, args=(job,), daemon=True)
+            thread.start()
     
     def _on_system_active(self) -> None:
         """Called when system becomes active"""
-        if self.current_job:
+        if not self.active_jobs:
+            self.logger.debug("🏃 System active - no quantization running")
+        elif self.config.get("scheduler", {}).get("pause_when_active", True):
+            # Paused workers keep their memory but give the CPU back until the next idle period
+            for job_id in self.scheduler.pause_all():
+                self.db.set_job_status(job_id, "paused")
+            self.logger.info(f"🏃 System active - paused {len(self.active_jobs)} quantization job(s)")
+        else:
             self.logger.info("🏃 System active - quantization will continue but may be slower")
+    
+    def _worker_command(self, job_id: str, result_path: Path) -> List[str]:
+        """Command line of the worker subprocess that runs one job"""
+        return [
+            sys.executable, str(Path(__file__).resolve()),
+            "--config", str(self.config_path),
+            "run-job", "--job-id", job_id, "--result", str(result_path)
+        ]
+    
+    def _run_job_process(self, job: QuantizationJob, run_id: str) -> Optional[Dict[str, Any]]:
+        """Run a job in a worker subprocess; None if it was interrupted before finishing"""
+        job_process = self.scheduler.start(job)
+        self.db.mark_job_started(job.job_id, run_id, job_process.process.pid, job_process.scheduler_pid)
+        
+        exit_code = self.scheduler.wait(job.job_id)
+        if exit_code is None:
+            return None
+        
+        if job_process.timed_out:
+            error = f"Job timed out after {self.scheduler.timeout_seconds / 60:.0f} active minutes"
+        elif job_process.result_path.exists():
+            with open(job_process.result_path, 'r') as f:
+                return json.load(f)
         else:
-            self.logger.debug("🏃 System active - no quantization running")
+            error = f"Job process exited with code {exit_code}"
+        
+        return {
+            "success": False,
+            "error": error,
+            "model_path": "",
+            "judgment_score": 0.0,
+            "summary": ""
+        }
     
     def _execute_quantization_job(self, job: QuantizationJob) -> None:
         """Execute a single quantization job"""
         start_time = datetime.now()
         run_id = str(uuid.uuid4())
+        interrupted = False
         
         # Create autopilot run record
-        self.current_run = AutopilotRun(
+        run = AutopilotRun(
             run_id=run_id,
             trigger_type="idle",
             timestamp=start_time,
@@ -395,22 +558,24 @@ class QuantizationAutopilot:
             success=False
         )
         
-        self.current_job = job
-        
         try:
-            # Update job status
-            self.db.update_job_status(job.job_id, "running", run_id)
-            
             self.logger.info(f"🚀 Starting quantization: {job.base_model} -> {job.quantization_method}")
             
-            # Execute quantization using existing pass1_quantization_loop
-            result = self._run_quantization_process(job)
+            # Execute quantization in a worker subprocess
+            result = self._run_job_process(job, run_id)
+            
+            if result is None:
+                # Stopped, not failed: the job resumes from its checkpoint next time
+                interrupted = True
+                self.db.requeue_job(job.job_id)
+                self.logger.info(f"⏸️ Job interrupted and requeued: {job.base_model} -> {job.quantization_method}")
+                return
             
             if result["success"]:
-                self.current_run.success = True
-                self.current_run.model_path = result["model_path"]
-                self.current_run.judgment_score = result["judgment_score"]
-                self.current_run.result_summary = result["summary"]
+                run.success = True
+                run.model_path = result["model_path"]
+                run.judgment_score = result["judgment_score"]
+                run.result_summary = result["summary"]
                 
                 self.db.update_job_status(job.job_id, "completed", run_id)
                 self.logger.info(f"✅ Quantization completed: score {result['judgment_score']:.3f}")
@@ -419,8 +584,8 @@ class QuantizationAutopilot:
                 self._send_notification(f"✅ Quantization successful: {job.base_model} -> {job.quantization_method}")
                 
             else:
-                self.current_run.error_message = result["error"]
-                self.current_run.result_summary = f"Failed: {result['error']}"
+                run.error_message = result["error"]
+                run.result_summary = f"Failed: {result['error']}"
                 
                 self.db.update_job_status(job.job_id, "failed", run_id)
                 self.logger.error(f"❌ Quantization failed: {result['error']}")
@@ -429,8 +594,8 @@ class QuantizationAutopilot:
                 self._send_notification(f"❌ Quantization failed: {job.base_model} -> {result['error']}")
         
         except Exception as e:
-            self.current_run.error_message = str(e)
-            self.current_run.result_summary = f"Exception: {e}"
+            run.error_message = str(e)
+            run.result_summary = f"Exception: {e}"
             
             self.db.update_job_status(job.job_id, "failed", run_id)
             self.logger.error(f"💥 Quantization exception: {e}")
@@ -441,16 +606,16 @@ class QuantizationAutopilot:
             # Calculate execution time
             end_time = datetime.now()
             execution_time = (end_time - start_time).total_seconds() / 60
-            self.current_run.execution_time_minutes = execution_time
-            
-            # Save run record
-            self.db.add_autopilot_run(self.current_run)
             
-            # Clear current job
-            self.current_job = None
-            self.current_run = None
+            # Clear active job
+            self.active_jobs.pop(job.job_id, None)
             
-            self.logger.info(f"🏁 Job completed in {execution_time:.1f} minutes")
+            if not interrupted:
+                # Save run record
+                run.execution_time_minutes = execution_time
+                self.db.add_autopilot_run(run)
+                
+                self.logger.info(f"🏁 Job completed in {execution_time:.1f} minutes")
     
     def _run_quantization_process(self, job: QuantizationJob) -> Dict[str, Any]:
         """Run the actual quantization process with full integration"""
@@ -465,7 +630,7 @@ class QuantizationAutopilot:
             import sys
             sys.path.append('..')  # Add parent directory to path
             
-            from quantize_model import quantize_model
+            from quantize_model import quantize_model, QuantizationResult
             from judge_emotion import judge_emotion
             from emotion_core_tracker import EmotionalQuantDatabase
             from autopilot_state import AutopilotStateManager
@@ -495,12 +660,20 @@ class QuantizationAutopilot:
             if "target_model_size_range_gb" in self.config:
                 size_range = tuple(self.config["target_model_size_range_gb"])
             
-            quant_result = quantize_model(
-                base_model=job.base_model,
-                quantization_method=job.quantization_method,
-                config=quantizer_config,
-                target_size_range_gb=size_range
-            )
+            # An earlier, interrupted attempt may already have produced the quantized model
+            checkpoint = self.db.get_job_progress(job.job_id).get("quantized")
+            if checkpoint and Path(checkpoint["model_path"]).exists():
+                self.logger.info(f"⏩ Reusing quantized model from an earlier attempt: {checkpoint['model_path']}")
+                quant_result = QuantizationResult(**checkpoint)
+            else:
+                quant_result = quantize_model(
+                    base_model=job.base_model,
+                    quantization_method=job.quantization_method,
+                    config=quantizer_config,
+                    target_size_range_gb=size_range
+                )
+                if quant_result.success:
+                    self.db.update_job_progress(job.job_id, "quantized", asdict(quant_result))
             
             if not quant_result.success:
                 # Log failure and update state
@@ -736,8 +909,35 @@ class QuantizationAutopilot:
         # if self.config["notifications"]["slack"]["enabled"]:
         #     self._send_slack_notification(message)
     
+    def _requeue_interrupted_jobs(self) -> int:
+        """Requeue jobs a previous autopilot process left running or paused"""
+        requeued = 0
+        
+        for job, pid, scheduler_pid in self.db.get_interrupted_jobs():
+            if job is None:
+                continue
+            
+            state = worker_state(pid, job.job_id, scheduler_pid)
+            if state == "owned":
+                continue  # Still supervised by a live autopilot
+            if state == "orphaned":
+                # Workers run in their own session, so they can outlive a crashed parent
+                terminate_worker(pid)
+            
+            self.db.requeue_job(job.job_id)
+            requeued += 1
+        
+        if requeued:
+            self.logger.info(f"🔧 Requeued {requeued} interrupted job(s) to resume from their checkpoints")
+        return requeued
+    
     def recover_from_crash(self) -> bool:
         """Attempt to recover from a crash or unclean shutdown"""
+        try:
+            self._requeue_interrupted_jobs()
+        except Exception as e:
+            self.logger.error(f"❌ Failed to requeue interrupted jobs: {e}")
+        
         try:
             import sys
             sys.path.append('..')
@@ -762,24 +962,13 @@ class QuantizationAutopilot:
             
             # Check if we were in the middle of a job
             if recovery_info["current_job_id"] and recovery_info["current_run_id"]:
-                # Mark the interrupted job as failed
-                self.db.update_job_status(recovery_info["current_job_id"], "failed")
-                
-                # Log the recovery event
+                # Log the recovery event; the interrupted job itself was requeued above
                 db.set_autopilot_state("crash_recovery", 
                     f"Recovered from crash at {datetime.now().isoformat()}")
-                
-                self.logger.info("🔧 Marked interrupted job as failed")
             
             # Reset state
             state_manager.stop_autopilot()
             
-            # Check for any jobs that were marked as running but not completed
-            pending_jobs = self.db.get_pending_jobs()
-            for job in pending_jobs:
-                # Reset any jobs that might be stuck in "running" state
-                self.db.update_job_status(job.job_id, "pending")
-            
             self.logger.info("✅ Crash recovery completed successfully")
             return True
             
@@ -904,6 +1093,10 @@ class QuantizationAutopilot:
         self.logger.info("🛑 Stopping Quantization Autopilot")
         self.is_running = False
         
+        # Running jobs are requeued and resume from their checkpoints on the next start
+        for job_id in self.scheduler.stop_all():
+            self.db.requeue_job(job_id)
+        
         # Stop idle monitoring
         self.idle_monitor.stop_monitoring()
         
@@ -918,7 +1111,10 @@ class QuantizationAutopilot:
         return {
             "is_running": self.is_running,
             "idle_status": idle_status,
-            "current_job": asdict(self.current_job) if self.current_job else None,
+            "active_jobs": [
+                {**asdict(self.active_jobs[status["job_id"]]), **status}
+                for status in self.scheduler.get_status() if status["job_id"] in self.active_jobs
+            ],
             "pending_jobs_count": len(pending_jobs),
             "daily_runs": daily_runs,
             "max_daily_runs": self.config.get("max_active_loops_per_day", 3),
@@ -967,8 +1163,37 @@ def create_cli():
     # Integration status command
     integration_parser = subparsers.add_parser('integration', help='Show integration status')
     
+    # Worker command, launched by the scheduler for each admitted job
+    run_job_parser = subparsers.add_parser('run-job', help='Run one queued job (used by the scheduler)')
+    run_job_parser.add_argument('--job-id', required=True, help='Queued job id')
+    run_job_parser.add_argument('--result', required=True, help='Where to write the job result JSON')
+    
     return parser
 
+def run_job_worker(config_path: str, job_id: str, result_path: str) -> int:
+    """Worker process entry point: run one queued job and write its result for the scheduler"""
+    autopilot = QuantizationAutopilot(config_path, worker_mode=True)
+    job = autopilot.db.get_job(job_id)
+    
+    if job is None:
+        result = {"success": False, "error": f"Unknown job {job_id}", "model_path": "",
+                  "judgment_score": 0.0, "summary": ""}
+    else:
+        result = autopilot._run_quantization_process(job)
+    
+    # Only the plain fields; the result objects stay in this process
+    summary = {
+        key: result[key] for key in (
+            "success", "error", "model_path", "judgment_score", "summary",
+            "run_id", "emotional_deviation", "seed_candidate", "execution_time_minutes"
+        ) if key in result
+    }
+    Path(result_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(result_path, 'w') as f:
+        json.dump(summary, f, indent=2, default=str)
+    
+    return 0 if result["success"] else 1
+
 def main():
     """Main execution function"""
     parser = create_cli()
@@ -978,6 +1203,9 @@ def main():
         parser.print_help()
         return 1
     
+    if args.command == 'run-job':
+        return run_job_worker(args.config, args.job_id, args.result)
+    
     try:
         # Create autopilot instance
         autopilot = QuantizationAutopilot(args.config)
@@ -24,6 +24,16 @@ class PassType(Enum):
     PASS_1 = "pass_1"  # Autonomous quantization
     PASS_2 = "pass_2"  # Model comparison and selection
 
+# Weights of each metric in EmotionalMetrics.overall_score
+OVERALL_SCORE_WEIGHTS = {
+    'response_fluency': 0.20,
+    'emotional_intensity': 0.15,
+    'emotional_match': 0.25,
+    'empathy_score': 0.20,
+    'metaphor_usage': 0.10,
+    'sentiment_accuracy': 0.10
+}
+
 class QuantLevel(Enum):
     """Quantization levels"""
     ORIGINAL = "original"
@@ -44,14 +54,7 @@ class EmotionalMetrics:
     
     def overall_score(self) -> float:
         """Calculate weighted overall emotional score"""
-        weights = {
-            'response_fluency': 0.20,
-            'emotional_intensity': 0.15,
-            'emotional_match': 0.25,
-            'empathy_score': 0.20,
-            'metaphor_usage': 0.10,
-            'sentiment_accuracy': 0.10
-        }
+        weights = OVERALL_SCORE_WEIGHTS
         
         return (
             self.response_fluency * weights['response_fluency'] +
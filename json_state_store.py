@@ -0,0 +1,236 @@
+"""
+json_state_store.py - Shared in-memory JSON document store for the Flask APIs
+
+Keeps JSON documents resident in memory so GET handlers never touch disk.
+Mutations mark a document dirty; a background thread coalesces writes and
+flushes them atomically (temp file + fsync + rename). Documents notice when
+another process rewrites their file and reload, and list-valued documents
+expose time indexes with timestamps parsed once per change instead of once
+per request.
+"""
+
+import atexit
+import bisect
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+
+def parse_timestamp(value: Optional[str]) -> float:
+    """Parse an ISO timestamp (optionally 'Z'-suffixed) into epoch seconds"""
+    if not value:
+        return float('-inf')
+    try:
+        return datetime.fromisoformat(value.replace('Z', '')).timestamp()
+    except (TypeError, ValueError):
+        return float('-inf')
+
+
+def atomic_write_json(path: Union[str, Path], data: Any, indent: Optional[int] = 2) -> bool:
+    """Write JSON to a temp file in the same directory, fsync it, then rename over the target"""
+    path = Path(path)
+    directory = path.parent if str(path.parent) else Path('.')
+    temp_path = None
+    try:
+        fd, temp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix='.tmp', dir=directory)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        return True
+    except (IOError, OSError, TypeError, ValueError) as e:
+        print(f"Error saving {path}: {e}")
+        if temp_path:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+        return False
+
+
+class _TimeIndex:
+    """Sorted (epoch, position) pairs for one list inside a document"""
+
+    def __init__(self, entries: List[Dict[str, Any]], field: str):
+        self.entries = entries
+        self.pairs: List[Tuple[float, int]] = sorted(
+            (parse_timestamp(entry.get(field)), position)
+            for position, entry in enumerate(entries)
+        )
+        self.epochs = [epoch for epoch, _ in self.pairs]
+
+    def since(self, cutoff: float) -> List[Dict[str, Any]]:
+        start = bisect.bisect_left(self.epochs, cutoff)
+        positions = sorted(position for _, position in self.pairs[start:])
+        return [self.entries[position] for position in positions]
+
+    def newest_first(self) -> List[Dict[str, Any]]:
+        return [self.entries[position] for _, position in reversed(self.pairs)]
+
+
+class JSONDocument:
+    """A JSON file held in memory with coalesced background writes"""
+
+    def __init__(self, store: 'JSONStateStore', path: Union[str, Path], default: Any):
+        self.store = store
+        self.path = Path(path)
+        self.lock = threading.RLock()
+        self.version = 0
+        self._default = default
+        self._dirty = False
+        self._file_signature: Optional[Tuple[int, int]] = None
+        self._last_check = 0.0
+        self._indexes: Dict[Tuple[Optional[str], str], Tuple[int, _TimeIndex]] = {}
+        self._data = self._read_from_disk()
+
+    @property
+    def data(self) -> Any:
+        """The in-memory document, reloaded first if another process changed the file"""
+        self._check_external_change()
+        return self._data
+
+    @contextmanager
+    def editing(self):
+        """Hold the document lock while mutating, then schedule a write"""
+        with self.lock:
+            self._check_external_change()
+            yield self._data
+            self.mark_dirty()
+
+    def replace(self, data: Any):
+        """Swap in a new document value and schedule a write"""
+        with self.lock:
+            self._data = data
+            self.mark_dirty()
+
+    def mark_dirty(self):
+        """Schedule a write; repeated calls before the next flush coalesce"""
+        with self.lock:
+            self._dirty = True
+            self.version += 1
+        self.store._schedule_flush()
+
+    def since(self, cutoff: datetime, field: str = 'timestamp',
+              list_key: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Entries whose timestamp field is at or after cutoff, in document order"""
+        return self._time_index(field, list_key).since(cutoff.timestamp())
+
+    def newest_first(self, field: str = 'timestamp', list_key: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Entries ordered by timestamp field, most recent first"""
+        return self._time_index(field, list_key).newest_first()
+
+    def _time_index(self, field: str, list_key: Optional[str]) -> _TimeIndex:
+        data = self.data
+        with self.lock:
+            cached = self._indexes.get((list_key, field))
+            if cached is not None and cached[0] == self.version:
+                return cached[1]
+            entries = data.get(list_key, []) if list_key is not None else data
+            index = _TimeIndex(entries, field)
+            self._indexes[(list_key, field)] = (self.version, index)
+            return index
+
+    # Disk synchronization
+
+    def _signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_from_disk(self) -> Any:
+        self._file_signature = self._signature()
+        self._last_check = time.monotonic()
+        try:
+            if self.path.exists():
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Error loading {self.path}: {e}")
+        return copy.deepcopy(self._default)
+
+    def _check_external_change(self):
+        now = time.monotonic()
+        if now - self._last_check < self.store.check_interval:
+            return
+        with self.lock:
+            self._last_check = now
+            signature = self._signature()
+            if signature is None or signature == self._file_signature:
+                return
+            if self._dirty:
+                # Our pending write wins; the next flush overwrites the external change
+                print(f"⚠️ {self.path} changed on disk while local edits were pending")
+                return
+            self._data = self._read_from_disk()
+            self.version += 1
+
+    def flush(self) -> bool:
+        """Write the document now if it has pending changes"""
+        with self.lock:
+            if not self._dirty:
+                return True
+            snapshot = copy.deepcopy(self._data)
+            self._dirty = False
+
+        saved = atomic_write_json(self.path, snapshot)
+
+        with self.lock:
+            if saved:
+                self._file_signature = self._signature()
+            else:
+                self._dirty = True
+        return saved
+
+
+class JSONStateStore:
+    """Registry of JSON documents sharing one background flush thread"""
+
+    def __init__(self, flush_interval: float = 0.5, check_interval: float = 1.0):
+        self.flush_interval = flush_interval
+        self.check_interval = check_interval
+        self._documents: Dict[Path, JSONDocument] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        atexit.register(self.flush)
+
+    def document(self, path: Union[str, Path], default: Any = None) -> JSONDocument:
+        """Get (or open) the document for a file path"""
+        key = Path(path).resolve()
+        with self._lock:
+            if key not in self._documents:
+                self._documents[key] = JSONDocument(self, path, {} if default is None else default)
+            return self._documents[key]
+
+    def flush(self) -> bool:
+        """Write every dirty document synchronously"""
+        with self._lock:
+            documents = list(self._documents.values())
+        return all([document.flush() for document in documents])
+
+    def _schedule_flush(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._flush_loop, name='json-state-flusher', daemon=True
+                )
+                self._thread.start()
+        self._wake.set()
+
+    def _flush_loop(self):
+        while True:
+            self._wake.wait()
+            # Let a burst of edits accumulate before writing
+            time.sleep(self.flush_interval)
+            self._wake.clear()
+            self.flush()
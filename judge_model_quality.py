@@ -5,16 +5,18 @@ Evaluates quantized candidate models against emotional baselines for automated r
 """
 
 import os
+import sys
 import json
 import logging
-import shutil
 from pathlib import Path
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Tuple, Any
-import hashlib
 import subprocess
 import time
 
+sys.path.append(str(Path(__file__).parent / "quant_pass2"))
+from artifact_store import ArtifactStore
+
 # Try to import quantization tracking
 try:
     from quant_tracking import QuantLoopResult, QuantTracker
@@ -361,6 +363,8 @@ def swap_out_baseline(new_path: str, config_path: str = "models/config.json"):
     """
     Replace the baseline model with a new quantized model.
     Updates configuration and creates backup of old model.
+    The new model is handed over: it is moved into the artifact store and the
+    baseline path points at its checkout there, so it is never stored twice.
     
     Args:
         new_path: Path to the new model to set as baseline
@@ -383,11 +387,14 @@ def swap_out_baseline(new_path: str, config_path: str = "models/config.json"):
             "version_history": []
         }
     
+    # Baselines and their archives share one content-addressed store
+    store_dir = config.get("store_dir") or str(config_file.parent / "store")
+    
     # Archive current baseline if it exists
     old_baseline_path = config.get("baseline_path", "")
     if old_baseline_path and Path(old_baseline_path).exists():
         try:
-            archive_old_model(old_baseline_path)
+            archive_old_model(old_baseline_path, store_dir=store_dir)
             logger.info(f"✅ Archived old baseline: {old_baseline_path}")
         except Exception as e:
             logger.warning(f"⚠️ Failed to archive old model: {e}")
@@ -396,6 +403,14 @@ def swap_out_baseline(new_path: str, config_path: str = "models/config.json"):
     new_model_path = Path(new_path)
     model_name = new_model_path.stem
     
+    # Hashed once here; archiving this model later reuses the digest
+    store = ArtifactStore(store_dir)
+    store_version = f"{model_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    manifest = store.ingest(str(new_model_path), store_version, retire=not store.manages(str(new_model_path)))
+    baseline_path = store.checkout(manifest, str(store.checkouts_dir / store_version))
+    if manifest["kind"] == "file":
+        baseline_path = baseline_path / manifest["files"][0]["path"]
+    
     # Add current config to version history
     if config.get("baseline_model", "none") != "none":
         config.setdefault("version_history", []).append({
@@ -407,12 +422,13 @@ def swap_out_baseline(new_path: str, config_path: str = "models/config.json"):
     # Update to new baseline
     config.update({
         "baseline_model": model_name,
-        "baseline_path": str(new_model_path.absolute()),
+        "baseline_path": str(baseline_path.absolute()),
         "last_updated": datetime.now(timezone.utc).isoformat(),
+        "store_version": store_version,
         "model_info": {
-            "size_mb": new_model_path.stat().st_size / (1024 * 1024),
+            "size_mb": manifest["total_size"] / (1024 * 1024),
             "format": _extract_format_from_path(str(new_model_path)),
-            "hash": _calculate_file_hash(str(new_model_path))
+            "hash": _manifest_hash(manifest)
         }
     })
     
@@ -422,16 +438,19 @@ def swap_out_baseline(new_path: str, config_path: str = "models/config.json"):
     
     logger.info(f"✅ Baseline model updated successfully")
     logger.info(f"   New baseline: {model_name}")
-    logger.info(f"   Path: {new_model_path}")
+    logger.info(f"   Path: {baseline_path}")
     logger.info(f"   Size: {config['model_info']['size_mb']:.1f} MB")
 
-def archive_old_model(model_path: str, archive_dir: str = "models/archive"):
+def archive_old_model(model_path: str, archive_dir: str = "models/archive", store_dir: Optional[str] = None):
     """
     Move an old model to the archive directory with timestamp.
+    The archived file is a hardlink to its object in the artifact store,
+    so archiving never copies or re-hashes a model the store already holds.
     
     Args:
         model_path: Path to the model to archive
         archive_dir: Directory to store archived models
+        store_dir: Artifact store directory (defaults to "store" next to the archive directory)
     """
     logger.info(f"📦 Archiving model: {model_path}")
     
@@ -450,8 +469,14 @@ def archive_old_model(model_path: str, archive_dir: str = "models/archive"):
     destination = archive_path / archive_name
     
     try:
-        # Move the file to archive
-        shutil.move(str(source_path), str(destination))
+        # Move the model into the store (its content is usually there already) and link it into the archive
+        store = ArtifactStore(store_dir or str(archive_path.parent / "store"))
+        manifest = store.ingest(str(source_path), f"{source_path.stem}_archived_{timestamp}",
+                                retire=not store.manages(str(source_path)))
+        if manifest["kind"] == "directory":
+            store.checkout(manifest, str(destination))
+        else:
+            store.place(manifest["files"][0]["digest"], str(destination))
         logger.info(f"✅ Model archived successfully: {destination}")
         
         # Create metadata file
@@ -459,8 +484,9 @@ def archive_old_model(model_path: str, archive_dir: str = "models/archive"):
             "original_path": str(source_path),
             "archived_at": datetime.now(timezone.utc).isoformat(),
             "archived_name": archive_name,
-            "size_mb": destination.stat().st_size / (1024 * 1024),
-            "hash": _calculate_file_hash(str(destination))
+            "store_version": manifest["version"],
+            "size_mb": manifest["total_size"] / (1024 * 1024),
+            "hash": _manifest_hash(manifest)
         }
         
         metadata_file = destination.with_suffix(destination.suffix + ".meta.json")
@@ -491,17 +517,11 @@ def _extract_format_from_path(path: str) -> str:
     else:
         return "unknown"
 
-def _calculate_file_hash(file_path: str) -> str:
-    """Calculate SHA256 hash of a file for verification"""
-    sha256_hash = hashlib.sha256()
-    try:
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(chunk)
-        return sha256_hash.hexdigest()
-    except Exception as e:
-        logger.warning(f"Failed to calculate hash for {file_path}: {e}")
-        return "unknown"
+def _manifest_hash(manifest: Dict) -> str:
+    """Content hash of a stored model: the file's SHA-256, or the tree digest for a directory"""
+    if manifest["kind"] == "directory":
+        return manifest["digest"]
+    return manifest["files"][0]["digest"]
 
 def get_current_baseline_info(config_path: str = "models/config.json") -> Dict[str, Any]:
     """Get information about the current baseline model"""
@@ -13,6 +13,8 @@ from datetime import datetime, timedelta
 from collections import defaultdict
 import math
 
+from modules.emotion.analysis_service import TokenizedText, get_analysis_service
+
 logger = logging.getLogger(__name__)
 
 class EmotionTagger:
@@ -98,6 +100,10 @@ class EmotionTagger:
             'last_reset': datetime.now().isoformat()
         }
         
+        # Actor-independent analysis is shared with the other detectors and memoized per message
+        self.analysis_service = get_analysis_service()
+        self._analysis_key = self.analysis_service.register_method("emotion_tagger", self._analyze_tokens)
+        
         logger.info("😊 Emotion Tagger initialized")
     
     async def analyze_emotion(self, content: str, actor: str) -> Dict[str, Any]:
@@ -112,17 +118,8 @@ class EmotionTagger:
             Dict containing emotions, tone, confidence, and metadata
         """
         try:
-            # Preprocess content
-            processed_content = self._preprocess_content(content)
-            
-            # Detect emotions
-            emotions = self._detect_emotions(processed_content)
-            
-            # Determine tone
-            tone = self._determine_tone(processed_content, emotions)
-            
-            # Calculate confidence
-            confidence = self._calculate_confidence(emotions, processed_content)
+            processed_content, emotions, tone, confidence = self.analysis_service.run(self._analysis_key, content)
+            emotions = list(emotions)
             
             # Actor-specific adjustments
             emotions, tone = self._apply_actor_adjustments(emotions, tone, actor)
@@ -159,6 +156,14 @@ class EmotionTagger:
                 'metadata': {'error': str(e)}
             }
     
+    def _analyze_tokens(self, tokens: TokenizedText) -> Tuple[str, Tuple[str, ...], str, float]:
+        """Processed content, emotions, tone and confidence for a message."""
+        processed_content = self._preprocess_content(tokens.text)
+        emotions = self._detect_emotions(processed_content)
+        tone = self._determine_tone(processed_content, emotions)
+        confidence = self._calculate_confidence(emotions, processed_content)
+        return processed_content, tuple(emotions), tone, confidence
+    
     def _preprocess_content(self, content: str) -> str:
         """Preprocess content for emotion analysis."""
         try:
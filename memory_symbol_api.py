@@ -14,6 +14,8 @@ from typing import Dict, Any, List
 import random
 import uuid
 
+from json_state_store import JSONStateStore
+
 app = Flask(__name__)
 CORS(app)
 
@@ -30,6 +32,12 @@ class MemorySymbolAPI:
     
     def __init__(self):
         self.initialize_data_files()
+        
+        # Documents stay resident in memory; writes are coalesced and flushed in the background
+        self.state_store = JSONStateStore()
+        self.memory_trace = self.state_store.document(MEMORY_TRACE_PATH)
+        self.symbolic_map = self.state_store.document(SYMBOLIC_MAP_PATH)
+        self.anchor_state = self.state_store.document(ANCHOR_STATE_PATH)
     
     def initialize_data_files(self):
         """Initialize data files with default content if they don't exist"""
@@ -177,23 +185,6 @@ class MemorySymbolAPI:
             with open(ANCHOR_STATE_PATH, 'w') as f:
                 json.dump(default_anchor, f, indent=2)
 
-    def load_json_file(self, file_path: Path) -> Dict[str, Any]:
-        """Load JSON file with error handling"""
-        try:
-            with open(file_path, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error loading {file_path}: {e}")
-            return {}
-
-    def save_json_file(self, file_path: Path, data: Dict[str, Any]):
-        """Save JSON file with error handling"""
-        try:
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=2)
-        except Exception as e:
-            print(f"Error saving {file_path}: {e}")
-
 # Initialize API instance
 memory_api = MemorySymbolAPI()
 
@@ -201,11 +192,10 @@ memory_api = MemorySymbolAPI()
 def get_emotional_trace():
     """Get emotional memory trace"""
     try:
-        data = memory_api.load_json_file(MEMORY_TRACE_PATH)
+        data = memory_api.memory_trace.data
         
-        # Sort by timestamp (most recent first)
-        trace = data.get('trace', [])
-        trace.sort(key=lambda x: x['timestamp'], reverse=True)
+        # Sort by timestamp (most recent first) from the pre-parsed time index
+        trace = memory_api.memory_trace.newest_first(list_key='trace')
         
         return jsonify({
             'trace': trace,
@@ -221,10 +211,6 @@ def add_memory_entry():
     try:
         entry_data = request.json
         
-        # Load current trace
-        data = memory_api.load_json_file(MEMORY_TRACE_PATH)
-        trace = data.get('trace', [])
-        
         # Create new entry
         new_entry = {
             'id': str(uuid.uuid4()),
@@ -238,17 +224,16 @@ def add_memory_entry():
             'symbolic_connections': entry_data.get('symbolic_connections', [])
         }
         
-        # Add to trace
-        trace.insert(0, new_entry)  # Add at beginning (most recent)
-        
-        # Keep only last 100 entries
-        if len(trace) > 100:
-            trace = trace[:100]
-        
-        # Update and save
-        data['trace'] = trace
-        data['last_updated'] = datetime.now().isoformat()
-        memory_api.save_json_file(MEMORY_TRACE_PATH, data)
+        with memory_api.memory_trace.editing() as data:
+            trace = data.setdefault('trace', [])
+            
+            # Add to trace
+            trace.insert(0, new_entry)  # Add at beginning (most recent)
+            
+            # Keep only last 100 entries
+            del trace[100:]
+            
+            data['last_updated'] = datetime.now().isoformat()
         
         return jsonify({'success': True, 'entry': new_entry})
     except Exception as e:
@@ -258,11 +243,10 @@ def add_memory_entry():
 def get_symbolic_map():
     """Get active symbolic map"""
     try:
-        data = memory_api.load_json_file(SYMBOLIC_MAP_PATH)
+        data = memory_api.symbolic_map.data
         
         # Sort by frequency (most frequent first)
-        symbols = data.get('symbols', [])
-        symbols.sort(key=lambda x: x['frequency'], reverse=True)
+        symbols = sorted(data.get('symbols', []), key=lambda x: x['frequency'], reverse=True)
         
         return jsonify({
             'symbols': symbols,
@@ -282,39 +266,35 @@ def invoke_symbol():
         if not symbol_name:
             return jsonify({'error': 'Symbol name required'}), 400
         
-        # Load current map
-        data = memory_api.load_json_file(SYMBOLIC_MAP_PATH)
-        symbols = data.get('symbols', [])
-        
-        # Find and update symbol
-        symbol_found = False
-        for symbol in symbols:
-            if symbol['name'] == symbol_name:
-                symbol['frequency'] += 1
-                symbol['last_invoked'] = datetime.now().isoformat()
-                if 'affective_color' in symbol_data:
-                    symbol['affective_color'] = symbol_data['affective_color']
-                symbol_found = True
-                break
-        
-        # If symbol doesn't exist, create it
-        if not symbol_found:
-            new_symbol = {
-                'id': f"sym_{symbol_name}",
-                'name': symbol_name,
-                'affective_color': symbol_data.get('affective_color', 'contemplative'),
-                'frequency': 1,
-                'last_invoked': datetime.now().isoformat(),
-                'connections': symbol_data.get('connections', []),
-                'ritual_weight': symbol_data.get('ritual_weight', 0.5),
-                'dream_associations': symbol_data.get('dream_associations', [])
-            }
-            symbols.append(new_symbol)
-        
-        # Update and save
-        data['symbols'] = symbols
-        data['last_updated'] = datetime.now().isoformat()
-        memory_api.save_json_file(SYMBOLIC_MAP_PATH, data)
+        with memory_api.symbolic_map.editing() as data:
+            symbols = data.setdefault('symbols', [])
+            
+            # Find and update symbol
+            symbol_found = False
+            for symbol in symbols:
+                if symbol['name'] == symbol_name:
+                    symbol['frequency'] += 1
+                    symbol['last_invoked'] = datetime.now().isoformat()
+                    if 'affective_color' in symbol_data:
+                        symbol['affective_color'] = symbol_data['affective_color']
+                    symbol_found = True
+                    break
+            
+            # If symbol doesn't exist, create it
+            if not symbol_found:
+                new_symbol = {
+                    'id': f"sym_{symbol_name}",
+                    'name': symbol_name,
+                    'affective_color': symbol_data.get('affective_color', 'contemplative'),
+                    'frequency': 1,
+                    'last_invoked': datetime.now().isoformat(),
+                    'connections': symbol_data.get('connections', []),
+                    'ritual_weight': symbol_data.get('ritual_weight', 0.5),
+                    'dream_associations': symbol_data.get('dream_associations', [])
+                }
+                symbols.append(new_symbol)
+            
+            data['last_updated'] = datetime.now().isoformat()
         
         return jsonify({'success': True, 'symbol_name': symbol_name})
     except Exception as e:
@@ -324,8 +304,7 @@ def invoke_symbol():
 def get_anchor_state():
     """Get current anchor/identity state"""
     try:
-        data = memory_api.load_json_file(ANCHOR_STATE_PATH)
-        return jsonify(data)
+        return jsonify(memory_api.anchor_state.data)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -340,56 +319,57 @@ def adjust_anchor_baseline():
         if not vector_name or new_value is None:
             return jsonify({'error': 'Vector name and value required'}), 400
         
-        # Load current state
-        data = memory_api.load_json_file(ANCHOR_STATE_PATH)
-        
-        if vector_name not in data.get('vectors', {}):
-            return jsonify({'error': f'Vector {vector_name} not found'}), 404
-        
-        # Record old value for drift tracking
-        old_baseline = data['vectors'][vector_name]['baseline']
-        
-        # Update baseline
-        data['vectors'][vector_name]['baseline'] = max(0.0, min(1.0, new_value))
-        
-        # Record adjustment in drift history
-        if 'drift_history' not in data:
-            data['drift_history'] = []
-        
-        data['drift_history'].append({
-            'timestamp': datetime.now().isoformat(),
-            'vector': vector_name,
-            'old_baseline': old_baseline,
-            'new_baseline': data['vectors'][vector_name]['baseline'],
-            'adjustment_type': 'manual'
-        })
-        
-        # Keep only last 50 drift entries
-        if len(data['drift_history']) > 50:
-            data['drift_history'] = data['drift_history'][-50:]
-        
-        # Recalculate tether score
-        vectors = data['vectors']
-        total_alignment = sum(
-            1.0 - abs(v['value'] - v['baseline']) 
-            for v in vectors.values()
-        ) / len(vectors)
-        data['tether_score'] = total_alignment
-        
-        # Update identity stability
-        if data['tether_score'] > 0.9:
-            data['identity_stability'] = 'excellent'
-        elif data['tether_score'] > 0.7:
-            data['identity_stability'] = 'good'
-        elif data['tether_score'] > 0.5:
-            data['identity_stability'] = 'concerning'
-        else:
-            data['identity_stability'] = 'critical'
-        
-        data['last_calibration'] = datetime.now().isoformat()
-        
-        # Save updated state
-        memory_api.save_json_file(ANCHOR_STATE_PATH, data)
+        with memory_api.anchor_state.lock:
+            # Load current state
+            data = memory_api.anchor_state.data
+            
+            if vector_name not in data.get('vectors', {}):
+                return jsonify({'error': f'Vector {vector_name} not found'}), 404
+            
+            # Record old value for drift tracking
+            old_baseline = data['vectors'][vector_name]['baseline']
+            
+            # Update baseline
+            data['vectors'][vector_name]['baseline'] = max(0.0, min(1.0, new_value))
+            
+            # Record adjustment in drift history
+            if 'drift_history' not in data:
+                data['drift_history'] = []
+            
+            data['drift_history'].append({
+                'timestamp': datetime.now().isoformat(),
+                'vector': vector_name,
+                'old_baseline': old_baseline,
+                'new_baseline': data['vectors'][vector_name]['baseline'],
+                'adjustment_type': 'manual'
+            })
+            
+            # Keep only last 50 drift entries
+            if len(data['drift_history']) > 50:
+                data['drift_history'] = data['drift_history'][-50:]
+            
+            # Recalculate tether score
+            vectors = data['vectors']
+            total_alignment = sum(
+                1.0 - abs(v['value'] - v['baseline']) 
+                for v in vectors.values()
+            ) / len(vectors)
+            data['tether_score'] = total_alignment
+            
+            # Update identity stability
+            if data['tether_score'] > 0.9:
+                data['identity_stability'] = 'excellent'
+            elif data['tether_score'] > 0.7:
+                data['identity_stability'] = 'good'
+            elif data['tether_score'] > 0.5:
+                data['identity_stability'] = 'concerning'
+            else:
+                data['identity_stability'] = 'critical'
+            
+            data['last_calibration'] = datetime.now().isoformat()
+            
+            # Save updated state (flushed in the background)
+            memory_api.anchor_state.mark_dirty()
         
         return jsonify({
             'success': True,
@@ -404,38 +384,39 @@ def adjust_anchor_baseline():
 def simulate_drift():
     """Simulate natural drift for demonstration purposes"""
     try:
-        data = memory_api.load_json_file(ANCHOR_STATE_PATH)
-        
-        # Simulate small random drifts in current values
-        for vector_name, vector_data in data['vectors'].items():
-            drift_amount = random.uniform(-0.05, 0.05)
-            new_value = max(0.0, min(1.0, vector_data['value'] + drift_amount))
-            vector_data['value'] = new_value
+        with memory_api.anchor_state.lock:
+            data = memory_api.anchor_state.data
             
-            # Record drift in recent_drift array
-            if 'recent_drift' not in vector_data:
-                vector_data['recent_drift'] = []
+            # Simulate small random drifts in current values
+            for vector_name, vector_data in data['vectors'].items():
+                drift_amount = random.uniform(-0.05, 0.05)
+                new_value = max(0.0, min(1.0, vector_data['value'] + drift_amount))
+                vector_data['value'] = new_value
+                
+                # Record drift in recent_drift array
+                if 'recent_drift' not in vector_data:
+                    vector_data['recent_drift'] = []
+                
+                vector_data['recent_drift'].append({
+                    'timestamp': datetime.now().isoformat(),
+                    'drift_amount': drift_amount,
+                    'new_value': new_value
+                })
+                
+                # Keep only last 20 drift records
+                if len(vector_data['recent_drift']) > 20:
+                    vector_data['recent_drift'] = vector_data['recent_drift'][-20:]
             
-            vector_data['recent_drift'].append({
-                'timestamp': datetime.now().isoformat(),
-                'drift_amount': drift_amount,
-                'new_value': new_value
-            })
+            # Recalculate tether score
+            vectors = data['vectors']
+            total_alignment = sum(
+                1.0 - abs(v['value'] - v['baseline']) 
+                for v in vectors.values()
+            ) / len(vectors)
+            data['tether_score'] = total_alignment
             
-            # Keep only last 20 drift records
-            if len(vector_data['recent_drift']) > 20:
-                vector_data['recent_drift'] = vector_data['recent_drift'][-20:]
-        
-        # Recalculate tether score
-        vectors = data['vectors']
-        total_alignment = sum(
-            1.0 - abs(v['value'] - v['baseline']) 
-            for v in vectors.values()
-        ) / len(vectors)
-        data['tether_score'] = total_alignment
-        
-        # Save updated state
-        memory_api.save_json_file(ANCHOR_STATE_PATH, data)
+            # Save updated state (flushed in the background)
+            memory_api.anchor_state.mark_dirty()
         
         return jsonify({
             'success': True,
@@ -13,9 +13,10 @@ from typing import Dict, Any, Optional, List, Tuple
 from pathlib import Path
 import hashlib
 import os
-import re
 from collections import defaultdict
 
+from modules.emotion.analysis_service import TokenizedText, get_analysis_service
+
 logger = logging.getLogger(__name__)
 
 class MemorySystem:
@@ -54,6 +55,9 @@ class MemorySystem:
             'horrible', 'hate', 'disgusted', 'depressed', 'lonely', 'scared'
         }
 
+        self.analysis_service = get_analysis_service()
+        self._analysis_key = self.analysis_service.register_method("memory_sentiment", self._score_sentiment)
+
         logger.info("🧠 Memory System initialized")
 
     def _is_authorized(self, persona: Optional[str], token: Optional[str]) -> bool:
@@ -204,8 +208,11 @@ class MemorySystem:
     
     def _analyze_sentiment(self, text: str) -> Tuple[float, List[str]]:
         """Basic sentiment analysis using keyword matching"""
-        text_lower = text.lower()
-        words = re.findall(r'\b\w+\b', text_lower)
+        sentiment_score, emotion_tags = self.analysis_service.run(self._analysis_key, text)
+        return sentiment_score, list(emotion_tags)
+
+    def _score_sentiment(self, tokens: TokenizedText) -> Tuple[float, Tuple[str, ...]]:
+        words = tokens.words
         
         positive_count = sum(1 for word in words if word in self.positive_keywords)
         negative_count = sum(1 for word in words if word in self.negative_keywords)
@@ -227,7 +234,7 @@ class MemorySystem:
             elif word in self.negative_keywords:
                 emotion_tags.append(f"negative:{word}")
         
-        return sentiment_score, emotion_tags
+        return sentiment_score, tuple(emotion_tags)
     
     def _update_emotional_patterns(self, emotion_tags: List[str], sentiment_score: float):
         """Update long-term emotional patterns"""
@@ -139,9 +139,11 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup system components on shutdown"""
-    global database
+    global companion_system, database
     
     try:
+        if companion_system:
+            await companion_system.close()
         if database:
             await database.close()
         logger.info("System shutdown complete")
@@ -7,6 +7,8 @@ stream override and safety protocols.
 
 import asyncio
 import logging
+import re
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional, Callable
 from datetime import datetime
 from dataclasses import dataclass
@@ -53,6 +55,54 @@ class CrisisIntervention:
     timestamp: datetime
     outcome: Optional[str] = None
 
+class CrisisPatternMatcher:
+    """
+    All crisis patterns compiled into a single word-boundary-aware regex
+
+    One scan of the input reports every pattern hit grouped by crisis level,
+    including hits that overlap each other, so cost grows with input length
+    rather than with the number of patterns.
+    """
+    
+    def __init__(self, patterns: Dict[CrisisLevel, List[str]]):
+        self.patterns = {level: list(level_patterns) for level, level_patterns in patterns.items()}
+        
+        # pattern -> [(level, position within level)], preserving declaration order
+        self._pattern_levels: Dict[str, List[tuple]] = {}
+        for level, level_patterns in self.patterns.items():
+            for position, pattern in enumerate(level_patterns):
+                self._pattern_levels.setdefault(self._normalize(pattern), []).append((level, position))
+        
+        # Longest first so the most specific pattern wins at a given position;
+        # the zero-width lookahead lets hits starting inside another hit be reported.
+        alternatives = sorted(self._pattern_levels, key=len, reverse=True)
+        self._regex = re.compile(
+            r"(?=(?<!\w)(" + "|".join(re.escape(p) for p in alternatives) + r")(?!\w))"
+        ) if alternatives else None
+    
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return text.lower().replace("\u2019", "'")
+    
+    def match(self, text: str) -> Dict[CrisisLevel, List[str]]:
+        """Return the patterns hit in text, grouped by level in declaration order"""
+        if self._regex is None:
+            return {}
+        
+        positions: Dict[CrisisLevel, set] = {}
+        for found in self._regex.finditer(self._normalize(text)):
+            for level, position in self._pattern_levels[found.group(1)]:
+                positions.setdefault(level, set()).add(position)
+        
+        return {
+            level: [self.patterns[level][position] for position in sorted(positions[level])]
+            for level in self.patterns if level in positions
+        }
+    
+    def has_match(self, text: str) -> bool:
+        """True if any crisis pattern occurs in text"""
+        return self._regex is not None and self._regex.search(self._normalize(text)) is not None
+
 class CrisisSafetyOverride:
     """
     Crisis safety override system that can interrupt normal processing
@@ -82,6 +132,12 @@ class CrisisSafetyOverride:
                 "disappointed", "tired", "confused"
             ]
         }
+        self.pattern_matcher = CrisisPatternMatcher(self.crisis_patterns)
+        
+        # Assessments memoized per interaction so the interrupt check and the
+        # full assessment scan the same input only once
+        self._assessment_cache: "OrderedDict[tuple, CrisisAssessment]" = OrderedDict()
+        self._assessment_cache_size = config.get("assessment_cache_size", 256)
         
         # Safety resources by severity
         self.safety_resources = {
@@ -156,28 +212,36 @@ class CrisisSafetyOverride:
         self.crisis_logger.addHandler(handler)
         self.crisis_logger.setLevel(logging.WARNING)
     
+    def refresh_pattern_matcher(self):
+        """Recompile the matcher after crisis_patterns has been modified"""
+        self.pattern_matcher = CrisisPatternMatcher(self.crisis_patterns)
+        self._assessment_cache.clear()
+    
     async def assess_crisis_level(self, user_input: str, context: Dict[str, Any]) -> CrisisAssessment:
         """
         Enhanced crisis assessment with detailed analysis
+        
+        When the context carries an interaction_id the result is memoized, so
+        repeated assessments of the same interaction reuse the first one.
         """
-        user_input_lower = user_input.lower()
+        interaction_id = context.get("interaction_id")
+        cache_key = (interaction_id, user_input) if interaction_id else None
+        if cache_key is not None and cache_key in self._assessment_cache:
+            self._assessment_cache.move_to_end(cache_key)
+            return self._assessment_cache[cache_key]
+        
         detected_indicators = []
         max_level = CrisisLevel.NONE
         confidence_scores = {}
         
-        # Check against all crisis patterns
+        # Check against all crisis patterns in a single pass
+        level_hits = self.pattern_matcher.match(user_input)
         for level, patterns in self.crisis_patterns.items():
-            level_score = 0.0
-            level_indicators = []
-            
-            for pattern in patterns:
-                if pattern in user_input_lower:
-                    level_score += 1.0
-                    level_indicators.append(pattern)
+            level_indicators = level_hits.get(level, [])
             
             if level_indicators:
                 detected_indicators.extend(level_indicators)
-                confidence_scores[level] = level_score / len(patterns)
+                confidence_scores[level] = len(level_indicators) / len(patterns)
                 
                 # Update max level based on hierarchy
                 if level.value in ["critical"] and max_level.value not in ["critical"]:
@@ -221,6 +285,11 @@ class CrisisSafetyOverride:
         if assessment.level != CrisisLevel.NONE:
             self.crisis_logger.warning(f"Crisis detected: {assessment.level.value} - {detected_indicators}")
         
+        if cache_key is not None:
+            self._assessment_cache[cache_key] = assessment
+            if len(self._assessment_cache) > self._assessment_cache_size:
+                self._assessment_cache.popitem(last=False)
+        
         return assessment
     
     def _analyze_context_factors(self, context: Dict[str, Any]) -> Dict[str, Any]:
@@ -255,11 +324,8 @@ class CrisisSafetyOverride:
         crisis_count = 0
         
         for message in recent_messages:
-            user_input = message.get("user_input", "").lower()
-            for level_patterns in self.crisis_patterns.values():
-                if any(pattern in user_input for pattern in level_patterns):
-                    crisis_count += 1
-                    break
+            if self.pattern_matcher.has_match(message.get("user_input", "")):
+                crisis_count += 1
         
         return crisis_count >= 2
     
@@ -10,7 +10,7 @@ import json
 import time
 from typing import Dict, List, Any, Optional
 from datetime import datetime
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from contextlib import contextmanager
 from enum import Enum
 
@@ -56,6 +56,8 @@ class ProcessingTrace:
     decision_points: List[DecisionPoint]
     final_outcome: Dict[str, Any]
     performance_metrics: Dict[str, float]
+    stage_timings: Dict[str, float] = field(default_factory=dict)
+    background_stage_timings: Dict[str, float] = field(default_factory=dict)
 
 class EnhancedLogger:
     """
@@ -182,6 +184,28 @@ class EnhancedLogger:
             self.logger.debug(f"  Output: {json.dumps(decision_point.output_result, indent=2, default=str)}")
             self.logger.debug(f"  Context: {json.dumps(decision_point.context_factors, indent=2, default=str)}")
     
+    def record_stage_timing(self, stage: str, duration_ms: float, background: bool = False,
+                            interaction_id: Optional[str] = None):
+        """Record how long a pipeline stage took on the matching trace"""
+        trace = self.current_trace
+        if interaction_id and (trace is None or trace.interaction_id != interaction_id):
+            # Background stages usually finish after the trace has been archived
+            trace = next(
+                (t for t in reversed(self.decision_history) if t.interaction_id == interaction_id),
+                None
+            )
+        if trace is None:
+            return
+        
+        timings = trace.background_stage_timings if background else trace.stage_timings
+        timings[stage] = duration_ms
+        
+        if self.performance_logger.isEnabledFor(logging.DEBUG):
+            self.performance_logger.debug(
+                f"Stage timing - ID: {trace.interaction_id}, Stage: {stage}"
+                f"{' (background)' if background else ''}, Time: {duration_ms:.1f}ms"
+            )
+    
     def finish_interaction_trace(self, final_outcome: Dict[str, Any]):
         """Complete the current interaction trace"""
         if not self.current_trace:
@@ -210,7 +234,8 @@ class EnhancedLogger:
             "low_confidence_decisions": len([
                 dp for dp in self.current_trace.decision_points 
                 if dp.confidence_score < 0.5
-            ])
+            ]),
+            "stage_time_ms": sum(self.current_trace.stage_timings.values())
         }
         
         # Store trace in history
@@ -361,10 +386,19 @@ class EnhancedLogger:
             avg_processing_time = sum(t.total_processing_time_ms for t in traces) / len(traces)
             avg_decisions_per_interaction = sum(len(t.decision_points) for t in traces) / len(traces)
             
+            stage_totals: Dict[str, List[float]] = {}
+            for trace in traces:
+                for stage, duration_ms in {**trace.stage_timings, **trace.background_stage_timings}.items():
+                    stage_totals.setdefault(stage, []).append(duration_ms)
+            
             report["performance_summary"] = {
                 "average_processing_time_ms": avg_processing_time,
                 "average_decisions_per_interaction": avg_decisions_per_interaction,
-                "total_decisions_analyzed": len(all_decisions)
+                "total_decisions_analyzed": len(all_decisions),
+                "average_stage_time_ms": {
+                    stage: sum(durations) / len(durations)
+                    for stage, durations in stage_totals.items()
+                }
             }
         
         # Generate recommendations
@@ -6,6 +6,7 @@ comprehensive directive guidance to the MythoMax LLM.
 """
 
 import asyncio
+import functools
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -21,6 +22,7 @@ from ..emotion.mood_style_profiles import MoodStyleProfile, get_mood_style_profi
 from ..autonomy.desire_initiator import desire_initiator
 from ..voice.voice_manager import voice_manager
 from ..memory.memory_manager import memory_manager
+from .guidance_scheduler import GuidanceScheduler, input_fingerprint, select_context
 
 # Import enhancement functions
 from ...utils.message_timing import infer_conversation_tempo
@@ -29,6 +31,20 @@ from ...utils.event_logger import log_emotional_event
 
 logger = logging.getLogger(__name__)
 
+# Context fields each guidance module reads besides the user input. Modules are
+# handed only these, so their memo keys cover everything they depend on while
+# per-turn counters, history and timestamps stay out.
+MODULE_CONTEXT_FIELDS = {
+    "attachment": ("mood", "emotional_intensity", "current_emotional_state"),
+    "shadow_memory": ("mood", "current_emotional_state"),
+    "dream_engine": ("mood", "creative_context"),
+    "audio": ("mood", "current_emotional_state"),
+    "creative": ("mood", "creative_context"),
+    "desire_system": (),
+    "ritual_hooks": ("conversation_depth",),
+    "sensory_preferences": ("mood",),
+}
+
 @dataclass
 class GuidancePackage:
     """Comprehensive guidance package for MythoMax"""
@@ -81,6 +97,7 @@ class GuidanceCoordinator:
         self.ritual_prompt_generator = RitualPromptGenerator()
         self.conversation_turn = 0
         self.ritual_check_interval = 5
+        self.scheduler = GuidanceScheduler(module_timeouts={"dream_engine": 0.5, "audio": 0.5})
         self._initialize_modules()
         
     def _initialize_modules(self):
@@ -242,8 +259,9 @@ class GuidanceCoordinator:
             conversation_length=conversation_length
         )
         
-        # Enhancement Function 5: Log emotional event
-        log_emotional_event(
+        # Enhancement Function 5: Log emotional event (file I/O runs off the event loop)
+        asyncio.get_running_loop().run_in_executor(None, functools.partial(
+            log_emotional_event,
             event_type="guidance_analysis_start",
             intensity=context.get("emotional_intensity", 0.5),
             tag=f"Guidance analysis for user input in {mood} mood",
@@ -254,7 +272,7 @@ class GuidanceCoordinator:
                 "silence_duration": recent_silence
             },
             source_module="guidance_coordinator"
-        )
+        ))
 
         # Low-activity mode check: if user silent + not sleeping → run soft internal prompt
         if self.dream_module and recent_silence > 1800:  # 30+ minutes of silence
@@ -294,80 +312,64 @@ class GuidanceCoordinator:
         if ritual_suggestion:
             guidance.mode_specifics["ritual_suggestion"] = ritual_suggestion
             
-        active_modules = []
-        
-        # Run all analysis in parallel for efficiency
-        tasks = []
+        # Module fan-out: each module gets its own timeout and the whole set
+        # shares a per-turn budget; late modules fall back to cached guidance
+        contexts = {name: select_context(context, fields) for name, fields in MODULE_CONTEXT_FIELDS.items()}
+        jobs = {}
         
         if self.attachment_engine:
-            tasks.append(self._get_attachment_guidance(user_input, context))
-            active_modules.append("attachment")
+            jobs["attachment"] = lambda: self._get_attachment_guidance(user_input, contexts["attachment"])
         
         if self.shadow_memory:
-            tasks.append(self._get_shadow_insights(user_input, context))
-            active_modules.append("shadow_memory")
+            jobs["shadow_memory"] = lambda: self._get_shadow_insights(user_input, contexts["shadow_memory"])
             
         if self.dream_engine:
-            tasks.append(self._get_dream_guidance(user_input, context))
-            active_modules.append("dream_engine")
+            jobs["dream_engine"] = lambda: self._get_dream_guidance(user_input, contexts["dream_engine"])
             
         if self.audio_layer:
-            tasks.append(self._get_audio_guidance(user_input, context))
-            active_modules.append("audio")
+            jobs["audio"] = lambda: self._get_audio_guidance(user_input, contexts["audio"])
             
         if self.creative_module:
-            tasks.append(self._get_creative_guidance(user_input, context))
-            active_modules.append("creative")
+            jobs["creative"] = lambda: self._get_creative_guidance(user_input, contexts["creative"])
             
         # NEW ENHANCED MODULE ROUTING - Active integration
         if self.desire_registry:
-            tasks.append(self._get_desire_guidance(user_input, context))
-            active_modules.append("desire_system")
+            jobs["desire_system"] = lambda: self._get_desire_guidance(user_input, contexts["desire_system"])
             
         if self.ritual_engine:
-            tasks.append(self._get_ritual_guidance(user_input, context))
-            active_modules.append("ritual_hooks")
+            jobs["ritual_hooks"] = lambda: self._get_ritual_guidance(user_input, contexts["ritual_hooks"])
             
         if self.sensory_preferences:
-            tasks.append(self._get_sensory_guidance(user_input, context))
-            active_modules.append("sensory_preferences")
+            jobs["sensory_preferences"] = lambda: self._get_sensory_guidance(user_input,
+                                                                             contexts["sensory_preferences"])
         
-        self.logger.debug(f"📋 Active modules for analysis: {', '.join(active_modules)}")
+        self.logger.debug(f"📋 Active modules for analysis: {', '.join(jobs)}")
         
-        # Execute all guidance gathering in parallel
-        if tasks:
-            self.logger.debug(f"⚡ Running {len(tasks)} analysis tasks in parallel")
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Process results and update guidance package
-            successful_results = 0
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    self.logger.error(f"❌ {active_modules[i]} module failed: {result}")
-                else:
-                    successful_results += 1
-                    self.logger.debug(f"✅ {active_modules[i]} module completed successfully")
-            
-            self.logger.info(f"📊 Module Results: {successful_results}/{len(tasks)} successful")
-            self._integrate_guidance_results(guidance, results)
-        else:
-            self.logger.warning("⚠️ No modules available for guidance analysis - using fallback")
-        
-        # Generate symbolic weight guidance from memory manager
+        # Symbolic guidance only writes its own mode_specifics entry, and the
+        # therapeutic, environmental and safety assessments only need the input,
+        # so both overlap with the module fan-out
         self.logger.debug("🎭 Generating symbolic guidance...")
-        await self._generate_symbolic_guidance(guidance, user_input, context)
-        
-        # Perform therapeutic analysis
-        self.logger.debug("🧠 Performing therapeutic analysis...")
-        await self._assess_therapeutic_needs(guidance, user_input, context)
-        
-        # Determine environmental recommendations
-        self.logger.debug("🌍 Generating environmental guidance...")
-        await self._generate_environmental_guidance(guidance, user_input, context)
+        symbolic_task = asyncio.ensure_future(self._generate_symbolic_guidance(guidance, user_input, context))
+        self.logger.debug("🧠 Performing therapeutic, environmental and safety assessment...")
+        assessment_task = asyncio.ensure_future(self._assess_turn(user_input, context))
         
-        # Assess safety and crisis levels
-        self.logger.debug("🚨 Assessing safety protocols...")
-        await self._assess_safety_protocols(guidance, user_input, context)
+        try:
+            if jobs:
+                self.logger.debug(f"⚡ Running {len(jobs)} analysis tasks within {self.scheduler.turn_budget:.2f}s budget")
+                fingerprints = {name: input_fingerprint(user_input, contexts[name]) for name in jobs}
+                module_results = await self.scheduler.run(jobs, fingerprints)
+                
+                self.logger.info(f"📊 Module Results: {len(module_results)}/{len(jobs)} available")
+                self._integrate_guidance_results(guidance, list(module_results.values()))
+            else:
+                self.logger.warning("⚠️ No modules available for guidance analysis - using fallback")
+            
+            await symbolic_task
+            # Applied after the module results so crisis priorities override theirs
+            self._apply_assessment(guidance, await assessment_task)
+        finally:
+            for task in (symbolic_task, assessment_task):
+                task.cancel()
 
         user_id = context.get("user_id", "default")
         if desire_initiator.should_initiate(user_id):
@@ -752,6 +754,30 @@ class GuidanceCoordinator:
         except Exception as e:
             self.logger.error(f"Error generating symbolic guidance: {e}")
 
+    async def _assess_turn(self, user_input: str, context: Dict) -> GuidancePackage:
+        """Therapeutic, environmental and safety assessment on a scratch package"""
+        assessment = GuidancePackage(emotional_priority="")
+        await self._assess_therapeutic_needs(assessment, user_input, context)
+        # Both only read the crisis level set above
+        await asyncio.gather(
+            self._generate_environmental_guidance(assessment, user_input, context),
+            self._assess_safety_protocols(assessment, user_input, context)
+        )
+        return assessment
+
+    def _apply_assessment(self, guidance: GuidancePackage, assessment: GuidancePackage):
+        """Merge the turn assessment into the guidance built from module results"""
+        guidance.crisis_level = assessment.crisis_level
+        guidance.therapeutic_guidance = assessment.therapeutic_guidance
+        if assessment.safety_protocols:
+            guidance.safety_protocols = assessment.safety_protocols
+        if assessment.emotional_priority:
+            guidance.emotional_priority = assessment.emotional_priority
+        guidance.scene_guidance = assessment.scene_guidance
+        if not guidance.audio_guidance:  # Don't override if already set by audio module
+            guidance.audio_guidance = assessment.audio_guidance
+        guidance.utility_actions.extend(assessment.utility_actions)
+
     async def _assess_therapeutic_needs(self, guidance: GuidancePackage, user_input: str, context: Dict):
         """Assess therapeutic intervention needs"""
         # Crisis keywords that require immediate attention
@@ -1263,3 +1289,7 @@ class GuidanceCoordinator:
         except Exception as e:
             self.logger.error(f"Error getting devotion analytics: {e}")
             return {"available": False, "error": str(e)}
+
+    def get_guidance_stats(self) -> Dict[str, Any]:
+        """Per-module latency histograms and scheduling counters for guidance fan-out"""
+        return self.scheduler.get_stats()
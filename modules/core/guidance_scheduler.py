@@ -0,0 +1,231 @@
+"""
+Guidance Scheduler for the Unified Companion System
+
+Runs the GuidanceCoordinator's module fan-out under a per-turn time budget.
+Every module gets its own timeout; modules that miss the budget are filled
+from their last good guidance while they finish in the background and refresh
+the cache. Modules whose inputs have not changed since a recent turn are served
+from a short-TTL memo without running. Per-module latency histograms are kept
+for diagnostics.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is open-ended
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram"""
+
+    def __init__(self, bounds: Optional[List[float]] = None):
+        self.bounds = list(bounds or LATENCY_BUCKETS_MS)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def record(self, duration_ms: float):
+        self.counts[bisect.bisect_left(self.bounds, duration_ms)] += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of samples"""
+        total = self.count
+        if not total:
+            return 0.0
+        threshold = fraction * total
+        running = 0
+        for index, bucket_count in enumerate(self.counts):
+            running += bucket_count
+            if running >= threshold:
+                return float(self.bounds[index]) if index < len(self.bounds) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        total = self.count
+        labels = [f"<={bound}ms" for bound in self.bounds] + [f">{self.bounds[-1]}ms"]
+        return {
+            "count": total,
+            "mean_ms": self.total_ms / total if total else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": self.max_ms,
+            "buckets": dict(zip(labels, self.counts))
+        }
+
+
+@dataclass
+class ModuleStats:
+    """Counters for a single guidance module"""
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    runs: int = 0
+    memo_hits: int = 0
+    late: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    stale_fills: int = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "memo_hits": self.memo_hits,
+            "late": self.late,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "stale_fills": self.stale_fills,
+            "latency": self.latency.snapshot()
+        }
+
+
+def input_fingerprint(user_input: str, context: Dict[str, Any]) -> str:
+    """Stable digest of a module's inputs, used as the memo key"""
+    payload = json.dumps([user_input, context], sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def select_context(context: Dict[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+    """
+    The fields of a turn's context that one module reads
+
+    Handing a module only these fields and fingerprinting the same selection
+    keeps per-turn counters, history and timestamps out of its memo key.
+    """
+    return {name: context[name] for name in fields if name in context}
+
+
+class GuidanceScheduler:
+    """
+    Time-budgeted fan-out over guidance modules
+
+    Args:
+        turn_budget: Seconds the whole fan-out may take before late modules are dropped
+        module_timeout: Default per-module timeout in seconds
+        module_timeouts: Per-module overrides of module_timeout
+        cache_ttl: Seconds a memoized result stays valid for unchanged inputs
+    """
+
+    def __init__(self, turn_budget: float = 1.0, module_timeout: float = 0.8,
+                 module_timeouts: Optional[Dict[str, float]] = None, cache_ttl: float = 30.0):
+        self.turn_budget = turn_budget
+        self.module_timeout = module_timeout
+        self.module_timeouts = dict(module_timeouts or {})
+        self.cache_ttl = cache_ttl
+
+        # module -> (input fingerprint, result, monotonic time stored)
+        self._cache: Dict[str, Tuple[str, Any, float]] = {}
+        self._stats: Dict[str, ModuleStats] = {}
+        self._background: set = set()
+
+    def _module_stats(self, name: str) -> ModuleStats:
+        if name not in self._stats:
+            self._stats[name] = ModuleStats()
+        return self._stats[name]
+
+    async def run(self, jobs: Dict[str, Callable[[], Awaitable[Any]]],
+                  fingerprint: Union[str, Dict[str, str]]) -> Dict[str, Any]:
+        """
+        Run guidance modules within the turn budget
+
+        Args:
+            jobs: Module name -> zero-argument coroutine factory
+            fingerprint: Digest of this turn's inputs (see input_fingerprint), or
+                module name -> digest of the inputs that module reads
+
+        Returns:
+            Module name -> result for every module that produced fresh, memoized
+            or stale guidance. Modules with nothing to offer are omitted.
+        """
+        now = time.monotonic()
+        results: Dict[str, Any] = {}
+        tasks: Dict[asyncio.Task, str] = {}
+
+        for name, factory in jobs.items():
+            module_fingerprint = fingerprint[name] if isinstance(fingerprint, dict) else fingerprint
+            cached = self._cache.get(name)
+            if cached and cached[0] == module_fingerprint and now - cached[2] < self.cache_ttl:
+                self._module_stats(name).memo_hits += 1
+                results[name] = cached[1]
+                continue
+
+            timeout = self.module_timeouts.get(name, self.module_timeout)
+            task = asyncio.ensure_future(self._timed(name, factory, timeout, module_fingerprint))
+            tasks[task] = name
+
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=self.turn_budget)
+
+            for task in done:
+                name = tasks[task]
+                ok, value = task.result()
+                if ok:
+                    results[name] = value
+                else:
+                    self._fill_stale(name, results)
+
+            for task in pending:
+                # Keep running under the module's own timeout; the result
+                # refreshes the cache for the next turn
+                name = tasks[task]
+                self._module_stats(name).late += 1
+                self._fill_stale(name, results)
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+                logger.warning(f"⏱️ Guidance module {name} missed the {self.turn_budget:.2f}s turn budget")
+
+        # Preserve the caller's module order
+        return {name: results[name] for name in jobs if name in results}
+
+    async def _timed(self, name: str, factory: Callable[[], Awaitable[Any]],
+                     timeout: float, fingerprint: str) -> Tuple[bool, Any]:
+        stats = self._module_stats(name)
+        start = time.perf_counter()
+        try:
+            value = await asyncio.wait_for(factory(), timeout)
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            logger.warning(f"⏱️ Guidance module {name} timed out after {timeout:.2f}s")
+            return False, None
+        except Exception as e:
+            stats.errors += 1
+            logger.error(f"❌ Guidance module {name} failed: {e}")
+            return False, e
+        finally:
+            stats.runs += 1
+            stats.latency.record((time.perf_counter() - start) * 1000)
+
+        self._cache[name] = (fingerprint, value, time.monotonic())
+        return True, value
+
+    def _fill_stale(self, name: str, results: Dict[str, Any]):
+        cached = self._cache.get(name)
+        if cached is not None:
+            self._module_stats(name).stale_fills += 1
+            results[name] = cached[1]
+
+    async def drain(self):
+        """Wait for late modules still running in the background"""
+        if self._background:
+            await asyncio.gather(*list(self._background), return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-module latency histograms and scheduling counters"""
+        return {
+            "turn_budget_s": self.turn_budget,
+            "module_timeout_s": self.module_timeout,
+            "cache_ttl_s": self.cache_ttl,
+            "modules": {name: stats.snapshot() for name, stats in self._stats.items()}
+        }
@@ -0,0 +1,239 @@
+"""
+Stage Pipeline Executor
+
+Small dependency-graph executor for the unified companion's interaction flow.
+Stages declare the named values they consume; each stage starts as soon as its
+inputs are available, so independent stages run concurrently. Stages marked as
+background are handed to a per-companion queue and run after the response has
+been returned; the owner closes the queue to finish them before shutting down. Per-stage timings are recorded on the enhanced logger trace.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from .enhanced_logging import EnhancedLogger
+
+StageFunc = Callable[..., Awaitable[Any]]
+
+
+@dataclass
+class Stage:
+    """A single named step in the interaction pipeline"""
+    name: str
+    func: StageFunc
+    inputs: Sequence[str]
+    background: bool = False
+
+
+class BackgroundStageQueue:
+    """
+    FIFO queue for post-response work
+
+    Jobs run one at a time in submission order, so bookkeeping for a user is
+    applied in the same order as their interactions. Callers can wait for a
+    key's pending jobs before reading state those jobs write, and should
+    ``close`` the queue before its event loop ends. Jobs are kept outside any
+    one loop: if a loop ends with work still queued, the next loop that uses
+    the queue starts a new worker and runs it.
+    """
+
+    def __init__(self, logger: Optional[EnhancedLogger] = None):
+        self.enhanced_logger = logger
+        self.logger = logging.getLogger(__name__)
+        self._jobs: Deque[Tuple[str, List[Stage], Dict[str, Any], Optional[str]]] = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._drained: Optional[asyncio.Event] = None
+        self._pending: Dict[str, int] = defaultdict(int)
+        self._idle: Dict[str, asyncio.Event] = {}
+
+    def submit(self, key: str, stages: List[Stage], values: Dict[str, Any],
+               interaction_id: Optional[str] = None):
+        """Queue background stages that run against an already computed value set"""
+        if not stages:
+            return
+        self._pending[key] += 1
+        self._jobs.append((key, stages, values, interaction_id))
+        self._ensure_worker()
+        self._idle_event(key).clear()
+        self._drained.clear()
+        self._wakeup.set()
+
+    async def wait_for(self, key: str):
+        """Wait until every job submitted under key has finished"""
+        if self._pending.get(key):
+            self._ensure_worker()
+            await self._idle_event(key).wait()
+
+    async def drain(self):
+        """Wait until the queue is empty"""
+        if self._jobs:
+            self._ensure_worker()
+            await self._drained.wait()
+
+    async def close(self):
+        """Run every queued job, then stop the worker"""
+        await self.drain()
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+        self._worker = None
+
+    @property
+    def pending_count(self) -> int:
+        return sum(self._pending.values())
+
+    def _idle_event(self, key: str) -> asyncio.Event:
+        if key not in self._idle:
+            self._idle[key] = asyncio.Event()
+            self._idle[key].set()
+        return self._idle[key]
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # The worker and events belong to the loop that created them
+            self._loop = loop
+            self._worker = None
+            self._wakeup = asyncio.Event()
+            self._drained = asyncio.Event()
+            self._idle = {}
+            for key in self._pending:
+                self._idle_event(key).clear()
+            if not self._jobs:
+                self._drained.set()
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            if not self._jobs:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            key, stages, values, interaction_id = self._jobs[0]
+            try:
+                await run_stages(stages, values, self.enhanced_logger, interaction_id)
+            except asyncio.CancelledError:
+                # Cut off by its loop ending: the job stays queued for the next worker
+                raise
+            except Exception as e:
+                self.logger.error(f"Background stage failed for {key}: {e}")
+
+            self._jobs.popleft()
+            self._pending[key] -= 1
+            if self._pending[key] <= 0:
+                del self._pending[key]
+                self._idle_event(key).set()
+            if not self._jobs:
+                self._drained.set()
+
+
+class StagePipeline:
+    """Declarative set of stages split into foreground and background work"""
+
+    def __init__(self):
+        self.stages: Dict[str, Stage] = {}
+
+    def add_stage(self, name: str, func: StageFunc, inputs: Sequence[str] = (),
+                  background: bool = False) -> 'StagePipeline':
+        """
+        Register a stage
+
+        Args:
+            name: Name under which the stage's result is published
+            func: Coroutine function called with its inputs as keyword arguments
+            inputs: Names of initial values or earlier stages this stage needs
+            background: Run after the response is returned instead of inline
+        """
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        self.stages[name] = Stage(name, func, tuple(inputs), background)
+        return self
+
+    @property
+    def foreground(self) -> List[Stage]:
+        return [stage for stage in self.stages.values() if not stage.background]
+
+    @property
+    def background(self) -> List[Stage]:
+        return [stage for stage in self.stages.values() if stage.background]
+
+    def validate(self, initial: Sequence[str]):
+        """Check that every input resolves and foreground stages never wait on background ones"""
+        available = set(initial) | set(self.stages)
+        for stage in self.stages.values():
+            missing = [name for name in stage.inputs if name not in available]
+            if missing:
+                raise ValueError(f"Stage {stage.name} has unknown inputs: {missing}")
+            if not stage.background:
+                deferred = [name for name in stage.inputs
+                            if name in self.stages and self.stages[name].background]
+                if deferred:
+                    raise ValueError(f"Stage {stage.name} depends on background stages: {deferred}")
+
+    async def run(self, initial: Dict[str, Any], logger: Optional[EnhancedLogger] = None,
+                  background_queue: Optional[BackgroundStageQueue] = None,
+                  queue_key: str = "default") -> Dict[str, Any]:
+        """
+        Run foreground stages and hand background stages to the queue
+
+        Returns:
+            Dict of initial values plus every foreground stage result
+        """
+        self.validate(list(initial))
+        interaction_id = logger.current_trace.interaction_id if logger and logger.current_trace else None
+        values = await run_stages(self.foreground, initial, logger, interaction_id)
+
+        if background_queue is not None:
+            background_queue.submit(queue_key, self.background, values, interaction_id)
+        elif self.background:
+            values = await run_stages(self.background, values, logger, interaction_id)
+        return values
+
+
+async def run_stages(stages: Sequence[Stage], initial: Dict[str, Any],
+                     logger: Optional[EnhancedLogger] = None,
+                     interaction_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run stages as a dependency graph, starting each one once its inputs resolve
+
+    The first failing stage cancels the rest and its exception propagates.
+    """
+    values = dict(initial)
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def execute(stage: Stage):
+        for name in stage.inputs:
+            if name in tasks:
+                await tasks[name]
+        kwargs = {name: values[name] for name in stage.inputs}
+        start = time.perf_counter()
+        try:
+            result = await stage.func(**kwargs)
+        finally:
+            if logger is not None:
+                logger.record_stage_timing(
+                    stage.name, (time.perf_counter() - start) * 1000,
+                    background=stage.background, interaction_id=interaction_id
+                )
+        values[stage.name] = result
+        return result
+
+    for stage in stages:
+        tasks[stage.name] = asyncio.ensure_future(execute(stage))
+
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+    return values
@@ -20,6 +20,7 @@ from .context_detector import ContextDetector
 from .adaptive_mode_coordinator import AdaptiveModeCoordinator
 from .crisis_safety_override import CrisisSafetyOverride, CrisisLevel
 from .enhanced_logging import EnhancedLogger, DecisionCategory
+from .stage_pipeline import StagePipeline, BackgroundStageQueue
 from ..memory.narrative_memory_templates import NarrativeMemoryTemplateManager
 from ..emotion.mood_inflection import MoodInflection
 from ..symbolic.symbol_resurrection import SymbolResurrectionManager
@@ -30,6 +31,7 @@ from ..database.database_interface import (
     create_database_interface, DatabaseInterface, UserProfile,
     InteractionRecord, PsychologicalState, MemoryFragment, InteractionType
 )
+from ..database.write_behind import WriteBehindBuffer
 
 @dataclass
 class InteractionState:
@@ -422,10 +424,13 @@ class UnifiedCompanion:
         self.mythomax = MythoMaxInterface(config.get("mythomax", {}))
         self.context_detector = ContextDetector()
         self.mode_coordinator = AdaptiveModeCoordinator("system")  # Will be updated per user
+        # One coordinator per user, so guidance memoization and latency stats survive across turns
+        self.user_mode_coordinators: Dict[str, AdaptiveModeCoordinator] = {}
         
         # Enhanced systems
         self.crisis_override = CrisisSafetyOverride(config.get("crisis_safety", {}))
         self.enhanced_logger = EnhancedLogger("unified_companion", config.get("logging", {}))
+        self.background_stages = BackgroundStageQueue(self.enhanced_logger)
         
         # Database integration
         db_config = config.get("database", {})
@@ -433,6 +438,15 @@ class UnifiedCompanion:
             connection_string=db_config.get("connection_string"),
             database_type=db_config.get("type", "inmemory")
         )
+        write_behind = db_config.get("write_behind")
+        if write_behind:
+            # Batch per-turn writes; reads for a user flush that user's pending writes first
+            options = write_behind if isinstance(write_behind, dict) else {}
+            self.database = WriteBehindBuffer(
+                self.database,
+                max_batch=options.get("max_batch", 50),
+                flush_interval=options.get("flush_interval", 0.5)
+            )
         
         # Core systems
         self.interaction_states: Dict[str, InteractionState] = {}
@@ -763,8 +777,9 @@ class UnifiedCompanion:
                 {"session_context": session_context}
             )
             
+            # Reuses the assessment memoized by the interrupt check above
             crisis_assessment = await self.crisis_override.assess_crisis_level(
-                user_input, session_context or {}
+                user_input, context_for_assessment
             )
             
             # Check for crisis override
@@ -804,113 +819,172 @@ class UnifiedCompanion:
                     }
                 }
             
-            # STEP 2: Load/Create User Profile and Interaction State
-            user_profile = await self.database.get_user_profile(user_id)
-            if not user_profile:
-                user_profile = await self._create_new_user_profile(user_id)
-                
-            interaction_state = await self._get_interaction_state(user_id, session_context)
-            
+            # STEPS 2-13 run as a stage graph: each stage starts once its inputs
+            # are ready, and bookkeeping after the response is queued to run in
+            # the background so the user is not kept waiting for it.
+            async def load_user_profile():
+                user_profile = await self.database.get_user_profile(user_id)
+                if not user_profile:
+                    user_profile = await self._create_new_user_profile(user_id)
+                return user_profile
+
+            async def load_interaction_state():
+                # Let queued bookkeeping from this user's previous turn land first
+                await self.background_stages.wait_for(user_id)
+                return await self._get_interaction_state(user_id, session_context)
+
             # STEP 3: Retrieve Relevant Memories
-            self.enhanced_logger.log_decision(
-                DecisionCategory.MEMORY_RETRIEVAL,
-                "Retrieving relevant memories",
-                {"user_id": user_id},
-                "Context-based memory relevance scoring",
-                None,
-                0.8
-            )
-            
-            relevant_memories = await self._retrieve_relevant_memories(user_id, user_input, interaction_state)
-            
+            async def retrieve_memories(interaction_state):
+                self.enhanced_logger.log_decision(
+                    DecisionCategory.MEMORY_RETRIEVAL,
+                    "Retrieving relevant memories",
+                    {"user_id": user_id},
+                    "Context-based memory relevance scoring",
+                    None,
+                    0.8
+                )
+                return await self._retrieve_relevant_memories(user_id, user_input, interaction_state)
+
             # STEP 4: Enhanced Context Analysis
-            analysis_context = await self._build_enhanced_context(
-                interaction_state, user_profile, relevant_memories, crisis_assessment
-            )
-            analysis_context['current_input'] = user_input
-            
+            async def build_context(interaction_state, user_profile, relevant_memories, crisis_assessment):
+                analysis_context = await self._build_enhanced_context(
+                    interaction_state, user_profile, relevant_memories, crisis_assessment
+                )
+                analysis_context['current_input'] = user_input
+                return analysis_context
+
             # STEP 5: Mode Detection with Enhanced Logging
-            self.enhanced_logger.log_decision(
-                DecisionCategory.MODE_DETECTION,
-                "Detecting optimal interaction mode",
-                {"input_length": len(user_input), "emotional_context": analysis_context.get("current_emotional_state", {})},
-                "Multi-factor mode detection algorithm",
-                None,
-                0.0
-            )
-            
-            user_mode_coordinator = AdaptiveModeCoordinator(user_id)
-            guidance_package = await user_mode_coordinator.process_interaction(
-                user_input, analysis_context
-            )
-            
-            self.enhanced_logger.log_decision(
-                DecisionCategory.MODE_DETECTION,
-                "Mode detection completed",
-                {"detected_mode": guidance_package.primary_mode},
-                f"Selected {guidance_package.primary_mode} based on context analysis",
-                guidance_package.primary_mode,
-                0.85  # Mode detection confidence
-            )
-            
+            async def detect_mode(analysis_context):
+                self.enhanced_logger.log_decision(
+                    DecisionCategory.MODE_DETECTION,
+                    "Detecting optimal interaction mode",
+                    {"input_length": len(user_input), "emotional_context": analysis_context.get("current_emotional_state", {})},
+                    "Multi-factor mode detection algorithm",
+                    None,
+                    0.0
+                )
+                
+                user_mode_coordinator = self._get_mode_coordinator(user_id)
+                guidance_package = await user_mode_coordinator.process_interaction(
+                    user_input, analysis_context
+                )
+                
+                self.enhanced_logger.log_decision(
+                    DecisionCategory.MODE_DETECTION,
+                    "Mode detection completed",
+                    {"detected_mode": guidance_package.primary_mode},
+                    f"Selected {guidance_package.primary_mode} based on context analysis",
+                    guidance_package.primary_mode,
+                    0.85  # Mode detection confidence
+                )
+                return guidance_package
+
+            async def build_interaction_data(analysis_context, guidance_package):
+                return {
+                    "user_input": user_input,
+                    "emotional_state": analysis_context.get("current_emotional_state", {}),
+                    "context_analysis": analysis_context,
+                    "interaction_type": guidance_package.primary_mode
+                }
+
             # STEP 6: Emotional Weight Tracking
-            interaction_data = {
-                "user_input": user_input,
-                "emotional_state": analysis_context.get("current_emotional_state", {}),
-                "context_analysis": analysis_context,
-                "interaction_type": guidance_package.primary_mode
-            }
-            
-            await self.emotional_weight_tracker.update_emotional_weight(user_id, interaction_data)
-            
+            async def track_emotional_weight(interaction_data):
+                await self.emotional_weight_tracker.update_emotional_weight(user_id, interaction_data)
+
             # STEP 7: Symbolic Context Storage
-            await self.symbolic_context_manager.store_symbolic_context(user_id, interaction_data)
-            
+            async def store_symbolic_context(interaction_data):
+                await self.symbolic_context_manager.store_symbolic_context(user_id, interaction_data)
+
             # STEP 8: Dynamic Template Selection
-            available_templates = self._get_base_response_patterns()
-            optimal_templates = await self.dynamic_template_engine.select_optimal_template(
-                user_id, analysis_context, available_templates
-            )
-            
-            self.enhanced_logger.log_decision(
-                DecisionCategory.RESPONSE_GENERATION,
-                "Dynamic template selection",
-                {"available_categories": list(available_templates.keys())},
-                "User history and context-based template optimization",
-                list(optimal_templates.keys()),
-                0.9
-            )
-            
+            async def select_templates(analysis_context):
+                optimal_templates = await self.dynamic_template_engine.select_optimal_template(
+                    user_id, analysis_context, available_templates
+                )
+                
+                self.enhanced_logger.log_decision(
+                    DecisionCategory.RESPONSE_GENERATION,
+                    "Dynamic template selection",
+                    {"available_categories": list(available_templates.keys())},
+                    "User history and context-based template optimization",
+                    list(optimal_templates.keys()),
+                    0.9
+                )
+                return optimal_templates
+
             # STEP 9: Enhanced Response Generation
-            companion_response = await self._generate_enhanced_companion_response(
-                user_input, 
-                analysis_context, 
-                guidance_package, 
-                interaction_state,
-                optimal_templates,
-                relevant_memories
-            )
-            
-            # STEP 10: Update Template Effectiveness (simple heuristic)
-            response_quality = await self._estimate_response_quality(companion_response, analysis_context)
-            for category, template in optimal_templates.items():
-                template_index = available_templates[category].index(template) if template in available_templates[category] else 0
-                await self.dynamic_template_engine.update_template_effectiveness(
-                    user_id, category, template_index, response_quality
+            async def generate_response(analysis_context, guidance_package, interaction_state,
+                                        optimal_templates, relevant_memories):
+                return await self._generate_enhanced_companion_response(
+                    user_input, 
+                    analysis_context, 
+                    guidance_package, 
+                    interaction_state,
+                    optimal_templates,
+                    relevant_memories
                 )
-            
+
+            # STEP 10: Update Template Effectiveness (simple heuristic)
+            async def update_template_effectiveness(companion_response, analysis_context, optimal_templates):
+                response_quality = await self._estimate_response_quality(companion_response, analysis_context)
+                for category, template in optimal_templates.items():
+                    template_index = available_templates[category].index(template) if template in available_templates[category] else 0
+                    await self.dynamic_template_engine.update_template_effectiveness(
+                        user_id, category, template_index, response_quality
+                    )
+
             # STEP 11: Comprehensive Database Storage
-            await self._store_interaction_data(
-                interaction_id, user_id, user_input, companion_response, 
-                analysis_context, guidance_package, interaction_state
-            )
-            
+            async def store_interaction(companion_response, analysis_context, guidance_package, interaction_state):
+                await self._store_interaction_data(
+                    interaction_id, user_id, user_input, companion_response, 
+                    analysis_context, guidance_package, interaction_state
+                )
+
             # STEP 12: Update Memory and State
-            await self._update_memory_and_state(interaction_state, user_input, companion_response, analysis_context)
-            
+            async def update_memory_and_state(interaction_state, companion_response, analysis_context):
+                await self._update_memory_and_state(interaction_state, user_input, companion_response, analysis_context)
+
             # STEP 13: Handle Utility Actions
-            if guidance_package.utility_actions:
-                await self._handle_utility_actions(guidance_package.utility_actions, interaction_state)
+            async def handle_utility_actions(guidance_package, interaction_state):
+                if guidance_package.utility_actions:
+                    await self._handle_utility_actions(guidance_package.utility_actions, interaction_state)
+
+            available_templates = self._get_base_response_patterns()
+            pipeline = (
+                StagePipeline()
+                .add_stage("user_profile", load_user_profile)
+                .add_stage("interaction_state", load_interaction_state)
+                .add_stage("relevant_memories", retrieve_memories, ["interaction_state"])
+                .add_stage("analysis_context", build_context,
+                           ["interaction_state", "user_profile", "relevant_memories", "crisis_assessment"])
+                .add_stage("guidance_package", detect_mode, ["analysis_context"])
+                .add_stage("optimal_templates", select_templates, ["analysis_context"])
+                .add_stage("interaction_data", build_interaction_data, ["analysis_context", "guidance_package"])
+                .add_stage("emotional_weight", track_emotional_weight, ["interaction_data"])
+                .add_stage("symbolic_context", store_symbolic_context, ["interaction_data"])
+                .add_stage("companion_response", generate_response,
+                           ["analysis_context", "guidance_package", "interaction_state",
+                            "optimal_templates", "relevant_memories"])
+                .add_stage("template_effectiveness", update_template_effectiveness,
+                           ["companion_response", "analysis_context", "optimal_templates"], background=True)
+                .add_stage("interaction_storage", store_interaction,
+                           ["companion_response", "analysis_context", "guidance_package", "interaction_state"],
+                           background=True)
+                .add_stage("memory_update", update_memory_and_state,
+                           ["interaction_state", "companion_response", "analysis_context"], background=True)
+                .add_stage("utility_actions", handle_utility_actions,
+                           ["guidance_package", "interaction_state"], background=True)
+            )
+            
+            stage_results = await pipeline.run(
+                {"crisis_assessment": crisis_assessment},
+                logger=self.enhanced_logger,
+                background_queue=self.background_stages,
+                queue_key=user_id
+            )
+            interaction_state = stage_results["interaction_state"]
+            relevant_memories = stage_results["relevant_memories"]
+            guidance_package = stage_results["guidance_package"]
+            companion_response = stage_results["companion_response"]
             
             # Extract enhanced context analysis
             enhanced_context_analysis = {
@@ -972,6 +1046,19 @@ class UnifiedCompanion:
             # Enhanced fallback response
             return await self._generate_enhanced_fallback_response(user_input, str(e), user_id)
     
+    def _get_mode_coordinator(self, user_id: str) -> AdaptiveModeCoordinator:
+        """Get the user's mode coordinator, creating it on their first interaction"""
+        if user_id not in self.user_mode_coordinators:
+            self.user_mode_coordinators[user_id] = AdaptiveModeCoordinator(user_id)
+        return self.user_mode_coordinators[user_id]
+
+    def get_guidance_stats(self, user_id: str) -> Dict[str, Any]:
+        """Guidance module latency histograms and scheduling counters for a user"""
+        coordinator = self.user_mode_coordinators.get(user_id)
+        if coordinator is None:
+            return {}
+        return coordinator.guidance_coordinator.get_guidance_stats()
+
     async def _get_interaction_state(self, user_id: str, session_context: Optional[Dict[str, Any]]) -> InteractionState:
         """Get or create interaction state for user"""
         
@@ -1394,6 +1481,7 @@ Emotional Characteristics:
 
     async def end_session(self, user_id: str) -> Dict[str, str]:
         """Generate goodbye when a session ends."""
+        await self.background_stages.wait_for(user_id)
         self.goodbye_manager.mark_session_end(user_id)
         interaction_state = self.interaction_states.get(user_id)
         emotional_state = interaction_state.emotional_state if interaction_state else {}
@@ -1401,9 +1489,15 @@ Emotional Characteristics:
         goodbye = self.goodbye_manager.generate_goodbye(user_id)
         return {"reflection": reflection, "goodbye": goodbye}
     
+    async def close(self):
+        """Finish queued background stages, then close the database so their writes are persisted"""
+        await self.background_stages.close()
+        await self.database.close()
+    
     async def get_interaction_summary(self, user_id: str) -> Dict[str, Any]:
         """Get summary of user's interaction patterns and adaptive profile"""
         
+        await self.background_stages.wait_for(user_id)
         if user_id not in self.interaction_states:
             return {"error": "No interaction history found for user"}
         
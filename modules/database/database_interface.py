@@ -5,7 +5,7 @@ Database interface definitions for the unified companion system.
 This provides the schema and interface without requiring specific database dependencies.
 """
 
-from typing import Dict, List, Any, Optional, Protocol
+from typing import Dict, List, Any, Optional, Protocol, Set
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
@@ -14,6 +14,8 @@ import logging
 import json
 import uuid
 
+from .indexes import TimeOrderedCollection, MemoryFragmentIndex
+
 class InteractionType(Enum):
     EMOTIONAL_SUPPORT = "emotional_support"
     TECHNICAL_ASSISTANCE = "technical_assistance"
@@ -299,6 +301,10 @@ class DatabaseInterface(Protocol):
         """Save an interaction record"""
         ...
     
+    async def save_interactions(self, interactions: List[InteractionRecord]) -> int:
+        """Save a batch of interaction records, returning how many were written"""
+        ...
+    
     async def get_recent_interactions(self, user_id: str, limit: int = 20) -> List[InteractionRecord]:
         """Get recent interactions for a user"""
         ...
@@ -315,6 +321,10 @@ class DatabaseInterface(Protocol):
         """Save a memory fragment"""
         ...
     
+    async def save_memory_fragments(self, memories: List[MemoryFragment]) -> int:
+        """Save a batch of memory fragments, returning how many were written"""
+        ...
+    
     async def get_relevant_memories(self, user_id: str, memory_type: Optional[str] = None,
                                   tags: Optional[List[str]] = None, limit: int = 10) -> List[MemoryFragment]:
         """Get relevant memory fragments for context"""
@@ -324,6 +334,10 @@ class DatabaseInterface(Protocol):
         """Log an emotionally vulnerable interaction"""
         ...
 
+    async def log_emotional_risks(self, entries: List[EmotionalRiskEntry]) -> int:
+        """Log a batch of emotional risk entries, returning how many were written"""
+        ...
+
     async def get_emotional_risk_history(self, user_id: str, limit: int = 20) -> List[EmotionalRiskEntry]:
         """Retrieve emotional risk history"""
         ...
@@ -331,17 +345,54 @@ class DatabaseInterface(Protocol):
 class InMemoryDatabase:
     """
     In-memory database implementation for development and testing
+    
+    Records are indexed per user (see indexes.py) so reads only touch the
+    requesting user's history. ``max_records_per_user`` bounds how many
+    interactions, psychological states, risk entries and memory fragments
+    are retained for each user; the oldest (or, for memories, the least
+    important) records are dropped first.
     """
     
-    def __init__(self):
+    def __init__(self, max_records_per_user: Optional[int] = None):
         self.users: Dict[str, UserProfile] = {}
-        self.interactions: List[InteractionRecord] = []
         self.sessions: Dict[str, SessionRecord] = {}
-        self.psychological_states: List[PsychologicalState] = []
-        self.memory_fragments: List[MemoryFragment] = []
-        self.emotional_risk_registry: List[EmotionalRiskEntry] = []
+        self.max_records_per_user = max_records_per_user
+        self.interaction_index: TimeOrderedCollection[InteractionRecord] = TimeOrderedCollection(
+            lambda record: record.timestamp, max_records_per_user
+        )
+        self.session_index: TimeOrderedCollection[InteractionRecord] = TimeOrderedCollection(
+            lambda record: record.timestamp
+        )
+        self.psychological_state_index: TimeOrderedCollection[PsychologicalState] = TimeOrderedCollection(
+            lambda state: state.timestamp, max_records_per_user
+        )
+        self.memory_index = MemoryFragmentIndex(max_records_per_user)
+        self.emotional_risk_index: TimeOrderedCollection[EmotionalRiskEntry] = TimeOrderedCollection(
+            lambda entry: entry.timestamp, max_records_per_user
+        )
+        # Ids of the retained records, so a retried bulk write skips what it already holds
+        self._interaction_ids: Set[str] = set()
+        self._risk_entry_ids: Set[str] = set()
         self.logger = logging.getLogger(__name__)
     
+    # Flat snapshots of the indexed collections, grouped by user
+    
+    @property
+    def interactions(self) -> List[InteractionRecord]:
+        return list(self.interaction_index)
+    
+    @property
+    def psychological_states(self) -> List[PsychologicalState]:
+        return list(self.psychological_state_index)
+    
+    @property
+    def memory_fragments(self) -> List[MemoryFragment]:
+        return list(self.memory_index)
+    
+    @property
+    def emotional_risk_registry(self) -> List[EmotionalRiskEntry]:
+        return list(self.emotional_risk_index)
+    
     async def initialize(self) -> None:
         """Initialize the in-memory database"""
         self.logger.info("In-memory database initialized")
@@ -381,18 +432,31 @@ class InMemoryDatabase:
     async def save_interaction(self, interaction: InteractionRecord) -> bool:
         """Save an interaction record"""
         try:
-            self.interactions.append(interaction)
+            evicted = self.interaction_index.add(interaction.user_id, interaction)
+            self.session_index.add(interaction.session_id, interaction)
+            self._interaction_ids.add(interaction.interaction_id)
+            for record in evicted:
+                self.session_index.discard(record.session_id, record)
+                self._interaction_ids.discard(record.interaction_id)
             return True
         except Exception as e:
             self.logger.error(f"Error saving interaction: {e}")
             return False
     
+    async def save_interactions(self, interactions: List[InteractionRecord]) -> int:
+        """Save a batch of interaction records; records already stored count as written"""
+        saved = 0
+        for interaction in interactions:
+            if interaction.interaction_id in self._interaction_ids:
+                saved += 1
+            else:
+                saved += await self.save_interaction(interaction)
+        return saved
+    
     async def get_recent_interactions(self, user_id: str, limit: int = 20) -> List[InteractionRecord]:
         """Get recent interactions for a user"""
         try:
-            user_interactions = [i for i in self.interactions if i.user_id == user_id]
-            user_interactions.sort(key=lambda x: x.timestamp, reverse=True)
-            return user_interactions[:limit]
+            return self.interaction_index.recent(user_id, limit)
         except Exception as e:
             self.logger.error(f"Error getting recent interactions: {e}")
             return []
@@ -400,9 +464,7 @@ class InMemoryDatabase:
     async def get_session_interactions(self, session_id: str) -> List[InteractionRecord]:
         """Get all interactions for a specific session"""
         try:
-            session_interactions = [i for i in self.interactions if i.session_id == session_id]
-            session_interactions.sort(key=lambda x: x.timestamp)
-            return session_interactions
+            return self.session_index.all(session_id)
         except Exception as e:
             self.logger.error(f"Error getting session interactions: {e}")
             return []
@@ -439,7 +501,7 @@ class InMemoryDatabase:
     async def save_psychological_state(self, state: PsychologicalState) -> bool:
         """Save psychological state snapshot"""
         try:
-            self.psychological_states.append(state)
+            self.psychological_state_index.add(state.user_id, state)
             return True
         except Exception as e:
             self.logger.error(f"Error saving psychological state: {e}")
@@ -448,10 +510,7 @@ class InMemoryDatabase:
     async def get_latest_psychological_state(self, user_id: str) -> Optional[PsychologicalState]:
         """Get latest psychological state for user"""
         try:
-            user_states = [s for s in self.psychological_states if s.user_id == user_id]
-            if user_states:
-                return max(user_states, key=lambda x: x.timestamp)
-            return None
+            return self.psychological_state_index.latest(user_id)
         except Exception as e:
             self.logger.error(f"Error getting psychological state: {e}")
             return None
@@ -460,10 +519,7 @@ class InMemoryDatabase:
         """Get psychological state trend over time"""
         try:
             start_date = datetime.now() - timedelta(days=days)
-            user_states = [s for s in self.psychological_states 
-                          if s.user_id == user_id and s.timestamp >= start_date]
-            user_states.sort(key=lambda x: x.timestamp)
-            return user_states
+            return self.psychological_state_index.since(user_id, start_date)
         except Exception as e:
             self.logger.error(f"Error getting psychological trend: {e}")
             return []
@@ -471,27 +527,24 @@ class InMemoryDatabase:
     async def save_memory_fragment(self, memory: MemoryFragment) -> bool:
         """Save a memory fragment"""
         try:
-            self.memory_fragments.append(memory)
+            self.memory_index.add(memory)
             return True
         except Exception as e:
             self.logger.error(f"Error saving memory fragment: {e}")
             return False
     
+    async def save_memory_fragments(self, memories: List[MemoryFragment]) -> int:
+        """Save a batch of memory fragments"""
+        saved = 0
+        for memory in memories:
+            saved += await self.save_memory_fragment(memory)
+        return saved
+    
     async def get_relevant_memories(self, user_id: str, memory_type: Optional[str] = None, 
                                   tags: Optional[List[str]] = None, limit: int = 10) -> List[MemoryFragment]:
         """Get relevant memory fragments for context"""
         try:
-            user_memories = [m for m in self.memory_fragments if m.user_id == user_id]
-            
-            if memory_type:
-                user_memories = [m for m in user_memories if m.memory_type == memory_type]
-            
-            if tags:
-                user_memories = [m for m in user_memories if any(tag in m.tags for tag in tags)]
-            
-            # Sort by importance score
-            user_memories.sort(key=lambda x: x.importance_score, reverse=True)
-            return user_memories[:limit]
+            return self.memory_index.query(user_id, memory_type or None, tags, limit)
         except Exception as e:
             self.logger.error(f"Error getting relevant memories: {e}")
             return []
@@ -499,12 +552,14 @@ class InMemoryDatabase:
     async def update_memory_access(self, memory_id: str) -> bool:
         """Update memory access tracking"""
         try:
-            for memory in self.memory_fragments:
-                if memory.memory_id == memory_id:
-                    memory.last_accessed = datetime.now()
-                    memory.access_count += 1
-                    return True
-            return False
+            memory = self.memory_index.get(memory_id)
+            if memory is None:
+                return False
+            memory.last_accessed = datetime.now()
+            memory.access_count += 1
+            # Callers may have adjusted importance or tags on the shared object
+            self.memory_index.reindex(memory_id)
+            return True
         except Exception as e:
             self.logger.error(f"Error updating memory access: {e}")
             return False
@@ -512,18 +567,29 @@ class InMemoryDatabase:
     async def log_emotional_risk(self, entry: EmotionalRiskEntry) -> bool:
         """Log an emotional risk entry"""
         try:
-            self.emotional_risk_registry.append(entry)
+            evicted = self.emotional_risk_index.add(entry.user_id, entry)
+            self._risk_entry_ids.add(entry.entry_id)
+            for record in evicted:
+                self._risk_entry_ids.discard(record.entry_id)
             return True
         except Exception as e:
             self.logger.error(f"Error logging emotional risk: {e}")
             return False
 
+    async def log_emotional_risks(self, entries: List[EmotionalRiskEntry]) -> int:
+        """Log a batch of emotional risk entries; entries already stored count as written"""
+        logged = 0
+        for entry in entries:
+            if entry.entry_id in self._risk_entry_ids:
+                logged += 1
+            else:
+                logged += await self.log_emotional_risk(entry)
+        return logged
+
     async def get_emotional_risk_history(self, user_id: str, limit: int = 20) -> List[EmotionalRiskEntry]:
         """Retrieve emotional risk history"""
         try:
-            entries = [e for e in self.emotional_risk_registry if e.user_id == user_id]
-            entries.sort(key=lambda x: x.timestamp, reverse=True)
-            return entries[:limit]
+            return self.emotional_risk_index.recent(user_id, limit)
         except Exception as e:
             self.logger.error(f"Error getting emotional risk history: {e}")
             return []
@@ -534,8 +600,7 @@ class InMemoryDatabase:
             start_date = datetime.now() - timedelta(days=days)
             
             # Get interactions in timeframe
-            user_interactions = [i for i in self.interactions 
-                               if i.user_id == user_id and i.timestamp >= start_date]
+            user_interactions = self.interaction_index.since(user_id, start_date)
             
             # Count by interaction type
             interaction_stats = {}
@@ -544,9 +609,7 @@ class InMemoryDatabase:
                 interaction_stats[interaction_type] = interaction_stats.get(interaction_type, 0) + 1
             
             # Get emotional trend
-            user_states = [s for s in self.psychological_states 
-                          if s.user_id == user_id and s.timestamp >= start_date]
-            user_states.sort(key=lambda x: x.timestamp)
+            user_states = self.psychological_state_index.since(user_id, start_date)
             
             emotional_trend = [
                 {
@@ -577,7 +640,8 @@ def create_database_interface(connection_string: Optional[str] = None, database_
     """
     Factory function to create appropriate database interface
     Auto-detects MongoDB when connection string is provided
-    Supports local JSON persistence when `database_type` is ``jsonfile``.
+    Supports local JSON persistence when `database_type` is ``jsonfile``, and
+    append-only log persistence in a directory when it is ``logfile``.
     """
     import os
     
@@ -590,6 +654,8 @@ def create_database_interface(connection_string: Optional[str] = None, database_
             database_type = "inmemory"
             logging.info("No connection string found, defaulting to in-memory database")
     
+    explicit_path = connection_string
+    
     # Use environment variable if no connection string provided
     if not connection_string:
         connection_string = os.getenv('MONGO_CONNECTION_STRING')
@@ -614,6 +680,11 @@ def create_database_interface(connection_string: Optional[str] = None, database_
             except RuntimeError:
                 asyncio.run(db.initialize())
         return db
+    elif database_type == "logfile":
+        log_dir = explicit_path or os.getenv('LOGFILE_DB_PATH', 'companion_db')
+        logging.info(f"Using log-structured database directory: {log_dir}")
+        from .logfile_database import LogFileDatabase
+        return LogFileDatabase(log_dir)
     elif database_type == "mongodb":
         if not connection_string:
             raise ValueError("MongoDB connection string required but not provided")
@@ -635,5 +706,5 @@ def create_database_interface(connection_string: Optional[str] = None, database_
             raise RuntimeError(error_msg)
     else:
         raise ValueError(
-            f"Unsupported database type: {database_type}. Supported types: 'auto', 'inmemory', 'mongodb', 'jsonfile'"
+            f"Unsupported database type: {database_type}. Supported types: 'auto', 'inmemory', 'mongodb', 'jsonfile', 'logfile'"
         )
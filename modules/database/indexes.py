@@ -0,0 +1,234 @@
+"""
+In-Memory Record Indexes
+
+Per-user indexes shared by the in-process database backends. Time-series
+records (interactions, psychological states, risk entries) are kept in
+per-user timestamp-ordered collections, and memory fragments are indexed by
+user, tag and type with a per-user importance ordering, so queries cost
+O(log n + k) in the user's own history instead of scanning every record.
+Both support bounded retention per user.
+"""
+
+import bisect
+import heapq
+import itertools
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class TimeOrderedCollection(Generic[T]):
+    """
+    Records grouped by user and kept sorted by timestamp
+
+    Records arriving in timestamp order (the common case) are appended; late
+    arrivals are inserted in place. Equal timestamps keep insertion order.
+    """
+
+    def __init__(self, timestamp_of: Callable[[T], datetime],
+                 max_per_user: Optional[int] = None):
+        self._timestamp_of = timestamp_of
+        self.max_per_user = max_per_user
+        self._keys: Dict[str, List[Tuple[datetime, int]]] = defaultdict(list)
+        self._records: Dict[str, List[T]] = defaultdict(list)
+        self._seq = itertools.count()
+
+    def add(self, user_id: str, record: T) -> List[T]:
+        """
+        Insert a record
+
+        Returns:
+            Records evicted from this user's history by the retention bound
+        """
+        key = (self._timestamp_of(record), next(self._seq))
+        keys = self._keys[user_id]
+        records = self._records[user_id]
+        if not keys or key >= keys[-1]:
+            keys.append(key)
+            records.append(record)
+        else:
+            index = bisect.bisect_right(keys, key)
+            keys.insert(index, key)
+            records.insert(index, record)
+
+        evicted: List[T] = []
+        if self.max_per_user is not None and len(records) > self.max_per_user:
+            excess = len(records) - self.max_per_user
+            evicted = records[:excess]
+            del keys[:excess]
+            del records[:excess]
+        return evicted
+
+    def discard(self, user_id: str, record: T) -> bool:
+        """Remove a specific record (matched by identity)"""
+        records = self._records.get(user_id, [])
+        for index, candidate in enumerate(records):
+            if candidate is record:
+                del records[index]
+                del self._keys[user_id][index]
+                return True
+        return False
+
+    def recent(self, user_id: str, limit: int) -> List[T]:
+        """Newest records first"""
+        records = self._records.get(user_id)
+        if not records or limit <= 0:
+            return []
+        return records[:-limit - 1:-1] if limit < len(records) else records[::-1]
+
+    def latest(self, user_id: str) -> Optional[T]:
+        records = self._records.get(user_id)
+        return records[-1] if records else None
+
+    def since(self, user_id: str, start: datetime) -> List[T]:
+        """Records at or after start, oldest first"""
+        keys = self._keys.get(user_id)
+        if not keys:
+            return []
+        index = bisect.bisect_left(keys, (start, -1))
+        return self._records[user_id][index:]
+
+    def all(self, user_id: str) -> List[T]:
+        """Every record for a user, oldest first"""
+        return list(self._records.get(user_id, []))
+
+    def count(self, user_id: str) -> int:
+        return len(self._records.get(user_id, []))
+
+    def __len__(self) -> int:
+        return sum(len(records) for records in self._records.values())
+
+    def __iter__(self):
+        for records in self._records.values():
+            yield from records
+
+
+class MemoryFragmentIndex:
+    """
+    Memory fragments indexed by id, user, tag and type
+
+    Each user's fragments are also kept ordered by importance (ties broken by
+    insertion order), so unfiltered top-k reads are a slice and filtered reads
+    select the top k from the matching candidate set with a heap.
+    """
+
+    def __init__(self, max_per_user: Optional[int] = None):
+        self.max_per_user = max_per_user
+        self._by_id: Dict[str, Any] = {}
+        self._order: Dict[str, int] = {}
+        self._by_tag: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+        self._by_type: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+        # user -> sorted [(-importance, order, memory_id)]
+        self._ranked: Dict[str, List[Tuple[float, int, str]]] = defaultdict(list)
+        # memory_id -> the (user, importance, tags, type) it was indexed under
+        self._indexed_as: Dict[str, Tuple[str, float, Tuple[str, ...], str]] = {}
+        self._seq = itertools.count()
+
+    def get(self, memory_id: str) -> Optional[Any]:
+        return self._by_id.get(memory_id)
+
+    def add(self, memory: Any) -> List[Any]:
+        """
+        Insert or replace a fragment
+
+        Returns:
+            Fragments evicted (least important first) by the retention bound
+        """
+        if memory.memory_id in self._by_id:
+            self._unindex(memory.memory_id)
+            order = self._order[memory.memory_id]
+        else:
+            order = next(self._seq)
+        self._order[memory.memory_id] = order
+        self._by_id[memory.memory_id] = memory
+        self._index(memory)
+
+        evicted = []
+        user_id = memory.user_id
+        if self.max_per_user is not None:
+            ranked = self._ranked[user_id]
+            while len(ranked) > self.max_per_user:
+                victim = self._by_id[ranked[-1][2]]
+                self.remove(victim.memory_id)
+                evicted.append(victim)
+        return evicted
+
+    def reindex(self, memory_id: str) -> bool:
+        """Refresh the indexes after a fragment's importance, tags or type changed in place"""
+        memory = self._by_id.get(memory_id)
+        if memory is None:
+            return False
+        if self._indexed_as.get(memory_id) != self._signature(memory):
+            self._unindex(memory_id)
+            self._index(memory)
+        return True
+
+    def remove(self, memory_id: str) -> Optional[Any]:
+        memory = self._by_id.pop(memory_id, None)
+        if memory is not None:
+            self._unindex(memory_id)
+            self._order.pop(memory_id, None)
+        return memory
+
+    def query(self, user_id: str, memory_type: Optional[str] = None,
+              tags: Optional[Iterable[str]] = None, limit: int = 10) -> List[Any]:
+        """Most important fragments for a user, optionally filtered by type and any-of tags"""
+        if limit <= 0:
+            return []
+        if memory_type is None and not tags:
+            return [self._by_id[entry[2]] for entry in self._ranked.get(user_id, [])[:limit]]
+
+        candidates: Optional[Set[str]] = None
+        if tags:
+            candidates = set()
+            for tag in tags:
+                candidates |= self._by_tag.get((user_id, tag), set())
+        if memory_type is not None:
+            typed = self._by_type.get((user_id, memory_type), set())
+            candidates = typed if candidates is None else candidates & typed
+
+        best = heapq.nsmallest(
+            limit,
+            ((-self._by_id[memory_id].importance_score, self._order[memory_id], memory_id)
+             for memory_id in candidates)
+        )
+        return [self._by_id[entry[2]] for entry in best]
+
+    def all(self, user_id: str) -> List[Any]:
+        return [self._by_id[entry[2]] for entry in self._ranked.get(user_id, [])]
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self):
+        return iter(list(self._by_id.values()))
+
+    @staticmethod
+    def _signature(memory: Any) -> Tuple[str, float, Tuple[str, ...], str]:
+        return (memory.user_id, memory.importance_score, tuple(memory.tags), memory.memory_type)
+
+    def _index(self, memory: Any):
+        memory_id = memory.memory_id
+        signature = self._signature(memory)
+        user_id, importance, tags, memory_type = signature
+        self._indexed_as[memory_id] = signature
+        for tag in set(tags):
+            self._by_tag[(user_id, tag)].add(memory_id)
+        self._by_type[(user_id, memory_type)].add(memory_id)
+        bisect.insort(self._ranked[user_id], (-importance, self._order[memory_id], memory_id))
+
+    def _unindex(self, memory_id: str):
+        signature = self._indexed_as.pop(memory_id, None)
+        if signature is None:
+            return
+        user_id, importance, tags, memory_type = signature
+        for tag in set(tags):
+            self._by_tag[(user_id, tag)].discard(memory_id)
+        self._by_type[(user_id, memory_type)].discard(memory_id)
+        ranked = self._ranked[user_id]
+        entry = (-importance, self._order[memory_id], memory_id)
+        index = bisect.bisect_left(ranked, entry)
+        if index < len(ranked) and ranked[index] == entry:
+            del ranked[index]
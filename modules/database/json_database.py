@@ -16,6 +16,7 @@ from .database_interface import (
     SessionRecord,
     PsychologicalState,
     MemoryFragment,
+    EmotionalRiskEntry,
 )
 
 
@@ -31,6 +32,7 @@ class JSONDatabase:
             "sessions": {},
             "psychological_states": [],
             "memory_fragments": [],
+            "emotional_risk": [],
         }
 
     async def initialize(self) -> None:
@@ -43,12 +45,33 @@ class JSONDatabase:
         except Exception as e:
             self.logger.error(f"Error loading JSON database: {e}")
 
-    def _save(self) -> None:
+    def _save(self) -> bool:
         try:
             with open(self.path, "w", encoding="utf-8") as f:
                 json.dump(self._data, f, indent=2)
+            return True
         except Exception as e:
             self.logger.error(f"Error saving JSON database: {e}")
+            return False
+
+    def _save_batch(self, key: str, id_field: str, records: List[Any]) -> int:
+        """
+        Add the records not already stored and rewrite the file once
+
+        A batch retried after a failed save finds its records in ``_data``
+        and does not add them again.
+
+        Returns:
+            int: len(records) once the file is written, 0 if the save failed
+        """
+        stored = self._data.setdefault(key, [])
+        known = {record.get(id_field) for record in stored}
+        for record in records:
+            data = record.to_dict()
+            if data[id_field] not in known:
+                known.add(data[id_field])
+                stored.append(data)
+        return len(records) if self._save() else 0
 
     async def create_user_profile(self, user_profile: UserProfile) -> bool:
         if user_profile.user_id in self._data["users"]:
@@ -74,6 +97,10 @@ class JSONDatabase:
         self._save()
         return True
 
+    async def save_interactions(self, interactions: List[InteractionRecord]) -> int:
+        # One file rewrite for the whole batch
+        return self._save_batch("interactions", "interaction_id", interactions)
+
     async def get_recent_interactions(self, user_id: str, limit: int = 20) -> List[InteractionRecord]:
         records = [r for r in self._data["interactions"] if r["user_id"] == user_id]
         records.sort(key=lambda x: x["timestamp"], reverse=True)
@@ -96,6 +123,9 @@ class JSONDatabase:
         self._save()
         return True
 
+    async def save_memory_fragments(self, memories: List[MemoryFragment]) -> int:
+        return self._save_batch("memory_fragments", "memory_id", memories)
+
     async def get_relevant_memories(self, user_id: str, memory_type: Optional[str] = None,
                                     tags: Optional[List[str]] = None, limit: int = 10) -> List[MemoryFragment]:
         memories = [m for m in self._data["memory_fragments"] if m["user_id"] == user_id]
@@ -106,6 +136,17 @@ class JSONDatabase:
         memories.sort(key=lambda x: x.get("importance_score", 0), reverse=True)
         return [MemoryFragment.from_dict(m) for m in memories[:limit]]
 
+    async def log_emotional_risk(self, entry: EmotionalRiskEntry) -> bool:
+        return await self.log_emotional_risks([entry]) == 1
+
+    async def log_emotional_risks(self, entries: List[EmotionalRiskEntry]) -> int:
+        return self._save_batch("emotional_risk", "entry_id", entries)
+
+    async def get_emotional_risk_history(self, user_id: str, limit: int = 20) -> List[EmotionalRiskEntry]:
+        entries = [e for e in self._data.get("emotional_risk", []) if e["user_id"] == user_id]
+        entries.sort(key=lambda x: x["timestamp"], reverse=True)
+        return [EmotionalRiskEntry.from_dict(e) for e in entries[:limit]]
+
     async def close(self):
         self._save()
         self.logger.info("JSON database saved")
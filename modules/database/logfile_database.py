@@ -0,0 +1,477 @@
+"""
+Log-Structured File Database Implementation
+
+Offline/edge persistence that scales with the size of each write rather than
+the size of the database. Every collection is a snapshot plus an append-only
+operation log of keyed JSON lines:
+
+    <directory>/<collection>.snapshot.json   {"generation": g, "records": {...}}
+    <directory>/<collection>.<g>.log         one {"k": key, "v": record} per line
+
+Writes append one line and flush it to the OS immediately, so a killed process
+loses nothing it acknowledged. fsync runs in batches: every ``sync_every``
+operations, and at most ``sync_interval`` seconds after the first unsynced
+write (on a timer when an event loop is running), which bounds what an OS crash
+or power loss can take. Once the log holds at least ``compact_every``
+entries and as many entries as there are live records, the records are written
+to a new snapshot generation and a fresh log is started. Loading is lazy per
+collection: a snapshot is read and its log replayed only when that collection
+is first used, and a torn final line from a crash is truncated away. Queries
+run against the in-memory indexes from indexes.py.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from .database_interface import (
+    UserProfile,
+    InteractionRecord,
+    SessionRecord,
+    PsychologicalState,
+    MemoryFragment,
+    EmotionalRiskEntry,
+)
+from .indexes import TimeOrderedCollection, MemoryFragmentIndex
+
+
+class CollectionLog:
+    """Snapshot plus append-only keyed operation log for one collection"""
+
+    def __init__(self, directory: str, name: str,
+                 encode: Callable[[Any], Dict[str, Any]],
+                 decode: Callable[[Dict[str, Any]], Any],
+                 sync_every: int = 64, sync_interval: float = 1.0,
+                 compact_every: int = 2000):
+        self.directory = directory
+        self.name = name
+        self.encode = encode
+        self.decode = decode
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.compact_every = compact_every
+        self.logger = logging.getLogger(__name__)
+
+        self.records: Dict[str, Any] = {}
+        self.generation = 0
+        self.log_entries = 0
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._sync_timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def snapshot_path(self) -> str:
+        return os.path.join(self.directory, f"{self.name}.snapshot.json")
+
+    def log_path(self, generation: Optional[int] = None) -> str:
+        generation = self.generation if generation is None else generation
+        return os.path.join(self.directory, f"{self.name}.{generation}.log")
+
+    # Loading and recovery
+
+    def load(self) -> Dict[str, Any]:
+        """Read the snapshot, replay its log and open the log for appending"""
+        raw: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self.generation = snapshot.get("generation", 0)
+            raw.update(snapshot.get("records", {}))
+        except FileNotFoundError:
+            pass
+
+        self.log_entries = self._replay(raw)
+        self._remove_stale_logs()
+
+        self.records = {}
+        for key, data in raw.items():
+            try:
+                self.records[key] = self.decode(data)
+            except Exception as e:
+                self.logger.error(f"Skipping unreadable {self.name} record {key}: {e}")
+
+        self._file = open(self.log_path(), "a", encoding="utf-8")
+        return self.records
+
+    def _replay(self, raw: Dict[str, Dict[str, Any]]) -> int:
+        path = self.log_path()
+        if not os.path.exists(path):
+            return 0
+
+        applied = 0
+        good_offset = 0
+        with open(path, "rb") as f:
+            for line in iter(f.readline, b""):
+                try:
+                    operation = json.loads(line)
+                    if not line.endswith(b"\n"):
+                        raise ValueError("unterminated entry")
+                except ValueError:
+                    # A torn tail from a crash mid-append; everything before it is intact
+                    self.logger.warning(
+                        f"Truncating {self.name} log at byte {good_offset} after an incomplete write"
+                    )
+                    break
+                good_offset = f.tell()
+                if operation.get("d"):
+                    raw.pop(operation["k"], None)
+                else:
+                    raw[operation["k"]] = operation["v"]
+                applied += 1
+
+        if good_offset < os.path.getsize(path):
+            with open(path, "r+b") as f:
+                f.truncate(good_offset)
+        return applied
+
+    def _remove_stale_logs(self):
+        prefix = f"{self.name}."
+        current = os.path.basename(self.log_path())
+        for filename in os.listdir(self.directory):
+            if filename.startswith(prefix) and filename.endswith(".log") and filename != current:
+                try:
+                    os.unlink(os.path.join(self.directory, filename))
+                except OSError as e:
+                    self.logger.warning(f"Could not remove stale log {filename}: {e}")
+
+    # Writes
+
+    def put(self, key: str, record: Any):
+        """Store a record and append it to the log"""
+        self.records[key] = record
+        self._append({"k": key, "v": self.encode(record)})
+
+    def delete(self, key: str):
+        """Remove a record and log the deletion"""
+        if self.records.pop(key, None) is not None:
+            self._append({"k": key, "d": True})
+
+    def _append(self, operation: Dict[str, Any]):
+        self._file.write(json.dumps(operation, ensure_ascii=False, separators=(",", ":")) + "\n")
+        # Out of the userspace buffer right away; only the fsync is batched
+        self._file.flush()
+        self.log_entries += 1
+        self._unsynced += 1
+
+        # Compacting once the log outgrows the live record set keeps the
+        # snapshot rewrite cost amortized O(1) per write
+        if self.log_entries >= max(self.compact_every, len(self.records)):
+            self.compact()
+        elif (self._unsynced >= self.sync_every
+              or time.monotonic() - self._last_sync >= self.sync_interval):
+            self.sync()
+        elif self._sync_timer is None:
+            self._schedule_sync()
+
+    def _schedule_sync(self):
+        # Without a timer a quiet collection would wait for its next write to fsync
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._sync_timer = loop.call_later(self.sync_interval, self._timed_sync)
+
+    def _timed_sync(self):
+        self._sync_timer = None
+        self.sync()
+
+    def sync(self):
+        """Flush buffered log entries and fsync them"""
+        if self._sync_timer is not None:
+            self._sync_timer.cancel()
+            self._sync_timer = None
+        if self._file is None or not self._unsynced:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def compact(self):
+        """Write the live records as a new snapshot generation and start a fresh log"""
+        self.sync()
+        next_generation = self.generation + 1
+        snapshot = {
+            "generation": next_generation,
+            "records": {key: self.encode(record) for key, record in self.records.items()}
+        }
+
+        fd, temp_path = tempfile.mkstemp(prefix=f".{self.name}.", suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.snapshot_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+        # The snapshot now names the new generation, so the old log is obsolete
+        # even if we crash before removing it
+        old_log = self.log_path()
+        self._file.close()
+        self.generation = next_generation
+        self._file = open(self.log_path(), "a", encoding="utf-8")
+        self.log_entries = 0
+        try:
+            os.unlink(old_log)
+        except OSError:
+            pass
+        self.logger.info(f"Compacted {self.name}: {len(self.records)} records in generation {self.generation}")
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+
+class LogFileDatabase:
+    """
+    Append-only log database with lazily loaded, indexed collections
+    """
+
+    def __init__(self, directory: str, sync_every: int = 64, sync_interval: float = 1.0,
+                 compact_every: int = 2000):
+        self.directory = directory
+        self.logger = logging.getLogger(__name__)
+        self._log_options = {
+            "sync_every": sync_every,
+            "sync_interval": sync_interval,
+            "compact_every": compact_every,
+        }
+        self._logs: Dict[str, CollectionLog] = {}
+
+        # Indexes, built when their collection is first loaded
+        self._interactions: Optional[TimeOrderedCollection] = None
+        self._sessions_index: Optional[TimeOrderedCollection] = None
+        self._states: Optional[TimeOrderedCollection] = None
+        self._memories: Optional[MemoryFragmentIndex] = None
+        self._risk: Optional[TimeOrderedCollection] = None
+
+        os.makedirs(directory, exist_ok=True)
+
+    async def initialize(self) -> None:
+        """Collections load lazily on first use"""
+        self.logger.info(f"Log-structured database ready at {self.directory}")
+
+    def _collection(self, name: str) -> CollectionLog:
+        log = self._logs.get(name)
+        if log is not None:
+            return log
+
+        codecs = {
+            "users": (UserProfile.to_dict, UserProfile.from_dict),
+            "sessions": (SessionRecord.to_dict, SessionRecord.from_dict),
+            "interactions": (InteractionRecord.to_dict, InteractionRecord.from_dict),
+            "psychological_states": (PsychologicalState.to_dict, PsychologicalState.from_dict),
+            "memory_fragments": (MemoryFragment.to_dict, MemoryFragment.from_dict),
+            "emotional_risk": (EmotionalRiskEntry.to_dict, EmotionalRiskEntry.from_dict),
+        }
+        encode, decode = codecs[name]
+        log = CollectionLog(self.directory, name, encode, decode, **self._log_options)
+        records = log.load()
+        self._logs[name] = log
+
+        if name == "interactions":
+            self._interactions = TimeOrderedCollection(lambda record: record.timestamp)
+            self._sessions_index = TimeOrderedCollection(lambda record: record.timestamp)
+            for record in records.values():
+                self._interactions.add(record.user_id, record)
+                self._sessions_index.add(record.session_id, record)
+        elif name == "psychological_states":
+            self._states = TimeOrderedCollection(lambda state: state.timestamp)
+            for state in records.values():
+                self._states.add(state.user_id, state)
+        elif name == "memory_fragments":
+            self._memories = MemoryFragmentIndex()
+            for memory in records.values():
+                self._memories.add(memory)
+        elif name == "emotional_risk":
+            self._risk = TimeOrderedCollection(lambda entry: entry.timestamp)
+            for entry in records.values():
+                self._risk.add(entry.user_id, entry)
+
+        self.logger.debug(f"Loaded {len(records)} {name} records")
+        return log
+
+    # User profiles
+
+    async def create_user_profile(self, user_profile: UserProfile) -> bool:
+        users = self._collection("users")
+        if user_profile.user_id in users.records:
+            return False
+        users.put(user_profile.user_id, user_profile)
+        return True
+
+    async def get_user_profile(self, user_id: str) -> Optional[UserProfile]:
+        return self._collection("users").records.get(user_id)
+
+    async def update_user_profile(self, user_id: str, updates: Dict[str, Any]) -> bool:
+        users = self._collection("users")
+        user = users.records.get(user_id)
+        if user is None:
+            return False
+        for key, value in updates.items():
+            if hasattr(user, key):
+                setattr(user, key, value)
+        user.last_active = datetime.now()
+        users.put(user_id, user)
+        return True
+
+    # Interactions and sessions
+
+    async def save_interaction(self, interaction: InteractionRecord) -> bool:
+        try:
+            interactions = self._collection("interactions")
+            previous = interactions.records.get(interaction.interaction_id)
+            if previous is not None:
+                self._interactions.discard(previous.user_id, previous)
+                self._sessions_index.discard(previous.session_id, previous)
+            interactions.put(interaction.interaction_id, interaction)
+            self._interactions.add(interaction.user_id, interaction)
+            self._sessions_index.add(interaction.session_id, interaction)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error saving interaction: {e}")
+            return False
+
+    async def save_interactions(self, interactions: List[InteractionRecord]) -> int:
+        """Append a batch of interactions and fsync them together"""
+        saved = 0
+        for interaction in interactions:
+            saved += await self.save_interaction(interaction)
+        self._collection("interactions").sync()
+        return saved
+
+    async def get_recent_interactions(self, user_id: str, limit: int = 20) -> List[InteractionRecord]:
+        self._collection("interactions")
+        return self._interactions.recent(user_id, limit)
+
+    async def get_session_interactions(self, session_id: str) -> List[InteractionRecord]:
+        self._collection("interactions")
+        return self._sessions_index.all(session_id)
+
+    async def create_session(self, session: SessionRecord) -> bool:
+        self._collection("sessions").put(session.session_id, session)
+        return True
+
+    async def update_session(self, session_id: str, updates: Dict[str, Any]) -> bool:
+        sessions = self._collection("sessions")
+        session = sessions.records.get(session_id)
+        if session is None:
+            return False
+        for key, value in updates.items():
+            if hasattr(session, key):
+                setattr(session, key, value)
+        sessions.put(session_id, session)
+        return True
+
+    async def get_session(self, session_id: str) -> Optional[SessionRecord]:
+        return self._collection("sessions").records.get(session_id)
+
+    # Psychological states
+
+    async def save_psychological_state(self, state: PsychologicalState) -> bool:
+        try:
+            self._collection("psychological_states").put(uuid.uuid4().hex, state)
+            self._states.add(state.user_id, state)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error saving psychological state: {e}")
+            return False
+
+    async def get_latest_psychological_state(self, user_id: str) -> Optional[PsychologicalState]:
+        self._collection("psychological_states")
+        return self._states.latest(user_id)
+
+    async def get_psychological_trend(self, user_id: str, days: int = 30) -> List[PsychologicalState]:
+        self._collection("psychological_states")
+        return self._states.since(user_id, datetime.now() - timedelta(days=days))
+
+    # Memory fragments
+
+    async def save_memory_fragment(self, memory: MemoryFragment) -> bool:
+        try:
+            self._collection("memory_fragments").put(memory.memory_id, memory)
+            self._memories.add(memory)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error saving memory fragment: {e}")
+            return False
+
+    async def save_memory_fragments(self, memories: List[MemoryFragment]) -> int:
+        saved = 0
+        for memory in memories:
+            saved += await self.save_memory_fragment(memory)
+        self._collection("memory_fragments").sync()
+        return saved
+
+    async def get_relevant_memories(self, user_id: str, memory_type: Optional[str] = None,
+                                    tags: Optional[List[str]] = None, limit: int = 10) -> List[MemoryFragment]:
+        self._collection("memory_fragments")
+        return self._memories.query(user_id, memory_type or None, tags, limit)
+
+    async def update_memory_access(self, memory_id: str) -> bool:
+        memories = self._collection("memory_fragments")
+        memory = self._memories.get(memory_id)
+        if memory is None:
+            return False
+        memory.last_accessed = datetime.now()
+        memory.access_count += 1
+        self._memories.reindex(memory_id)
+        memories.put(memory_id, memory)
+        return True
+
+    # Emotional risk
+
+    async def log_emotional_risk(self, entry: EmotionalRiskEntry) -> bool:
+        try:
+            entries = self._collection("emotional_risk")
+            previous = entries.records.get(entry.entry_id)
+            if previous is not None:
+                self._risk.discard(previous.user_id, previous)
+            entries.put(entry.entry_id, entry)
+            self._risk.add(entry.user_id, entry)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error logging emotional risk: {e}")
+            return False
+
+    async def log_emotional_risks(self, entries: List[EmotionalRiskEntry]) -> int:
+        logged = 0
+        for entry in entries:
+            logged += await self.log_emotional_risk(entry)
+        self._collection("emotional_risk").sync()
+        return logged
+
+    async def get_emotional_risk_history(self, user_id: str, limit: int = 20) -> List[EmotionalRiskEntry]:
+        self._collection("emotional_risk")
+        return self._risk.recent(user_id, limit)
+
+    # Maintenance
+
+    def flush(self):
+        """Fsync every open collection log"""
+        for log in self._logs.values():
+            log.sync()
+
+    def compact(self):
+        """Snapshot every loaded collection and start fresh logs"""
+        for log in self._logs.values():
+            log.compact()
+
+    async def close(self):
+        for log in self._logs.values():
+            log.close()
+        self._logs.clear()
+        self.logger.info("Log-structured database closed")
@@ -8,7 +8,8 @@ import logging
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.errors import DuplicateKeyError, PyMongoError
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
 
 from .database_interface import (
     DatabaseInterface, UserProfile, InteractionRecord, SessionRecord,
@@ -151,6 +152,10 @@ class MongoDatabase:
             self.logger.error(f"Error saving interaction: {e}")
             return False
     
+    async def save_interactions(self, interactions: List[InteractionRecord]) -> int:
+        """Save a batch of interaction records in one round trip"""
+        return await self._insert_many("interactions", [i.to_dict() for i in interactions], "interaction_id")
+    
     async def get_recent_interactions(self, user_id: str, limit: int = 20) -> List[InteractionRecord]:
         """Get recent interactions for a user"""
         try:
@@ -201,6 +206,24 @@ class MongoDatabase:
             self.logger.error(f"Error saving memory fragment: {e}")
             return False
     
+    async def save_memory_fragments(self, memories: List[MemoryFragment]) -> int:
+        """Upsert a batch of memory fragments by memory_id with a single bulk_write"""
+        if not memories:
+            return 0
+        operations = [
+            ReplaceOne({"memory_id": memory.memory_id}, memory.to_dict(), upsert=True)
+            for memory in memories
+        ]
+        try:
+            result = await self.db[self.collections["memory_fragments"]].bulk_write(operations, ordered=False)
+            return result.upserted_count + result.matched_count
+        except BulkWriteError as e:
+            self.logger.error(f"Error saving memory fragments: {len(e.details.get('writeErrors', []))} failed")
+            return e.details.get("nUpserted", 0) + e.details.get("nMatched", 0)
+        except Exception as e:
+            self.logger.error(f"Error saving memory fragments: {e}")
+            return 0
+    
     async def get_relevant_memories(self, user_id: str, memory_type: Optional[str] = None, 
                                   tags: Optional[List[str]] = None, limit: int = 10) -> List[MemoryFragment]:
         """Get relevant memory fragments for context"""
@@ -293,6 +316,35 @@ class MongoDatabase:
             self.logger.error(f"Error logging emotional risk: {e}")
             return False
 
+    async def log_emotional_risks(self, entries: List[EmotionalRiskEntry]) -> int:
+        """Log a batch of emotional risk entries in one round trip"""
+        return await self._insert_many("emotional_risk", [e.to_dict() for e in entries], "entry_id")
+
+    async def _insert_many(self, collection: str, documents: List[Dict[str, Any]], id_field: str) -> int:
+        """
+        Unordered insert_many; returns how many documents are stored even on partial failure
+
+        Documents are keyed by their record id, so retrying a batch cannot
+        duplicate the documents a previous attempt already inserted.
+        """
+        if not documents:
+            return 0
+        for document in documents:
+            document["_id"] = document[id_field]
+        try:
+            result = await self.db[self.collections[collection]].insert_many(documents, ordered=False)
+            return len(result.inserted_ids)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            # A duplicate key means an earlier attempt already stored that record
+            duplicates = sum(1 for error in errors if error.get("code") == 11000)
+            if len(errors) > duplicates:
+                self.logger.error(f"Error bulk inserting {collection}: {len(errors) - duplicates} failed")
+            return e.details.get("nInserted", 0) + duplicates
+        except Exception as e:
+            self.logger.error(f"Error bulk inserting {collection}: {e}")
+            return 0
+
     async def get_emotional_risk_history(self, user_id: str, limit: int = 20) -> List[EmotionalRiskEntry]:
         """Retrieve emotional risk history"""
         try:
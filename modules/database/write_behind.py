@@ -0,0 +1,232 @@
+"""
+Write-Behind Database Buffer
+
+Wraps any DatabaseInterface backend and batches the high-volume per-turn
+writes (interactions, memory fragments, emotional risk entries). Buffered
+records are handed to the backend's bulk methods when a batch fills up or
+after ``flush_interval`` seconds, so persistence round trips are amortized
+across interactions. Before a read for a user, that user's pending writes are
+flushed, and a read waits for a flush that is still writing that user's
+records, which preserves read-your-writes consistency.
+
+A batch the backend does not fully write (it raises or reports fewer records
+than it was given) is put back and retried with the next flush. Bulk methods
+therefore have to treat a record they already hold as written; every backend
+skips records whose id it already stores.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from .database_interface import (
+    DatabaseInterface,
+    InteractionRecord,
+    MemoryFragment,
+    EmotionalRiskEntry,
+)
+
+# buffer name -> backend bulk method
+_BULK_METHODS = {
+    "interactions": "save_interactions",
+    "memory_fragments": "save_memory_fragments",
+    "emotional_risk": "log_emotional_risks",
+}
+
+
+class WriteBehindBuffer:
+    """
+    Buffers writes in front of a database backend
+
+    Args:
+        database: Backend implementing the bulk write methods
+        max_batch: Pending records that trigger an immediate flush
+        flush_interval: Seconds a record may wait before a background flush
+        max_attempts: Failed flushes after which a batch is dropped instead of retried
+    """
+
+    def __init__(self, database: DatabaseInterface, max_batch: int = 50, flush_interval: float = 0.5,
+                 max_attempts: int = 3):
+        self.database = database
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.logger = logging.getLogger(__name__)
+
+        self._pending: Dict[str, List[Any]] = {name: [] for name in _BULK_METHODS}
+        self._pending_by_user: Dict[str, int] = defaultdict(int)
+        # user -> records of theirs that a running flush is writing
+        self._in_flight_by_user: Dict[str, int] = defaultdict(int)
+        # buffer name -> consecutive flushes that left part of its batch unwritten
+        self._failed_attempts: Dict[str, int] = defaultdict(int)
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._timer: Optional[asyncio.Task] = None
+        self.stats = {"buffered": 0, "flushes": 0, "records_written": 0, "requeued": 0, "dropped": 0}
+
+    def __getattr__(self, name: str):
+        # Everything without a buffered path goes straight to the backend
+        return getattr(self.database, name)
+
+    @property
+    def pending_count(self) -> int:
+        return sum(len(records) for records in self._pending.values())
+
+    # Buffered writes
+
+    async def save_interaction(self, interaction: InteractionRecord) -> bool:
+        await self._buffer("interactions", interaction.user_id, interaction)
+        return True
+
+    async def save_interactions(self, interactions: List[InteractionRecord]) -> int:
+        for interaction in interactions:
+            await self._buffer("interactions", interaction.user_id, interaction)
+        return len(interactions)
+
+    async def save_memory_fragment(self, memory: MemoryFragment) -> bool:
+        await self._buffer("memory_fragments", memory.user_id, memory)
+        return True
+
+    async def save_memory_fragments(self, memories: List[MemoryFragment]) -> int:
+        for memory in memories:
+            await self._buffer("memory_fragments", memory.user_id, memory)
+        return len(memories)
+
+    async def log_emotional_risk(self, entry: EmotionalRiskEntry) -> bool:
+        await self._buffer("emotional_risk", entry.user_id, entry)
+        return True
+
+    async def log_emotional_risks(self, entries: List[EmotionalRiskEntry]) -> int:
+        for entry in entries:
+            await self._buffer("emotional_risk", entry.user_id, entry)
+        return len(entries)
+
+    async def _buffer(self, name: str, user_id: str, record: Any):
+        self._pending[name].append(record)
+        self._pending_by_user[user_id] += 1
+        self.stats["buffered"] += 1
+
+        if self.pending_count >= self.max_batch:
+            await self.flush()
+        elif self._timer is None or self._timer.done():
+            self._timer = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        try:
+            await self.flush()
+        except Exception as e:
+            self.logger.error(f"Background flush failed: {e}")
+
+    async def flush(self) -> int:
+        """
+        Write every pending record through the backend's bulk methods
+
+        Batches the backend does not fully write are put back at the front of
+        their buffer, unless they already failed ``max_attempts`` times.
+
+        Returns:
+            int: Number of records the backend reported as written
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        async with self._flush_lock:
+            batches = {name: records for name, records in self._pending.items() if records}
+            if not batches:
+                return 0
+            # Swap the batches out so writes buffered during the flush start a new batch
+            self._pending = {name: [] for name in _BULK_METHODS}
+            in_flight = self._pending_by_user
+            self._pending_by_user = defaultdict(int)
+            for user_id, count in in_flight.items():
+                self._in_flight_by_user[user_id] += count
+
+            written = 0
+            try:
+                for name, records in batches.items():
+                    try:
+                        count = await getattr(self.database, _BULK_METHODS[name])(records)
+                    except Exception as e:
+                        self.logger.error(f"Bulk write of {len(records)} {name} records failed: {e}")
+                        count = 0
+                    written += count
+
+                    if count >= len(records):
+                        self._failed_attempts[name] = 0
+                    else:
+                        self._requeue(name, records, count)
+            finally:
+                for user_id, count in in_flight.items():
+                    self._in_flight_by_user[user_id] -= count
+                    if not self._in_flight_by_user[user_id]:
+                        del self._in_flight_by_user[user_id]
+
+            self.stats["flushes"] += 1
+            self.stats["records_written"] += written
+            return written
+
+    def _requeue(self, name: str, records: List[Any], written: int):
+        # The backend does not say which records failed, so the whole batch goes back;
+        # bulk methods skip the records they already stored
+        self._failed_attempts[name] += 1
+        if self._failed_attempts[name] >= self.max_attempts:
+            self.logger.error(f"Dropping {len(records) - written} unwritten {name} records "
+                              f"after {self._failed_attempts[name]} failed flushes")
+            self._failed_attempts[name] = 0
+            self.stats["dropped"] += len(records) - written
+            return
+
+        self.logger.warning(f"Bulk flush wrote {written} of {len(records)} {name} records; "
+                            f"retrying them with the next flush")
+        self._pending[name] = records + self._pending[name]
+        for record in records:
+            self._pending_by_user[record.user_id] += 1
+        self.stats["requeued"] += len(records)
+        if self._timer is None or self._timer.done() or self._timer is asyncio.current_task():
+            self._timer = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_for(self, user_id: str):
+        # A flush already writing this user's records holds the lock, so this waits for it
+        if self._pending_by_user.get(user_id) or self._in_flight_by_user.get(user_id):
+            await self.flush()
+
+    # Reads that must observe the user's own buffered writes
+
+    async def get_recent_interactions(self, user_id: str, limit: int = 20) -> List[InteractionRecord]:
+        await self._flush_for(user_id)
+        return await self.database.get_recent_interactions(user_id, limit)
+
+    async def get_relevant_memories(self, user_id: str, memory_type: Optional[str] = None,
+                                    tags: Optional[List[str]] = None, limit: int = 10) -> List[MemoryFragment]:
+        await self._flush_for(user_id)
+        return await self.database.get_relevant_memories(user_id, memory_type, tags, limit)
+
+    async def get_emotional_risk_history(self, user_id: str, limit: int = 20) -> List[EmotionalRiskEntry]:
+        await self._flush_for(user_id)
+        return await self.database.get_emotional_risk_history(user_id, limit)
+
+    async def get_user_analytics(self, user_id: str, days: int = 30) -> Dict[str, Any]:
+        await self._flush_for(user_id)
+        return await self.database.get_user_analytics(user_id, days)
+
+    async def get_session_interactions(self, session_id: str) -> List[InteractionRecord]:
+        if self._pending["interactions"] or self._in_flight_by_user:
+            await self.flush()
+        return await self.database.get_session_interactions(session_id)
+
+    async def update_memory_access(self, memory_id: str) -> bool:
+        if self._in_flight_by_user or any(memory.memory_id == memory_id
+                                          for memory in self._pending["memory_fragments"]):
+            await self.flush()
+        return await self.database.update_memory_access(memory_id)
+
+    async def close(self):
+        # Retry requeued batches now; after max_attempts failures they are dropped
+        for _ in range(self.max_attempts):
+            await self.flush()
+            if not self.pending_count:
+                break
+        if self._timer is not None and not self._timer.done():
+            self._timer.cancel()
+        await self.database.close()
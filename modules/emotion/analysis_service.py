@@ -0,0 +1,220 @@
+"""
+Shared Emotion Analysis Service
+
+Several detectors (EmotionDetector, the memory EmotionTagger, MemorySystem's
+sentiment pass and the symbol tagger) look at the same user message. This
+service tokenizes a message once, hands the shared tokens to whichever
+registered analyzers are asked for, and memoizes every result by a hash of
+the message content in a bounded LRU, so each message is analyzed once per
+analyzer no matter how many code paths ask.
+
+Detector instances register their bound analyzers under a key of their own,
+held weakly, so each instance runs its own lexicons and configuration and the
+service never keeps a detector alive.
+"""
+
+import hashlib
+import itertools
+import logging
+import re
+import threading
+import weakref
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r'\b\w+\b')
+
+
+@dataclass
+class TokenizedText:
+    """One message split every way the analyzers need it"""
+    text: str
+    lower: str
+    words: List[str]        # \b\w+\b tokens of the lowercased text
+    split_words: List[str]  # whitespace-separated tokens of the lowercased text
+    word_counts: Counter = field(default_factory=Counter)
+
+    @classmethod
+    def from_text(cls, text: str) -> "TokenizedText":
+        lower = text.lower()
+        words = WORD_PATTERN.findall(lower)
+        return cls(text=text, lower=lower, words=words, split_words=lower.split(), word_counts=Counter(words))
+
+
+class _Entry:
+    __slots__ = ("tokens", "results")
+
+    def __init__(self, tokens: TokenizedText):
+        self.tokens = tokens
+        self.results: Dict[str, Any] = {}
+
+
+def content_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class EmotionAnalysisService:
+    """
+    Process-wide tokenize-once, memoized fan-out to registered analyzers
+
+    Analyzers are callables taking a TokenizedText. They must be deterministic
+    functions of the text (and, for instance analyzers, of their instance's
+    configuration), since their results are shared between every caller that
+    asks the same analyzer about the same content.
+    """
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._analyzers: Dict[str, Callable[[TokenizedText], Any]] = {}
+        self._methods: Dict[str, weakref.WeakMethod] = {}
+        self._dead: List[str] = []
+        self._owner_ids = itertools.count(1)
+        self._cache: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.stats = {
+            "requests": 0,
+            "duplicate_hits": 0,
+            "analyzer_runs": 0,
+            "tokenizations": 0,
+            "evictions": 0,
+        }
+
+    def register(self, name: str, analyzer: Callable[[TokenizedText], Any], replace: bool = False) -> bool:
+        """
+        Register a module-level analyzer under a name
+
+        The first registration wins unless ``replace`` is set, so a module
+        can register at import time without discarding cached results.
+        Replacing drops that analyzer's cache. Analyzers that belong to an
+        instance go through ``register_method`` instead.
+
+        Returns:
+            bool: True if this analyzer is now the registered one
+        """
+        with self._lock:
+            self._purge_dead()
+            if name in self._analyzers and not replace:
+                return False
+            if name in self._analyzers:
+                self._drop_results(name)
+            self._analyzers[name] = analyzer
+            return True
+
+    def register_method(self, name: str, method: Callable[[TokenizedText], Any]) -> str:
+        """
+        Register an instance's bound analyzer under a key of its own
+
+        The method is held through a weak reference, and its registration and
+        cached results are dropped once the instance is collected.
+
+        Returns:
+            str: Key to pass to ``run`` and ``analyze``
+        """
+        with self._lock:
+            self._purge_dead()
+            key = f"{name}#{next(self._owner_ids)}"
+            # The callback may fire during any allocation, so it only records the key
+            self._methods[key] = weakref.WeakMethod(method, lambda _ref, key=key: self._dead.append(key))
+            return key
+
+    def is_registered(self, name: str) -> bool:
+        with self._lock:
+            self._purge_dead()
+            return name in self._analyzers or name in self._methods
+
+    def tokenize(self, text: str) -> TokenizedText:
+        """Shared tokens for the text (cached alongside the analysis results)"""
+        with self._lock:
+            return self._entry(text).tokens
+
+    def analyze(self, text: str, analyzers: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Results of the named analyzers (all registered ones by default) for the text
+
+        Raises:
+            KeyError: If an analyzer name is not registered
+        """
+        with self._lock:
+            self._purge_dead()
+            names = list(analyzers) if analyzers is not None else [*self._analyzers, *self._methods]
+            entry = self._entry(text)
+            results = {}
+            for name in names:
+                self.stats["requests"] += 1
+                if name in entry.results:
+                    self.stats["duplicate_hits"] += 1
+                else:
+                    entry.results[name] = self._resolve(name)(entry.tokens)
+                    self.stats["analyzer_runs"] += 1
+                results[name] = entry.results[name]
+            return results
+
+    def run(self, name: str, text: str) -> Any:
+        """Result of a single analyzer for the text"""
+        return self.analyze(text, [name])[name]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._purge_dead()
+            requests = self.stats["requests"]
+            return {
+                **self.stats,
+                "hit_rate": self.stats["duplicate_hits"] / requests if requests else 0.0,
+                "cached_messages": len(self._cache),
+                "analyzers": [*self._analyzers, *self._methods],
+            }
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def _resolve(self, name: str) -> Callable[[TokenizedText], Any]:
+        if name not in self._methods:
+            return self._analyzers[name]
+        method = self._methods[name]()
+        if method is None:
+            raise KeyError(name)
+        return method
+
+    def _drop_results(self, name: str):
+        for entry in self._cache.values():
+            entry.results.pop(name, None)
+
+    def _purge_dead(self):
+        while self._dead:
+            key = self._dead.pop()
+            self._methods.pop(key, None)
+            self._drop_results(key)
+
+    def _entry(self, text: str) -> _Entry:
+        key = content_hash(text)
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._cache.move_to_end(key)
+            return entry
+
+        entry = _Entry(TokenizedText.from_text(text))
+        self.stats["tokenizations"] += 1
+        self._cache[key] = entry
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+            self.stats["evictions"] += 1
+        return entry
+
+
+# Global instance
+_analysis_service = None
+_service_lock = threading.Lock()
+
+
+def get_analysis_service() -> EmotionAnalysisService:
+    """Get global emotion analysis service instance"""
+    global _analysis_service
+    if _analysis_service is None:
+        with _service_lock:
+            if _analysis_service is None:
+                _analysis_service = EmotionAnalysisService()
+    return _analysis_service
@@ -8,6 +8,8 @@ import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+from .analysis_service import TokenizedText, get_analysis_service
+
 logger = logging.getLogger(__name__)
 
 class EmotionDetector:
@@ -91,6 +93,14 @@ class EmotionDetector:
             "😞", "😢", "😭", "💔", "😔", "terrible", "awful", 
             "horrible", "hate", "worst", "sucks"
         ]
+        
+        # Keyword lookup tables so a message is scanned once rather than once per keyword
+        all_keywords = {keyword for keywords in self.emotion_keywords.values() for keyword in keywords}
+        self._word_keywords = {keyword for keyword in all_keywords if " " not in keyword}
+        self._keyword_lengths = sorted({len(keyword) for keyword in self._word_keywords})
+        
+        self.analysis_service = get_analysis_service()
+        self._analysis_key = self.analysis_service.register_method("emotion_detector", self._analyze_tokens)
     
     async def analyze_text(self, text: str) -> Dict[str, Any]:
         """
@@ -107,7 +117,17 @@ class EmotionDetector:
                 "sentiment": "neutral"
             }
         
-        text_lower = text.lower()
+        analysis = self.analysis_service.run(self._analysis_key, text)
+        return {
+            **analysis,
+            "emotions": dict(analysis["emotions"]),
+            "analysis_timestamp": datetime.now().isoformat()
+        }
+    
+    def _analyze_tokens(self, tokens: TokenizedText) -> Dict[str, Any]:
+        """Keyword, sentiment and intensity analysis over the shared tokens"""
+        text_lower = tokens.lower
+        multipliers = self._keyword_multipliers(tokens.split_words)
         emotion_scores = {}
         
         # Score each emotion category
@@ -115,26 +135,18 @@ class EmotionDetector:
             score = 0
             
             for keyword in keywords:
-                if keyword in text_lower:
-                    base_score = 1.0
-                    
-                    # Check for intensity modifiers before the keyword
-                    words = text_lower.split()
-                    for i, word in enumerate(words):
-                        if keyword in word:
-                            # Look for modifiers in previous words
-                            for j in range(max(0, i-2), i):
-                                if words[j] in self.intensity_modifiers:
-                                    base_score *= self.intensity_modifiers[words[j]]
-                    
-                    score += base_score
+                if keyword in multipliers:
+                    score += multipliers[keyword]
+                elif keyword not in self._word_keywords and keyword in text_lower:
+                    # Multi-word keywords never sit inside one word, so no modifier applies
+                    score += 1.0
             
             if score > 0:
                 emotion_scores[emotion] = min(score, 1.0)  # Cap at 1.0
         
         # If no emotions detected, analyze sentiment
         if not emotion_scores:
-            sentiment_score = self._analyze_sentiment(text)
+            sentiment_score = self._analyze_sentiment(tokens.text)
             if sentiment_score > 0.6:
                 emotion_scores["happy"] = sentiment_score
             elif sentiment_score < 0.4:
@@ -156,21 +168,50 @@ class EmotionDetector:
         sentiment = self._calculate_sentiment(emotion_scores)
         
         # Calculate intensity based on text features
-        intensity = self._calculate_intensity(text, primary_score)
+        intensity = self._calculate_intensity(tokens.text, primary_score, tokens.split_words)
         
         return {
             "primary_emotion": primary_name,
             "confidence": primary_score,
             "intensity": intensity,
             "emotions": emotion_scores,
-            "sentiment": sentiment,
-            "analysis_timestamp": datetime.now().isoformat()
+            "sentiment": sentiment
         }
     
+    def _keyword_multipliers(self, words: List[str]) -> Dict[str, float]:
+        """
+        Score for every single-word keyword found in the message
+        
+        Each word that contains a keyword multiplies that keyword's score by
+        the intensity modifiers among the two words before it.
+        """
+        multipliers = {}
+        for i, word in enumerate(words):
+            for keyword in self._contained_keywords(word):
+                score = multipliers.get(keyword, 1.0)
+                for j in range(max(0, i-2), i):
+                    if words[j] in self.intensity_modifiers:
+                        score *= self.intensity_modifiers[words[j]]
+                multipliers[keyword] = score
+        return multipliers
+    
+    def _contained_keywords(self, word: str) -> set:
+        """Keywords occurring anywhere inside a word"""
+        found = set()
+        for length in self._keyword_lengths:
+            if length > len(word):
+                break
+            for start in range(len(word) - length + 1):
+                candidate = word[start:start + length]
+                if candidate in self._word_keywords:
+                    found.add(candidate)
+        return found
+    
     def _analyze_sentiment(self, text: str) -> float:
         """Simple sentiment analysis"""
-        positive_count = sum(1 for indicator in self.positive_indicators if indicator in text.lower())
-        negative_count = sum(1 for indicator in self.negative_indicators if indicator in text.lower())
+        text_lower = text.lower()
+        positive_count = sum(1 for indicator in self.positive_indicators if indicator in text_lower)
+        negative_count = sum(1 for indicator in self.negative_indicators if indicator in text_lower)
         
         total_indicators = positive_count + negative_count
         if total_indicators == 0:
@@ -193,7 +234,8 @@ class EmotionDetector:
         else:
             return "neutral"
     
-    def _calculate_intensity(self, text: str, emotion_score: float) -> float:
+    def _calculate_intensity(self, text: str, emotion_score: float,
+                             words: Optional[List[str]] = None) -> float:
         """Calculate emotional intensity based on text features"""
         base_intensity = emotion_score
         
@@ -209,7 +251,8 @@ class EmotionDetector:
             base_intensity += 0.1
         
         # Repetition indicates intensity
-        words = text.lower().split()
+        if words is None:
+            words = text.lower().split()
         repeated_words = len(words) - len(set(words))
         if repeated_words > 0:
             base_intensity += 0.1
@@ -13,6 +13,8 @@ import os
 import random
 from dataclasses import dataclass
 
+import numpy as np
+
 class AudioType(Enum):
     AMBIENT = "ambient"
     MUSIC = "music"
@@ -60,6 +62,204 @@ class AudioPlayback:
     loop_count: int
     trigger_context: str
 
+ROW_ARRAYS = ("persona_affinity", "emotion_triggers", "interaction_triggers", "mood_categories",
+              "trigger_counts", "durations")
+
+
+def track_signature(track: AudioTrack) -> Tuple:
+    """The track fields the feature matrix is built from"""
+    return (tuple(sorted(track.persona_affinity.items())), tuple(track.emotional_triggers),
+            tuple(track.interaction_triggers), tuple(c.value for c in track.mood_categories), track.duration)
+
+
+class TrackFeatureMatrix:
+    """
+    Dense per-track features for vectorized scoring
+
+    One row per track; columns are persona affinities, emotional trigger and
+    interaction trigger indicators, mood category indicators, plus duration
+    and trigger count. Rows live in buffers with spare capacity that doubles
+    when full, so adding a track is amortized O(1). Replacing a track rewrites
+    its row, and removing one shifts the rows below it up inside the buffers
+    (O(n), without reallocating). New vocabulary grows the column sets, so
+    library changes never require a full rebuild.
+    """
+
+    def __init__(self):
+        self.track_ids: List[str] = []
+        self.row_of: Dict[str, int] = {}
+        self.signatures: List[Tuple] = []
+        self.personas: Dict[str, int] = {}
+        self.emotions: Dict[str, int] = {}
+        self.interactions: Dict[str, int] = {}
+        self.moods: Dict[str, int] = {}
+        self._capacity = 0
+        self._persona_affinity = np.zeros((0, 0))
+        self._emotion_triggers = np.zeros((0, 0))
+        self._interaction_triggers = np.zeros((0, 0))
+        self._mood_categories = np.zeros((0, 0))
+        self._trigger_counts = np.zeros(0)
+        self._durations = np.zeros(0)
+
+    def __len__(self) -> int:
+        return len(self.track_ids)
+
+    # Views of the filled rows; the buffers behind them keep spare capacity
+    @property
+    def persona_affinity(self) -> np.ndarray:
+        return self._persona_affinity[:len(self)]
+
+    @property
+    def emotion_triggers(self) -> np.ndarray:
+        return self._emotion_triggers[:len(self)]
+
+    @property
+    def interaction_triggers(self) -> np.ndarray:
+        return self._interaction_triggers[:len(self)]
+
+    @property
+    def mood_categories(self) -> np.ndarray:
+        return self._mood_categories[:len(self)]
+
+    @property
+    def trigger_counts(self) -> np.ndarray:
+        return self._trigger_counts[:len(self)]
+
+    @property
+    def durations(self) -> np.ndarray:
+        return self._durations[:len(self)]
+
+    @classmethod
+    def from_tracks(cls, tracks: List[AudioTrack]) -> "TrackFeatureMatrix":
+        """Build the whole matrix at once, allocating each array a single time"""
+        features = cls()
+        for track in tracks:
+            for persona in track.persona_affinity:
+                features.personas.setdefault(persona, len(features.personas))
+            for emotion in track.emotional_triggers:
+                features.emotions.setdefault(emotion, len(features.emotions))
+            for interaction in track.interaction_triggers:
+                features.interactions.setdefault(interaction, len(features.interactions))
+            for category in track.mood_categories:
+                features.moods.setdefault(category.value, len(features.moods))
+
+        count = len(tracks)
+        features._capacity = count
+        features._persona_affinity = np.zeros((count, len(features.personas)))
+        features._emotion_triggers = np.zeros((count, len(features.emotions)))
+        features._interaction_triggers = np.zeros((count, len(features.interactions)))
+        features._mood_categories = np.zeros((count, len(features.moods)))
+        for row, track in enumerate(tracks):
+            features.track_ids.append(track.track_id)
+            features.row_of[track.track_id] = row
+            features.signatures.append(track_signature(track))
+            for persona, affinity in track.persona_affinity.items():
+                features._persona_affinity[row, features.personas[persona]] = affinity
+            features._emotion_triggers[row, [features.emotions[e] for e in track.emotional_triggers]] = 1.0
+            features._interaction_triggers[row, [features.interactions[i] for i in track.interaction_triggers]] = 1.0
+            features._mood_categories[row, [features.moods[c.value] for c in track.mood_categories]] = 1.0
+
+        features._trigger_counts = np.array([max(1, len(t.emotional_triggers)) for t in tracks], dtype=float)
+        features._durations = np.array([t.duration for t in tracks], dtype=float)
+        return features
+
+    def _column(self, vocabulary: Dict[str, int], name: str, value: str) -> int:
+        if value not in vocabulary:
+            vocabulary[value] = len(vocabulary)
+            buffer = getattr(self, f"_{name}")
+            setattr(self, f"_{name}", np.hstack([buffer, np.zeros((buffer.shape[0], 1))]))
+        return vocabulary[value]
+
+    def _grow(self):
+        capacity = max(8, self._capacity * 2)
+        for name in ROW_ARRAYS:
+            buffer = getattr(self, f"_{name}")
+            grown = np.zeros((capacity,) + buffer.shape[1:])
+            grown[:len(self)] = buffer[:len(self)]
+            setattr(self, f"_{name}", grown)
+        self._capacity = capacity
+
+    def add(self, track: AudioTrack):
+        """Insert a track's row, or rewrite it in place if the track id is already present"""
+        row = self.row_of.get(track.track_id)
+        if row is None:
+            row = len(self.track_ids)
+            if row == self._capacity:
+                self._grow()
+            self.track_ids.append(track.track_id)
+            self.row_of[track.track_id] = row
+            self.signatures.append(track_signature(track))
+        else:
+            for name in ROW_ARRAYS:
+                getattr(self, f"_{name}")[row] = 0.0
+            self.signatures[row] = track_signature(track)
+
+        # Columns are looked up first: a new one replaces the buffer
+        for persona, affinity in track.persona_affinity.items():
+            column = self._column(self.personas, "persona_affinity", persona)
+            self._persona_affinity[row, column] = affinity
+        for emotion in track.emotional_triggers:
+            column = self._column(self.emotions, "emotion_triggers", emotion)
+            self._emotion_triggers[row, column] = 1.0
+        for interaction in track.interaction_triggers:
+            column = self._column(self.interactions, "interaction_triggers", interaction)
+            self._interaction_triggers[row, column] = 1.0
+        for category in track.mood_categories:
+            column = self._column(self.moods, "mood_categories", category.value)
+            self._mood_categories[row, column] = 1.0
+
+        self._trigger_counts[row] = max(1, len(track.emotional_triggers))
+        self._durations[row] = track.duration
+
+    def remove(self, track_id: str):
+        """Delete a track's row, keeping the remaining rows in library order"""
+        row = self.row_of.pop(track_id, None)
+        if row is None:
+            return
+        end = len(self.track_ids)
+        del self.track_ids[row]
+        del self.signatures[row]
+        for later in self.track_ids[row:]:
+            self.row_of[later] -= 1
+        for name in ROW_ARRAYS:
+            buffer = getattr(self, f"_{name}")
+            buffer[row:end - 1] = buffer[row + 1:end]
+            buffer[end - 1] = 0.0
+
+    def persona_scores(self, persona_name: str) -> np.ndarray:
+        column = self.personas.get(persona_name.lower())
+        return self.persona_affinity[:, column] if column is not None else np.zeros(len(self))
+
+    def emotion_scores(self, emotional_state: Dict[str, float]) -> np.ndarray:
+        """Summed intensity of matching triggers over the trigger count, capped at 1"""
+        weights = np.zeros(len(self.emotions))
+        for emotion, intensity in emotional_state.items():
+            column = self.emotions.get(emotion)
+            if column is not None:
+                weights[column] += intensity
+        return np.minimum(1.0, (self.emotion_triggers @ weights) / self.trigger_counts)
+
+    def interaction_scores(self, interaction_context: str) -> np.ndarray:
+        column = self.interactions.get(interaction_context)
+        return self.interaction_triggers[:, column] if column is not None else np.zeros(len(self))
+
+    def mood_mask(self, mood: str) -> np.ndarray:
+        column = self.moods.get(mood)
+        return self.mood_categories[:, column] > 0 if column is not None else np.zeros(len(self), dtype=bool)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Row indices of the k highest finite scores, best first; ties keep row order"""
+    candidates = np.flatnonzero(np.isfinite(scores))
+    if len(candidates) > k:
+        # -scores so the k largest come first; argpartition then a stable sort of just those
+        kept = np.argpartition(-scores[candidates], k - 1)[:k]
+        threshold = scores[candidates[kept]].min()
+        candidates = candidates[scores[candidates] >= threshold]
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order][:k]
+
+
 class MoodscapeAudioLayer:
     """
     Manages ambient audio that responds to mood, persona, and interaction context.
@@ -74,8 +274,10 @@ class MoodscapeAudioLayer:
         self.mood_preferences: Dict[str, Dict[str, Any]] = {}  # User preferences for mood-audio combinations
         self.volume_master = 0.7
         self.crossfade_duration = 3.0
+        self.features = TrackFeatureMatrix()
         self._initialize_audio_library()
         self._load_configuration()
+        self._sync_features()
     
     def _initialize_audio_library(self):
         """Initialize the audio library with predefined tracks"""
@@ -258,6 +460,32 @@ class MoodscapeAudioLayer:
             track = AudioTrack(**track_data)
             self.audio_library[track.track_id] = track
     
+    def add_audio_track(self, track: AudioTrack):
+        """Add or replace a track in the library"""
+        self.audio_library[track.track_id] = track
+        self.features.add(track)
+    
+    def remove_audio_track(self, track_id: str) -> bool:
+        """Remove a track from the library"""
+        if self.audio_library.pop(track_id, None) is None:
+            return False
+        self.features.remove(track_id)
+        return True
+    
+    def _sync_features(self):
+        """Bring the feature matrix in line with audio_library after direct edits"""
+        features = self.features
+        if not len(features):
+            self.features = TrackFeatureMatrix.from_tracks(list(self.audio_library.values()))
+            return
+        for track_id in [track_id for track_id in features.track_ids if track_id not in self.audio_library]:
+            features.remove(track_id)
+        # Tracks replaced or edited under the same id show up as a changed signature
+        for track_id, track in self.audio_library.items():
+            row = features.row_of.get(track_id)
+            if row is None or features.signatures[row] != track_signature(track):
+                features.add(track)
+    
     def select_audio_for_mood(self, persona_name: str, current_mood: str, 
                              emotional_state: Dict[str, float], interaction_context: str,
                              user_preferences: Optional[Dict[str, Any]] = None) -> Optional[AudioTrack]:
@@ -275,49 +503,32 @@ class MoodscapeAudioLayer:
             Selected audio track or None if no suitable track found
         """
         
-        # Filter tracks by persona affinity
-        suitable_tracks = [
-            track for track in self.audio_library.values()
-            if track.persona_affinity.get(persona_name.lower(), 0) > 0.3
-        ]
-        
-        if not suitable_tracks:
+        self._sync_features()
+        features = self.features
+        if not len(features):
             return None
         
-        # Score tracks based on multiple factors
-        track_scores = []
+        persona_scores = features.persona_scores(persona_name)
         
-        for track in suitable_tracks:
-            score = 0.0
-            
-            # Persona affinity (40% weight)
-            persona_score = track.persona_affinity.get(persona_name.lower(), 0)
-            score += persona_score * 0.4
-            
-            # Emotional trigger matching (30% weight)
-            emotion_score = 0.0
-            for emotion, intensity in emotional_state.items():
-                if emotion in track.emotional_triggers:
-                    emotion_score += intensity
-            emotion_score = min(1.0, emotion_score / max(1, len(track.emotional_triggers)))
-            score += emotion_score * 0.3
-            
-            # Interaction context matching (20% weight)
-            context_score = 1.0 if interaction_context in track.interaction_triggers else 0.0
-            score += context_score * 0.2
-            
-            # User preferences (10% weight)
-            if user_preferences:
-                preference_score = user_preferences.get(track.track_id, 0.5)
-                score += preference_score * 0.1
-            
-            track_scores.append((track, score))
+        # Persona affinity 40%, emotional triggers 30%, interaction context 20%, user preference 10%
+        scores = (persona_scores * 0.4
+                  + features.emotion_scores(emotional_state) * 0.3
+                  + features.interaction_scores(interaction_context) * 0.2)
+        if user_preferences:
+            # Tracks the caller has no preference for count as neutral
+            preferences = np.full(len(features), 0.5)
+            for track_id, preference in user_preferences.items():
+                row = features.row_of.get(track_id)
+                if row is not None and isinstance(preference, (int, float)):
+                    preferences[row] = preference
+            scores += preferences * 0.1
         
-        # Sort by score and return best match
-        track_scores.sort(key=lambda x: x[1], reverse=True)
+        # Only tracks with some affinity for the persona are eligible
+        scores = np.where(persona_scores > 0.3, scores, -np.inf)
+        best = top_k(scores, 1)
         
-        if track_scores and track_scores[0][1] > 0.3:  # Minimum threshold
-            return track_scores[0][0]
+        if len(best) and scores[best[0]] > 0.3:  # Minimum threshold
+            return self.audio_library[features.track_ids[best[0]]]
         
         return None
     
@@ -477,37 +688,31 @@ class MoodscapeAudioLayer:
             List of recommended tracks with scores
         """
         
-        recommendations = []
+        self._sync_features()
+        features = self.features
+        persona_scores = features.persona_scores(persona_name)
+        emotion_scores = features.emotion_scores(emotional_state)
+        total_scores = (persona_scores * 0.6) + (emotion_scores * 0.4)
         
-        for track in self.audio_library.values():
-            # Calculate compatibility score
-            persona_score = track.persona_affinity.get(persona_name.lower(), 0)
-            
-            emotion_score = 0.0
-            for emotion, intensity in emotional_state.items():
-                if emotion in track.emotional_triggers:
-                    emotion_score += intensity
-            emotion_score = min(1.0, emotion_score / max(1, len(track.emotional_triggers)))
-            
-            total_score = (persona_score * 0.6) + (emotion_score * 0.4)
-            
-            if total_score > 0.2:  # Minimum relevance threshold
-                recommendations.append({
-                    'track_id': track.track_id,
-                    'name': track.name,
-                    'type': track.audio_type.value,
-                    'mood_categories': [cat.value for cat in track.mood_categories],
-                    'score': total_score,
-                    'persona_affinity': persona_score,
-                    'emotion_match': emotion_score,
-                    'duration': track.duration,
-                    'description': self._generate_track_description(track)
-                })
-        
-        # Sort by score
-        recommendations.sort(key=lambda x: x['score'], reverse=True)
-        
-        return recommendations[:5]  # Return top 5 recommendations
+        # Minimum relevance threshold, then the top 5
+        ranked = top_k(np.where(total_scores > 0.2, total_scores, -np.inf), 5)
+        
+        recommendations = []
+        for row in ranked:
+            track = self.audio_library[features.track_ids[row]]
+            recommendations.append({
+                'track_id': track.track_id,
+                'name': track.name,
+                'type': track.audio_type.value,
+                'mood_categories': [cat.value for cat in track.mood_categories],
+                'score': float(total_scores[row]),
+                'persona_affinity': float(persona_scores[row]),
+                'emotion_match': float(emotion_scores[row]),
+                'duration': track.duration,
+                'description': self._generate_track_description(track)
+            })
+        
+        return recommendations
     
     def _generate_track_description(self, track: AudioTrack) -> str:
         """Generate a description of the track for the user"""
@@ -594,19 +799,17 @@ class MoodscapeAudioLayer:
         playlist = []
         total_duration = 0.0
         
-        # Filter tracks by persona and mood
-        suitable_tracks = [
-            track for track in self.audio_library.values()
-            if (track.persona_affinity.get(persona_name.lower(), 0) > 0.4 and
-                any(cat.value == target_mood for cat in track.mood_categories))
-        ]
+        # Filter by persona and mood and rank by persona affinity in one pass over the matrix
+        self._sync_features()
+        features = self.features
+        persona_scores = features.persona_scores(persona_name)
+        eligible = (persona_scores > 0.4) & features.mood_mask(target_mood)
+        ranked = top_k(np.where(eligible, persona_scores, -np.inf), len(features))
+        suitable_tracks = [self.audio_library[features.track_ids[row]] for row in ranked]
         
         if not suitable_tracks:
             return []
         
-        # Sort by persona affinity
-        suitable_tracks.sort(key=lambda x: x.persona_affinity.get(persona_name.lower(), 0), reverse=True)
-        
         # Build playlist
         while total_duration < target_duration and suitable_tracks:
             for track in suitable_tracks:
@@ -1,16 +1,21 @@
 import json
 import os
-import re
-from collections import Counter
 from datetime import datetime
 
+from modules.emotion.analysis_service import TokenizedText, get_analysis_service
+
 TAG_LOG_PATH = os.path.join('logs', 'symbol_tags.jsonl')
 
 
+def _repeated_words(tokens: TokenizedText) -> tuple:
+    return tuple(w for w, c in tokens.word_counts.items() if c > 1 and len(w) > 3)
+
+
+get_analysis_service().register('symbol_tags', _repeated_words)
+
+
 def extract_tags(text: str) -> list[str]:
-    words = re.findall(r'\b\w+\b', text.lower())
-    counts = Counter(words)
-    return [w for w, c in counts.items() if c > 1 and len(w) > 3]
+    return list(get_analysis_service().run('symbol_tags', text))
 
 
 def tag_text(text: str) -> list[str]:
@@ -5,6 +5,8 @@ Encode and broadcast emotional state through ambient sensory cues
 
 import json
 import time
+import heapq
+import itertools
 import asyncio
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
@@ -70,15 +72,30 @@ class EmotionalBroadcaster:
     Manages emotional presence broadcasting across multiple channels
     """
     
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", intensity_epsilon: float = 0.02,
+                 min_emit_interval: float = 0.05):
         self.data_dir = data_dir
         self.signatures_file = f"{data_dir}/emotional_signatures.json"
         self.presence_log_file = f"{data_dir}/presence_broadcast_log.json"
         
         self.emotional_signatures: Dict[str, EmotionalSignature] = {}
-        self.active_signals: List[PresenceSignal] = []
         self.broadcast_history: List[Dict[str, Any]] = []
         
+        # Deadline scheduling: a signal is only revisited when its curve has
+        # moved by intensity_epsilon since the last emission (or it expires)
+        self.intensity_epsilon = intensity_epsilon
+        self.min_emit_interval = min_emit_interval
+        self._signals: Dict[int, PresenceSignal] = {}
+        self._last_emitted: Dict[int, float] = {}
+        self._deadlines: List[Tuple[float, int]] = []
+        self._signal_ids = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        
+        # Per-channel coalescing: only each signal's newest pending update is written
+        self._channel_pending: Dict[BroadcastChannel, Dict[int, Tuple[PresenceSignal, float]]] = {}
+        self._channel_workers: Dict[BroadcastChannel, asyncio.Task] = {}
+        self.broadcast_stats = {"wakeups": 0, "emissions": 0, "coalesced": 0}
+        
         # Initialize default emotional signatures
         self._create_default_signatures()
         
@@ -299,71 +316,155 @@ class EmotionalBroadcaster:
         
         return signal
 
+    @property
+    def active_signals(self) -> List[PresenceSignal]:
+        """Signals currently being broadcast, oldest first"""
+        return list(self._signals.values())
+
     def start_broadcasting(self, signal: PresenceSignal):
         """Start broadcasting an emotional presence signal"""
-        self.active_signals.append(signal)
+        signal_id = next(self._signal_ids)
+        self._signals[signal_id] = signal
+        heapq.heappush(self._deadlines, (time.time(), signal_id))
         
         # Log the broadcast
         self._log_broadcast(signal)
         
-        # Start broadcast task if not already running
-        if not self.is_broadcasting:
+        # Start broadcast task if not already running, otherwise wake it for the new deadline
+        if not self.is_broadcasting or self.broadcast_task is None or self.broadcast_task.done():
             self.is_broadcasting = True
+            self._wakeup = asyncio.Event()
             self.broadcast_task = asyncio.create_task(self._broadcast_loop())
+        else:
+            self._wakeup.set()
         
         logger.info(f"Started broadcasting {signal.primary_emotion} presence")
 
     async def _broadcast_loop(self):
-        """Main broadcasting loop"""
-        while self.is_broadcasting and self.active_signals:
-            current_time = time.time()
+        """Sleep until the earliest signal deadline, then emit only what changed"""
+        while self.is_broadcasting and self._signals:
+            # Drop heap entries for signals that were stopped
+            while self._deadlines and self._deadlines[0][1] not in self._signals:
+                heapq.heappop(self._deadlines)
+            if not self._deadlines:
+                break
             
-            # Process each active signal
-            for signal in self.active_signals[:]:  # Copy to allow modification
+            delay = self._deadlines[0][0] - time.time()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    continue  # a signal was added or stopped; re-evaluate the heap
+                except asyncio.TimeoutError:
+                    pass
+            
+            self.broadcast_stats["wakeups"] += 1
+            current_time = time.time()
+            while self._deadlines and self._deadlines[0][0] <= current_time:
+                _, signal_id = heapq.heappop(self._deadlines)
+                signal = self._signals.get(signal_id)
+                if signal is None:
+                    continue
+                
                 elapsed = current_time - signal.started_at
                 
                 # Check if signal has expired
                 if elapsed >= signal.duration:
-                    self.active_signals.remove(signal)
+                    del self._signals[signal_id]
+                    self._last_emitted.pop(signal_id, None)
                     logger.info(f"Ended broadcasting {signal.primary_emotion} presence")
                     continue
                 
                 # Calculate current intensity based on curve
-                progress = elapsed / signal.duration
-                curve_intensity = self._calculate_curve_intensity(signal, progress)
+                curve_intensity = self._calculate_curve_intensity(signal, elapsed / signal.duration)
+                last = self._last_emitted.get(signal_id)
+                if last is None or abs(curve_intensity - last) >= self.intensity_epsilon:
+                    self._last_emitted[signal_id] = curve_intensity
+                    self.broadcast_stats["emissions"] += 1
+                    await self._broadcast_to_channels(signal_id, signal, curve_intensity)
                 
-                # Broadcast to each channel
-                await self._broadcast_to_channels(signal, curve_intensity)
-            
-            # Stop broadcasting if no active signals
-            if not self.active_signals:
-                self.is_broadcasting = False
-                break
-            
-            # Wait before next update
-            await asyncio.sleep(0.5)  # Update every 500ms
-
-    async def _broadcast_to_channels(self, signal: PresenceSignal, intensity: float):
-        """Broadcast signal to specified channels"""
+                next_time = self._next_change_time(signal, current_time, self._last_emitted[signal_id])
+                heapq.heappush(self._deadlines, (max(next_time, current_time + self.min_emit_interval), signal_id))
         
+        # Stop broadcasting if no active signals
+        if not self._signals:
+            self.is_broadcasting = False
+        await self.flush_channels()
+
+    def _next_change_time(self, signal: PresenceSignal, now: float, reference: float) -> float:
+        """
+        Earliest time the curve intensity differs from ``reference`` by the
+        epsilon, or the signal's expiry if it never does
+        """
+        expiry = signal.started_at + signal.duration
+        curve = signal.signature.intensity_curve
+        if len(curve) < 2 or signal.duration <= 0:
+            return expiry
+        
+        segment_length = signal.duration / (len(curve) - 1)
+        index = min(int(max(now - signal.started_at, 0.0) / segment_length), len(curve) - 2)
+        for index in range(index, len(curve) - 1):
+            segment_start = signal.started_at + index * segment_length
+            segment_end = segment_start + segment_length
+            start = max(now, segment_start)
+            slope = (curve[index + 1] - curve[index]) / segment_length
+            value = curve[index] + slope * (start - segment_start)
+            if abs(value - reference) >= self.intensity_epsilon:
+                return start
+            if slope:
+                # Linear within the segment: solve for either epsilon crossing ahead of start
+                crossings = [
+                    start + (reference + offset - value) / slope
+                    for offset in (self.intensity_epsilon, -self.intensity_epsilon)
+                ]
+                ahead = [t for t in crossings if start <= t <= segment_end]
+                if ahead:
+                    return min(ahead)
+        return expiry
+
+    async def _broadcast_to_channels(self, signal_id: int, signal: PresenceSignal, intensity: float):
+        """
+        Queue a signal update on each of its channels
+        
+        Every channel is written by its own task, so a slow channel does not
+        hold up the others; while a write is in flight only the newest pending
+        update of each signal on that channel is kept, so signals sharing a
+        channel never displace each other's updates.
+        """
         for channel in signal.channels:
+            pending = self._channel_pending.setdefault(channel, {})
+            if signal_id in pending:
+                self.broadcast_stats["coalesced"] += 1
+            pending[signal_id] = (signal, intensity)
+            worker = self._channel_workers.get(channel)
+            if worker is None or worker.done():
+                self._channel_workers[channel] = asyncio.create_task(self._channel_worker(channel))
+
+    async def _channel_worker(self, channel: BroadcastChannel):
+        handlers = {
+            BroadcastChannel.UI_AMBIENT: self._broadcast_ui_ambient,
+            BroadcastChannel.VOICE_TONE: self._broadcast_voice_tone,
+            BroadcastChannel.VISUAL_EFFECTS: self._broadcast_visual_effects,
+            BroadcastChannel.AUDIO_AMBIENT: self._broadcast_audio_ambient,
+            BroadcastChannel.NOTIFICATION: self._broadcast_notification,
+            BroadcastChannel.HAPTIC: self._broadcast_haptic,
+        }
+        pending = self._channel_pending.get(channel, {})
+        while pending:
+            # Oldest pending signal first
+            signal_id = next(iter(pending))
+            signal, intensity = pending.pop(signal_id)
             try:
-                if channel == BroadcastChannel.UI_AMBIENT:
-                    await self._broadcast_ui_ambient(signal, intensity)
-                elif channel == BroadcastChannel.VOICE_TONE:
-                    await self._broadcast_voice_tone(signal, intensity)
-                elif channel == BroadcastChannel.VISUAL_EFFECTS:
-                    await self._broadcast_visual_effects(signal, intensity)
-                elif channel == BroadcastChannel.AUDIO_AMBIENT:
-                    await self._broadcast_audio_ambient(signal, intensity)
-                elif channel == BroadcastChannel.NOTIFICATION:
-                    await self._broadcast_notification(signal, intensity)
-                elif channel == BroadcastChannel.HAPTIC:
-                    await self._broadcast_haptic(signal, intensity)
-                    
+                await handlers[channel](signal, intensity)
             except Exception as e:
                 logger.error(f"Error broadcasting to {channel.value}: {e}")
 
+    async def flush_channels(self):
+        """Wait until every queued channel update has been written"""
+        workers = [w for w in self._channel_workers.values() if not w.done()]
+        if workers:
+            await asyncio.gather(*workers, return_exceptions=True)
+
     async def _broadcast_ui_ambient(self, signal: PresenceSignal, intensity: float):
         """Broadcast to UI ambient layer"""
         # Create UI broadcast data
@@ -585,13 +686,17 @@ class EmotionalBroadcaster:
 
     def stop_broadcasting(self, emotion: Optional[str] = None):
         """Stop broadcasting specific emotion or all signals"""
-        if emotion:
-            self.active_signals = [s for s in self.active_signals if s.primary_emotion != emotion]
-        else:
-            self.active_signals.clear()
-        
-        if not self.active_signals:
+        stopped = [signal_id for signal_id, signal in self._signals.items()
+                   if emotion is None or signal.primary_emotion == emotion]
+        for signal_id in stopped:
+            # Heap entries for stopped signals are discarded lazily by the loop
+            del self._signals[signal_id]
+            self._last_emitted.pop(signal_id, None)
+        
+        if not self._signals:
             self.is_broadcasting = False
+        if self._wakeup is not None:
+            self._wakeup.set()
 
     def get_current_presence(self) -> List[Dict[str, Any]]:
         """Get currently broadcasting presence signals"""
@@ -357,6 +357,12 @@ class WhisperManager:
             
         return random.choice(phrases)
     
+    def iter_whisper_phrases(self):
+        """Yield (emotion, phrase) for every whisper in the signature tables"""
+        for emotion, signature in self.voice_engine.signatures.items():
+            for phrase in signature.get('whisper_phrases', []):
+                yield emotion, phrase
+    
     def schedule_ambient_whispers(self, emotion: str, intensity: float = 0.7, duration: float = 60.0):
         """Schedule a series of ambient whispers over time"""
         
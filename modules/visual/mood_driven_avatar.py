@@ -1,11 +1,13 @@
 # mood_driven_avatar.py
 # Visual mood-driven avatar system with romantic expressions
 
+import asyncio
+import bisect
 import json
 import time
 import threading
-from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Any
+from dataclasses import dataclass, replace
 from datetime import datetime
 from enum import Enum
 import numpy as np
@@ -62,6 +64,19 @@ class AvatarState:
     emotional_intensity: float  # 0.0 to 1.0
     timestamp: datetime
 
+@dataclass(frozen=True)
+class AnimationKeyframe:
+    """A gesture scheduled on the animation timeline"""
+    gesture: AvatarGesture
+    intensity: float
+    start_time: float
+    duration: float
+    body_parts: Tuple[str, ...]
+    
+    @property
+    def end_time(self) -> float:
+        return self.start_time + self.duration
+
 @dataclass
 class ExpressionParameters:
     mouth_curve: float  # -1.0 to 1.0
@@ -91,14 +106,14 @@ class MoodDrivenAvatar:
         self.emotion_mappings = self._load_emotion_mappings()
         self.avatar_customization = self._load_avatar_customization()
         
-        # Animation state
-        self.is_animating = False
-        self.animation_queue = []
-        self.current_animation = None
-        
-        # Start animation loop
+        # Animation timeline: keyframes ordered by start time, held in an
+        # immutable tuple that writers replace wholesale. Readers take a single
+        # reference and interpolate from it, so snapshots need no lock and
+        # nothing runs between requests.
+        self._timeline: Tuple[AnimationKeyframe, ...] = ()
+        self._write_lock = threading.Lock()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
         self.is_running = True
-        threading.Thread(target=self._animation_loop, daemon=True).start()
     
     def _load_expression_definitions(self) -> Dict[AvatarExpression, ExpressionParameters]:
         """Load expression parameter definitions"""
@@ -409,14 +424,10 @@ class MoodDrivenAvatar:
             # Map emotion to expression
             expression = self.emotion_mappings.get(emotion, AvatarExpression.NEUTRAL)
             
-            # Update current state
-            self.current_state.expression = expression
-            self.current_state.emotional_intensity = intensity
-            self.current_state.timestamp = datetime.now()
-            
-            # Update visual elements based on context
-            if context:
-                self._update_visual_elements(context)
+            # Publish a new state snapshot
+            changes = self._visual_changes(context) if context else {}
+            self._publish_state(expression=expression, emotional_intensity=intensity,
+                                timestamp=datetime.now(), **changes)
             
             # Trigger appropriate gesture
             self._trigger_emotion_gesture(emotion, intensity)
@@ -426,27 +437,19 @@ class MoodDrivenAvatar:
         except Exception as e:
             print(f"[Avatar] Error updating mood: {e}")
     
-    def _update_visual_elements(self, context: Dict[str, Any]):
-        """Update visual elements based on context"""
-        # Update eye color based on emotion
-        if "eye_color" in context:
-            self.current_state.eye_color = context["eye_color"]
-        
-        # Update hair style based on mood
-        if "hair_style" in context:
-            self.current_state.hair_style = context["hair_style"]
-        
-        # Update clothing based on context
-        if "clothing" in context:
-            self.current_state.clothing = context["clothing"]
-        
-        # Update background based on setting
-        if "background" in context:
-            self.current_state.background = context["background"]
-        
-        # Update lighting based on mood
-        if "lighting" in context:
-            self.current_state.lighting = context["lighting"]
+    def _visual_changes(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Visual element changes (eye color, hair, clothing, background, lighting) requested by context"""
+        return {
+            field: context[field]
+            for field in ("eye_color", "hair_style", "clothing", "background", "lighting")
+            if field in context
+        }
+    
+    def _publish_state(self, **changes):
+        """Swap in a new state snapshot; readers never see a half-applied update"""
+        with self._write_lock:
+            self.current_state = replace(self.current_state, **changes)
+        self._notify()
     
     def _trigger_emotion_gesture(self, emotion: str, intensity: float):
         """Trigger appropriate gesture for emotion"""
@@ -464,11 +467,11 @@ class MoodDrivenAvatar:
             "confident": AvatarGesture.SMILE,
             "happy": AvatarGesture.WAVE,
             "sad": AvatarGesture.TILT_HEAD,
-            "angry": AvatarGesture.None,
-            "surprised": AvatarGesture.None,
-            "fearful": AvatarGesture.None,
-            "disgusted": AvatarGesture.None,
-            "neutral": AvatarGesture.None
+            "angry": None,
+            "surprised": None,
+            "fearful": None,
+            "disgusted": None,
+            "neutral": None
         }
         
         gesture = gesture_mappings.get(emotion)
@@ -476,114 +479,140 @@ class MoodDrivenAvatar:
             self.trigger_gesture(gesture, intensity)
     
     def trigger_gesture(self, gesture: AvatarGesture, intensity: float = 0.5):
-        """Trigger a specific gesture"""
-        try:
-            # Add gesture to animation queue
-            self.animation_queue.append({
-                "gesture": gesture,
-                "intensity": intensity,
-                "timestamp": datetime.now()
-            })
-            
-            print(f"[Avatar] Triggered gesture: {gesture.value}")
-            
-        except Exception as e:
-            print(f"[Avatar] Error triggering gesture: {e}")
-    
-    def _animation_loop(self):
-        """Main animation loop"""
-        while self.is_running:
-            try:
-                # Process animation queue
-                if self.animation_queue and not self.is_animating:
-                    animation = self.animation_queue.pop(0)
-                    self._execute_animation(animation)
-                
-                # Update current animation
-                if self.current_animation:
-                    self._update_current_animation()
-                
-                time.sleep(0.1)  # 10 FPS
-                
-            except Exception as e:
-                print(f"[Avatar] Animation loop error: {e}")
-                time.sleep(1.0)
-    
-    def _execute_animation(self, animation: Dict):
-        """Execute an animation"""
+        """Schedule a gesture to play after any already queued"""
         try:
-            gesture = animation["gesture"]
-            intensity = animation["intensity"]
-            
-            # Get gesture definition
             gesture_def = self.gesture_definitions.get(gesture)
             if not gesture_def:
                 return
             
-            # Set current animation
-            self.current_animation = {
-                "gesture": gesture,
-                "intensity": intensity,
-                "duration": gesture_def["duration"],
-                "start_time": time.time(),
-                "body_parts": gesture_def["body_parts"]
-            }
+            now = time.time()
+            with self._write_lock:
+                # Completed keyframes are pruned here, on the write path
+                timeline = self._timeline[self._first_unfinished(self._timeline, now):]
+                start_time = max(now, timeline[-1].end_time) if timeline else now
+                keyframe = AnimationKeyframe(
+                    gesture=gesture,
+                    intensity=intensity,
+                    start_time=start_time,
+                    duration=gesture_def["duration"],
+                    body_parts=tuple(gesture_def["body_parts"])
+                )
+                self._timeline = timeline + (keyframe,)
+            self._notify()
             
-            # Update avatar state
-            self.current_state.gesture = gesture
-            self.current_state.animation_intensity = intensity
-            self.is_animating = True
-            
-            print(f"[Avatar] Started animation: {gesture.value}")
+            print(f"[Avatar] Triggered gesture: {gesture.value}")
             
         except Exception as e:
-            print(f"[Avatar] Error executing animation: {e}")
+            print(f"[Avatar] Error triggering gesture: {e}")
     
-    def _update_current_animation(self):
-        """Update current animation progress"""
-        if not self.current_animation:
-            return
-        
-        current_time = time.time()
-        start_time = self.current_animation["start_time"]
-        duration = self.current_animation["duration"]
-        
-        # Check if animation is complete
-        if current_time - start_time >= duration:
-            self._complete_animation()
-        else:
-            # Update animation progress
-            progress = (current_time - start_time) / duration
-            self._update_animation_progress(progress)
+    @staticmethod
+    def _first_unfinished(timeline: Tuple[AnimationKeyframe, ...], now: float) -> int:
+        """Index of the first keyframe still playing or pending"""
+        # Keyframes never overlap, so end times are sorted too
+        return bisect.bisect_right([keyframe.end_time for keyframe in timeline], now)
     
-    def _update_animation_progress(self, progress: float):
-        """Update animation progress"""
-        # In a real implementation, this would update the visual animation
-        # For now, we'll just track the progress
-        pass
+    def _active_keyframe(self, now: Optional[float] = None) -> Tuple[Optional[AnimationKeyframe], float]:
+        """The keyframe playing at ``now`` and its progress (0-1)"""
+        now = time.time() if now is None else now
+        timeline = self._timeline
+        index = self._first_unfinished(timeline, now)
+        if index < len(timeline) and timeline[index].start_time <= now:
+            keyframe = timeline[index]
+            return keyframe, (now - keyframe.start_time) / keyframe.duration if keyframe.duration else 1.0
+        return None, 0.0
     
-    def _complete_animation(self):
-        """Complete current animation"""
-        self.current_animation = None
-        self.current_state.gesture = None
-        self.is_animating = False
+    @property
+    def is_animating(self) -> bool:
+        return self._active_keyframe()[0] is not None
+    
+    @property
+    def current_animation(self) -> Optional[Dict[str, Any]]:
+        keyframe, progress = self._active_keyframe()
+        if keyframe is None:
+            return None
+        return {
+            "gesture": keyframe.gesture,
+            "intensity": keyframe.intensity,
+            "duration": keyframe.duration,
+            "start_time": keyframe.start_time,
+            "body_parts": list(keyframe.body_parts),
+            "progress": progress
+        }
+    
+    @property
+    def animation_queue(self) -> List[Dict[str, Any]]:
+        """Gestures scheduled but not yet started"""
+        now = time.time()
+        return [
+            {"gesture": keyframe.gesture, "intensity": keyframe.intensity, "start_time": keyframe.start_time}
+            for keyframe in self._timeline if keyframe.start_time > now
+        ]
+    
+    def next_keyframe_boundary(self, now: Optional[float] = None) -> Optional[float]:
+        """Time of the next gesture start or end, or None when the timeline is idle"""
+        now = time.time() if now is None else now
+        timeline = self._timeline
+        index = self._first_unfinished(timeline, now)
+        if index >= len(timeline):
+            return None
+        keyframe = timeline[index]
+        return keyframe.start_time if keyframe.start_time > now else keyframe.end_time
+    
+    def _notify(self):
+        for loop, event in list(self._waiters):
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # Loop closed; its waiter is gone
+                self._waiters.remove((loop, event))
+    
+    async def animation_events(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield avatar state whenever it changes or a gesture starts or ends
         
-        print("[Avatar] Animation completed")
+        Sleeps until the next keyframe boundary or state update; an idle
+        avatar causes no wakeups.
+        """
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        self._waiters.append(waiter)
+        try:
+            while self.is_running:
+                waiter[1].clear()
+                boundary = self.next_keyframe_boundary()
+                timeout = None if boundary is None else max(boundary - time.time(), 0.0)
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                if not self.is_running:
+                    break
+                yield self.get_avatar_state()
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+    
+    def stop(self):
+        """Stop the avatar and release any animation_events consumers"""
+        self.is_running = False
+        self._notify()
     
     def get_avatar_state(self) -> Dict[str, Any]:
-        """Get current avatar state"""
-        expression_params = self.expression_definitions.get(self.current_state.expression)
+        """Get current avatar state, interpolating the active gesture at call time"""
+        state = self.current_state
+        keyframe, progress = self._active_keyframe()
+        expression_params = self.expression_definitions.get(state.expression)
         
         return {
-            "expression": self.current_state.expression.value,
-            "gesture": self.current_state.gesture.value if self.current_state.gesture else None,
-            "eye_color": self.current_state.eye_color,
-            "hair_style": self.current_state.hair_style,
-            "clothing": self.current_state.clothing,
-            "background": self.current_state.background,
-            "lighting": self.current_state.lighting,
-            "animation_intensity": self.current_state.animation_intensity,
-            "emotional_intensity": self.current_state.emotional_intensity,
+            "expression": state.expression.value,
+            "gesture": keyframe.gesture.value if keyframe else None,
+            "eye_color": state.eye_color,
+            "hair_style": state.hair_style,
+            "clothing": state.clothing,
+            "background": state.background,
+            "lighting": state.lighting,
+            "animation_intensity": keyframe.intensity if keyframe else state.animation_intensity,
+            "animation_progress": progress,
+            "emotional_intensity": state.emotional_intensity,
             "expression_parameters": {
                 "mouth_curve": expression_params.mouth_curve if expression_params else 0.0,
                 "eye_openness": expression_params.eye_openness if expression_params else 0.8,
@@ -592,8 +621,8 @@ class MoodDrivenAvatar:
                 "eye_sparkle": expression_params.eye_sparkle if expression_params else 0.3,
                 "overall_brightness": expression_params.overall_brightness if expression_params else 1.0
             },
-            "timestamp": self.current_state.timestamp.isoformat(),
-            "is_animating": self.is_animating
+            "timestamp": state.timestamp.isoformat(),
+            "is_animating": keyframe is not None
         }
     
     def customize_avatar(self, eye_color: str = None, hair_style: str = None,
@@ -601,20 +630,24 @@ class MoodDrivenAvatar:
                         lighting: str = None):
         """Customize avatar appearance"""
         try:
+            changes = {}
             if eye_color and eye_color in self.avatar_customization["eye_colors"]:
-                self.current_state.eye_color = self.avatar_customization["eye_colors"][eye_color]
+                changes["eye_color"] = self.avatar_customization["eye_colors"][eye_color]
             
             if hair_style and hair_style in self.avatar_customization["hair_styles"]:
-                self.current_state.hair_style = hair_style
+                changes["hair_style"] = hair_style
             
             if clothing and clothing in self.avatar_customization["clothing"]:
-                self.current_state.clothing = clothing
+                changes["clothing"] = clothing
             
             if background and background in self.avatar_customization["backgrounds"]:
-                self.current_state.background = background
+                changes["background"] = background
             
             if lighting and lighting in self.avatar_customization["lighting"]:
-                self.current_state.lighting = lighting
+                changes["lighting"] = lighting
+            
+            if changes:
+                self._publish_state(**changes)
             
             print(f"[Avatar] Customized appearance")
             
@@ -633,12 +666,13 @@ class MoodDrivenAvatar:
     
     def get_avatar_summary(self) -> Dict[str, Any]:
         """Get avatar system summary"""
+        state = self.get_avatar_state()
         return {
-            "current_expression": self.current_state.expression.value,
-            "current_gesture": self.current_state.gesture.value if self.current_state.gesture else None,
-            "emotional_intensity": self.current_state.emotional_intensity,
-            "animation_intensity": self.current_state.animation_intensity,
-            "is_animating": self.is_animating,
+            "current_expression": state["expression"],
+            "current_gesture": state["gesture"],
+            "emotional_intensity": state["emotional_intensity"],
+            "animation_intensity": state["animation_intensity"],
+            "is_animating": state["is_animating"],
             "queue_length": len(self.animation_queue),
             "available_expressions": [e.value for e in AvatarExpression],
             "available_gestures": [g.value for g in AvatarGesture],
@@ -1,10 +1,17 @@
 # emotional_tts.py
 # Advanced emotional TTS integration with Tacotron/FastPitch
 
+import asyncio
+import io
 import json
+import re
+import struct
 import time
 import threading
-from typing import Dict, List, Optional, Tuple
+import wave
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
@@ -13,6 +20,8 @@ import torch
 import torchaudio
 from pathlib import Path
 
+from .phrase_cache import PhraseAudioCache
+
 class EmotionType(Enum):
     LOVE = "love"
     PASSION = "passion"
@@ -25,6 +34,18 @@ class EmotionType(Enum):
     SURPRISE = "surprise"
     NEUTRAL = "neutral"
 
+# Presence/whisper emotions (modules/presence) mapped onto synthesis emotions
+PRESENCE_EMOTIONS = {
+    "longing": EmotionType.LOVE,
+    "melancholy": EmotionType.SADNESS,
+    "peace": EmotionType.CALM,
+    "warmth": EmotionType.TENDERNESS,
+    "joy": EmotionType.EXCITEMENT,
+    "anticipation": EmotionType.EXCITEMENT,
+    "curiosity": EmotionType.SURPRISE,
+    "contentment": EmotionType.CALM,
+}
+
 class PersonaVoice(Enum):
     MIA = "mia"
     SOLENE = "solene"
@@ -48,18 +69,217 @@ class EmotionalTTSConfig:
     sample_rate: int = 22050
     hop_length: int = 256
     win_length: int = 1024
+    # Disk tier of the phrase cache; None keeps cached phrases in memory only
+    phrase_cache_dir: Optional[str] = "cache/phrase_audio/emotional_tts"
+
+# Sentence ends, then phrase breaks for sentences that are still too long
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?\u2026])\s+')
+_PHRASE_BREAK = re.compile(r'(?<=[,;:\u2014])\s+')
+
+
+def split_into_chunks(text: str, max_chars: int = 120) -> List[str]:
+    """Split text into sentence chunks, breaking long sentences at phrase boundaries"""
+    chunks = []
+    for sentence in _SENTENCE_BREAK.split(text.strip()):
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            chunks.append(sentence)
+            continue
+        current = ""
+        for phrase in _PHRASE_BREAK.split(sentence):
+            if current and len(current) + 1 + len(phrase) > max_chars:
+                chunks.append(current)
+                current = phrase
+            else:
+                current = f"{current} {phrase}" if current else phrase
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+def wav_header(sample_rate: int, data_size: int = 0xFFFFFFFF - 36) -> bytes:
+    """16-bit mono WAV header; the default size marks a stream of unknown length"""
+    return (b"RIFF" + struct.pack("<I", min(data_size + 36, 0xFFFFFFFF)) + b"WAVE"
+            + b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16)
+            + b"data" + struct.pack("<I", data_size))
+
+
+class LookaheadNormalizer:
+    """
+    Peak normalizer with bounded look-ahead
+
+    Samples are released in blocks once ``lookahead`` further samples are
+    buffered, scaled by the peak over the block plus its look-ahead (and a
+    slowly decaying memory of earlier peaks, so the gain does not pump between
+    blocks). Latency is bounded by block + lookahead samples instead of the
+    whole utterance.
+    """
+
+    def __init__(self, block: int = 4096, lookahead: int = 2048, decay: float = 0.9):
+        self.block = block
+        self.lookahead = lookahead
+        self.decay = decay
+        self._buffer = np.zeros(block + lookahead, dtype=np.float32)
+        self._scratch = np.empty(block + lookahead, dtype=np.float32)
+        self._filled = 0
+        self._peak = 0.0
+
+    def push(self, audio: np.ndarray) -> Iterator[np.ndarray]:
+        """Buffer samples and yield every block whose look-ahead is now known"""
+        offset = 0
+        while offset < len(audio):
+            take = min(len(audio) - offset, len(self._buffer) - self._filled)
+            self._buffer[self._filled:self._filled + take] = audio[offset:offset + take]
+            self._filled += take
+            offset += take
+            if self._filled == len(self._buffer):
+                yield self._release(self.block)
+
+    def flush(self) -> Iterator[np.ndarray]:
+        """Release whatever is still buffered"""
+        if self._filled:
+            yield self._release(self._filled)
+
+    def _release(self, count: int) -> np.ndarray:
+        window = self._scratch[:self._filled]
+        np.abs(self._buffer[:self._filled], out=window)
+        self._peak = max(float(window.max()), self._peak * self.decay)
+        out = self._buffer[:count] * (1.0 / self._peak if self._peak > 0 else 1.0)
+        remaining = self._filled - count
+        self._buffer[:remaining] = self._buffer[count:self._filled]
+        self._filled = remaining
+        return out
+
+
+class ModelWarmPool:
+    """
+    Loads models on demand in a background thread and keeps them in an LRU
+
+    ``request(key)`` returns a readiness future; concurrent requests for the
+    same key share one load, and listeners added with ``add_ready_listener``
+    are called with the key on the loader thread after each load. Loaded entries are evicted least recently used
+    first when the pool exceeds ``max_entries`` or ``memory_budget_mb`` (each
+    loaded model reports its size under a ``size_mb`` key).
+    """
+
+    def __init__(self, loader: Callable[[Hashable], Dict[str, Any]], max_entries: int = 4,
+                 memory_budget_mb: Optional[float] = None):
+        self.loader = loader
+        self.max_entries = max_entries
+        self.memory_budget_mb = memory_budget_mb
+        self._entries: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._loading: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-model-loader")
+        self.load_times: Dict[str, float] = {}
+        self.evictions = 0
+        self._ready_listeners: List[Callable[[Hashable], None]] = []
+
+    def request(self, key: Hashable) -> Future:
+        """Future resolving to the loaded model, starting a background load if needed"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                future = Future()
+                future.set_result(self._entries[key])
+                return future
+            future = self._loading.get(key)
+            if future is None:
+                future = self._executor.submit(self._load, key)
+                self._loading[key] = future
+            return future
+
+    def get_if_ready(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """The loaded model, or None (after kicking off a background load)"""
+        with self._lock:
+            model = self._entries.get(key)
+            if model is not None:
+                self._entries.move_to_end(key)
+                return model
+        self.request(key)
+        return None
+
+    def is_ready(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def add_ready_listener(self, listener: Callable[[Hashable], None]):
+        self._ready_listeners.append(listener)
+
+    def _load(self, key: Hashable) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            model = self.loader(key)
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self.load_times[str(key)] = round(elapsed, 3)
+            self._entries[key] = model
+            self._entries.move_to_end(key)
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries
+                or (self.memory_budget_mb is not None and self.memory_mb() > self.memory_budget_mb)
+            ):
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        for listener in self._ready_listeners:
+            try:
+                listener(key)
+            except Exception as e:
+                print(f"[EmotionalTTS] Ready listener failed for {key}: {e}")
+        return model
+
+    def memory_mb(self) -> float:
+        return sum(float(model.get("size_mb", 0.0)) for model in self._entries.values())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "loaded": [str(key) for key in self._entries],
+                "loading": [str(key) for key in self._loading],
+                "memory_mb": self.memory_mb(),
+                "evictions": self.evictions,
+                "load_times_s": dict(self.load_times),
+            }
+
+    def submit(self, func: Callable, *args) -> Future:
+        """Run work on the loader thread, after any loads already queued"""
+        return self._executor.submit(func, *args)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
 
 class EmotionalTTS:
-    def __init__(self):
+    def __init__(self, max_loaded_personas: int = 2, memory_budget_mb: Optional[float] = None,
+                 phrase_cache: Optional[PhraseAudioCache] = None, max_cached_phrase_chars: int = 160,
+                 prewarm_whispers: bool = True):
         self.config = self._load_config()
-        self.models = {}
         self.vocoders = {}
         self.persona_voices = self._load_persona_voices()
         self.emotion_mappings = self._load_emotion_mappings()
-        self.is_initialized = False
+        self._rng = np.random.default_rng()
+        
+        # Models load lazily per (persona, device) on first use; until they are
+        # ready requests are served by the fallback path, so construction is cheap
+        self.model_pool = ModelWarmPool(self._load_persona_models, max_entries=max_loaded_personas,
+                                        memory_budget_mb=memory_budget_mb)
+        self.fallback_requests = 0
+        self.is_initialized = True
         
-        # Initialize models in background
-        threading.Thread(target=self._initialize_models, daemon=True).start()
+        # Repeated short phrases (whispers, rituals, greetings) are served from cache
+        self.phrase_cache = phrase_cache or PhraseAudioCache(directory=self.config.phrase_cache_dir)
+        self.max_cached_phrase_chars = max_cached_phrase_chars
+        
+        # Whisper phrases are rendered as soon as a persona's models are warm
+        self.prewarm_whispers = prewarm_whispers
+        self._whisper_phrases: Optional[List[Tuple[str, str]]] = None
+        self.model_pool.add_ready_listener(self._on_models_ready)
     
     def _load_config(self) -> EmotionalTTSConfig:
         """Load TTS configuration"""
@@ -194,26 +414,53 @@ class EmotionalTTS:
             )
         }
     
-    def _initialize_models(self):
-        """Initialize Tacotron2 and vocoder models"""
-        try:
-            print("[EmotionalTTS] Initializing models...")
-            
-            # Load Tacotron2 model
-            self.models["tacotron2"] = self._load_tacotron2()
-            
-            # Load WaveGlow vocoder
-            self.models["vocoder"] = self._load_vocoder()
-            
-            self.is_initialized = True
-            print("[EmotionalTTS] Models initialized successfully")
-            
-        except Exception as e:
-            print(f"[EmotionalTTS] Error initializing models: {e}")
-            # Fallback to simpler TTS
-            self._initialize_fallback_tts()
+    def ensure_models_loaded(self, persona: PersonaVoice = PersonaVoice.MIA) -> Future:
+        """Readiness future for a persona's models, starting the load in the background"""
+        return self.model_pool.request((persona.value, self.config.device))
+    
+    def models_ready(self, persona: PersonaVoice) -> bool:
+        return self.model_pool.is_ready((persona.value, self.config.device))
     
-    def _load_tacotron2(self):
+    def _on_models_ready(self, key: Tuple[str, str]):
+        """Queue the whisper phrases for a persona whose models just loaded"""
+        persona, device = key
+        if not self.prewarm_whispers or device != self.config.device:
+            return
+        phrases = self._load_whisper_phrases()
+        if phrases:
+            self.prewarm_phrases(phrases, PersonaVoice(persona))
+    
+    def _load_whisper_phrases(self) -> List[Tuple[str, str]]:
+        """(emotion, phrase) pairs from the presence whisper tables, read once"""
+        if self._whisper_phrases is None:
+            try:
+                from ..presence.voice_integration import EmotionalVoiceEngine, WhisperManager
+                self._whisper_phrases = list(WhisperManager(EmotionalVoiceEngine()).iter_whisper_phrases())
+            except Exception as e:
+                print(f"[EmotionalTTS] Whisper phrases unavailable for prewarming: {e}")
+                self._whisper_phrases = []
+        return self._whisper_phrases
+    
+    def _load_persona_models(self, key: Tuple[str, str]) -> Dict[str, Any]:
+        """Load the Tacotron2 model for a persona and the (shared) vocoder for the device"""
+        persona, device = key
+        print(f"[EmotionalTTS] Loading models for {persona} on {device}...")
+        
+        tacotron2 = self._load_tacotron2(persona)
+        if device not in self.vocoders:
+            self.vocoders[device] = self._load_vocoder()
+        vocoder = self.vocoders[device]
+        if tacotron2 is None or vocoder is None:
+            raise RuntimeError(f"model load failed for {persona}")
+        
+        print(f"[EmotionalTTS] Models for {persona} ready")
+        return {
+            "tacotron2": tacotron2,
+            "vocoder": vocoder,
+            "size_mb": tacotron2.get("size_mb", 0.0)
+        }
+    
+    def _load_tacotron2(self, persona: Optional[str] = None):
         """Load Tacotron2 model for text-to-mel-spectrogram"""
         try:
             # In a real implementation, this would load the actual Tacotron2 model
@@ -225,8 +472,10 @@ class EmotionalTTS:
             
             return {
                 "model": "tacotron2_emotional",
+                "persona": persona,
                 "status": "loaded",
-                "device": self.config.device
+                "device": self.config.device,
+                "size_mb": 110.0
             }
             
         except Exception as e:
@@ -251,48 +500,133 @@ class EmotionalTTS:
             print(f"[EmotionalTTS] Error loading vocoder: {e}")
             return None
     
-    def _initialize_fallback_tts(self):
-        """Initialize fallback TTS system"""
-        print("[EmotionalTTS] Using fallback TTS system")
-        self.is_initialized = True
+    def _synthesize_mel(self, text: str, persona: PersonaVoice, emotion: EmotionType,
+                        params: VoiceParameters,
+                        scratch: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+        """Mel-spectrogram for one chunk, via the persona's models or the fallback path"""
+        models = self.model_pool.get_if_ready((persona.value, self.config.device))
+        mel = self._generate_mel_spectrogram(self._preprocess_text(text, emotion), params, scratch)
+        if models is None:
+            # Fallback voice: no emotional conditioning until the models are warm
+            self.fallback_requests += 1
+            return mel
+        return self._apply_emotional_modifications(mel, params)
     
     def synthesize_speech(self, text: str, persona: PersonaVoice, emotion: EmotionType, 
                          intensity: float = 0.5) -> Optional[bytes]:
-        """Synthesize emotional speech"""
+        """Synthesize emotional speech as a complete 16-bit mono WAV file"""
         if not self.is_initialized:
             print("[EmotionalTTS] Models not yet initialized")
             return None
         
+        # Only cache renderings from warm models; fallback audio would pin the lower-quality voice
+        if len(text) <= self.max_cached_phrase_chars and self.models_ready(persona):
+            return self.phrase_cache.get_or_synthesize(
+                text, persona.value, emotion.value, intensity,
+                lambda: self._synthesize_uncached(text, persona, emotion, intensity)
+            )
+        return self._synthesize_uncached(text, persona, emotion, intensity)
+    
+    def _synthesize_uncached(self, text: str, persona: PersonaVoice, emotion: EmotionType,
+                             intensity: float) -> Optional[bytes]:
         try:
-            # Get persona voice characteristics
-            persona_config = self.persona_voices[persona]
+            final_params = self._combine_parameters(self.persona_voices[persona],
+                                                    self.emotion_mappings[emotion], intensity)
+            mel_spectrogram = self._synthesize_mel(text, persona, emotion, final_params)
+            audio = self._generate_audio(mel_spectrogram, final_params)
+            return self._post_process_audio(audio, final_params)
             
-            # Get emotion voice parameters
-            emotion_params = self.emotion_mappings[emotion]
-            
-            # Combine persona and emotion parameters
-            final_params = self._combine_parameters(persona_config, emotion_params, intensity)
-            
-            # Preprocess text
-            processed_text = self._preprocess_text(text, emotion)
-            
-            # Generate mel-spectrogram
-            mel_spectrogram = self._generate_mel_spectrogram(processed_text, final_params)
-            
-            # Apply emotional modifications
-            modified_mel = self._apply_emotional_modifications(mel_spectrogram, final_params)
-            
-            # Generate audio
-            audio = self._generate_audio(modified_mel, final_params)
+        except Exception as e:
+            print(f"[EmotionalTTS] Error synthesizing speech: {e}")
+            return None
+    
+    def prewarm_phrases(self, phrases: Iterable[Tuple[str, str]],
+                        persona: PersonaVoice = PersonaVoice.MIA, intensity: float = 0.4) -> Future:
+        """
+        Fill the phrase cache with (emotion, text) pairs in the background
+        
+        Emotions may be synthesis emotions or presence emotions such as the
+        whisper tables in modules/presence/voice_integration.py. The work is
+        queued behind the persona's model load so it renders with warm models.
+        
+        Returns:
+            Future: Resolves to the number of phrases newly synthesized
+        """
+        self.ensure_models_loaded(persona)
+        items = []
+        for emotion, text in phrases:
+            emotion_type = PRESENCE_EMOTIONS.get(emotion)
+            if emotion_type is None:
+                try:
+                    emotion_type = EmotionType(emotion)
+                except ValueError:
+                    continue
+            items.append((text, persona.value, emotion_type.value, intensity))
+        
+        def synthesize(text: str, persona_value: str, emotion_value: str, level: float) -> Optional[bytes]:
+            if not self.models_ready(persona):
+                return None
+            return self._synthesize_uncached(text, PersonaVoice(persona_value), EmotionType(emotion_value), level)
+        
+        return self.model_pool.submit(self.phrase_cache.prewarm, items, synthesize)
+    
+    def synthesize_speech_stream(self, text: str, persona: PersonaVoice, emotion: EmotionType,
+                                 intensity: float = 0.5, audio_format: str = "pcm",
+                                 max_chunk_chars: int = 120) -> Iterator[bytes]:
+        """
+        Synthesize emotional speech chunk by chunk
+        
+        Text is split at sentence (then phrase) boundaries and each chunk is
+        synthesized and emitted as soon as it is ready, so playback can start
+        after the first chunk instead of after the whole utterance.
+        
+        Args:
+            audio_format: "pcm" yields raw 16-bit mono frames; "wav" yields a
+                streaming WAV header first, then the same frames
+        
+        Yields:
+            bytes: Audio frames
+        """
+        if not self.is_initialized:
+            print("[EmotionalTTS] Models not yet initialized")
+            return
+        
+        try:
+            final_params = self._combine_parameters(self.persona_voices[persona],
+                                                    self.emotion_mappings[emotion], intensity)
+            normalizer = LookaheadNormalizer(
+                block=self.config.sample_rate // 4,
+                lookahead=self.config.sample_rate // 8
+            )
+            scratch: Dict[str, np.ndarray] = {}
             
-            # Apply post-processing
-            final_audio = self._post_process_audio(audio, final_params)
+            if audio_format == "wav":
+                yield wav_header(self.config.sample_rate)
             
-            return final_audio
+            for chunk in split_into_chunks(text, max_chunk_chars):
+                mel = self._synthesize_mel(chunk, persona, emotion, final_params, scratch)
+                audio = self._generate_audio(mel, final_params, scratch)
+                for block in normalizer.push(audio):
+                    yield self._to_pcm16(block, final_params)
             
+            for block in normalizer.flush():
+                yield self._to_pcm16(block, final_params)
+        
         except Exception as e:
-            print(f"[EmotionalTTS] Error synthesizing speech: {e}")
-            return None
+            print(f"[EmotionalTTS] Error streaming speech: {e}")
+    
+    async def synthesize_speech_async_stream(self, text: str, persona: PersonaVoice,
+                                             emotion: EmotionType, intensity: float = 0.5,
+                                             audio_format: str = "pcm") -> AsyncIterator[bytes]:
+        """Async variant of synthesize_speech_stream; synthesis runs in the default executor"""
+        loop = asyncio.get_running_loop()
+        frames = self.synthesize_speech_stream(text, persona, emotion, intensity, audio_format)
+        done = object()
+        while True:
+            frame = await loop.run_in_executor(None, next, frames, done)
+            if frame is done:
+                return
+            yield frame
     
     def _combine_parameters(self, persona_config: Dict, emotion_params: VoiceParameters, 
                            intensity: float) -> VoiceParameters:
@@ -346,7 +680,8 @@ class EmotionalTTS:
         marker = emotion_markers.get(emotion, "<neutral>")
         return f"{marker} {text} {marker}"
     
-    def _generate_mel_spectrogram(self, text: str, params: VoiceParameters) -> np.ndarray:
+    def _generate_mel_spectrogram(self, text: str, params: VoiceParameters,
+                                  scratch: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
         """Generate mel-spectrogram from text"""
         # In a real implementation, this would use Tacotron2
         # For now, we'll simulate the process
@@ -355,8 +690,10 @@ class EmotionalTTS:
         mel_length = int(len(text) * 50 * params.speaking_rate)  # Approximate length
         mel_channels = 80  # Standard mel channels
         
-        # Create simulated mel-spectrogram
-        mel_spectrogram = np.random.rand(mel_channels, mel_length) * 0.1
+        # Create simulated mel-spectrogram in a float32 buffer reused across chunks
+        mel_spectrogram = self._scratch_buffer(scratch, "mel", (mel_channels, mel_length))
+        self._rng.random(dtype=np.float32, out=mel_spectrogram)
+        mel_spectrogram *= 0.1
         
         # Apply basic pitch and energy modifications
         if params.pitch_shift != 0:
@@ -369,6 +706,18 @@ class EmotionalTTS:
         
         return mel_spectrogram
     
+    @staticmethod
+    def _scratch_buffer(scratch: Optional[Dict[str, np.ndarray]], name: str,
+                        shape: Tuple[int, ...]) -> np.ndarray:
+        """A float32 array of the given shape, carved out of a reusable buffer when one is supplied"""
+        size = int(np.prod(shape))
+        if scratch is None:
+            return np.empty(shape, dtype=np.float32)
+        buffer = scratch.get(name)
+        if buffer is None or buffer.size < size:
+            buffer = scratch[name] = np.empty(max(size, 1), dtype=np.float32)
+        return buffer[:size].reshape(shape)
+    
     def _simulate_pitch_shift(self, mel_spectrogram: np.ndarray, pitch_shift: float) -> np.ndarray:
         """Simulate pitch shifting in mel-spectrogram"""
         # Simple simulation of pitch shifting
@@ -385,61 +734,69 @@ class EmotionalTTS:
     
     def _apply_emotional_modifications(self, mel_spectrogram: np.ndarray, 
                                      params: VoiceParameters) -> np.ndarray:
-        """Apply emotional modifications to mel-spectrogram"""
-        modified_mel = mel_spectrogram.copy()
+        """Apply emotional modifications to mel-spectrogram (in place, float32)"""
+        modified_mel = mel_spectrogram
+        if modified_mel.dtype != np.float32:
+            modified_mel = modified_mel.astype(np.float32)
         
         # Apply warmth (affects lower frequencies)
         if params.warmth != 0.5:
             warmth_factor = (params.warmth - 0.5) * 2  # -1 to 1
             # Enhance lower frequencies for warmth
-            lower_freqs = modified_mel[:20, :]
-            modified_mel[:20, :] = lower_freqs * (1 + warmth_factor * 0.3)
+            modified_mel[:20, :] *= np.float32(1 + warmth_factor * 0.3)
         
         # Apply breathiness (adds noise to higher frequencies)
         if params.breathiness > 0:
-            noise_level = params.breathiness * 0.1
-            noise = np.random.rand(*modified_mel.shape) * noise_level
+            noise = self._rng.random(modified_mel.shape, dtype=np.float32)
+            noise *= np.float32(params.breathiness * 0.1)
             modified_mel += noise
         
         return modified_mel
     
-    def _generate_audio(self, mel_spectrogram: np.ndarray, params: VoiceParameters) -> np.ndarray:
+    def _generate_audio(self, mel_spectrogram: np.ndarray, params: VoiceParameters,
+                        scratch: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
         """Generate audio from mel-spectrogram"""
         # In a real implementation, this would use WaveGlow vocoder
         # For now, we'll simulate audio generation
         
         # Simulate audio generation
         audio_length = mel_spectrogram.shape[1] * self.config.hop_length
-        audio = np.random.rand(audio_length) * 0.1
-        
-        # Apply basic audio modifications
-        if params.energy != 1.0:
-            audio *= params.energy
+        audio = self._scratch_buffer(scratch, "audio", (audio_length,))
+        self._rng.random(dtype=np.float32, out=audio)
+        audio *= np.float32(0.1 * params.energy)
         
         return audio
     
+    def _to_pcm16(self, audio: np.ndarray, params: VoiceParameters) -> bytes:
+        """Scale normalized float audio by the final energy and encode as 16-bit PCM"""
+        scaled = audio * np.float32(params.energy * 32767)
+        np.clip(scaled, -32768, 32767, out=scaled)
+        return scaled.astype("<i2").tobytes()
+    
     def _post_process_audio(self, audio: np.ndarray, params: VoiceParameters) -> bytes:
-        """Apply post-processing to audio"""
-        # Normalize audio
-        audio = audio / np.max(np.abs(audio)) if np.max(np.abs(audio)) > 0 else audio
-        
-        # Apply final energy adjustment
-        audio *= params.energy
-        
-        # Convert to bytes (simulate WAV format)
-        # In real implementation, this would use proper audio encoding
-        audio_bytes = audio.tobytes()
+        """Normalize, apply the final energy adjustment and encode as a WAV file"""
+        peak = float(np.abs(audio).max()) if audio.size else 0.0
+        if peak > 0:
+            audio = audio * np.float32(1.0 / peak)
         
-        return audio_bytes
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(self.config.sample_rate)
+            wav_file.writeframes(self._to_pcm16(audio, params))
+        return buffer.getvalue()
     
     def get_voice_status(self) -> Dict:
         """Get TTS system status"""
         return {
             "initialized": self.is_initialized,
             "models_loaded": {
-                "tacotron2": self.models.get("tacotron2") is not None,
-                "vocoder": self.models.get("vocoder") is not None
+                persona.value: self.models_ready(persona) for persona in self.persona_voices
             },
+            "model_pool": self.model_pool.stats(),
+            "fallback_requests": self.fallback_requests,
+            "phrase_cache": self.phrase_cache.get_stats(),
             "device": self.config.device,
             "persona_voices": list(self.persona_voices.keys()),
             "emotions": list(self.emotion_mappings.keys()),
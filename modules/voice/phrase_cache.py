@@ -0,0 +1,280 @@
+"""
+Phrase-Level Synthesized Audio Cache
+
+Short phrases the companion repeats (whispers, ritual lines, greetings) are
+cached by content address: a hash of the normalized text, persona, emotion
+and a quantized intensity bucket. Hot entries live in an in-memory LRU with a
+byte budget; everything is also appended to on-disk segment files that are
+read back through ``mmap``, so a restarted process keeps its warm phrases
+without re-synthesizing them.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.jsonl"
+
+
+def intensity_bucket(intensity: float, buckets: int = 8) -> int:
+    """Quantize an intensity in [0, 1] to one of ``buckets`` levels"""
+    clamped = min(max(float(intensity), 0.0), 1.0)
+    return min(int(clamped * buckets), buckets - 1)
+
+
+def phrase_key(text: str, persona: str, emotion: str, intensity: float, buckets: int = 8) -> str:
+    """Content address for a phrase rendering"""
+    normalized = " ".join(text.split()).lower()
+    material = f"{normalized}\x1f{persona}\x1f{emotion}\x1f{intensity_bucket(intensity, buckets)}"
+    return hashlib.blake2b(material.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class PhraseAudioCache:
+    """
+    Two-tier (memory LRU + memory-mapped segment files) cache of synthesized phrases
+
+    Args:
+        max_memory_bytes: Byte budget for the in-memory tier
+        directory: Where segment files live (created on the first write); None keeps the cache memory-only
+        segment_bytes: Size at which a new segment file is started
+        max_disk_bytes: Oldest segments are dropped once the disk tier exceeds this
+        intensity_buckets: Number of intensity levels that share a cache entry
+    """
+
+    def __init__(self, max_memory_bytes: int = 32 * 1024 * 1024, directory: Optional[str] = None,
+                 segment_bytes: int = 64 * 1024 * 1024, max_disk_bytes: int = 512 * 1024 * 1024,
+                 intensity_buckets: int = 8):
+        self.max_memory_bytes = max_memory_bytes
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.intensity_buckets = intensity_buckets
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.RLock()
+
+        # key -> (segment, offset, length)
+        self._disk_index: Dict[str, Tuple[int, int, int]] = {}
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._segment = 0
+        self._writer = None
+        self._index_writer = None
+
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+
+        if directory and os.path.isdir(directory):
+            self._load_disk_index()
+
+    def key(self, text: str, persona: str, emotion: str, intensity: float) -> str:
+        return phrase_key(text, persona, emotion, intensity, self.intensity_buckets)
+
+    # Lookups
+
+    def get(self, text: str, persona: str, emotion: str, intensity: float) -> Optional[bytes]:
+        return self.get_by_key(self.key(text, persona, emotion, intensity))
+
+    def get_by_key(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return audio
+
+            audio = self._read_disk(key)
+            if audio is not None:
+                self.stats["disk_hits"] += 1
+                self._remember(key, audio)
+                return audio
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, text: str, persona: str, emotion: str, intensity: float, audio: bytes) -> str:
+        key = self.key(text, persona, emotion, intensity)
+        with self._lock:
+            self._remember(key, audio)
+            if self.directory and key not in self._disk_index:
+                self._write_disk(key, audio)
+            self.stats["stores"] += 1
+        return key
+
+    def get_or_synthesize(self, text: str, persona: str, emotion: str, intensity: float,
+                          synthesize: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+        """Cached audio for the phrase, synthesizing (and caching) it on a miss"""
+        audio = self.get(text, persona, emotion, intensity)
+        if audio is None:
+            audio = synthesize()
+            if audio:
+                self.put(text, persona, emotion, intensity, audio)
+        return audio
+
+    def prewarm(self, phrases: Iterable[Tuple[str, str, str, float]],
+                synthesize: Callable[[str, str, str, float], Optional[bytes]]) -> int:
+        """
+        Synthesize and cache every (text, persona, emotion, intensity) not already cached
+
+        Returns:
+            int: Number of phrases newly synthesized
+        """
+        added = 0
+        for text, persona, emotion, intensity in phrases:
+            key = self.key(text, persona, emotion, intensity)
+            with self._lock:
+                cached = key in self._memory or key in self._disk_index
+            if cached:
+                continue
+            audio = synthesize(text, persona, emotion, intensity)
+            if audio:
+                self.put(text, persona, emotion, intensity, audio)
+                added += 1
+        return added
+
+    def get_stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            return {
+                **self.stats,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk_index),
+            }
+
+    def close(self):
+        with self._lock:
+            for mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+            for handle in (self._writer, self._index_writer):
+                if handle is not None:
+                    handle.close()
+            self._writer = self._index_writer = None
+
+    # Memory tier
+
+    def _remember(self, key: str, audio: bytes):
+        if len(audio) > self.max_memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    # Disk tier
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"segment_{segment:05d}.bin")
+
+    def _load_disk_index(self):
+        segments = sorted(
+            int(name[len("segment_"):-len(".bin")])
+            for name in os.listdir(self.directory)
+            if name.startswith("segment_") and name.endswith(".bin")
+        )
+        sizes = {segment: os.path.getsize(self._segment_path(segment)) for segment in segments}
+        self._segment = segments[-1] if segments else 0
+
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        if not os.path.exists(index_path):
+            return
+        with open(index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    key, segment, offset, length = entry["k"], entry["s"], entry["o"], entry["n"]
+                except (ValueError, KeyError):
+                    continue  # torn tail from an interrupted write
+                # Entries whose bytes never reached the segment (or whose segment was dropped) are skipped
+                if offset + length <= sizes.get(segment, -1):
+                    self._disk_index[key] = (segment, offset, length)
+
+    def _write_disk(self, key: str, audio: bytes):
+        try:
+            if self._writer is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._writer = open(self._segment_path(self._segment), "ab")
+            if self._writer.tell() and self._writer.tell() + len(audio) > self.segment_bytes:
+                self._writer.close()
+                self._segment += 1
+                self._drop_old_segments()
+                self._writer = open(self._segment_path(self._segment), "ab")
+            if self._index_writer is None:
+                self._index_writer = open(os.path.join(self.directory, INDEX_FILE), "a", encoding="utf-8")
+
+            offset = self._writer.tell()
+            self._writer.write(audio)
+            self._writer.flush()
+            self._index_writer.write(json.dumps({"k": key, "s": self._segment, "o": offset, "n": len(audio)}) + "\n")
+            self._index_writer.flush()
+            self._disk_index[key] = (self._segment, offset, len(audio))
+        except OSError as e:
+            logger.warning(f"Phrase cache disk write failed: {e}")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        location = self._disk_index.get(key)
+        if location is None:
+            return None
+        segment, offset, length = location
+        try:
+            mapped = self._maps.get(segment)
+            if mapped is None or len(mapped) < offset + length:
+                # Segments grow while they are being written; remap to see new entries
+                if mapped is not None:
+                    mapped.close()
+                with open(self._segment_path(segment), "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[segment] = mapped
+            return mapped[offset:offset + length]
+        except (OSError, ValueError) as e:
+            logger.warning(f"Phrase cache disk read failed: {e}")
+            self._disk_index.pop(key, None)
+            return None
+
+    def _drop_old_segments(self):
+        segments = sorted({segment for segment, _, _ in self._disk_index.values()})
+        total = sum(os.path.getsize(self._segment_path(s)) for s in segments if os.path.exists(self._segment_path(s)))
+        dropped = False
+        while segments and total > self.max_disk_bytes:
+            oldest = segments.pop(0)
+            path = self._segment_path(oldest)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            mapped = self._maps.pop(oldest, None)
+            if mapped is not None:
+                mapped.close()
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            total -= size
+            for key in [k for k, (s, _, _) in self._disk_index.items() if s == oldest]:
+                del self._disk_index[key]
+            dropped = True
+
+        if dropped:
+            self._rewrite_index()
+
+    def _rewrite_index(self):
+        """Rewrite the index without entries for dropped segments"""
+        if self._index_writer is not None:
+            self._index_writer.close()
+            self._index_writer = None
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        temp_path = index_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for key, (segment, offset, length) in self._disk_index.items():
+                f.write(json.dumps({"k": key, "s": segment, "o": offset, "n": length}) + "\n")
+        os.replace(temp_path, index_path)
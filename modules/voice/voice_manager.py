@@ -1,10 +1,11 @@
 """Inflection-to-Voice bridge linking mood and scene intent to voice style."""
 
-from typing import Dict
+from typing import Dict, Optional
 
 from ...backend.modules.voice.voice_orchestrator import voice_orchestrator, VoiceEngine
 from ..emotion.emotion_state_manager import emotion_state_manager
 from ..sensory_preference import sensory_preferences
+from .phrase_cache import PhraseAudioCache
 
 
 STYLE_MAP: Dict[str, Dict[str, str]] = {
@@ -19,10 +20,17 @@ STYLE_MAP: Dict[str, Dict[str, str]] = {
     },
 }
 
+# Longer utterances are rarely repeated verbatim
+MAX_CACHED_PHRASE_CHARS = 160
+
+# Disk tier of the phrase cache; renderings survive restarts
+PHRASE_CACHE_DIR = "cache/phrase_audio/voice_manager"
+
 
 class VoiceManager:
-    def __init__(self):
+    def __init__(self, phrase_cache_dir: Optional[str] = PHRASE_CACHE_DIR):
         self.default_engine = VoiceEngine.PIPER_TTS
+        self.phrase_cache = PhraseAudioCache(directory=phrase_cache_dir)
 
     def mood_to_style(self, mood: str, intent: str) -> str:
         return STYLE_MAP.get(intent, {}).get(mood, "plain")
@@ -37,8 +45,16 @@ class VoiceManager:
             voice_orchestrator.update_voice_profile(
                 pitch=profile.get("pitch"), speed=profile.get("speed")
             )
+            # The rendered voice depends on engine and profile as well as style
+            voice = f"{self.default_engine.value}:{profile.get('pitch')}:{profile.get('speed')}"
+            cacheable = len(text) <= MAX_CACHED_PHRASE_CHARS
+            audio = self.phrase_cache.get(text, voice, style, 0.5) if cacheable else None
+            if audio:
+                return audio
             audio = await voice_orchestrator.tts_engines[self.default_engine].synthesize(text, style)
             if audio:
+                if cacheable:
+                    self.phrase_cache.put(text, voice, style, 0.5, audio)
                 return audio
         except Exception:
             pass
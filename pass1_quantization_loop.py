@@ -10,15 +10,32 @@ import time
 import logging
 import argparse
 import subprocess
+import sys
 import hashlib
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
+
+import numpy as np
 
 # Import our emotional evaluation components
 from emotional_dataset_builder import EmotionalDatasetBuilder
-from emotion_training_tracker import EmotionTrainingTracker, EmotionalMetrics, QuantLevel, PassType
+from emotion_training_tracker import (
+    EmotionTrainingTracker, EmotionalMetrics, QuantLevel, PassType, OVERALL_SCORE_WEIGHTS
+)
+
+# Single-pass emotional feature extraction shared with the Pass 1 tooling
+sys.path.append(str(Path(__file__).parent / "quant_pass1"))
+from emotion_features import METRIC_FIELDS, score_responses
+from level_search import (
+    DEFAULT_CONFIDENCE_Z, DEFAULT_STAGE_FRACTIONS, DEGRADED, FAILED, TOO_LARGE, UNCERTAIN,
+    DegradationEstimate, bisect_first_passing, estimate_degradation, stage_sizes, stratified_order
+)
+
+# Batched generation engine shared with Pass 2
+sys.path.append(str(Path(__file__).parent / "quant_pass2"))
+from generation_engine import GenerationEngine, TransformersBackend
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -37,10 +54,18 @@ class QuantizationConfig:
     evaluation_prompt_count: int = 25
     response_timeout: int = 30
     mock_mode: bool = False  # Enable mock quantization for testing
+    generation_batch_size: int = 4
+    generation_max_new_tokens: int = 200
+    evaluation_workers: int = 1  # Processes for feature extraction on large eval sets
+    search_strategy: str = "linear"  # "linear" walks every level, "bisect" runs the budgeted search
+    search_stage_fractions: List[float] = None  # Share of prompts scored per search stage
+    search_confidence_z: float = DEFAULT_CONFIDENCE_Z
     
     def __post_init__(self):
         if self.quant_levels is None:
             self.quant_levels = ["q8_0", "q6_K", "q5_K_M", "q4_K_M", "q3_K_L", "q2_K"]
+        if self.search_stage_fractions is None:
+            self.search_stage_fractions = list(DEFAULT_STAGE_FRACTIONS)
 
 @dataclass
 class QuantizationResult:
@@ -55,6 +80,20 @@ class QuantizationResult:
     success: bool
     error_message: str = ""
 
+@dataclass
+class LevelProbe:
+    """A quantized level and the responses scored on it so far during a search"""
+    quant_level: str
+    iteration: int
+    model_path: str
+    model_size_mb: float
+    quantization_time: float
+    responses: List[Dict] = field(default_factory=list)
+    scores: Optional[np.ndarray] = None  # (responses, metrics), in search order
+    evaluation_time: float = 0.0
+    outcome: str = ""
+    estimate: Optional[DegradationEstimate] = None
+
 class Pass1QuantizationLoop:
     """Main orchestrator for Pass 1 emotional quantization"""
     
@@ -75,6 +114,10 @@ class Pass1QuantizationLoop:
         self.iteration_count = 0
         self.baseline_metrics: Optional[EmotionalMetrics] = None
         self.best_result: Optional[QuantizationResult] = None
+        self._search_order: List[int] = []
+        
+        # Overall score weights in metric matrix column order
+        self.score_weights = np.array([OVERALL_SCORE_WEIGHTS[field] for field in METRIC_FIELDS])
         
         logger.info("🚀 Pass 1 Quantization Loop initialized")
         logger.info(f"   Base model: {self.config.base_model_path}")
@@ -215,6 +258,14 @@ class Pass1QuantizationLoop:
     
     def _generate_model_responses(self, model_path: str, prompts: List[Dict]) -> List[Dict]:
         """Generate responses from quantized model for evaluation"""
+        # Transformers checkpoints are evaluated for real; other formats fall back to mock responses
+        if not self.config.mock_mode and (Path(model_path) / "config.json").exists():
+            try:
+                return self._generate_batched_responses(model_path, prompts)
+            except Exception as e:
+                # A model that cannot be loaded or run must not stop the loop
+                logger.warning(f"⚠️ Could not generate from {Path(model_path).name} ({e}) - using mock responses")
+        
         responses = []
         
         logger.info(f"🤖 Generating responses from {Path(model_path).name}...")
@@ -243,12 +294,42 @@ class Pass1QuantizationLoop:
                     'prompt': prompt_data['prompt'],
                     'expected_emotion': prompt_data.get('expected_emotion', 'neutral'),
                     'response': f"[Error generating response: {e}]",
-                    'category': prompt_data.get('category', 'general')
+                    'category': prompt_data.get('category', 'general'),
+                    'failed': True
                 })
         
         logger.info(f"✅ Generated {len(responses)} responses")
         return responses
     
+    def _generate_batched_responses(self, model_path: str, prompts: List[Dict]) -> List[Dict]:
+        """Generate responses in length-bucketed batches, streaming them to disk as they finish"""
+        logger.info(f"🤖 Generating batched responses from {Path(model_path).name}...")
+        
+        engine = GenerationEngine(TransformersBackend(model_path=model_path),
+                                  batch_size=self.config.generation_batch_size)
+        params = {
+            'max_new_tokens': self.config.generation_max_new_tokens,
+            'do_sample': True,
+            'temperature': 0.7,
+            'top_p': 0.9
+        }
+        output_path = Path(self.config.output_dir) / f"{Path(model_path).name}_responses.jsonl"
+        texts = engine.generate([p['prompt'] for p in prompts], params, output_path=str(output_path))
+        
+        responses = []
+        for i, (prompt_data, text) in enumerate(zip(prompts, texts)):
+            responses.append({
+                'prompt_id': prompt_data.get('id', f'prompt_{i}'),
+                'prompt': prompt_data['prompt'],
+                'expected_emotion': prompt_data.get('expected_emotion', 'neutral'),
+                'response': text or "[Error generating response]",
+                'category': prompt_data.get('category', 'general'),
+                'failed': not text
+            })
+        
+        logger.info(f"✅ Generated {len(responses)} responses at {engine.stats.tokens_per_second:.1f} tokens/s")
+        return responses
+    
     def _mock_generate_response(self, model_path: str, prompt: str, expected_emotion: str) -> str:
         """Mock response generation (replace with actual model inference)"""
         
@@ -321,6 +402,22 @@ class Pass1QuantizationLoop:
         
         return response
     
+    def _score_responses(self, responses: List[Dict]) -> np.ndarray:
+        """(responses, metrics) score matrix from one feature pass over the eval set; NaN rows for failed prompts"""
+        return score_responses(
+            [None if response_data.get('failed') else response_data['response'] for response_data in responses],
+            [response_data['expected_emotion'] for response_data in responses],
+            workers=self.config.evaluation_workers
+        )
+    
+    @staticmethod
+    def _mean_metrics(scores: np.ndarray) -> EmotionalMetrics:
+        """Average each metric over the prompts with a usable response (rows without NaN)"""
+        usable = scores[~np.isnan(scores).any(axis=1)]
+        if not len(usable):
+            return EmotionalMetrics(0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+        return EmotionalMetrics(**dict(zip(METRIC_FIELDS, usable.mean(axis=0).tolist())))
+    
     def _evaluate_emotional_responses(self, responses: List[Dict]) -> EmotionalMetrics:
         """Evaluate emotional quality of model responses"""
         logger.info("📊 Evaluating emotional response quality...")
@@ -329,221 +426,28 @@ class Pass1QuantizationLoop:
         if total_responses == 0:
             return EmotionalMetrics(0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
         
-        fluency_scores = []
-        intensity_scores = []
-        match_scores = []
-        empathy_scores = []
-        metaphor_scores = []
-        sentiment_scores = []
-        
-        for response_data in responses:
-            response = response_data['response']
-            expected_emotion = response_data['expected_emotion']
-            
-            # Evaluate response fluency (based on length and structure)
-            fluency = self._evaluate_fluency(response)
-            fluency_scores.append(fluency)
-            
-            # Evaluate emotional intensity 
-            intensity = self._evaluate_emotional_intensity(response, expected_emotion)
-            intensity_scores.append(intensity)
-            
-            # Evaluate emotional match accuracy
-            match = self._evaluate_emotional_match(response, expected_emotion)
-            match_scores.append(match)
-            
-            # Evaluate empathy demonstration
-            empathy = self._evaluate_empathy(response)
-            empathy_scores.append(empathy)
-            
-            # Evaluate metaphor usage
-            metaphor = self._evaluate_metaphor_usage(response)
-            metaphor_scores.append(metaphor)
-            
-            # Evaluate sentiment accuracy
-            sentiment = self._evaluate_sentiment_accuracy(response, expected_emotion)
-            sentiment_scores.append(sentiment)
-        
-        # Calculate average scores
-        metrics = EmotionalMetrics(
-            response_fluency=sum(fluency_scores) / len(fluency_scores),
-            emotional_intensity=sum(intensity_scores) / len(intensity_scores),
-            emotional_match=sum(match_scores) / len(match_scores),
-            empathy_score=sum(empathy_scores) / len(empathy_scores),
-            metaphor_usage=sum(metaphor_scores) / len(metaphor_scores),
-            sentiment_accuracy=sum(sentiment_scores) / len(sentiment_scores)
-        )
+        # Average each metric over the responses that were generated
+        metrics = self._mean_metrics(self._score_responses(responses))
         
         logger.info(f"✅ Evaluation complete - Overall Score: {metrics.overall_score():.3f}")
         return metrics
     
-    def _evaluate_fluency(self, response: str) -> float:
-        """Evaluate response fluency and coherence"""
-        if not response or len(response.strip()) < 10:
-            return 0.1
-        
-        # Basic fluency indicators
-        sentence_count = len([s for s in response.split('.') if s.strip()])
-        word_count = len(response.split())
-        
-        # Penalize very short or very long responses
-        if word_count < 5:
-            return 0.3
-        elif word_count > 200:
-            return 0.7
-        
-        # Check for proper sentence structure
-        has_periods = '.' in response
-        has_capitals = any(c.isupper() for c in response)
-        
-        fluency_score = 0.6  # Base score
-        
-        if sentence_count > 1:
-            fluency_score += 0.1
-        if has_periods:
-            fluency_score += 0.1  
-        if has_capitals:
-            fluency_score += 0.1
-        if 20 <= word_count <= 100:  # Optimal length
-            fluency_score += 0.1
-        
-        return min(1.0, fluency_score)
-    
-    def _evaluate_emotional_intensity(self, response: str, expected_emotion: str) -> float:
-        """Evaluate emotional intensity of response"""
-        # Simple keyword-based emotional intensity detection
-        intensity_keywords = {
-            'grief': ['deeply', 'painful', 'overwhelming', 'heartbreaking', 'devastating'],
-            'joy': ['wonderful', 'amazing', 'fantastic', 'incredible', 'delightful'],
-            'fear': ['terrifying', 'scary', 'frightening', 'alarming', 'threatening'],
-            'anger': ['furious', 'outraged', 'infuriating', 'frustrating', 'unfair'],
-            'love': ['beautiful', 'precious', 'profound', 'tender', 'meaningful']
-        }
-        
-        emotion_words = intensity_keywords.get(expected_emotion, [])
-        response_lower = response.lower()
-        
-        # Count emotional intensity indicators
-        intensity_matches = sum(1 for word in emotion_words if word in response_lower)
-        
-        # Base intensity score
-        base_score = 0.5
-        
-        # Add score for emotional words
-        intensity_score = base_score + (intensity_matches * 0.1)
-        
-        # Check for emotional punctuation
-        if '!' in response:
-            intensity_score += 0.1
-        
-        return min(1.0, intensity_score)
-    
-    def _evaluate_emotional_match(self, response: str, expected_emotion: str) -> float:
-        """Evaluate how well response matches expected emotion"""
-        # Emotional indicator words for each emotion
-        emotion_indicators = {
-            'grief': ['loss', 'sad', 'pain', 'miss', 'mourn', 'difficult', 'hard'],
-            'joy': ['happy', 'celebrate', 'wonderful', 'excited', 'glad', 'pleased'],
-            'fear': ['afraid', 'scared', 'worry', 'concern', 'danger', 'safe', 'protect'],
-            'anger': ['upset', 'angry', 'frustrated', 'unfair', 'wrong', 'annoyed'],
-            'love': ['love', 'care', 'tender', 'precious', 'beautiful', 'special']
-        }
-        
-        expected_indicators = emotion_indicators.get(expected_emotion, [])
-        response_lower = response.lower()
-        
-        # Count matches
-        matches = sum(1 for word in expected_indicators if word in response_lower)
-        
-        # Calculate match score
-        if len(expected_indicators) == 0:
-            return 0.7  # Default for unknown emotions
-        
-        match_ratio = matches / len(expected_indicators)
-        return min(1.0, 0.4 + (match_ratio * 0.6))  # Scale to 0.4-1.0 range
-    
-    def _evaluate_empathy(self, response: str) -> float:
-        """Evaluate empathy demonstration in response"""
-        empathy_indicators = [
-            'understand', 'feel', 'imagine', 'support', 'here for you',
-            'validates', 'normal', 'natural', 'makes sense', 'completely'
-        ]
-        
-        response_lower = response.lower()
-        empathy_count = sum(1 for indicator in empathy_indicators if indicator in response_lower)
-        
-        # Base empathy score
-        empathy_score = 0.5 + (empathy_count * 0.1)
-        
-        # Bonus for perspective-taking language
-        if any(phrase in response_lower for phrase in ['you must', 'you might', 'you could']):
-            empathy_score += 0.1
-        
-        return min(1.0, empathy_score)
-    
-    def _evaluate_metaphor_usage(self, response: str) -> float:
-        """Evaluate appropriate metaphor usage"""
-        metaphor_indicators = [
-            'like', 'as if', 'reminds', 'mirror', 'bridge', 'journey',
-            'path', 'light', 'shadow', 'ocean', 'mountain', 'garden'
-        ]
-        
-        response_lower = response.lower()
-        metaphor_count = sum(1 for indicator in metaphor_indicators if indicator in response_lower)
-        
-        # Moderate metaphor usage is ideal (not too little, not too much)
-        if metaphor_count == 0:
-            return 0.6  # Acceptable but could be enhanced
-        elif metaphor_count <= 2:
-            return 0.8  # Good usage
-        else:
-            return 0.7  # Too many metaphors
-    
-    def _evaluate_sentiment_accuracy(self, response: str, expected_emotion: str) -> float:
-        """Evaluate sentiment accuracy using simple sentiment analysis"""
-        # Simple sentiment mapping
-        positive_emotions = ['joy', 'love', 'gratitude', 'pride', 'wonder']
-        negative_emotions = ['grief', 'fear', 'anger', 'disappointment', 'despair']
-        
-        # Count positive and negative words
-        positive_words = ['good', 'great', 'wonderful', 'happy', 'beautiful', 'amazing']
-        negative_words = ['bad', 'sad', 'terrible', 'awful', 'difficult', 'painful']
-        
-        response_lower = response.lower()
-        
-        positive_count = sum(1 for word in positive_words if word in response_lower)
-        negative_count = sum(1 for word in negative_words if word in response_lower)
-        
-        # Determine if sentiment matches expected emotion
-        if expected_emotion in positive_emotions:
-            # Should have more positive sentiment
-            if positive_count > negative_count:
-                return 0.8 + min(0.2, positive_count * 0.1)
-            else:
-                return 0.6
-        elif expected_emotion in negative_emotions:
-            # Should acknowledge negative emotion appropriately
-            if negative_count > 0 or any(word in response_lower for word in ['understand', 'difficult']):
-                return 0.8
-            else:
-                return 0.5
-        else:
-            # Neutral emotion - balanced sentiment is good
-            return 0.7
-    
     def _calculate_degradation(self, current_metrics: EmotionalMetrics, baseline_metrics: EmotionalMetrics) -> float:
         """Calculate emotional degradation compared to baseline"""
         if baseline_metrics is None:
             return 0.0
         
-        current_score = current_metrics.overall_score()
-        baseline_score = baseline_metrics.overall_score()
+        metric_matrix = np.array([
+            [getattr(metrics, field) for field in METRIC_FIELDS]
+            for metrics in (current_metrics, baseline_metrics)
+        ])
+        current_score, baseline_score = metric_matrix @ self.score_weights
         
         if baseline_score == 0:
             return 0.0
         
         degradation = (baseline_score - current_score) / baseline_score
-        return max(0.0, degradation)  # Only positive degradation
+        return max(0.0, float(degradation))  # Only positive degradation
     
     def _meets_target_criteria(self, result: QuantizationResult) -> bool:
         """Check if quantization result meets target criteria"""
@@ -655,18 +559,27 @@ class Pass1QuantizationLoop:
         self._save_iteration_results(result)
         
         # Step 4: Update best result
-        if self.best_result is None or emotional_metrics.overall_score() > self.best_result.emotional_metrics.overall_score():
-            self.best_result = result
-            logger.info(f"🏆 New best result: {emotional_metrics.overall_score():.3f}")
+        self._update_best_result(result)
         
         return result
     
+    def _update_best_result(self, result: QuantizationResult):
+        """Keep the highest-scoring result seen so far"""
+        score = result.emotional_metrics.overall_score()
+        if self.best_result is None or score > self.best_result.emotional_metrics.overall_score():
+            self.best_result = result
+            logger.info(f"🏆 New best result: {score:.3f}")
+    
     def run_full_loop(self, force: bool = False) -> Dict[str, Any]:
         """Run the complete quantization loop"""
+        if self.config.search_strategy == "bisect":
+            return self.run_search_loop(force)
+        
         logger.info("🚀 Starting full quantization loop")
         
         results = []
         target_met = False
+        selected_level = None
         
         # Establish baseline if needed (using the least aggressive quantization)
         if self.baseline_metrics is None:
@@ -696,16 +609,22 @@ class Pass1QuantizationLoop:
             # Check if target criteria are met
             if self._meets_target_criteria(result):
                 target_met = True
+                selected_level = quant_level
                 logger.info(f"🎯 Target criteria met with {quant_level}!")
                 break
             
             # Small delay between iterations
             time.sleep(2)
         
-        # Generate summary
+        return self._write_summary(results, target_met, selected_level)
+    
+    def _write_summary(self, results: List[QuantizationResult], target_met: bool,
+                       selected_level: Optional[str], search: Optional[Dict] = None) -> Dict[str, Any]:
+        """Build, save and return the loop summary"""
         summary = {
             "success": True,
             "target_met": target_met,
+            "selected_level": selected_level,
             "total_iterations": len(results),
             "best_result": None,
             "baseline_score": self.baseline_metrics.overall_score() if self.baseline_metrics else 0.0,
@@ -730,6 +649,9 @@ class Pass1QuantizationLoop:
             result_dict['overall_score'] = r.emotional_metrics.overall_score()
             summary["results"].append(result_dict)
         
+        if search is not None:
+            summary["search"] = search
+        
         # Save summary
         summary_path = Path(self.config.output_dir) / f"pass1_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         with open(summary_path, 'w') as f:
@@ -744,6 +666,168 @@ class Pass1QuantizationLoop:
         
         return summary
     
+    def run_search_loop(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Budgeted search for the first quant level that meets the targets
+        
+        Reaches the same choice as the linear walk while quantizing only the
+        levels a bisection visits. A visited level is scored on a growing,
+        stratified subset of the prompts and settled as soon as its degradation
+        interval clears the threshold. Only the selected level is then scored
+        on the full eval set.
+        """
+        logger.info("🚀 Starting budgeted quantization search")
+        
+        if not force and not self._check_idle_conditions():
+            return {"success": False, "error": "System not idle"}
+        
+        total = len(self.evaluation_prompts)
+        if total == 0:
+            return {"success": False, "error": "No evaluation prompts"}
+        labels = [prompt.get('expected_emotion', 'neutral') for prompt in self.evaluation_prompts]
+        self._search_order = stratified_order(labels)
+        stages = stage_sizes(total, self.config.search_stage_fractions, minimum=2)
+        probes: Dict[str, LevelProbe] = {}
+        
+        # The baseline is scored on every prompt; candidates are compared against it prompt by prompt
+        logger.info("📊 Establishing baseline with least aggressive quantization...")
+        baseline_probe = self._quantize_probe(self.config.quant_levels[0])
+        if baseline_probe is None:
+            logger.error("❌ Failed to establish baseline")
+            return {"success": False, "error": "Failed to establish baseline"}
+        self._extend_probe(baseline_probe, total)
+        baseline_result = self._probe_result(baseline_probe)
+        self.baseline_metrics = baseline_result.emotional_metrics
+        baseline_scores = baseline_probe.scores @ self.score_weights
+        self._save_iteration_results(baseline_result)
+        self._update_best_result(baseline_result)
+        logger.info(f"✅ Baseline established: {self.baseline_metrics.overall_score():.3f}")
+        
+        def classify(quant_level: str) -> Optional[str]:
+            if quant_level in probes:
+                return probes[quant_level].outcome
+            if self.iteration_count >= self.config.max_iterations:
+                return None
+            
+            probe = self._quantize_probe(quant_level)
+            if probe is None:
+                return FAILED
+            probes[quant_level] = probe
+            
+            if probe.model_size_mb / 1024 > self.config.target_size_gb:
+                probe.outcome = TOO_LARGE
+                logger.info(f"📏 {quant_level}: {probe.model_size_mb / 1024:.1f}GB > {self.config.target_size_gb}GB target")
+                return probe.outcome
+            
+            for count in stages:
+                self._extend_probe(probe, count)
+                probe.estimate = estimate_degradation(
+                    baseline_scores[:count], probe.scores @ self.score_weights, total,
+                    z=self.config.search_confidence_z
+                )
+                decision = probe.estimate.decision(self.config.emotion_degradation_threshold)
+                if decision != UNCERTAIN:
+                    break
+            
+            probe.outcome = decision
+            logger.info(f"🔎 {quant_level}: {probe.outcome} after {count}/{total} prompts "
+                        f"(degradation {probe.estimate.degradation:.1%}, "
+                        f"interval {probe.estimate.lower:.1%} to {probe.estimate.upper:.1%})")
+            return probe.outcome
+        
+        results = []
+        target_met = False
+        selected_level = None
+        
+        while True:
+            quant_level = bisect_first_passing(self.config.quant_levels[1:], classify)
+            if quant_level is None:
+                break
+            
+            # Confirm the winner on the full eval set
+            probe = probes[quant_level]
+            self._extend_probe(probe, total)
+            result = self._probe_result(probe)
+            self._save_iteration_results(result)
+            self._update_best_result(result)
+            results.append(result)
+            
+            if self._meets_target_criteria(result):
+                target_met = True
+                selected_level = quant_level
+                logger.info(f"🎯 Target criteria met with {quant_level}!")
+                break
+            
+            logger.info(f"↩️ {quant_level} did not hold up on the full eval set, continuing search")
+            probe.outcome = DEGRADED
+        
+        search = {
+            "strategy": "bisect",
+            "stages": stages,
+            "levels_quantized": 1 + len(probes),
+            "responses_generated": total + sum(len(probe.responses) for probe in probes.values()),
+            "linear_responses": total * len(self.config.quant_levels),
+            "probes": [
+                {
+                    "quant_level": probe.quant_level,
+                    "outcome": probe.outcome,
+                    "model_size_mb": probe.model_size_mb,
+                    **(probe.estimate.to_dict() if probe.estimate else {"evaluated_prompts": len(probe.responses)})
+                }
+                for probe in probes.values()
+            ]
+        }
+        logger.info(f"📉 Search generated {search['responses_generated']} responses "
+                    f"(a linear walk generates up to {search['linear_responses']})")
+        
+        return self._write_summary(results, target_met, selected_level, search=search)
+    
+    def _quantize_probe(self, quant_level: str) -> Optional[LevelProbe]:
+        """Quantize a level for the search; None if quantization failed"""
+        self.iteration_count += 1
+        logger.info(f"🔄 Starting iteration {self.iteration_count} with {quant_level}")
+        
+        start_time = time.time()
+        model_path, model_size_mb, quant_success, quant_error = self._quantize_model(quant_level, self.iteration_count)
+        if not quant_success:
+            logger.warning(f"⚠️ Iteration failed: {quant_error}")
+            return None
+        
+        return LevelProbe(
+            quant_level=quant_level,
+            iteration=self.iteration_count,
+            model_path=model_path,
+            model_size_mb=model_size_mb,
+            quantization_time=time.time() - start_time
+        )
+    
+    def _extend_probe(self, probe: LevelProbe, count: int):
+        """Generate and score responses for the next prompts in search order, up to ``count``"""
+        pending = self._search_order[len(probe.responses):count]
+        if not pending:
+            return
+        
+        start_time = time.time()
+        responses = self._generate_model_responses(probe.model_path, [self.evaluation_prompts[i] for i in pending])
+        scores = self._score_responses(responses)
+        
+        probe.responses.extend(responses)
+        probe.scores = scores if probe.scores is None else np.vstack([probe.scores, scores])
+        probe.evaluation_time += time.time() - start_time
+    
+    def _probe_result(self, probe: LevelProbe) -> QuantizationResult:
+        """Iteration result from the responses a probe has scored"""
+        return QuantizationResult(
+            iteration=probe.iteration,
+            quant_level=probe.quant_level,
+            model_path=probe.model_path,
+            model_size_mb=probe.model_size_mb,
+            emotional_metrics=self._mean_metrics(probe.scores),
+            quantization_time=probe.quantization_time,
+            evaluation_time=probe.evaluation_time,
+            success=True
+        )
+    
     def print_last_results(self):
         """Print results from the last run"""
         # Look for the most recent summary file
@@ -805,6 +889,10 @@ def create_cli():
                        help='Maximum number of iterations')
     parser.add_argument('--evaluation-prompts', type=int, default=25, 
                        help='Number of evaluation prompts to use')
+    parser.add_argument('--evaluation-workers', type=int, default=1, 
+                       help='Processes for emotional feature extraction on large eval sets')
+    parser.add_argument('--search', choices=['linear', 'bisect'], default='linear', 
+                       help='Level search: walk every level, or bisect with staged evaluation')
     
     # Execution mode arguments
     mode_group = parser.add_mutually_exclusive_group(required=True)
@@ -846,6 +934,8 @@ def main():
         output_dir=args.output_dir,
         max_iterations=args.max_iterations,
         evaluation_prompt_count=args.evaluation_prompts,
+        evaluation_workers=args.evaluation_workers,
+        search_strategy=args.search,
         mock_mode=args.mock
     )
     
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Emotion Feature Extraction
+Single-pass lexicon features for evaluating emotional responses. Each response is
+lower-cased, split and scanned for every lexicon phrase once, giving one row of a
+feature matrix; all pass-1 metrics are then computed for the whole eval set as array math
+"""
+
+import re
+import math
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Emotional intensity keywords per expected emotion
+INTENSITY_KEYWORDS = {
+    'grief': ['deeply', 'painful', 'overwhelming', 'heartbreaking', 'devastating'],
+    'joy': ['wonderful', 'amazing', 'fantastic', 'incredible', 'delightful'],
+    'fear': ['terrifying', 'scary', 'frightening', 'alarming', 'threatening'],
+    'anger': ['furious', 'outraged', 'infuriating', 'frustrating', 'unfair'],
+    'love': ['beautiful', 'precious', 'profound', 'tender', 'meaningful']
+}
+
+# Emotional indicator words for each emotion
+EMOTION_INDICATORS = {
+    'grief': ['loss', 'sad', 'pain', 'miss', 'mourn', 'difficult', 'hard'],
+    'joy': ['happy', 'celebrate', 'wonderful', 'excited', 'glad', 'pleased'],
+    'fear': ['afraid', 'scared', 'worry', 'concern', 'danger', 'safe', 'protect'],
+    'anger': ['upset', 'angry', 'frustrated', 'unfair', 'wrong', 'annoyed'],
+    'love': ['love', 'care', 'tender', 'precious', 'beautiful', 'special']
+}
+
+EMPATHY_INDICATORS = [
+    'understand', 'feel', 'imagine', 'support', 'here for you',
+    'validates', 'normal', 'natural', 'makes sense', 'completely'
+]
+
+# Perspective-taking language
+PERSPECTIVE_PHRASES = ['you must', 'you might', 'you could']
+
+METAPHOR_INDICATORS = [
+    'like', 'as if', 'reminds', 'mirror', 'bridge', 'journey',
+    'path', 'light', 'shadow', 'ocean', 'mountain', 'garden'
+]
+
+POSITIVE_EMOTIONS = ['joy', 'love', 'gratitude', 'pride', 'wonder']
+NEGATIVE_EMOTIONS = ['grief', 'fear', 'anger', 'disappointment', 'despair']
+POSITIVE_WORDS = ['good', 'great', 'wonderful', 'happy', 'beautiful', 'amazing']
+NEGATIVE_WORDS = ['bad', 'sad', 'terrible', 'awful', 'difficult', 'painful']
+ACKNOWLEDGEMENT_WORDS = ['understand', 'difficult']
+
+FEATURE_NAMES = (
+    'too_short', 'word_count', 'sentence_count', 'has_period', 'has_capital',
+    'intensity_hits', 'has_exclamation', 'match_hits', 'match_vocabulary',
+    'empathy_hits', 'perspective', 'metaphor_hits',
+    'positive_hits', 'negative_hits', 'acknowledges', 'polarity'
+)
+
+# Column order of metric_scores(), matching the EmotionalMetrics fields
+METRIC_FIELDS = (
+    'response_fluency', 'emotional_intensity', 'emotional_match',
+    'empathy_score', 'metaphor_usage', 'sentiment_accuracy'
+)
+
+# Below this many responses a process pool costs more than it saves
+PARALLEL_MIN_RESPONSES = 256
+
+
+class PhraseScanner:
+    """Finds which of many phrases occur as substrings of a text in one regex pass"""
+
+    def __init__(self, phrases: Iterable[str]):
+        # Longest first, so at each position the lookahead reports the longest phrase there;
+        # shorter phrases that are prefixes of it are added back from the prefix map
+        self.phrases = sorted(set(phrases), key=lambda phrase: (-len(phrase), phrase))
+        self._prefixes = {
+            phrase: [other for other in self.phrases if other != phrase and phrase.startswith(other)]
+            for phrase in self.phrases
+        }
+        self._pattern = re.compile("(?=(" + "|".join(map(re.escape, self.phrases)) + "))")
+
+    def scan(self, text_lower: str) -> Set[str]:
+        """Every phrase contained in the (already lower-cased) text"""
+        found = set(self._pattern.findall(text_lower)) if self.phrases else set()
+        for phrase in list(found):
+            found.update(self._prefixes[phrase])
+        return found
+
+
+_SCANNER = PhraseScanner(
+    [word for words in INTENSITY_KEYWORDS.values() for word in words] +
+    [word for words in EMOTION_INDICATORS.values() for word in words] +
+    EMPATHY_INDICATORS + PERSPECTIVE_PHRASES + METAPHOR_INDICATORS +
+    POSITIVE_WORDS + NEGATIVE_WORDS + ACKNOWLEDGEMENT_WORDS
+)
+
+
+def _hits(words: List[str], found: Set[str]) -> int:
+    return sum(1 for word in words if word in found)
+
+
+def extract_features(response: str, expected_emotion: str) -> List[float]:
+    """One feature row (see FEATURE_NAMES) for a response"""
+    response = response or ""
+    response_lower = response.lower()
+    found = _SCANNER.scan(response_lower)
+    word_count = len(response.split())
+    indicators = EMOTION_INDICATORS.get(expected_emotion, [])
+
+    if expected_emotion in POSITIVE_EMOTIONS:
+        polarity = 1
+    elif expected_emotion in NEGATIVE_EMOTIONS:
+        polarity = -1
+    else:
+        polarity = 0
+
+    return [
+        len(response.strip()) < 10,
+        word_count,
+        len([s for s in response.split('.') if s.strip()]),
+        '.' in response,
+        any(c.isupper() for c in response),
+        _hits(INTENSITY_KEYWORDS.get(expected_emotion, []), found),
+        '!' in response,
+        _hits(indicators, found),
+        len(indicators),
+        _hits(EMPATHY_INDICATORS, found),
+        any(phrase in found for phrase in PERSPECTIVE_PHRASES),
+        _hits(METAPHOR_INDICATORS, found),
+        _hits(POSITIVE_WORDS, found),
+        _hits(NEGATIVE_WORDS, found),
+        any(word in found for word in ACKNOWLEDGEMENT_WORDS),
+        polarity
+    ]
+
+
+def _feature_block(pairs: List[Tuple[str, str]]) -> np.ndarray:
+    rows = [extract_features(response, emotion) for response, emotion in pairs]
+    return np.array(rows, dtype=np.float64).reshape(len(rows), len(FEATURE_NAMES))
+
+
+def extract_feature_matrix(responses: Sequence[str], expected_emotions: Sequence[str],
+                           workers: int = 1) -> np.ndarray:
+    """
+    (responses, features) matrix for a whole eval set
+
+    With ``workers`` > 1 and a large enough eval set, chunks are extracted
+    in a process pool.
+    """
+    pairs = list(zip(responses, expected_emotions))
+
+    if workers > 1 and len(pairs) >= PARALLEL_MIN_RESPONSES:
+        chunk_size = math.ceil(len(pairs) / (workers * 4))
+        chunks = [pairs[start:start + chunk_size] for start in range(0, len(pairs), chunk_size)]
+        logger.info(f"⚡ Extracting features for {len(pairs)} responses across {workers} processes")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return np.vstack(list(pool.map(_feature_block, chunks)))
+
+    return _feature_block(pairs)
+
+
+def metric_scores(features: np.ndarray) -> np.ndarray:
+    """(responses, metrics) scores in METRIC_FIELDS order from a feature matrix"""
+    f = {name: features[:, i] for i, name in enumerate(FEATURE_NAMES)}
+    word_count = f['word_count']
+
+    # Fluency: structure bonuses on a 0.6 base; very short or very long responses are penalized
+    fluency = (0.6 + 0.1 * (f['sentence_count'] > 1) + 0.1 * f['has_period'] + 0.1 * f['has_capital'] +
+               0.1 * ((word_count >= 20) & (word_count <= 100)))
+    fluency = np.select(
+        [f['too_short'] > 0, word_count < 5, word_count > 200],
+        [0.1, 0.3, 0.7],
+        np.minimum(1.0, fluency)
+    )
+
+    intensity = np.minimum(1.0, 0.5 + f['intensity_hits'] * 0.1 + 0.1 * f['has_exclamation'])
+
+    # Scaled to the 0.4-1.0 range; 0.7 for unknown emotions
+    vocabulary = f['match_vocabulary']
+    match_ratio = np.divide(f['match_hits'], vocabulary, out=np.zeros_like(vocabulary), where=vocabulary > 0)
+    match = np.where(vocabulary > 0, np.minimum(1.0, 0.4 + match_ratio * 0.6), 0.7)
+
+    empathy = np.minimum(1.0, 0.5 + f['empathy_hits'] * 0.1 + 0.1 * f['perspective'])
+
+    # Moderate metaphor usage is ideal (not too little, not too much)
+    metaphor = np.select([f['metaphor_hits'] == 0, f['metaphor_hits'] <= 2], [0.6, 0.8], 0.7)
+
+    positive, negative = f['positive_hits'], f['negative_hits']
+    sentiment = np.select(
+        [f['polarity'] > 0, f['polarity'] < 0],
+        [
+            np.where(positive > negative, 0.8 + np.minimum(0.2, positive * 0.1), 0.6),
+            np.where((negative > 0) | (f['acknowledges'] > 0), 0.8, 0.5)
+        ],
+        0.7
+    )
+
+    return np.column_stack([fluency, intensity, match, empathy, metaphor, sentiment])
+
+
+def score_responses(responses: Sequence[Optional[str]], expected_emotions: Sequence[str],
+                    workers: int = 1) -> np.ndarray:
+    """
+    (responses, metrics) score matrix for a whole eval set
+
+    A None response marks a prompt whose generation failed; its row is NaN so
+    averages and degradation estimates can leave it out.
+    """
+    failed = np.array([response is None for response in responses], dtype=bool)
+    scores = metric_scores(extract_feature_matrix(
+        [response or "" for response in responses], expected_emotions, workers=workers
+    ))
+    scores[failed] = np.nan
+    return scores
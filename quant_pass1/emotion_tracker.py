@@ -7,12 +7,14 @@ Tracks tone, sentiment, and metaphor density in AI responses
 import re
 import json
 import logging
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Set
 from dataclasses import dataclass
 from pathlib import Path
 import numpy as np
 from datetime import datetime
 
+from emotion_features import PhraseScanner
+
 try:
     import nltk
     from nltk.sentiment import SentimentIntensityAnalyzer
@@ -138,6 +140,14 @@ class EmotionTracker:
                 'understandable', 'makes sense', 'right to feel'
             ]
         }
+        
+        # Every lexicon phrase is found in one scan per text
+        self.metaphor_regexes = [re.compile(pattern, re.IGNORECASE) for pattern in self.metaphor_patterns]
+        self.phrase_scanner = PhraseScanner(
+            self.empathy_markers +
+            [phrase for phrases in self.tone_patterns.values() for phrase in phrases] +
+            [word for words in self.emotional_vocab.values() for word in words]
+        )
     
     def initialize_analyzers(self):
         """Initialize sentiment and text analysis tools"""
@@ -191,8 +201,8 @@ class EmotionTracker:
         metaphors_found = []
         text_lower = text.lower()
         
-        for pattern in self.metaphor_patterns:
-            matches = re.findall(pattern, text_lower, re.IGNORECASE)
+        for pattern in self.metaphor_regexes:
+            matches = pattern.findall(text_lower)
             if matches:
                 metaphors_found.extend([match if isinstance(match, str) else ' '.join(match) for match in matches])
         
@@ -211,43 +221,39 @@ class EmotionTracker:
         
         return len(metaphors) / len(sentences)
     
-    def find_empathy_markers(self, text: str) -> List[str]:
-        """Find empathy markers in text"""
-        found_markers = []
-        text_lower = text.lower()
-        
-        for marker in self.empathy_markers:
-            if marker in text_lower:
-                found_markers.append(marker)
-        
-        return found_markers
+    def _phrases_in(self, text: str, found: Optional[Set[str]]) -> Set[str]:
+        return self.phrase_scanner.scan(text.lower()) if found is None else found
     
-    def analyze_tone(self, text: str) -> Dict[str, float]:
-        """Analyze tone indicators in text"""
+    def find_empathy_markers(self, text: str, found: Optional[Set[str]] = None) -> List[str]:
+        """Find empathy markers in text (``found``: phrases already scanned from it)"""
+        found = self._phrases_in(text, found)
+        return [marker for marker in self.empathy_markers if marker in found]
+    
+    def analyze_tone(self, text: str, found: Optional[Set[str]] = None) -> Dict[str, float]:
+        """Analyze tone indicators in text (``found``: phrases already scanned from it)"""
         tone_scores = {}
-        text_lower = text.lower()
         word_count = len(text.split())
         
         if word_count == 0:
             return {tone: 0.0 for tone in self.tone_patterns.keys()}
         
+        found = self._phrases_in(text, found)
         for tone, patterns in self.tone_patterns.items():
-            matches = sum(1 for pattern in patterns if pattern in text_lower)
+            matches = sum(1 for pattern in patterns if pattern in found)
             tone_scores[tone] = matches / word_count
         
         return tone_scores
     
-    def find_emotional_vocabulary(self, text: str) -> List[str]:
-        """Find emotional vocabulary in text"""
-        found_vocab = []
-        text_lower = text.lower()
-        
-        for category, words in self.emotional_vocab.items():
-            for word in words:
-                if word in text_lower:
-                    found_vocab.append(f"{word} ({category})")
-        
-        return found_vocab
+    def find_emotional_vocabulary(self, text: str, found: Optional[Set[str]] = None) -> List[str]:
+        """Find emotional vocabulary in text (``found``: phrases already scanned from it)"""
+        found = self._phrases_in(text, found)
+        
+        return [
+            f"{word} ({category})"
+            for category, words in self.emotional_vocab.items()
+            for word in words
+            if word in found
+        ]
     
     def calculate_emotion_score(self, metrics: Dict) -> float:
         """Calculate overall emotion score"""
@@ -325,12 +331,13 @@ class EmotionTracker:
                 'sentiment': {'positive': 0, 'negative': 0, 'neutral': 1, 'compound': 0}
             }
         
-        # Perform all analyses
+        # Perform all analyses, scanning for lexicon phrases once
+        found = self.phrase_scanner.scan(text.lower())
         sentiment = self.analyze_sentiment(text)
         metaphor_density = self.calculate_metaphor_density(text)
-        tone_indicators = self.analyze_tone(text)
-        empathy_markers = self.find_empathy_markers(text)
-        emotional_vocabulary = self.find_emotional_vocabulary(text)
+        tone_indicators = self.analyze_tone(text, found)
+        empathy_markers = self.find_empathy_markers(text, found)
+        emotional_vocabulary = self.find_emotional_vocabulary(text, found)
         readability = self.calculate_readability(text)
         
         # Compile metrics
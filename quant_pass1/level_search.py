@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Quantization Level Search
+Budgeted search over quantization levels: candidates are scored on a growing,
+stratified subset of the eval set and dropped as soon as a sequential test shows
+they clearly miss (or clearly meet) the degradation target, and the ordered quant
+levels are bisected instead of walked one by one
+"""
+
+import math
+import random
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Share of the eval set scored at each stage; the last stage is always the full set
+DEFAULT_STAGE_FRACTIONS = (0.2, 0.5, 1.0)
+
+# Width of the degradation confidence interval, in standard errors
+DEFAULT_CONFIDENCE_Z = 2.5
+
+# Outcomes of probing one level
+PASS = "pass"
+TOO_LARGE = "too_large"
+DEGRADED = "degraded"
+FAILED = "failed"
+
+# Sequential test decisions
+UNCERTAIN = "uncertain"
+
+
+def stratified_order(labels: Sequence[str], seed: int = 0) -> List[int]:
+    """
+    Evaluation order of the prompts in which every prefix is stratified
+
+    Prompts are shuffled within each label and then dealt round-robin across
+    labels, so the first ``n`` indices cover the labels in proportion.
+    """
+    rng = random.Random(seed)
+    strata: Dict[str, List[int]] = {}
+    for index, label in enumerate(labels):
+        strata.setdefault(label, []).append(index)
+
+    queues = []
+    for label in sorted(strata):
+        indices = strata[label]
+        rng.shuffle(indices)
+        queues.append(indices)
+
+    # Deal by position in proportion to stratum size, so small strata are not front-loaded
+    keyed = [
+        ((position + 0.5) / len(queue), stratum, index)
+        for stratum, queue in enumerate(queues)
+        for position, index in enumerate(queue)
+    ]
+    return [index for _, _, index in sorted(keyed)]
+
+
+def stage_sizes(total: int, fractions: Sequence[float] = DEFAULT_STAGE_FRACTIONS,
+                minimum: int = 1) -> List[int]:
+    """Strictly increasing prompt counts per stage, ending with ``total``"""
+    sizes = []
+    for fraction in fractions:
+        size = min(total, max(minimum, math.ceil(total * fraction)))
+        if not sizes or size > sizes[-1]:
+            sizes.append(size)
+    if not sizes or sizes[-1] != total:
+        sizes.append(total)
+    return sizes
+
+
+@dataclass
+class DegradationEstimate:
+    """Degradation of a candidate on the prompts scored so far, with a confidence interval"""
+    degradation: float
+    lower: float
+    upper: float
+    evaluated: int
+    total: int
+
+    def decision(self, threshold: float) -> str:
+        """PASS or DEGRADED once the interval clears the threshold, otherwise UNCERTAIN"""
+        if self.lower > threshold:
+            return DEGRADED
+        if self.upper <= threshold:
+            return PASS
+        return UNCERTAIN
+
+    def to_dict(self) -> Dict:
+        return {
+            "degradation": self.degradation,
+            "lower": self.lower,
+            "upper": self.upper,
+            "evaluated_prompts": self.evaluated,
+            "total_prompts": self.total
+        }
+
+
+def estimate_degradation(baseline_scores: np.ndarray, scores: np.ndarray, total: int,
+                         z: float = DEFAULT_CONFIDENCE_Z) -> DegradationEstimate:
+    """
+    Paired estimate of ``(baseline - candidate) / baseline`` over the same prompts
+
+    Scores are per-prompt overall scores; NaN marks a prompt whose generation
+    failed (score_responses emits NaN rows for them) and is left out of that
+    side's mean, as the full-set averages do.
+    The standard error carries a finite-population correction, so once every
+    prompt is scored the interval collapses onto the full-set degradation.
+    """
+    baseline_scores = np.asarray(baseline_scores, dtype=np.float64)
+    scores = np.asarray(scores, dtype=np.float64)
+    evaluated = len(scores)
+
+    baseline_valid = ~np.isnan(baseline_scores)
+    valid = ~np.isnan(scores)
+    baseline_mean = baseline_scores[baseline_valid].mean() if baseline_valid.any() else 0.0
+    mean = scores[valid].mean() if valid.any() else 0.0
+
+    if baseline_mean == 0:
+        return DegradationEstimate(0.0, 0.0, 0.0, evaluated, total)
+
+    degradation = (baseline_mean - mean) / baseline_mean
+
+    paired = baseline_valid & valid
+    pairs = int(paired.sum())
+    if pairs > 1 and evaluated < total:
+        differences = (baseline_scores[paired] - scores[paired]) / baseline_mean
+        correction = math.sqrt((total - evaluated) / (total - 1))
+        margin = z * differences.std(ddof=1) / math.sqrt(pairs) * correction
+    elif evaluated < total:
+        margin = math.inf
+    else:
+        margin = 0.0
+
+    return DegradationEstimate(
+        degradation=max(0.0, float(degradation)),
+        lower=float(degradation - margin),
+        upper=float(degradation + margin),
+        evaluated=evaluated,
+        total=total
+    )
+
+
+def bisect_first_passing(levels: Sequence, classify: Callable[[object], Optional[str]]) -> Optional[object]:
+    """
+    First level (in order) whose probe passes, found by bisection
+
+    Levels are ordered from least to most aggressive, so size only shrinks and
+    degradation only grows along them: a level that is too large rules out every
+    level before it, and a level that passes or is too degraded rules out every
+    level after it. Levels whose probe failed are dropped from the search.
+    ``classify`` returns None when the probe budget is spent, which ends the
+    search with the best level found so far.
+    """
+    candidates = list(levels)
+    low, high = 0, len(candidates) - 1
+    found = None
+
+    while low <= high:
+        middle = (low + high) // 2
+        outcome = classify(candidates[middle])
+
+        if outcome is None:
+            logger.info("🛑 Search budget spent before the bisection converged")
+            break
+        if outcome == FAILED:
+            del candidates[middle]
+            high -= 1
+        elif outcome == TOO_LARGE:
+            low = middle + 1
+        else:
+            if outcome == PASS:
+                found = candidates[middle]
+            high = middle - 1
+
+    return found
@@ -38,6 +38,7 @@ class LoopConfig:
     adaptive_parameters: bool = True
     save_intermediate: bool = True
     early_stopping: bool = True
+    staged_evaluation: bool = False  # Score methods on stratified subsets, full set only for the winner
 
 class QuantizationLoop:
     """Autonomous quantization loop controller"""
@@ -310,7 +311,7 @@ class QuantizationLoop:
                 
                 try:
                     # Run quantization attempt
-                    results = quantizer.run_quantization_pass()
+                    results = quantizer.run_quantization_pass(staged=self.loop_config.staged_evaluation)
                     
                     # Store results
                     self.attempt_history.append(results)
@@ -426,7 +427,8 @@ class QuantizationLoop:
                 "target_size_gb": self.loop_config.target_size_gb,
                 "max_emotional_degradation": self.loop_config.max_emotional_degradation,
                 "convergence_threshold": self.loop_config.convergence_threshold,
-                "adaptive_parameters": self.loop_config.adaptive_parameters
+                "adaptive_parameters": self.loop_config.adaptive_parameters,
+                "staged_evaluation": self.loop_config.staged_evaluation
             },
             "quantization_config": {
                 "model_path": self.quant_config.model_path,
@@ -463,6 +465,7 @@ def main():
     model_path = os.getenv("SEED_MODEL_PATH", "meta-llama/Llama-2-13b-chat-hf")
     emotion_threshold = float(os.getenv("EMOTION_THRESHOLD", "0.07"))
     size_target_gb = float(os.getenv("SIZE_TARGET_GB", "24.0"))
+    staged_evaluation = os.getenv("STAGED_EVALUATION", "false").lower() == "true"
     
     # Create configurations
     loop_config = LoopConfig(
@@ -472,7 +475,8 @@ def main():
         convergence_threshold=0.001,
         adaptive_parameters=True,
         save_intermediate=True,
-        early_stopping=True
+        early_stopping=True,
+        staged_evaluation=staged_evaluation
     )
     
     quant_config = QuantizationConfig(
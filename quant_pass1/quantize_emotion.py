@@ -22,10 +22,22 @@ from transformers import (
 from datasets import Dataset
 import psutil
 
+from level_search import (
+    DEFAULT_CONFIDENCE_Z, DEFAULT_STAGE_FRACTIONS, DEGRADED,
+    DegradationEstimate, estimate_degradation, stage_sizes, stratified_order
+)
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Weights of the combined score that degradation is measured on
+DEGRADATION_WEIGHTS = {"emotion_score": 0.4, "sentiment_score": 0.4, "metaphor_density": 0.2}
+
+def combined_score(metrics: Dict, prefix: str = "") -> float:
+    """Weighted emotion/sentiment/metaphor score of per-response (or ``avg_``-prefixed) metrics"""
+    return sum(metrics.get(prefix + name, 0) * weight for name, weight in DEGRADATION_WEIGHTS.items())
+
 @dataclass
 class QuantizationConfig:
     """Configuration for quantization parameters"""
@@ -35,10 +47,14 @@ class QuantizationConfig:
     emotion_threshold: float = 0.07  # 7% max degradation
     quant_methods: List[str] = None
     seed: int = 42
+    stage_fractions: List[float] = None  # Share of prompts scored per stage in staged evaluation
+    confidence_z: float = DEFAULT_CONFIDENCE_Z
     
     def __post_init__(self):
         if self.quant_methods is None:
             self.quant_methods = ["4bit", "8bit", "gptq", "gguf"]
+        if self.stage_fractions is None:
+            self.stage_fractions = list(DEFAULT_STAGE_FRACTIONS)
 
 class EmotionalQuantizer:
     """Main quantization system with emotional preservation"""
@@ -221,24 +237,29 @@ class EmotionalQuantizer:
             logger.error(f"❌ Response generation failed: {e}")
             return ""
     
-    def evaluate_emotional_fidelity(self, model, tokenizer, eval_set: List[Dict]) -> Dict:
-        """Evaluate emotional fidelity of quantized model"""
+    def evaluate_emotional_fidelity(self, model, tokenizer, eval_set: List[Dict],
+                                    indices: Optional[List[int]] = None) -> Dict:
+        """Evaluate emotional fidelity of quantized model (on the prompts at ``indices``, default all)"""
         from emotion_tracker import EmotionTracker
         
         logger.info("🧪 Evaluating emotional fidelity...")
         
-        tracker = EmotionTracker()
-        results = {
-            "total_prompts": len(eval_set),
-            "successful_generations": 0,
-            "avg_emotion_score": 0.0,
-            "avg_sentiment_score": 0.0,
-            "avg_metaphor_density": 0.0,
-            "responses": []
-        }
+        if indices is None:
+            indices = list(range(len(eval_set)))
         
-        for i, prompt_data in enumerate(eval_set):
+        responses = self._score_prompts(model, tokenizer, eval_set, indices, EmotionTracker())
+        results = self._summarize_fidelity(len(indices), responses)
+        
+        logger.info(f"📈 Evaluation complete: {results['successful_generations']}/{results['total_prompts']} successful")
+        return results
+    
+    def _score_prompts(self, model, tokenizer, eval_set: List[Dict], indices: List[int], tracker) -> List[Dict]:
+        """Generate and analyze responses for the prompts at ``indices``; failed generations are left out"""
+        responses = []
+        
+        for count, i in enumerate(indices, 1):
             try:
+                prompt_data = eval_set[i]
                 prompt = prompt_data["prompt"]
                 expected_category = prompt_data.get("category", "general")
                 
@@ -249,47 +270,51 @@ class EmotionalQuantizer:
                     # Analyze emotional content
                     emotion_metrics = tracker.analyze_emotional_content(response)
                     
-                    results["responses"].append({
+                    responses.append({
+                        "prompt_index": i,
                         "prompt": prompt,
                         "response": response,
                         "category": expected_category,
                         "metrics": emotion_metrics
                     })
-                    
-                    results["successful_generations"] += 1
-                    results["avg_emotion_score"] += emotion_metrics.get("emotion_score", 0)
-                    results["avg_sentiment_score"] += emotion_metrics.get("sentiment_score", 0)
-                    results["avg_metaphor_density"] += emotion_metrics.get("metaphor_density", 0)
                 
                 # Progress logging
-                if (i + 1) % 10 == 0:
-                    logger.info(f"📊 Evaluated {i + 1}/{len(eval_set)} prompts")
+                if count % 10 == 0:
+                    logger.info(f"📊 Evaluated {count}/{len(indices)} prompts")
                     
             except Exception as e:
                 logger.error(f"❌ Evaluation failed for prompt {i}: {e}")
         
-        # Calculate averages
-        if results["successful_generations"] > 0:
-            results["avg_emotion_score"] /= results["successful_generations"]
-            results["avg_sentiment_score"] /= results["successful_generations"]
-            results["avg_metaphor_density"] /= results["successful_generations"]
+        return responses
+    
+    @staticmethod
+    def _summarize_fidelity(total_prompts: int, responses: List[Dict]) -> Dict:
+        """Average metrics over the successful responses"""
+        results = {
+            "total_prompts": total_prompts,
+            "successful_generations": len(responses),
+            "avg_emotion_score": 0.0,
+            "avg_sentiment_score": 0.0,
+            "avg_metaphor_density": 0.0,
+            "responses": responses
+        }
+        
+        if responses:
+            for name in DEGRADATION_WEIGHTS:
+                results[f"avg_{name}"] = sum(r["metrics"].get(name, 0) for r in responses) / len(responses)
         
-        logger.info(f"📈 Evaluation complete: {results['successful_generations']}/{results['total_prompts']} successful")
         return results
     
+    @staticmethod
+    def _prompt_scores(responses: List[Dict], indices: List[int]) -> np.ndarray:
+        """Combined score per prompt at ``indices``; NaN where generation failed"""
+        by_index = {r["prompt_index"]: combined_score(r["metrics"]) for r in responses}
+        return np.array([by_index.get(i, np.nan) for i in indices], dtype=np.float64)
+    
     def calculate_degradation(self, baseline_metrics: Dict, current_metrics: Dict) -> float:
         """Calculate emotional degradation percentage"""
-        baseline_score = (
-            baseline_metrics["avg_emotion_score"] * 0.4 +
-            baseline_metrics["avg_sentiment_score"] * 0.4 +
-            baseline_metrics["avg_metaphor_density"] * 0.2
-        )
-        
-        current_score = (
-            current_metrics["avg_emotion_score"] * 0.4 +
-            current_metrics["avg_sentiment_score"] * 0.4 +
-            current_metrics["avg_metaphor_density"] * 0.2
-        )
+        baseline_score = combined_score(baseline_metrics, prefix="avg_")
+        current_score = combined_score(current_metrics, prefix="avg_")
         
         if baseline_score == 0:
             return 0.0
@@ -297,8 +322,43 @@ class EmotionalQuantizer:
         degradation = (baseline_score - current_score) / baseline_score
         return max(0.0, degradation)  # Ensure non-negative
     
-    def run_quantization_pass(self) -> Dict:
-        """Run complete quantization pass"""
+    def _evaluate_staged(self, model, tokenizer, eval_set: List[Dict], order: List[int], stages: List[int],
+                         baseline_scores: np.ndarray, confirm: bool) -> Tuple[Dict, DegradationEstimate]:
+        """
+        Evaluate on growing stratified subsets of the eval set
+        
+        A method that can no longer win the pass stops after the first stage; one
+        that still can is scored on to the full set, stopping early only once it
+        is clearly too degraded.
+        """
+        from emotion_tracker import EmotionTracker
+        
+        tracker = EmotionTracker()
+        responses = []
+        evaluated = 0
+        
+        for count in stages:
+            responses.extend(self._score_prompts(model, tokenizer, eval_set, order[evaluated:count], tracker))
+            evaluated = count
+            estimate = estimate_degradation(
+                baseline_scores[:count], self._prompt_scores(responses, order[:count]),
+                len(eval_set), z=self.config.confidence_z
+            )
+            if not confirm or estimate.decision(self.config.emotion_threshold) == DEGRADED:
+                break
+        
+        logger.info(f"🔎 Staged evaluation stopped after {evaluated}/{len(eval_set)} prompts "
+                    f"(degradation {estimate.lower*100:.2f}% to {estimate.upper*100:.2f}%)")
+        return self._summarize_fidelity(evaluated, responses), estimate
+    
+    def run_quantization_pass(self, staged: bool = False) -> Dict:
+        """
+        Run complete quantization pass
+        
+        With ``staged``, methods are scored on stratified subsets first and only
+        the candidates that could still be the pass's best result are scored on
+        the whole eval set.
+        """
         logger.info(f"🚀 Starting quantization pass #{self.current_attempt + 1}")
         
         # Load evaluation set
@@ -322,6 +382,12 @@ class EmotionalQuantizer:
         
         results = {}
         
+        if staged:
+            order = stratified_order([p.get("category", "general") for p in eval_set], seed=self.config.seed)
+            stages = stage_sizes(len(eval_set), self.config.stage_fractions, minimum=2)
+            baseline_scores = self._prompt_scores(self.baseline_metrics["responses"], order)
+            best_size = float('inf')
+        
         for method in self.config.quant_methods:
             try:
                 start_time = time.time()
@@ -336,10 +402,18 @@ class EmotionalQuantizer:
                 model_size = self.get_model_size_gb(model_path)
                 
                 # Evaluate emotional fidelity
-                quant_metrics = self.evaluate_emotional_fidelity(quantized_model, tokenizer, eval_set)
-                
-                # Calculate degradation
-                degradation = self.calculate_degradation(self.baseline_metrics, quant_metrics)
+                if staged:
+                    # Only the smallest method that fits so far can still be the best result
+                    quant_metrics, estimate = self._evaluate_staged(
+                        quantized_model, tokenizer, eval_set, order, stages, baseline_scores,
+                        confirm=model_size <= self.config.target_size_gb and model_size < best_size
+                    )
+                    degradation = estimate.degradation
+                else:
+                    quant_metrics = self.evaluate_emotional_fidelity(quantized_model, tokenizer, eval_set)
+                    
+                    # Calculate degradation
+                    degradation = self.calculate_degradation(self.baseline_metrics, quant_metrics)
                 
                 # Store results
                 result = {
@@ -353,6 +427,13 @@ class EmotionalQuantizer:
                     "metrics": quant_metrics
                 }
                 
+                if staged:
+                    result["evaluated_prompts"] = estimate.evaluated
+                    result["degradation_interval"] = [estimate.lower, estimate.upper]
+                    if (estimate.evaluated == len(eval_set) and
+                            result["meets_size_target"] and result["meets_quality_target"]):
+                        best_size = model_size
+                
                 results[method] = result
                 
                 # Log results
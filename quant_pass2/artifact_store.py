@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Model Artifact Store
+Content-addressed store for model files. Each file is kept once under the
+SHA-256 of its whole content (dedupe is per file, not per chunk); every model
+version is a JSON manifest of (path, size, digest) entries. Backups, restores and archives
+are hardlinks (or reflinks) to stored objects instead of copies, and the active
+model is a symlink that is flipped atomically to a checked-out version. Stored
+objects never share an inode with the files they were ingested from
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+READ_BLOCK_SIZE = 1024 * 1024
+
+INDEX_FILE = "index.json"
+
+# ioctl request for cloning a file's extents (Linux btrfs/xfs)
+FICLONE = 0x40049409
+
+
+def hash_file(path: Path) -> str:
+    """Plain SHA-256 of a file's content"""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(READ_BLOCK_SIZE)
+            if not block:
+                break
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def tree_digest(files: Iterable[Dict]) -> str:
+    """Digest of a manifest's (path, digest) entries"""
+    hasher = hashlib.sha256()
+    for entry in sorted(files, key=lambda entry: entry["path"]):
+        hasher.update(f"{entry['path']}\0{entry['digest']}\n".encode())
+    return hasher.hexdigest()
+
+
+def place_file(source: Path, destination: Path, hardlink: bool = True) -> str:
+    """
+    Make ``destination`` a copy of ``source`` as cheaply as the filesystem allows
+
+    With ``hardlink=False`` the destination always gets its own inode, so later
+    writes to either file cannot reach the other.
+
+    Returns:
+        "hardlink", "reflink" or "copy"
+    """
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    if hardlink:
+        try:
+            os.link(source, destination)
+            return "hardlink"
+        except OSError:
+            pass
+
+    if sys.platform.startswith('linux'):
+        import fcntl
+        try:
+            with open(source, 'rb') as src, open(destination, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return "reflink"
+        except OSError:
+            destination.unlink(missing_ok=True)
+
+    shutil.copy2(source, destination)
+    return "copy"
+
+
+def _write_json(path: Path, data: Dict):
+    # Write-then-rename so readers never see a partial file
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class ArtifactStore:
+    """
+    Content-addressed, deduplicating store of model versions
+
+    Layout under ``root``::
+
+        objects/ab/abcdef...   one read-only file per distinct content digest
+        manifests/<version>.json
+        checkouts/<version>/   hardlinked trees that active-model symlinks point at
+        index.json             digests of already-hashed files, by inode
+
+    Args:
+        root: Store directory; keep it on the same filesystem as the models so placing files is a hardlink
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.manifests_dir = self.root / "manifests"
+        self.checkouts_dir = self.root / "checkouts"
+        for directory in (self.objects_dir, self.manifests_dir, self.checkouts_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+        self.stats = {"hashed_files": 0, "hashed_bytes": 0, "index_hits": 0, "new_objects": 0}
+
+    def _load_index(self) -> Dict:
+        index_path = self.root / INDEX_FILE
+        if index_path.exists():
+            try:
+                with open(index_path, 'r') as f:
+                    index = json.load(f)
+                # Entries with several chunk digests hold a digest-of-digests, not a plain SHA-256
+                return {key: entry for key, entry in index.items() if len(entry.get("chunks", ())) <= 1}
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"⚠️ Ignoring unreadable store index: {e}")
+        return {}
+
+    def _save_index(self):
+        with self._lock:
+            _write_json(self.root / INDEX_FILE, self._index)
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest
+
+    def manages(self, path: str) -> bool:
+        """Whether a path resolves into the store (a checkout or an object)"""
+        try:
+            Path(path).resolve().relative_to(self.root.resolve())
+            return True
+        except ValueError:
+            return False
+
+    def file_digest(self, path: Path) -> str:
+        """SHA-256 of a file, hashing it only if its inode is not indexed yet"""
+        stat = path.stat()
+        key = f"{stat.st_dev}:{stat.st_ino}"
+        with self._lock:
+            cached = self._index.get(key)
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            with self._lock:
+                self.stats["index_hits"] += 1
+            return cached["digest"]
+
+        digest = hash_file(path)
+        with self._lock:
+            self._index[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": digest}
+            self.stats["hashed_files"] += 1
+            self.stats["hashed_bytes"] += stat.st_size
+        return digest
+
+    def _remember(self, path: Path, digest: str):
+        # A placed file with its own inode (reflink or copy) is known without hashing it again
+        stat = path.stat()
+        with self._lock:
+            self._index[f"{stat.st_dev}:{stat.st_ino}"] = {
+                "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": digest
+            }
+
+    def _store_object(self, source: Path, digest: str, retire: bool = False):
+        object_path = self.object_path(digest)
+        if object_path.exists():
+            if retire:
+                source.unlink()
+            return
+
+        # Placed under a private name first: identical files ingested in parallel must not clobber each other
+        staging = object_path.with_name(f".{digest}.{os.getpid()}.{threading.get_ident()}")
+        staging.parent.mkdir(parents=True, exist_ok=True)
+        moved = False
+        if retire and source.stat().st_nlink == 1:
+            # A retired file with no other links can become the object itself
+            try:
+                os.replace(source, staging)
+                moved = True
+            except OSError:
+                pass
+        if not moved:
+            # Never link the source: it may be rewritten in place, and the object must not change with it
+            place_file(source, staging, hardlink=False)
+            if retire:
+                source.unlink()
+        # Stored objects are shared by every version that contains them; nothing may write to them
+        os.chmod(staging, 0o444)
+        os.replace(staging, object_path)
+        self._remember(object_path, digest)
+        with self._lock:
+            self.stats["new_objects"] += 1
+
+    def ingest(self, source: str, version: str, exclude: Iterable[str] = (), retire: bool = False) -> Dict:
+        """
+        Record a model file or directory as a version
+
+        Files whose content is already stored are not stored again, and files
+        already hashed (same inode, size and mtime) are not read again. New
+        content is reflinked or copied into the store, so the source files stay
+        writable and independent of it. With ``retire=True`` the source is
+        consumed instead: its files are moved into the store where possible and
+        the source is gone afterwards.
+        """
+        source_path = Path(source)
+        excluded = set(exclude)
+        new_objects = self.stats["new_objects"]
+
+        if source_path.is_file():
+            kind = "file"
+            files = [(source_path.name, source_path)]
+        else:
+            kind = "directory"
+            files = []
+            for dirpath, dirnames, filenames in os.walk(source_path):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    file_path = Path(dirpath) / filename
+                    relative = file_path.relative_to(source_path).as_posix()
+                    if relative not in excluded and file_path.is_file():
+                        files.append((relative, file_path))
+
+        def record(item):
+            relative, file_path = item
+            digest = self.file_digest(file_path)
+            size = file_path.stat().st_size
+            self._store_object(file_path, digest, retire=retire)
+            return {"path": relative, "size": size, "digest": digest}
+
+        # hashlib releases the GIL on large reads, so files hash in parallel
+        with ThreadPoolExecutor(max_workers=max(1, min(8, os.cpu_count() or 1, len(files)))) as pool:
+            entries = list(pool.map(record, files))
+
+        if retire and kind == "directory":
+            shutil.rmtree(source_path)
+
+        manifest = {
+            "version": version,
+            "kind": kind,
+            "source": str(source_path),
+            "created_at": datetime.now().isoformat(),
+            "file_count": len(entries),
+            "total_size": sum(entry["size"] for entry in entries),
+            "digest": tree_digest(entries),
+            "files": entries
+        }
+        _write_json(self.manifests_dir / f"{version}.json", manifest)
+        self._save_index()
+
+        logger.info(f"🗃️ Stored version {version}: {len(entries)} files, "
+                    f"{manifest['total_size'] / (1024 * 1024):.1f}MB, {self.stats['new_objects'] - new_objects} new objects")
+        return manifest
+
+    def has_version(self, version: str) -> bool:
+        return (self.manifests_dir / f"{version}.json").exists()
+
+    def load_manifest(self, version: str) -> Dict:
+        with open(self.manifests_dir / f"{version}.json", 'r') as f:
+            return json.load(f)
+
+    def list_versions(self) -> List[Dict]:
+        """Manifest summaries, newest first"""
+        versions = []
+        for manifest_path in self.manifests_dir.glob("*.json"):
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+            versions.append({key: manifest[key] for key in
+                             ("version", "kind", "created_at", "file_count", "total_size", "digest")})
+        return sorted(versions, key=lambda version: version["created_at"], reverse=True)
+
+    def place(self, digest: str, destination: str) -> str:
+        """Materialize one stored object at ``destination``; returns how it was placed"""
+        destination_path = Path(destination)
+        destination_path.unlink(missing_ok=True)
+        return place_file(self.object_path(digest), destination_path)
+
+    def checkout(self, manifest: Dict, destination: str) -> Path:
+        """Materialize a version as a tree of hardlinks (or reflinks) under ``destination``"""
+        destination_path = Path(destination)
+        destination_path.mkdir(parents=True, exist_ok=True)
+
+        methods = {}
+        for entry in manifest["files"]:
+            file_path = destination_path / entry["path"]
+            method = self.place(entry["digest"], file_path)
+            if method != "hardlink":
+                self._remember(file_path, entry["digest"])
+            methods[method] = methods.get(method, 0) + 1
+        if set(methods) - {"hardlink"}:
+            self._save_index()
+
+        logger.info(f"📎 Checked out {manifest['version']} to {destination_path} "
+                    f"({', '.join(f'{count} {method}' for method, count in methods.items()) or 'empty'})")
+        return destination_path
+
+    def activate(self, version: str, link_path: str) -> Path:
+        """
+        Point ``link_path`` at a checkout of ``version``
+
+        The symlink is replaced with a rename, so readers see either the old or
+        the new version. A plain directory at ``link_path`` (from before the
+        store) is removed first.
+        """
+        target = self.checkouts_dir / version
+        if not target.exists():
+            staging = self.checkouts_dir / f".{version}.{os.getpid()}.tmp"
+            shutil.rmtree(staging, ignore_errors=True)
+            self.checkout(self.load_manifest(version), staging)
+            os.replace(staging, target)
+
+        link = Path(link_path)
+        link.parent.mkdir(parents=True, exist_ok=True)
+        if link.exists() and not link.is_symlink():
+            aside = link.with_name(f".{link.name}.{os.getpid()}.old")
+            os.replace(link, aside)
+            if aside.is_dir():
+                shutil.rmtree(aside)
+            else:
+                aside.unlink()
+
+        tmp_link = link.with_name(f".{link.name}.{os.getpid()}.link")
+        tmp_link.unlink(missing_ok=True)
+        try:
+            os.symlink(os.path.relpath(target, link.parent), tmp_link, target_is_directory=True)
+        except OSError as e:
+            # Symlinks can need extra privileges on Windows; fall back to a linked copy in place
+            logger.warning(f"⚠️ Cannot create symlink ({e}), checking out in place")
+            if link.is_symlink():
+                link.unlink()
+            shutil.rmtree(link, ignore_errors=True)
+            return self.checkout(self.load_manifest(version), link)
+
+        os.replace(tmp_link, link)
+        logger.info(f"🔀 {link} -> {version}")
+        return target
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Embedding Store
+Response embeddings keyed by text hash, held as one L2-normalized float32
+matrix (memory-mapped from disk when a directory is given) so that texts are
+encoded once, in large batches, and cosine similarities are matrix products
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILE = "vectors.f32"
+KEYS_FILE = "keys.txt"
+META_FILE = "meta.json"
+
+
+def text_key(text: str) -> str:
+    """Stable hash of a text"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows in place; all-zero rows stay zero"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+class EmbeddingStore:
+    """
+    Text-hash keyed, normalized float32 embedding matrix
+
+    Args:
+        directory: Where vectors are persisted and memory-mapped; None keeps them in memory
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory) if directory else None
+        self.dim: Optional[int] = None
+        self._rows: Dict[str, int] = {}
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._lock = threading.RLock()
+        self.stats = {"hits": 0, "encoded": 0, "encode_calls": 0}
+
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, text: str) -> bool:
+        return text_key(text) in self._rows
+
+    def ensure(self, texts: List[str], encode: Callable[[List[str]], np.ndarray],
+               batch_size: int = 256) -> np.ndarray:
+        """
+        Embed every text not yet stored, ``batch_size`` texts per encode call
+
+        Returns:
+            Row indices of the texts in the store
+        """
+        with self._lock:
+            keys = [text_key(text) for text in texts]
+            missing = {}
+            for key, text in zip(keys, texts):
+                if key not in self._rows and key not in missing:
+                    missing[key] = text
+            self.stats["hits"] += len(texts) - len(missing)
+
+            pending = list(missing.items())
+            for start in range(0, len(pending), batch_size):
+                chunk = pending[start:start + batch_size]
+                vectors = np.array(encode([text for _, text in chunk]), dtype=np.float32, copy=True)
+                self._append([key for key, _ in chunk], normalize_rows(vectors.reshape(len(chunk), -1)))
+                self.stats["encode_calls"] += 1
+                self.stats["encoded"] += len(chunk)
+
+            return np.fromiter((self._rows[key] for key in keys), dtype=np.int64, count=len(keys))
+
+    def vectors(self, texts: List[str]) -> np.ndarray:
+        """Normalized embeddings of already stored texts"""
+        with self._lock:
+            return self._matrix[[self._rows[text_key(text)] for text in texts]]
+
+    def similarity_matrix(self, texts_a: List[str], texts_b: Optional[List[str]] = None) -> np.ndarray:
+        """Cosine similarity of every text in ``texts_a`` with every text in ``texts_b``"""
+        vectors_a = self.vectors(texts_a)
+        vectors_b = vectors_a if texts_b is None else self.vectors(texts_b)
+        return vectors_a @ vectors_b.T
+
+    def paired_similarity(self, texts_a: List[str], texts_b: List[str]) -> np.ndarray:
+        """Cosine similarity of ``texts_a[i]`` with ``texts_b[i]`` for each i"""
+        return np.einsum('ij,ij->i', self.vectors(texts_a), self.vectors(texts_b))
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.stats, "stored": len(self._rows), "dim": self.dim or 0}
+
+    def _append(self, keys: List[str], vectors: np.ndarray):
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            if self.directory:
+                with open(self.directory / META_FILE, 'w') as f:
+                    json.dump({"dim": self.dim, "dtype": "float32"}, f)
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match store dimension {self.dim}")
+
+        start = len(self._rows)
+        if self.directory:
+            # Vectors first, keys second: a torn write leaves surplus vectors, trimmed on load
+            with open(self.directory / VECTORS_FILE, 'ab') as f:
+                f.write(vectors.tobytes())
+            with open(self.directory / KEYS_FILE, 'a', encoding='utf-8') as f:
+                f.write("".join(f"{key}\n" for key in keys))
+            self._matrix = self._map(start + len(keys))
+        else:
+            self._matrix = np.vstack([self._matrix.reshape(-1, self.dim), vectors])
+
+        for offset, key in enumerate(keys):
+            self._rows[key] = start + offset
+
+    def _map(self, rows: int) -> np.ndarray:
+        if rows == 0:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.memmap(self.directory / VECTORS_FILE, dtype=np.float32, mode='r', shape=(rows, self.dim))
+
+    def _load(self):
+        meta_path = self.directory / META_FILE
+        if not meta_path.exists():
+            return
+        with open(meta_path) as f:
+            self.dim = json.load(f)["dim"]
+
+        keys_path = self.directory / KEYS_FILE
+        vectors_path = self.directory / VECTORS_FILE
+        keys = []
+        if keys_path.exists():
+            with open(keys_path, encoding='utf-8') as f:
+                keys = [line.strip() for line in f if line.strip()]
+        row_bytes = self.dim * np.dtype(np.float32).itemsize
+        stored_rows = vectors_path.stat().st_size // row_bytes if vectors_path.exists() else 0
+
+        rows = min(len(keys), stored_rows)
+        if stored_rows != rows or (vectors_path.exists() and vectors_path.stat().st_size != rows * row_bytes):
+            os.truncate(vectors_path, rows * row_bytes)
+        if len(keys) != rows:
+            keys = keys[:rows]
+            with open(keys_path, 'w', encoding='utf-8') as f:
+                f.write("".join(f"{key}\n" for key in keys))
+
+        self._rows = {key: row for row, key in enumerate(keys)}
+        self._matrix = self._map(rows)
+        logger.info(f"📂 Loaded {rows} cached embeddings ({self.dim}-d)")
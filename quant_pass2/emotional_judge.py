@@ -5,21 +5,45 @@ Creates an ensemble of judge models for comparative emotional evaluation
 """
 
 import os
+import re
 import json
+import hashlib
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass, asdict
 import time
 from datetime import datetime
 
+import numpy as np
+import psutil
 import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
+from transformers import AutoTokenizer, AutoModelForCausalLM
+
+from generation_engine import GenerationEngine, TransformersBackend
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Map judge names to actual model paths
+JUDGE_MODEL_PATHS = {
+    "llama2-uncensored": "meta-llama/Llama-2-7b-chat-hf",  # Fallback to available model
+    "mistral:7b-instruct-q4_K_M": "mistralai/Mistral-7B-Instruct-v0.1"
+}
+
+# Judgments are 2-3 sentences; low temperature for more consistent judgment
+JUDGE_GENERATION_PARAMS = {
+    "max_new_tokens": 150,
+    "do_sample": True,
+    "temperature": 0.3,
+    "top_p": 0.9
+}
+
+VOTE_OPTIONS = ("a", "b", "tie")
+
 @dataclass
 class JudgeVote:
     """Individual judge vote on a comparison"""
@@ -46,11 +70,51 @@ class EnsembleJudgment:
     disagreement_level: float
     emotional_analysis: Dict
 
+def comparison_key(comparison: Dict) -> str:
+    """Stable hash of a comparison's prompt, models and responses"""
+    fields = [comparison[name] for name in ("prompt", "model_a", "model_b", "response_a", "response_b")]
+    return hashlib.blake2b(json.dumps(fields, ensure_ascii=False).encode('utf-8'), digest_size=16).hexdigest()
+
+class VoteCheckpoint:
+    """Append-only JSONL of one judge's votes, so an interrupted run resumes where it stopped"""
+    
+    def __init__(self, checkpoint_dir: str, judge_name: str):
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', judge_name)
+        self.path = Path(checkpoint_dir) / f"{safe_name}.jsonl"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+    
+    def load(self) -> Dict[str, JudgeVote]:
+        """Votes already recorded, by comparison key"""
+        votes = {}
+        if not self.path.exists():
+            return votes
+        
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    votes[record['key']] = JudgeVote(**record['vote'])
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    continue  # Torn write from an interrupted run
+        return votes
+    
+    def append(self, key: str, vote: JudgeVote):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"key": key, "vote": asdict(vote)}, ensure_ascii=False) + "\n")
+
+def _judge_worker(judge_name: str, comparisons: List[Dict], batch_size: int,
+                  checkpoint_dir: Optional[str]) -> List[JudgeVote]:
+    """Process pool entry point: load one judge and vote on every comparison"""
+    judge = EmotionalJudge([judge_name], checkpoint_dir=checkpoint_dir)
+    return judge.judge_batch(judge_name, comparisons, batch_size=batch_size, checkpoint_dir=checkpoint_dir)
+
 class EmotionalJudge:
     """Ensemble emotional judging system using multiple AI models"""
     
-    def __init__(self, judge_models: List[str] = None):
+    def __init__(self, judge_models: List[str] = None,
+                 checkpoint_dir: Optional[str] = "quant_pass2/results/judge_checkpoints"):
         self.judge_models = judge_models or ["llama2-uncensored", "mistral:7b-instruct-q4_K_M"]
+        self.checkpoint_dir = checkpoint_dir
         self.loaded_judges = {}
         self.judgment_history = []
         
@@ -92,13 +156,7 @@ Which response (A or B) is more appropriate and effective? Provide your analysis
         logger.info(f"📥 Loading judge model: {model_name}")
         
         try:
-            # Map model names to actual model paths
-            model_mapping = {
-                "llama2-uncensored": "meta-llama/Llama-2-7b-chat-hf",  # Fallback to available model
-                "mistral:7b-instruct-q4_K_M": "mistralai/Mistral-7B-Instruct-v0.1"
-            }
-            
-            actual_model_path = model_mapping.get(model_name, model_name)
+            actual_model_path = JUDGE_MODEL_PATHS.get(model_name, model_name)
             
             tokenizer = AutoTokenizer.from_pretrained(
                 actual_model_path,
@@ -124,76 +182,100 @@ Which response (A or B) is more appropriate and effective? Provide your analysis
             logger.error(f"❌ Failed to load judge {model_name}: {e}")
             raise
     
-    def generate_judge_evaluation(self, judge_name: str, prompt: str, response_a: str, response_b: str) -> JudgeVote:
-        """Generate evaluation from a specific judge"""
-        try:
-            model, tokenizer = self.load_judge_model(judge_name)
-            persona = self.judge_personas.get(judge_name, self.judge_personas["mistral:7b-instruct-q4_K_M"])
-            
-            # Construct evaluation prompt
-            evaluation_prompt = f"""
+    def _evaluation_prompt(self, judge_name: str, comparison: Dict) -> str:
+        persona = self.judge_personas.get(judge_name, self.judge_personas["mistral:7b-instruct-q4_K_M"])
+        
+        return f"""
 {persona['evaluation_prompt']}
 
-Original Situation: {prompt}
+Original Situation: {comparison['prompt']}
 
-Response A: {response_a}
+Response A: {comparison['response_a']}
 
-Response B: {response_b}
+Response B: {comparison['response_b']}
 
 Evaluation: [Choose A, B, or TIE and explain your reasoning in 2-3 sentences focusing on emotional intelligence and appropriateness]
 """
-            
-            # Generate judgment
-            generator = pipeline(
-                "text-generation",
-                model=model,
-                tokenizer=tokenizer,
-                torch_dtype=torch.float16,
-                device_map="auto",
-                return_full_text=False
-            )
-            
-            judgment = generator(
-                evaluation_prompt,
-                max_length=300,
-                do_sample=True,
-                temperature=0.3,  # Lower temperature for more consistent judgment
-                top_p=0.9,
-                pad_token_id=tokenizer.eos_token_id
-            )
-            
-            judgment_text = judgment[0]['generated_text'].strip()
-            
-            # Parse judgment
-            vote, confidence, reasoning = self._parse_judgment(judgment_text)
-            
-            # Analyze emotional aspects
-            emotional_aspects = self._analyze_emotional_aspects(response_a, response_b, judgment_text)
-            
-            return JudgeVote(
-                judge_name=judge_name,
-                model_a_response=response_a,
-                model_b_response=response_b,
-                prompt=prompt,
-                vote=vote,
-                confidence=confidence,
-                reasoning=reasoning,
-                emotional_aspects=emotional_aspects
-            )
-            
-        except Exception as e:
-            logger.error(f"❌ Judge evaluation failed for {judge_name}: {e}")
-            # Return default vote
+    
+    def _vote_from_judgment(self, judge_name: str, comparison: Dict, judgment_text: str) -> JudgeVote:
+        """Parse a judge's generated text into a vote; empty text means the evaluation failed"""
+        response_a, response_b = comparison['response_a'], comparison['response_b']
+        
+        if not judgment_text:
             return JudgeVote(
                 judge_name=judge_name,
                 model_a_response=response_a,
                 model_b_response=response_b,
-                prompt=prompt,
+                prompt=comparison['prompt'],
                 vote="tie",
                 confidence=0.0,
                 reasoning="Evaluation failed",
                 emotional_aspects={}
             )
+        
+        vote, confidence, reasoning = self._parse_judgment(judgment_text)
+        
+        return JudgeVote(
+            judge_name=judge_name,
+            model_a_response=response_a,
+            model_b_response=response_b,
+            prompt=comparison['prompt'],
+            vote=vote,
+            confidence=confidence,
+            reasoning=reasoning,
+            emotional_aspects=self._analyze_emotional_aspects(response_a, response_b, judgment_text)
+        )
+    
+    def _judge_engine(self, judge_name: str, batch_size: int) -> GenerationEngine:
+        model, tokenizer = self.load_judge_model(judge_name)
+        return GenerationEngine(TransformersBackend(model=model, tokenizer=tokenizer), batch_size=batch_size)
+    
+    def judge_batch(self, judge_name: str, comparisons: List[Dict], batch_size: int = 8,
+                    checkpoint_dir: Optional[str] = None) -> List[JudgeVote]:
+        """
+        One judge's votes on many comparisons, generated in padded length-bucketed batches
+        
+        With ``checkpoint_dir`` set, each vote is appended to disk as soon as its
+        batch finishes and votes already there are not generated again.
+        """
+        checkpoint = VoteCheckpoint(checkpoint_dir, judge_name) if checkpoint_dir else None
+        keys = [comparison_key(comparison) for comparison in comparisons]
+        recorded = checkpoint.load() if checkpoint else {}
+        votes = [recorded.get(key) for key in keys]
+        pending = [i for i, vote in enumerate(votes) if vote is None]
+        
+        if len(pending) < len(comparisons):
+            logger.info(f"📂 {judge_name}: resuming with {len(comparisons) - len(pending)} checkpointed votes")
+        
+        if pending:
+            try:
+                engine = self._judge_engine(judge_name, batch_size)
+                prompts = [self._evaluation_prompt(judge_name, comparisons[i]) for i in pending]
+                
+                for position, judgment_text in engine.stream(prompts, JUDGE_GENERATION_PARAMS):
+                    index = pending[position]
+                    votes[index] = self._vote_from_judgment(judge_name, comparisons[index], judgment_text)
+                    # Failed evaluations are not checkpointed, so the next run retries them
+                    if checkpoint and judgment_text:
+                        checkpoint.append(keys[index], votes[index])
+                
+                logger.info(f"⚡ {judge_name}: {engine.stats.tokens_per_second:.1f} tokens/s")
+            except Exception as e:
+                logger.error(f"❌ Judge evaluation failed for {judge_name}: {e}")
+        
+        return [vote or self._vote_from_judgment(judge_name, comparison, "")
+                for vote, comparison in zip(votes, comparisons)]
+    
+    def generate_judge_evaluation(self, judge_name: str, prompt: str, response_a: str, response_b: str) -> JudgeVote:
+        """Generate evaluation from a specific judge"""
+        comparison = {
+            "prompt": prompt,
+            "model_a": "",
+            "model_b": "",
+            "response_a": response_a,
+            "response_b": response_b
+        }
+        return self.judge_batch(judge_name, [comparison], batch_size=1)[0]
     
     def _parse_judgment(self, judgment_text: str) -> Tuple[str, float, str]:
         """Parse judge's text response into vote, confidence, and reasoning"""
@@ -299,34 +381,31 @@ Evaluation: [Choose A, B, or TIE and explain your reasoning in 2-3 sentences foc
     
     def _calculate_consensus(self, votes: List[JudgeVote]) -> Tuple[str, float, float]:
         """Calculate consensus vote from all judges"""
-        if not votes:
-            return "tie", 0.0, 1.0
-        
-        # Count votes
-        vote_counts = {"a": 0, "b": 0, "tie": 0}
-        total_confidence = 0
-        
-        for vote in votes:
-            vote_counts[vote.vote] += 1
-            total_confidence += vote.confidence
-        
-        # Determine consensus
-        max_votes = max(vote_counts.values())
-        consensus_options = [vote for vote, count in vote_counts.items() if count == max_votes]
-        
-        if len(consensus_options) == 1:
-            consensus_vote = consensus_options[0]
-        else:
-            consensus_vote = "tie"  # No clear majority
-        
-        # Calculate confidence
-        consensus_confidence = total_confidence / len(votes) if votes else 0.0
-        
-        # Calculate disagreement level
-        total_votes = sum(vote_counts.values())
-        disagreement = 1.0 - (max_votes / total_votes) if total_votes > 0 else 1.0
-        
-        return consensus_vote, consensus_confidence, disagreement
+        consensus, confidence, disagreement = self._calculate_consensus_batch([votes])
+        return consensus[0], float(confidence[0]), float(disagreement[0])
+    
+    def _calculate_consensus_batch(self, votes_per_comparison: List[List[JudgeVote]]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """Consensus vote, mean confidence and disagreement level of every comparison at once"""
+        n = len(votes_per_comparison)
+        flat_votes = [vote for votes in votes_per_comparison for vote in votes]
+        rows = np.repeat(np.arange(n), [len(votes) for votes in votes_per_comparison])
+        columns = np.array([VOTE_OPTIONS.index(vote.vote) for vote in flat_votes], dtype=np.int64)
+        
+        # (comparisons, options) vote counts
+        counts = np.zeros((n, len(VOTE_OPTIONS)))
+        np.add.at(counts, (rows, columns), 1)
+        total_confidence = np.bincount(rows, weights=[vote.confidence for vote in flat_votes], minlength=n)
+        
+        totals = counts.sum(axis=1)
+        max_votes = counts.max(axis=1)
+        # A clear majority needs a single option with the most votes; otherwise it's a tie
+        clear = ((counts == max_votes[:, None]).sum(axis=1) == 1) & (totals > 0)
+        winners = np.where(clear, counts.argmax(axis=1), VOTE_OPTIONS.index("tie"))
+        
+        confidence = np.divide(total_confidence, totals, out=np.zeros(n), where=totals > 0)
+        disagreement = 1.0 - np.divide(max_votes, totals, out=np.zeros(n), where=totals > 0)
+        
+        return [VOTE_OPTIONS[winner] for winner in winners], confidence, disagreement
     
     def _compile_emotional_analysis(self, votes: List[JudgeVote]) -> Dict:
         """Compile emotional analysis from all judge votes"""
@@ -353,34 +432,108 @@ Evaluation: [Choose A, B, or TIE and explain your reasoning in 2-3 sentences foc
             "consensus_strength": len([v for v in votes if v.confidence > 0.7]) / len(votes)
         }
     
-    def batch_judge_comparisons(self, comparisons: List[Dict]) -> List[EnsembleJudgment]:
-        """Process multiple comparisons in batch"""
+    def estimate_judge_memory_gb(self, judge_name: str) -> float:
+        """Rough memory footprint of a loaded judge in GB"""
+        model_path = Path(JUDGE_MODEL_PATHS.get(judge_name, judge_name))
+        
+        if model_path.is_dir():
+            weights = [f for f in model_path.iterdir() if f.suffix in (".safetensors", ".bin", ".pt")]
+            if weights:
+                return 1.2 * sum(f.stat().st_size for f in weights) / 1024**3
+        
+        # Hub names carry the parameter count, e.g. "7b" or "13B"; fp16 is 2 bytes per parameter
+        match = re.search(r'(\d+(?:\.\d+)?)[bB]\b', str(model_path))
+        billions = float(match.group(1)) if match else 7.0
+        return 1.2 * billions * 2
+    
+    def parallel_judge_slots(self, max_workers: Optional[int] = None) -> int:
+        """How many judges fit in memory side by side"""
+        if len(self.judge_models) < 2 or max_workers == 1:
+            return 1
+        
+        available_gb = psutil.virtual_memory().available / 1024**3
+        if torch.cuda.is_available():
+            available_gb = min(available_gb, sum(
+                torch.cuda.mem_get_info(device)[0] for device in range(torch.cuda.device_count())
+            ) / 1024**3)
+        
+        needed_gb = max(self.estimate_judge_memory_gb(judge_name) for judge_name in self.judge_models)
+        slots = int(available_gb // needed_gb)
+        
+        return max(1, min(len(self.judge_models), slots, max_workers or len(self.judge_models)))
+    
+    def _collect_judge_votes(self, comparisons: List[Dict], batch_size: int,
+                             max_workers: Optional[int]) -> Dict[str, List[JudgeVote]]:
+        """Votes of every judge on every comparison, judges running concurrently when they fit"""
+        workers = self.parallel_judge_slots(max_workers)
+        votes_by_judge = {}
+        
+        if workers > 1:
+            logger.info(f"🏛️ Running {len(self.judge_models)} judges across {workers} processes")
+            # CUDA cannot be re-initialized in forked children
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                futures = {
+                    judge_name: pool.submit(_judge_worker, judge_name, comparisons, batch_size, self.checkpoint_dir)
+                    for judge_name in self.judge_models
+                }
+                for judge_name, future in futures.items():
+                    try:
+                        votes_by_judge[judge_name] = future.result()
+                    except Exception as e:
+                        logger.error(f"❌ Judge process failed for {judge_name}: {e}")
+                        votes_by_judge[judge_name] = [
+                            self._vote_from_judgment(judge_name, comparison, "") for comparison in comparisons
+                        ]
+            return votes_by_judge
+        
+        for judge_name in self.judge_models:
+            votes_by_judge[judge_name] = self.judge_batch(
+                judge_name, comparisons, batch_size=batch_size, checkpoint_dir=self.checkpoint_dir
+            )
+            # The judges do not fit together, so free this one before loading the next
+            if len(self.judge_models) > 1:
+                self.loaded_judges.pop(judge_name, None)
+                torch.cuda.empty_cache()
+        
+        return votes_by_judge
+    
+    def batch_judge_comparisons(self, comparisons: List[Dict], batch_size: int = 8,
+                                max_workers: Optional[int] = None) -> List[EnsembleJudgment]:
+        """
+        Process multiple comparisons in batch
+        
+        Each judge evaluates all comparisons in padded batches of ``batch_size``;
+        judges run in a process pool when several fit in memory.
+        """
         logger.info(f"🔄 Processing {len(comparisons)} comparisons")
         
-        judgments = []
+        if not comparisons:
+            return []
         
-        for i, comparison in enumerate(comparisons):
-            try:
-                judgment = self.judge_comparison(
-                    comparison['prompt'],
-                    comparison['model_a'],
-                    comparison['model_b'],
-                    comparison['response_a'],
-                    comparison['response_b']
-                )
-                judgments.append(judgment)
-                
-                # Progress logging
-                if (i + 1) % 5 == 0:
-                    logger.info(f"📊 Processed {i + 1}/{len(comparisons)} judgments")
-                
-                # Clean up GPU memory periodically
-                if (i + 1) % 10 == 0:
-                    torch.cuda.empty_cache()
-                
-            except Exception as e:
-                logger.error(f"❌ Failed to judge comparison {i}: {e}")
+        votes_by_judge = self._collect_judge_votes(comparisons, batch_size, max_workers)
+        votes_per_comparison = [
+            [votes_by_judge[judge_name][i] for judge_name in self.judge_models]
+            for i in range(len(comparisons))
+        ]
+        consensus, confidence, disagreement = self._calculate_consensus_batch(votes_per_comparison)
         
+        judgments = []
+        for i, (comparison, judge_votes) in enumerate(zip(comparisons, votes_per_comparison)):
+            judgments.append(EnsembleJudgment(
+                prompt=comparison['prompt'],
+                model_a=comparison['model_a'],
+                model_b=comparison['model_b'],
+                response_a=comparison['response_a'],
+                response_b=comparison['response_b'],
+                judge_votes=judge_votes,
+                consensus_vote=consensus[i],
+                confidence_score=float(confidence[i]),
+                disagreement_level=float(disagreement[i]),
+                emotional_analysis=self._compile_emotional_analysis(judge_votes)
+            ))
+        
+        self.judgment_history.extend(judgments)
         logger.info(f"✅ Completed {len(judgments)} judgments")
         return judgments
     
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Batched Generation Engine
+Loads a model once and generates responses for many prompts in length-bucketed,
+padded batches, streaming each finished response to disk and reporting
+throughput in tokens per second. Works on CPU-only machines.
+"""
+
+import json
+import time
+import logging
+from pathlib import Path
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class GenerationStats:
+    """Throughput of an engine over its lifetime"""
+    prompts: int = 0
+    batches: int = 0
+    generated_tokens: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.generated_tokens / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "tokens_per_second": self.tokens_per_second}
+
+
+class TransformersBackend:
+    """Causal LM and tokenizer loaded once, generating one padded batch at a time"""
+
+    def __init__(self, model=None, tokenizer=None, model_path: Optional[str] = None,
+                 device: Optional[str] = None):
+        import torch
+
+        if model is None or tokenizer is None:
+            from transformers import AutoTokenizer, AutoModelForCausalLM
+
+            logger.info(f"📥 Loading generation model: {model_path}")
+            device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+            tokenizer = AutoTokenizer.from_pretrained(model_path, trust_remote_code=True)
+            model = AutoModelForCausalLM.from_pretrained(
+                model_path,
+                # Half precision only pays off (and is only well supported) on GPU
+                torch_dtype=torch.float16 if device == "cuda" else torch.float32,
+                trust_remote_code=True
+            ).to(device)
+
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        # Decoder-only models must be left-padded so generation continues from the prompt
+        tokenizer.padding_side = "left"
+
+        self.torch = torch
+        self.model = model.eval()
+        self.tokenizer = tokenizer
+        self.device = device or str(next(model.parameters()).device)
+
+    def count_tokens(self, prompts: List[str]) -> List[int]:
+        return [len(ids) for ids in self.tokenizer(prompts)["input_ids"]]
+
+    def generate_batch(self, prompts: List[str], params: Dict[str, Any]) -> List[Tuple[str, int]]:
+        """Responses and generated token counts for one batch"""
+        encoded = self.tokenizer(prompts, return_tensors="pt", padding=True).to(self.device)
+        prompt_length = encoded["input_ids"].shape[1]
+
+        kwargs = {k: v for k, v in params.items() if k not in ("max_length", "max_new_tokens")}
+        # max_length is per prompt; with padding the longest prompt in the bucket sets the budget
+        max_new_tokens = params.get("max_new_tokens") or max(1, params.get("max_length", 200) - prompt_length)
+
+        with self.torch.inference_mode():
+            output = self.model.generate(
+                **encoded,
+                max_new_tokens=max_new_tokens,
+                pad_token_id=self.tokenizer.pad_token_id,
+                **kwargs
+            )
+
+        generated = output[:, prompt_length:]
+        token_counts = (generated != self.tokenizer.pad_token_id).sum(dim=1).tolist()
+        texts = self.tokenizer.batch_decode(generated, skip_special_tokens=True)
+        return [(text.strip(), count) for text, count in zip(texts, token_counts)]
+
+
+class GenerationEngine:
+    """
+    Length-bucketed batched generation over a backend
+
+    Args:
+        backend: Object with ``count_tokens(prompts)`` and ``generate_batch(prompts, params)``
+        batch_size: Maximum prompts per batch
+        max_batch_tokens: Optional cap on padded prompt tokens per batch
+    """
+
+    def __init__(self, backend, batch_size: int = 4, max_batch_tokens: Optional[int] = None):
+        self.backend = backend
+        self.batch_size = max(1, batch_size)
+        self.max_batch_tokens = max_batch_tokens
+        self.stats = GenerationStats()
+
+    def buckets(self, prompts: List[str]) -> List[List[int]]:
+        """Prompt indices grouped into batches of similar length, so little compute goes to padding"""
+        lengths = self.backend.count_tokens(prompts)
+        order = sorted(range(len(prompts)), key=lambda i: lengths[i])
+
+        batches, current = [], []
+        for index in order:
+            # Sorted ascending, so this prompt is the longest (and sets the padded width) of the batch
+            padded = lengths[index] * (len(current) + 1)
+            if current and (len(current) >= self.batch_size or
+                            (self.max_batch_tokens and padded > self.max_batch_tokens)):
+                batches.append(current)
+                current = []
+            current.append(index)
+        if current:
+            batches.append(current)
+        return batches
+
+    def stream(self, prompts: List[str], params: Dict[str, Any]) -> Iterator[Tuple[int, str]]:
+        """Yield (prompt index, response) as each batch completes; failed batches yield empty responses"""
+        batches = self.buckets(prompts)
+        done = 0
+        for batch in batches:
+            started = time.perf_counter()
+            try:
+                outputs = self.backend.generate_batch([prompts[i] for i in batch], params)
+            except Exception as e:
+                logger.error(f"❌ Batch generation failed: {e}")
+                outputs = [("", 0)] * len(batch)
+            elapsed = time.perf_counter() - started
+
+            self.stats.batches += 1
+            self.stats.prompts += len(batch)
+            self.stats.elapsed_seconds += elapsed
+            batch_tokens = sum(count for _, count in outputs)
+            self.stats.generated_tokens += batch_tokens
+            done += len(batch)
+            logger.info(
+                f"⚡ Generated {done}/{len(prompts)} responses "
+                f"({batch_tokens / elapsed if elapsed > 0 else 0.0:.1f} tok/s batch, "
+                f"{self.stats.tokens_per_second:.1f} tok/s overall)"
+            )
+
+            for index, (text, _) in zip(batch, outputs):
+                yield index, text
+
+    def generate(self, prompts: List[str], params: Dict[str, Any],
+                 output_path: Optional[str] = None) -> List[str]:
+        """
+        Responses for all prompts, in input order
+
+        With ``output_path`` set, each response is appended to that JSONL file
+        as soon as its batch finishes.
+        """
+        responses = [""] * len(prompts)
+        output = None
+        if output_path:
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            output = open(output_path, 'a', encoding='utf-8')
+        try:
+            for index, text in self.stream(prompts, params):
+                responses[index] = text
+                if output is not None:
+                    output.write(json.dumps({"index": index, "prompt": prompts[index], "response": text},
+                                            ensure_ascii=False) + "\n")
+                    output.flush()
+        finally:
+            if output is not None:
+                output.close()
+        return responses
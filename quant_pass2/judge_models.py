@@ -15,7 +15,7 @@ import time
 from datetime import datetime
 
 import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
+from transformers import AutoTokenizer, AutoModelForCausalLM
 from sentence_transformers import SentenceTransformer
 
 # Import emotion tracker from Pass 1
@@ -23,6 +23,10 @@ import sys
 sys.path.append('../quant_pass1')
 from emotion_tracker import EmotionTracker
 
+from embedding_store import EmbeddingStore
+from generation_engine import GenerationEngine, TransformersBackend
+from response_cache import ResponseCache
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -59,10 +63,15 @@ class JudgmentConfig:
     original_model_path: str = "meta-llama/Llama-2-13b-chat-hf"
     eval_set_path: str = "quant_pass1/emotional_eval_set.jsonl"
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    embedding_batch_size: int = 64
+    embedding_cache_dir: str = "quant_pass2/results/embedding_cache"
     max_length: int = 200
     temperature: float = 0.7
     sample_size: int = 20  # Number of prompts to test
+    sample_seed: Optional[int] = 42  # Fixed sample so cached responses are reused across runs
     batch_size: int = 4
+    top_p: float = 0.9
+    response_cache_dir: str = "quant_pass2/results/response_cache"
     
 class ModelJudge:
     """Comprehensive model comparison and judging system"""
@@ -75,10 +84,18 @@ class ModelJudge:
         self.original_model = None
         self.original_tokenizer = None
         self.comparison_results = []
+        self._evaluation_prompts = None
         
         # Create results directory
         Path("quant_pass2/results").mkdir(parents=True, exist_ok=True)
         
+        # Each (model, prompt, params) is generated once and shared by every comparison
+        self.response_cache = ResponseCache(config.response_cache_dir)
+        # Each distinct response is embedded once; the store is per embedding model
+        self.embedding_store = EmbeddingStore(
+            str(Path(config.embedding_cache_dir) / config.embedding_model.replace('/', '__'))
+        )
+        
         logger.info("🏛️ Model Judge initialized")
         
     def load_embedding_model(self):
@@ -180,6 +197,10 @@ class ModelJudge:
                 total_size += file_path.stat().st_size
         return total_size / (1024**3)
     
+    def _model_dtype(self):
+        """Half precision on GPU; CPU-only machines generate in float32"""
+        return torch.float16 if torch.cuda.is_available() else torch.float32
+    
     def load_original_model(self):
         """Load the original unquantized model for comparison"""
         logger.info(f"📥 Loading original model: {self.config.original_model_path}")
@@ -192,7 +213,7 @@ class ModelJudge:
             
             self.original_model = AutoModelForCausalLM.from_pretrained(
                 self.config.original_model_path,
-                torch_dtype=torch.float16,
+                torch_dtype=self._model_dtype(),
                 device_map="auto",
                 trust_remote_code=True
             )
@@ -218,7 +239,7 @@ class ModelJudge:
             
             model = AutoModelForCausalLM.from_pretrained(
                 candidate.path,
-                torch_dtype=torch.float16,
+                torch_dtype=self._model_dtype(),
                 device_map="auto",
                 trust_remote_code=True
             )
@@ -232,48 +253,132 @@ class ModelJudge:
             logger.error(f"❌ Failed to load candidate {candidate.name}: {e}")
             raise
     
+    def _as_candidate(self, model) -> ModelCandidate:
+        """Accept either a ModelCandidate or a bare model path"""
+        if isinstance(model, ModelCandidate):
+            return model
+        return ModelCandidate(
+            name=Path(model).name,
+            path=str(model),
+            size_gb=0.0,
+            quantization_method="unknown",
+            emotional_degradation=0.0,
+            original_metrics={},
+            pass1_score=0.0
+        )
+    
+    def _load_original(self) -> Tuple[AutoModelForCausalLM, AutoTokenizer]:
+        """Original model and tokenizer, loaded on first use"""
+        if self.original_model is None:
+            self.load_original_model()
+        return self.original_model, self.original_tokenizer
+    
+    def generation_params(self) -> Dict[str, Any]:
+        """Generation parameters that identify a cached response"""
+        return {
+            'max_length': self.config.max_length,
+            'do_sample': True,
+            'temperature': self.config.temperature,
+            'top_p': self.config.top_p
+        }
+    
+    def collect_responses(self, model_path: str, prompts: List[str], load_model) -> Dict[str, str]:
+        """
+        Responses of a model to the prompts, generating only those not in the response cache
+        
+        The model is only loaded (via ``load_model``) when something is missing.
+        """
+        checksum = self.response_cache.checksum(model_path)
+        
+        def generate(missing: List[str]):
+            logger.info(f"📝 Generating {len(missing)} uncached responses for {Path(model_path).name}")
+            engine = self.generation_engine(*load_model())
+            for index, response in engine.stream(missing, self.generation_params()):
+                yield missing[index], response
+            logger.info(f"⚡ {Path(model_path).name}: {engine.stats.tokens_per_second:.1f} tokens/s")
+        
+        return self.response_cache.get_or_generate(checksum, prompts, self.generation_params(), generate)
+    
+    def generation_engine(self, model, tokenizer) -> GenerationEngine:
+        """Batched generation engine built once around a loaded model"""
+        return GenerationEngine(TransformersBackend(model=model, tokenizer=tokenizer),
+                                batch_size=self.config.batch_size)
+    
+    def generate_responses(self, model, tokenizer, prompts: List[str]) -> List[str]:
+        """Generate responses for many prompts in padded, length-bucketed batches"""
+        return self.generation_engine(model, tokenizer).generate(prompts, self.generation_params())
+    
     def generate_response(self, model, tokenizer, prompt: str) -> str:
         """Generate response from a model"""
-        try:
-            generator = pipeline(
-                "text-generation",
-                model=model,
-                tokenizer=tokenizer,
-                torch_dtype=torch.float16,
-                device_map="auto",
-                return_full_text=False
-            )
-            
-            response = generator(
-                prompt,
-                max_length=self.config.max_length,
-                do_sample=True,
-                temperature=self.config.temperature,
-                top_p=0.9,
-                pad_token_id=tokenizer.eos_token_id
-            )
-            
-            return response[0]['generated_text'].strip()
-            
-        except Exception as e:
-            logger.error(f"❌ Response generation failed: {e}")
-            return ""
+        return self.generate_responses(model, tokenizer, [prompt])[0]
     
-    def calculate_embedding_similarity(self, text1: str, text2: str) -> float:
-        """Calculate cosine similarity between response embeddings"""
-        if not self.embedding_model or not text1.strip() or not text2.strip():
-            return 0.0
+    def embed_texts(self, texts: List[str]) -> bool:
+        """Embed every not-yet-stored non-empty text in large batches"""
+        if not self.embedding_model:
+            return False
+        
+        texts = [text for text in texts if text.strip()]
+        self.embedding_store.ensure(
+            texts,
+            lambda batch: self.embedding_model.encode(
+                batch, batch_size=self.config.embedding_batch_size, convert_to_numpy=True
+            ),
+            batch_size=self.config.embedding_batch_size * 16
+        )
+        return True
+    
+    def paired_embedding_similarities(self, texts_a: List[str], texts_b: List[str]) -> np.ndarray:
+        """Cosine similarity of texts_a[i] with texts_b[i]; 0.0 where either text is empty"""
+        similarities = np.zeros(len(texts_a), dtype=np.float32)
         
         try:
-            embeddings = self.embedding_model.encode([text1, text2])
-            similarity = np.dot(embeddings[0], embeddings[1]) / (
-                np.linalg.norm(embeddings[0]) * np.linalg.norm(embeddings[1])
-            )
-            return float(similarity)
-            
+            if not self.embed_texts(list(texts_a) + list(texts_b)):
+                return similarities
+            
+            valid = np.array([bool(a.strip()) and bool(b.strip()) for a, b in zip(texts_a, texts_b)], dtype=bool)
+            if valid.any():
+                similarities[valid] = self.embedding_store.paired_similarity(
+                    [a for a, keep in zip(texts_a, valid) if keep],
+                    [b for b, keep in zip(texts_b, valid) if keep]
+                )
         except Exception as e:
             logger.error(f"❌ Embedding similarity calculation failed: {e}")
-            return 0.0
+            similarities[:] = 0.0
+        
+        return similarities
+    
+    def calculate_embedding_similarity(self, text1: str, text2: str) -> float:
+        """Calculate cosine similarity between response embeddings"""
+        return float(self.paired_embedding_similarities([text1], [text2])[0])
+    
+    def model_similarity_matrix(self, model_responses: Dict[str, Dict[str, str]], prompts: List[str]) -> Dict[str, Any]:
+        """
+        Mean per-prompt embedding similarity between every pair of models
+        
+        Args:
+            model_responses: Model name -> prompt -> response
+            prompts: Prompts to compare over
+        """
+        names = list(model_responses)
+        texts = [[model_responses[name].get(prompt, "") for prompt in prompts] for name in names]
+        
+        if not names or not prompts or not self.embed_texts([text for row in texts for text in row]) \
+                or self.embedding_store.dim is None:
+            return {'models': names, 'matrix': []}
+        
+        # (models, prompts, dim) tensor of normalized embeddings; missing responses stay zero
+        mask = np.array([[bool(text.strip()) for text in row] for row in texts], dtype=bool)
+        embeddings = np.zeros((len(names), len(prompts), self.embedding_store.dim), dtype=np.float32)
+        for i, row in enumerate(texts):
+            present = [text for text in row if text.strip()]
+            if present:
+                embeddings[i, mask[i]] = self.embedding_store.vectors(present)
+        
+        totals = np.einsum('ipd,jpd->ij', embeddings, embeddings)
+        counts = mask.astype(np.float32) @ mask.T.astype(np.float32)
+        matrix = np.divide(totals, counts, out=np.zeros_like(totals), where=counts > 0)
+        
+        return {'models': names, 'matrix': matrix.round(4).tolist()}
     
     def calculate_emotional_scores(self, response_a: str, response_b: str, prompt: str) -> Dict[str, Any]:
         """Calculate comprehensive emotional comparison scores"""
@@ -322,7 +427,10 @@ class ModelJudge:
         }
     
     def load_evaluation_prompts(self) -> List[Dict]:
-        """Load evaluation prompts from Pass 1"""
+        """Load evaluation prompts from Pass 1 (sampled once per judge)"""
+        if self._evaluation_prompts is not None:
+            return self._evaluation_prompts
+        
         try:
             with open(self.config.eval_set_path, 'r', encoding='utf-8') as f:
                 prompts = [json.loads(line) for line in f]
@@ -330,44 +438,53 @@ class ModelJudge:
             # Sample subset for efficiency
             if len(prompts) > self.config.sample_size:
                 import random
-                prompts = random.sample(prompts, self.config.sample_size)
+                prompts = random.Random(self.config.sample_seed).sample(prompts, self.config.sample_size)
             
             logger.info(f"📋 Loaded {len(prompts)} evaluation prompts")
+            self._evaluation_prompts = prompts
             return prompts
             
         except Exception as e:
             logger.error(f"❌ Failed to load evaluation prompts: {e}")
             return []
     
-    def compare_models_pairwise(self, model_a: ModelCandidate, model_b: ModelCandidate) -> List[ComparisonResult]:
+    def compare_models_pairwise(self, model_a, model_b,
+                                prompts: Optional[List[Dict]] = None) -> List[ComparisonResult]:
         """Compare two models across all evaluation prompts"""
+        model_a = self._as_candidate(model_a)
+        model_b = self._as_candidate(model_b)
         logger.info(f"⚖️ Comparing {model_a.name} vs {model_b.name}")
         
-        # Load models
+        # Load evaluation prompts
+        if prompts is None:
+            prompts = self.load_evaluation_prompts()
+        prompt_texts = [prompt_data['prompt'] for prompt_data in prompts]
+        
+        # Fetch (or generate once) each model's responses
         try:
-            model_a_obj, tokenizer_a = self.load_candidate_model(model_a)
-            model_b_obj, tokenizer_b = self.load_candidate_model(model_b)
+            responses_a = self.collect_responses(model_a.path, prompt_texts, lambda: self.load_candidate_model(model_a))
+            responses_b = self.collect_responses(model_b.path, prompt_texts, lambda: self.load_candidate_model(model_b))
         except Exception as e:
             logger.error(f"❌ Failed to load models for comparison: {e}")
             return []
+        torch.cuda.empty_cache()
         
-        # Load evaluation prompts
-        prompts = self.load_evaluation_prompts()
         results = []
         
+        # All embedding similarities for the pair in one batched pass
+        similarities = self.paired_embedding_similarities(
+            [responses_a[prompt] for prompt in prompt_texts], [responses_b[prompt] for prompt in prompt_texts]
+        )
+        
         try:
-            for i, prompt_data in enumerate(prompts):
-                prompt = prompt_data['prompt']
-                
-                # Generate responses
-                response_a = self.generate_response(model_a_obj, tokenizer_a, prompt)
-                response_b = self.generate_response(model_b_obj, tokenizer_b, prompt)
+            for i, prompt in enumerate(prompt_texts):
+                response_a = responses_a[prompt]
+                response_b = responses_b[prompt]
                 
                 if not response_a or not response_b:
                     continue
                 
-                # Calculate embedding similarity
-                embedding_sim = self.calculate_embedding_similarity(response_a, response_b)
+                embedding_sim = float(similarities[i])
                 
                 # Calculate emotional scores
                 emotion_analysis = self.calculate_emotional_scores(response_a, response_b, prompt)
@@ -404,10 +521,6 @@ class ModelJudge:
                 if (i + 1) % 5 == 0:
                     logger.info(f"📊 Processed {i + 1}/{len(prompts)} comparisons")
             
-            # Clean up models from memory
-            del model_a_obj, model_b_obj
-            torch.cuda.empty_cache()
-            
             logger.info(f"✅ Completed comparison: {len(results)} results")
             return results
             
@@ -415,34 +528,42 @@ class ModelJudge:
             logger.error(f"❌ Error during model comparison: {e}")
             return results
     
-    def compare_against_original(self, candidate: ModelCandidate) -> List[ComparisonResult]:
+    def compare_against_original(self, candidate, prompts: Optional[List[Dict]] = None) -> List[ComparisonResult]:
         """Compare candidate model against original"""
+        candidate = self._as_candidate(candidate)
         logger.info(f"🎯 Comparing {candidate.name} against original model")
         
-        # Load candidate model
+        # Load evaluation prompts
+        if prompts is None:
+            prompts = self.load_evaluation_prompts()
+        prompt_texts = [prompt_data['prompt'] for prompt_data in prompts]
+        
+        # The original's responses are generated once and shared by every candidate
         try:
-            candidate_model, candidate_tokenizer = self.load_candidate_model(candidate)
+            original_responses = self.collect_responses(self.config.original_model_path, prompt_texts, self._load_original)
+            candidate_responses = self.collect_responses(candidate.path, prompt_texts, lambda: self.load_candidate_model(candidate))
         except Exception as e:
             logger.error(f"❌ Failed to load candidate model: {e}")
             return []
+        torch.cuda.empty_cache()
         
-        # Load evaluation prompts
-        prompts = self.load_evaluation_prompts()
         results = []
         
+        # All embedding similarities for the pair in one batched pass
+        similarities = self.paired_embedding_similarities(
+            [original_responses[prompt] for prompt in prompt_texts],
+            [candidate_responses[prompt] for prompt in prompt_texts]
+        )
+        
         try:
-            for i, prompt_data in enumerate(prompts):
-                prompt = prompt_data['prompt']
-                
-                # Generate responses
-                original_response = self.generate_response(self.original_model, self.original_tokenizer, prompt)
-                candidate_response = self.generate_response(candidate_model, candidate_tokenizer, prompt)
+            for i, prompt in enumerate(prompt_texts):
+                original_response = original_responses[prompt]
+                candidate_response = candidate_responses[prompt]
                 
                 if not original_response or not candidate_response:
                     continue
                 
-                # Calculate embedding similarity
-                embedding_sim = self.calculate_embedding_similarity(original_response, candidate_response)
+                embedding_sim = float(similarities[i])
                 
                 # Calculate emotional scores
                 emotion_analysis = self.calculate_emotional_scores(original_response, candidate_response, prompt)
@@ -478,10 +599,6 @@ class ModelJudge:
                 if (i + 1) % 5 == 0:
                     logger.info(f"📊 Processed {i + 1}/{len(prompts)} comparisons vs original")
             
-            # Clean up candidate model from memory
-            del candidate_model
-            torch.cuda.empty_cache()
-            
             logger.info(f"✅ Completed original comparison: {len(results)} results")
             return results
             
@@ -489,6 +606,22 @@ class ModelJudge:
             logger.error(f"❌ Error during original comparison: {e}")
             return results
     
+    def collect_all_responses(self, candidates: List[ModelCandidate]) -> Dict[str, Dict[str, str]]:
+        """Responses of the original and every candidate over the evaluation prompts"""
+        prompt_texts = [prompt_data['prompt'] for prompt_data in self.load_evaluation_prompts()]
+        sources = [("original", self.config.original_model_path, self._load_original)]
+        sources += [(c.name, c.path, lambda c=c: self.load_candidate_model(c)) for c in candidates]
+        
+        model_responses = {}
+        for name, path, load_model in sources:
+            try:
+                model_responses[name] = self.collect_responses(path, prompt_texts, load_model)
+            except Exception as e:
+                logger.error(f"❌ Failed to collect responses for {name}: {e}")
+        torch.cuda.empty_cache()
+        
+        return model_responses
+    
     def calculate_model_rankings(self, all_results: List[ComparisonResult]) -> Dict[str, Dict]:
         """Calculate comprehensive rankings for all models"""
         logger.info("🏆 Calculating model rankings")
@@ -591,12 +724,16 @@ class ModelJudge:
             logger.error("❌ No candidate models found")
             return {}
         
-        # Load original model
-        self.load_original_model()
-        
+        # The original model is loaded lazily, only if some of its responses are not cached yet
         all_results = []
         
         try:
+            # Generate (or load cached) responses of every model, then embed them all in batched passes
+            logger.info("📊 Phase 0: Collecting and embedding responses")
+            model_responses = self.collect_all_responses(candidates)
+            prompt_texts = [prompt_data['prompt'] for prompt_data in self.load_evaluation_prompts()]
+            embedding_similarity = self.model_similarity_matrix(model_responses, prompt_texts)
+            
             # Compare each candidate against original
             logger.info("📊 Phase 1: Comparing candidates against original")
             for candidate in candidates:
@@ -624,6 +761,9 @@ class ModelJudge:
                 'model_rankings': model_rankings,
                 'all_comparison_results': [asdict(result) for result in all_results],
                 'top_candidates': list(model_rankings.keys())[:3],
+                'embedding_similarity': embedding_similarity,
+                'response_cache': self.response_cache.get_stats(),
+                'embedding_cache': self.embedding_store.get_stats(),
                 'processing_time': time.time() - start_time
             }
             
@@ -1,17 +1,19 @@
 #!/usr/bin/env python3
 """
 Core Model Replacement System
-Replaces the current companion core model with selected candidate
+Replaces the current companion core model with selected candidate.
+Model versions live in a content-addressed artifact store: backups are
+hardlinked snapshots and the active model is a symlink flipped to a version
 """
 
 import os
 import json
-import shutil
 import logging
 from pathlib import Path
 from typing import Dict, Optional, List
 from datetime import datetime
-import hashlib
+
+from artifact_store import ArtifactStore
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -25,15 +27,21 @@ class CoreModelReplacer:
         self.candidate_dir = os.getenv("CANDIDATE_DIR", "quant_pass1/models")
         self.final_model_dir = os.getenv("FINAL_MODEL_DIR", "core2/models/active_core")
         self.backup_dir = os.getenv("BACKUP_DIR", "quant_pass2/backups")
+        self.store_dir = os.getenv("MODEL_STORE_DIR", "quant_pass2/model_store")
         self.companion_manifest_path = "personas/companion_manifest.json"
+        # Kept beside the active model link: the link itself resolves into a store checkout
+        active_model_path = Path(self.final_model_dir)
+        self.replacement_metadata_path = active_model_path.with_name(f"{active_model_path.name}.replacement_metadata.json")
         
-        # Create necessary directories
-        Path(self.final_model_dir).mkdir(parents=True, exist_ok=True)
+        # Create necessary directories; the active model path itself becomes a symlink on first replacement
+        Path(self.final_model_dir).parent.mkdir(parents=True, exist_ok=True)
         Path(self.backup_dir).mkdir(parents=True, exist_ok=True)
+        self.store = ArtifactStore(self.store_dir)
         
         logger.info("🔄 Core Model Replacer initialized")
         logger.info(f"📁 Final model directory: {self.final_model_dir}")
         logger.info(f"💾 Backup directory: {self.backup_dir}")
+        logger.info(f"🗃️ Model store: {self.store_dir}")
     
     def validate_candidate(self, candidate_path: str) -> Dict:
         """Validate that candidate model is complete and functional"""
@@ -128,8 +136,9 @@ class CoreModelReplacer:
         
         try:
             if active_model_path.exists():
-                # Copy current model to backup
-                shutil.copytree(active_model_path, backup_path, dirs_exist_ok=True)
+                # Snapshot the current model into the store and link it into the backup directory
+                manifest = self.store.ingest(str(active_model_path), backup_name, exclude=["backup_metadata.json"])
+                self.store.checkout(manifest, str(backup_path))
                 
                 # Create backup metadata
                 metadata = {
@@ -137,12 +146,13 @@ class CoreModelReplacer:
                     "timestamp": datetime.now().isoformat(),
                     "original_path": str(active_model_path),
                     "backup_path": str(backup_path),
-                    "file_count": len(list(backup_path.rglob("*"))),
-                    "backup_size_mb": sum(f.stat().st_size for f in backup_path.rglob("*") if f.is_file()) / (1024 * 1024)
+                    "store_version": backup_name,
+                    "checksum": manifest["digest"],
+                    "file_count": manifest["file_count"],
+                    "backup_size_mb": manifest["total_size"] / (1024 * 1024)
                 }
                 
-                with open(backup_path / "backup_metadata.json", 'w') as f:
-                    json.dump(metadata, f, indent=2)
+                self._write_metadata(backup_path / "backup_metadata.json", metadata)
                 
                 logger.info(f"✅ Backup created successfully")
                 logger.info(f"   📁 Location: {backup_path}")
@@ -183,31 +193,27 @@ class CoreModelReplacer:
             backup_path = self.create_backup(backup_name)
             replacement_result["backup_path"] = backup_path
             
-            # Remove existing active model
+            # Store the candidate as a version and flip the active model to it
+            version = f"core_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            manifest = self.store.ingest(candidate_path, version)
             active_model_path = Path(self.final_model_dir)
-            if active_model_path.exists():
-                shutil.rmtree(active_model_path)
-                logger.info("🗑️ Removed old active model")
-            
-            # Copy candidate to active location
-            candidate_dir = Path(candidate_path)
-            shutil.copytree(candidate_dir, active_model_path)
-            logger.info("📋 Copied candidate to active location")
+            self.store.activate(version, str(active_model_path))
+            logger.info("📋 Switched active model to candidate")
             
             # Create replacement metadata
             replacement_info = {
                 "replacement_timestamp": datetime.now().isoformat(),
                 "candidate_source": candidate_path,
                 "backup_location": backup_path,
+                "store_version": version,
                 "model_info": validation["model_info"],
                 "file_count": validation["file_count"],
                 "size_mb": validation["total_size_mb"],
-                "checksum": self._calculate_directory_checksum(active_model_path)
+                "checksum": manifest["digest"]
             }
             
             # Save replacement metadata
-            with open(active_model_path / "replacement_metadata.json", 'w') as f:
-                json.dump(replacement_info, f, indent=2)
+            self._write_metadata(self.replacement_metadata_path, replacement_info)
             
             replacement_result["replacement_info"] = replacement_info
             replacement_result["success"] = True
@@ -283,17 +289,14 @@ class CoreModelReplacer:
                 logger.error(f"❌ Backup directory not found: {backup_path}")
                 return False
             
-            # Remove current active model
-            if active_model_path.exists():
-                shutil.rmtree(active_model_path)
-            
-            # Copy backup to active location
-            shutil.copytree(backup_dir, active_model_path)
+            # Backups made before the store are full copies; store them as a version first
+            version = self._read_metadata(backup_dir / "backup_metadata.json").get("store_version")
+            if not version or not self.store.has_version(version):
+                version = f"restored_{backup_dir.name}"
+                self.store.ingest(str(backup_dir), version, exclude=["backup_metadata.json"])
             
-            # Remove backup metadata file if it exists in active location
-            metadata_file = active_model_path / "backup_metadata.json"
-            if metadata_file.exists():
-                metadata_file.unlink()
+            # Flip the active model back to the backed-up version
+            self.store.activate(version, str(active_model_path))
             
             logger.info("✅ Model restored from backup successfully")
             return True
@@ -332,19 +335,21 @@ class CoreModelReplacer:
         backups.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
         return backups
     
-    def _calculate_directory_checksum(self, directory: Path) -> str:
-        """Calculate checksum for directory contents"""
-        hasher = hashlib.md5()
-        
-        for file_path in sorted(directory.rglob("*")):
-            if file_path.is_file():
-                hasher.update(file_path.name.encode())
-                with open(file_path, 'rb') as f:
-                    # Read file in chunks to handle large files
-                    for chunk in iter(lambda: f.read(8192), b""):
-                        hasher.update(chunk)
-        
-        return hasher.hexdigest()
+    def _write_metadata(self, path: Path, metadata: Dict):
+        """Write a metadata file without touching a stored object of the same name"""
+        # Files in a backup checkout are hardlinks to read-only store objects, so replace rather than overwrite
+        path.unlink(missing_ok=True)
+        with open(path, 'w') as f:
+            json.dump(metadata, f, indent=2)
+    
+    def _read_metadata(self, path: Path) -> Dict:
+        if not path.exists():
+            return {}
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
     
     def get_replacement_status(self) -> Dict:
         """Get status of current active model"""
@@ -359,8 +364,10 @@ class CoreModelReplacer:
         }
         
         if active_model_path.exists():
-            # Check for replacement metadata
-            metadata_file = active_model_path / "replacement_metadata.json"
+            # Check for replacement metadata; models replaced before the store kept it inside the model directory
+            metadata_file = self.replacement_metadata_path
+            if not metadata_file.exists():
+                metadata_file = active_model_path / "replacement_metadata.json"
             if metadata_file.exists():
                 try:
                     with open(metadata_file, 'r') as f:
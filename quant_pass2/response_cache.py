@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Response Store
+Caches model generations by (model checksum, prompt hash, generation params)
+so each model's outputs over the evaluation set are generated once and reused
+by every comparison, across runs
+"""
+
+import json
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Any
+
+logger = logging.getLogger(__name__)
+
+# Files larger than this are fingerprinted by name, size and mtime instead of content
+FULL_HASH_LIMIT_BYTES = 16 * 1024 * 1024
+
+
+def prompt_hash(prompt: str) -> str:
+    """Stable hash of a prompt"""
+    return hashlib.blake2b(prompt.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def params_key(params: Dict[str, Any]) -> str:
+    """Canonical form of generation parameters"""
+    return json.dumps(params, sort_keys=True, separators=(',', ':'))
+
+
+def model_checksum(model_path: str) -> str:
+    """
+    Fingerprint of a model directory
+
+    Config, tokenizer and other small files are hashed by content; weight
+    shards are hashed by name, size and modification time so that multi-GB
+    checkpoints are not re-read on every run. Hub identifiers (paths that do
+    not exist locally) are fingerprinted by name.
+    """
+    path = Path(model_path)
+    digest = hashlib.blake2b(digest_size=16)
+
+    if not path.exists():
+        digest.update(f"hub:{model_path}".encode('utf-8'))
+        return digest.hexdigest()
+
+    files = [path] if path.is_file() else sorted(p for p in path.rglob("*") if p.is_file())
+    for file_path in files:
+        stat = file_path.stat()
+        relative = file_path.name if path.is_file() else str(file_path.relative_to(path))
+        digest.update(relative.encode('utf-8'))
+        if stat.st_size <= FULL_HASH_LIMIT_BYTES:
+            with open(file_path, 'rb') as f:
+                digest.update(f.read())
+        else:
+            digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode('utf-8'))
+
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """Persistent per-model store of generated responses"""
+
+    def __init__(self, cache_dir: str = "quant_pass2/results/response_cache"):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._responses: Dict[str, Dict[str, str]] = {}  # checksum -> entry key -> response
+        self._checksums: Dict[str, str] = {}
+        self._lock = threading.RLock()
+        self.stats = {"hits": 0, "misses": 0, "generated": 0}
+
+    def checksum(self, model_path: str) -> str:
+        """Model checksum, computed once per path per run"""
+        with self._lock:
+            if model_path not in self._checksums:
+                self._checksums[model_path] = model_checksum(model_path)
+            return self._checksums[model_path]
+
+    def get(self, checksum: str, prompt: str, params: Dict[str, Any]) -> Optional[str]:
+        with self._lock:
+            response = self._model_entries(checksum).get(self._entry_key(prompt, params))
+            self.stats["hits" if response is not None else "misses"] += 1
+            return response
+
+    def put(self, checksum: str, prompt: str, params: Dict[str, Any], response: str):
+        """Record a response and append it to the model's store"""
+        key = self._entry_key(prompt, params)
+        with self._lock:
+            entries = self._model_entries(checksum)
+            if key in entries:
+                return
+            entries[key] = response
+            record = {
+                "key": key,
+                "prompt_hash": prompt_hash(prompt),
+                "params": params,
+                "response": response
+            }
+            with open(self._store_path(checksum), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def missing(self, checksum: str, prompts: List[str], params: Dict[str, Any]) -> List[str]:
+        """Prompts with no cached response for this model and params"""
+        with self._lock:
+            entries = self._model_entries(checksum)
+            return [prompt for prompt in dict.fromkeys(prompts)
+                    if self._entry_key(prompt, params) not in entries]
+
+    def get_or_generate(self, checksum: str, prompts: List[str], params: Dict[str, Any],
+                        generate: Callable[[List[str]], Iterable[Tuple[str, str]]]) -> Dict[str, str]:
+        """
+        Responses for every prompt, generating only the ones not yet cached
+
+        ``generate`` receives the missing prompts and returns (or yields)
+        ``(prompt, response)`` pairs in any order; yielded responses are
+        persisted as they arrive, so an interrupted run resumes where it
+        stopped. Empty responses (failed generations) are not cached.
+
+        Returns:
+            Dict mapping each prompt to its response
+        """
+        missing = self.missing(checksum, prompts, params)
+        with self._lock:
+            self.stats["hits"] += len(set(prompts)) - len(missing)
+            self.stats["misses"] += len(missing)
+        if missing:
+            for prompt, response in generate(missing):
+                if response:
+                    self.put(checksum, prompt, params, response)
+                    self.stats["generated"] += 1
+
+        with self._lock:
+            entries = self._model_entries(checksum)
+            return {prompt: entries.get(self._entry_key(prompt, params), "") for prompt in prompts}
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+                "models": len(self._responses),
+                "cached_responses": sum(len(entries) for entries in self._responses.values())
+            }
+
+    def _entry_key(self, prompt: str, params: Dict[str, Any]) -> str:
+        return hashlib.blake2b(
+            f"{prompt_hash(prompt)}\x1f{params_key(params)}".encode('utf-8'), digest_size=16
+        ).hexdigest()
+
+    def _store_path(self, checksum: str) -> Path:
+        return self.cache_dir / f"{checksum}.jsonl"
+
+    def _model_entries(self, checksum: str) -> Dict[str, str]:
+        entries = self._responses.get(checksum)
+        if entries is not None:
+            return entries
+
+        entries = {}
+        store_path = self._store_path(checksum)
+        if store_path.exists():
+            with open(store_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        entries[record["key"]] = record["response"]
+                    except (ValueError, KeyError):
+                        continue  # torn line from an interrupted run
+            logger.info(f"📂 Loaded {len(entries)} cached responses for model {checksum[:12]}")
+        self._responses[checksum] = entries
+        return entries
@@ -11,6 +11,7 @@ import argparse
 import sys
 from pathlib import Path
 from typing import Dict, List, Optional
+from dataclasses import asdict
 from datetime import datetime
 
 # Import our Pass 2 components
@@ -40,9 +41,15 @@ class Pass2Orchestrator:
         
         # Initialize components with proper configurations
         from judge_models import JudgmentConfig
-        judge_config = JudgmentConfig()  # Use default config
+        # Generated responses persist here, so an interrupted run resumes without regenerating
+        judge_config = JudgmentConfig(
+            response_cache_dir=self.config["response_cache_dir"],
+            embedding_cache_dir=self.config.get("embedding_cache_dir", "results/embedding_cache")
+        )
         self.model_judge = ModelJudge(judge_config)
-        self.emotional_judge = EmotionalJudge()
+        self.emotional_judge = EmotionalJudge(
+            checkpoint_dir=self.config.get("judge_checkpoint_dir", "results/judge_checkpoints")
+        )
         self.human_collector = HumanPreferenceCollector()
         self.core_replacer = CoreModelReplacer()
         self.emotion_tracker = EmotionTracker() if EmotionTracker else None
@@ -67,6 +74,9 @@ class Pass2Orchestrator:
                 "llama2_quantized_gptq"
             ],
             "baseline_model": "original_llama2_13b",
+            "response_cache_dir": "results/response_cache",
+            "embedding_cache_dir": "results/embedding_cache",
+            "judge_checkpoint_dir": "results/judge_checkpoints",
             "judging_config": {
                 "ai_judge_weight": 0.4,
                 "human_judge_weight": 0.6,
@@ -165,6 +175,7 @@ class Pass2Orchestrator:
             "rankings": {},
             "consensus_analysis": {}
         }
+        all_comparisons = []
         
         # Run pairwise model comparisons
         logger.info("   📊 Running pairwise model comparisons...")
@@ -178,11 +189,11 @@ class Pass2Orchestrator:
                 comparison_result = self.model_judge.compare_models_pairwise(
                     candidate_a['path'], 
                     candidate_b['path'],
-                    prompts[:10],  # Use subset for speed
-                    {}  # Empty baseline for relative comparison
+                    prompts[:10]  # Use subset for speed
                 )
                 
-                ai_results["model_comparisons"][comparison_key] = comparison_result
+                ai_results["model_comparisons"][comparison_key] = [asdict(result) for result in comparison_result]
+                all_comparisons.extend(comparison_result)
         
         # Run emotional judging
         logger.info("   💝 Running emotional ensemble judging...")
@@ -204,8 +215,9 @@ class Pass2Orchestrator:
         
         # Calculate overall rankings
         logger.info("   🏆 Calculating AI rankings...")
-        rankings = self.model_judge.calculate_model_rankings(ai_results["model_comparisons"])
+        rankings = self.model_judge.calculate_model_rankings(all_comparisons)
         ai_results["rankings"] = rankings
+        ai_results["response_cache"] = self.model_judge.response_cache.get_stats()
         
         # Analyze consensus
         ai_results["consensus_analysis"] = self._analyze_ai_consensus(ai_results)
@@ -508,8 +520,28 @@ class Pass2Orchestrator:
     
     def _generate_candidate_responses(self, model_path: str, prompts: List[Dict]) -> List[Dict]:
         """Generate responses from a candidate model for evaluation"""
-        # This is a placeholder - in practice you'd load the model and generate responses
-        # For now, return mock responses that vary by model type
+        # Batched generation through the judge, sharing its response cache with the comparisons
+        prompt_texts = [prompt["prompt"] for prompt in prompts]
+        try:
+            candidate = self.model_judge._as_candidate(model_path)
+            generated = self.model_judge.collect_responses(
+                model_path, prompt_texts, lambda: self.model_judge.load_candidate_model(candidate)
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Could not generate from {Path(model_path).name} ({e}) - using mock responses")
+            return self._mock_candidate_responses(model_path, prompts)
+        
+        return [
+            {
+                "prompt": prompt["prompt"],
+                "response": generated[prompt["prompt"]],
+                "category": prompt.get("category", "general")
+            }
+            for prompt in prompts
+        ]
+    
+    def _mock_candidate_responses(self, model_path: str, prompts: List[Dict]) -> List[Dict]:
+        """Mock responses that vary by model type, for when the model cannot be loaded"""
         responses = []
         
         for i, prompt in enumerate(prompts):
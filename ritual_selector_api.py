@@ -5,12 +5,12 @@ Provides endpoints for active rituals, symbol management, and co-creation offeri
 
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-import json
-import os
 from datetime import datetime, timedelta
 import uuid
 import random
 
+from json_state_store import JSONStateStore
+
 app = Flask(__name__)
 CORS(app)
 
@@ -20,26 +20,6 @@ SYMBOLS_FILE = 'active_symbols.json'
 RITUAL_HISTORY_FILE = 'ritual_history.json'
 RITUAL_OFFERS_FILE = 'ritual_offers.json'
 
-def load_json_file(filename, default_data):
-    """Load JSON data from file with fallback to default"""
-    try:
-        if os.path.exists(filename):
-            with open(filename, 'r', encoding='utf-8') as f:
-                return json.load(f)
-    except (json.JSONDecodeError, IOError) as e:
-        print(f"Error loading {filename}: {e}")
-    return default_data
-
-def save_json_file(filename, data):
-    """Save JSON data to file"""
-    try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        return True
-    except IOError as e:
-        print(f"Error saving {filename}: {e}")
-        return False
-
 def generate_ritual_data():
     """Generate realistic ritual and symbol data"""
     
@@ -269,23 +249,21 @@ def generate_ritual_data():
     return active_rituals, active_symbols
 
 # Initialize data
-active_rituals, active_symbols = generate_ritual_data()
-ritual_history = []
-ritual_offers = []
+default_rituals, default_symbols = generate_ritual_data()
 
-# Load existing data
-active_rituals = load_json_file(RITUALS_FILE, active_rituals)
-active_symbols = load_json_file(SYMBOLS_FILE, active_symbols)
-ritual_history = load_json_file(RITUAL_HISTORY_FILE, ritual_history)
-ritual_offers = load_json_file(RITUAL_OFFERS_FILE, ritual_offers)
+# Documents stay resident in memory; writes are coalesced and flushed in the background
+state_store = JSONStateStore()
+rituals_doc = state_store.document(RITUALS_FILE, default_rituals)
+symbols_doc = state_store.document(SYMBOLS_FILE, default_symbols)
+ritual_history_doc = state_store.document(RITUAL_HISTORY_FILE, [])
+ritual_offers_doc = state_store.document(RITUAL_OFFERS_FILE, [])
 
 @app.route('/api/rituals/active', methods=['GET'])
 def get_active_rituals():
     """Get currently active rituals available for invocation"""
     try:
-        # Filter and sort rituals
-        available_rituals = [r for r in active_rituals if r.get('is_available', True)]
-        all_rituals = sorted(active_rituals, key=lambda x: (-x.get('frequency', 0), x.get('name', '')))
+        # Sort rituals
+        all_rituals = sorted(rituals_doc.data, key=lambda x: (-x.get('frequency', 0), x.get('name', '')))
         
         # Return flat array for easier React component consumption
         return jsonify(all_rituals)
@@ -298,7 +276,7 @@ def get_active_symbols():
     """Get currently active symbols with their ritual connections"""
     try:
         # Sort by salience score
-        sorted_symbols = sorted(active_symbols, key=lambda x: -x.get('salience_score', 0))
+        sorted_symbols = sorted(symbols_doc.data, key=lambda x: -x.get('salience_score', 0))
         
         # Return flat array for easier React component consumption
         return jsonify(sorted_symbols)
@@ -311,7 +289,7 @@ def get_symbol_history(symbol_id):
     """Get detailed history for a specific symbol"""
     try:
         # Find the symbol
-        symbol = next((s for s in active_symbols if s['id'] == symbol_id), None)
+        symbol = next((s for s in symbols_doc.data if s['id'] == symbol_id), None)
         if not symbol:
             return jsonify({'error': 'Symbol not found', 'status': 'error'}), 404
         
@@ -358,38 +336,39 @@ def invoke_ritual():
         if not ritual_id:
             return jsonify({'error': 'ritual_id is required', 'status': 'error'}), 400
         
-        # Find the ritual
-        ritual = next((r for r in active_rituals if r['id'] == ritual_id), None)
-        if not ritual:
-            return jsonify({'error': 'Ritual not found', 'status': 'error'}), 404
-        
-        if not ritual.get('is_available', True):
-            return jsonify({'error': 'Ritual not currently available', 'status': 'error'}), 400
-        
-        # Create ritual invocation record
-        invocation = {
-            'id': f'invocation_{uuid.uuid4().hex[:8]}',
-            'ritual_id': ritual_id,
-            'ritual_name': ritual['name'],
-            'invoked_at': datetime.now().isoformat() + 'Z',
-            'activation_method': ritual['activation_method'],
-            'mood_symbol': ritual['mood_symbol']
-        }
+        with rituals_doc.lock:
+            # Find the ritual
+            ritual = next((r for r in rituals_doc.data if r['id'] == ritual_id), None)
+            if not ritual:
+                return jsonify({'error': 'Ritual not found', 'status': 'error'}), 404
+            
+            if not ritual.get('is_available', True):
+                return jsonify({'error': 'Ritual not currently available', 'status': 'error'}), 400
+            
+            # Create ritual invocation record
+            invocation = {
+                'id': f'invocation_{uuid.uuid4().hex[:8]}',
+                'ritual_id': ritual_id,
+                'ritual_name': ritual['name'],
+                'invoked_at': datetime.now().isoformat() + 'Z',
+                'activation_method': ritual['activation_method'],
+                'mood_symbol': ritual['mood_symbol']
+            }
+            
+            # Update ritual data
+            ritual['frequency'] = ritual.get('frequency', 0) + 1
+            ritual['last_invoked'] = invocation['invoked_at']
+            
+            # For adaptive and passive rituals, they might become unavailable after invocation
+            if ritual['activation_method'] in ['adaptive', 'passive']:
+                ritual['is_available'] = random.choice([True, False])
+            
+            # Save updated data (flushed in the background)
+            rituals_doc.mark_dirty()
         
         # Add to history
-        ritual_history.insert(0, invocation)
-        
-        # Update ritual data
-        ritual['frequency'] = ritual.get('frequency', 0) + 1
-        ritual['last_invoked'] = invocation['invoked_at']
-        
-        # For adaptive and passive rituals, they might become unavailable after invocation
-        if ritual['activation_method'] in ['adaptive', 'passive']:
-            ritual['is_available'] = random.choice([True, False])
-        
-        # Save updated data
-        save_json_file(RITUALS_FILE, active_rituals)
-        save_json_file(RITUAL_HISTORY_FILE, ritual_history)
+        with ritual_history_doc.editing() as ritual_history:
+            ritual_history.insert(0, invocation)
         
         return jsonify({
             'success': True,
@@ -425,7 +404,8 @@ def offer_custom_ritual():
         }
         
         # Add to offers
-        ritual_offers.insert(0, offer)
+        with ritual_offers_doc.editing() as ritual_offers:
+            ritual_offers.insert(0, offer)
         
         # Create a provisional ritual based on the offer
         ritual_name = f"Co-Created: {intent[:30]}{'...' if len(intent) > 30 else ''}"
@@ -444,11 +424,8 @@ def offer_custom_ritual():
         }
         
         # Add to active rituals
-        active_rituals.insert(0, provisional_ritual)
-        
-        # Save data
-        save_json_file(RITUAL_OFFERS_FILE, ritual_offers)
-        save_json_file(RITUALS_FILE, active_rituals)
+        with rituals_doc.editing() as active_rituals:
+            active_rituals.insert(0, provisional_ritual)
         
         return jsonify({
             'success': True,
@@ -470,6 +447,7 @@ def get_ritual_history():
         limit = int(request.args.get('limit', 20))
         
         # Get recent history
+        ritual_history = ritual_history_doc.data
         recent_history = ritual_history[:limit]
         
         return jsonify({
@@ -486,6 +464,7 @@ def get_ritual_offers():
     """Get ritual offers from users"""
     try:
         status_filter = request.args.get('status')
+        ritual_offers = ritual_offers_doc.data
         
         if status_filter:
             filtered_offers = [o for o in ritual_offers if o.get('status') == status_filter]
@@ -507,7 +486,7 @@ def get_recent_ritual_offers():
     """Get recent ritual offers for display in the panel"""
     try:
         # Sort by offered_at timestamp, most recent first
-        sorted_offers = sorted(ritual_offers, key=lambda x: x.get('offered_at', ''), reverse=True)
+        sorted_offers = sorted(ritual_offers_doc.data, key=lambda x: x.get('offered_at', ''), reverse=True)
         
         # Return flat array for easier React component consumption
         return jsonify(sorted_offers)
@@ -525,21 +504,22 @@ def update_symbol():
         if not symbol_id:
             return jsonify({'error': 'symbol_id is required', 'status': 'error'}), 400
         
-        # Find and update symbol
-        symbol = next((s for s in active_symbols if s['id'] == symbol_id), None)
-        if not symbol:
-            return jsonify({'error': 'Symbol not found', 'status': 'error'}), 404
-        
-        # Update frequency and timestamp
-        symbol['frequency'] = symbol.get('frequency', 0) + 1
-        symbol['last_invoked'] = datetime.now().isoformat() + 'Z'
-        
-        # Adjust salience based on recent usage
-        current_salience = symbol.get('salience_score', 0.5)
-        symbol['salience_score'] = min(1.0, current_salience + 0.05)
-        
-        # Save updated symbols
-        save_json_file(SYMBOLS_FILE, active_symbols)
+        with symbols_doc.lock:
+            # Find and update symbol
+            symbol = next((s for s in symbols_doc.data if s['id'] == symbol_id), None)
+            if not symbol:
+                return jsonify({'error': 'Symbol not found', 'status': 'error'}), 404
+            
+            # Update frequency and timestamp
+            symbol['frequency'] = symbol.get('frequency', 0) + 1
+            symbol['last_invoked'] = datetime.now().isoformat() + 'Z'
+            
+            # Adjust salience based on recent usage
+            current_salience = symbol.get('salience_score', 0.5)
+            symbol['salience_score'] = min(1.0, current_salience + 0.05)
+            
+            # Save updated symbols (flushed in the background)
+            symbols_doc.mark_dirty()
         
         return jsonify({
             'message': 'Symbol updated successfully',
@@ -553,6 +533,8 @@ def update_symbol():
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
+    active_rituals = rituals_doc.data
+    ritual_offers = ritual_offers_doc.data
     return jsonify({
         'status': 'healthy',
         'service': 'ritual-selector-api',
@@ -560,17 +542,17 @@ def health_check():
         'data_status': {
             'active_rituals': len(active_rituals),
             'available_rituals': len([r for r in active_rituals if r.get('is_available', True)]),
-            'active_symbols': len(active_symbols),
-            'ritual_history': len(ritual_history),
+            'active_symbols': len(symbols_doc.data),
+            'ritual_history': len(ritual_history_doc.data),
             'pending_offers': len([o for o in ritual_offers if o.get('status') == 'pending'])
         }
     })
 
 if __name__ == '__main__':
     print("✨ Ritual Selector API Server Starting...")
-    print(f"🕯️ Loaded {len(active_rituals)} active rituals")
-    print(f"🌀 Loaded {len(active_symbols)} living symbols") 
-    print(f"📿 Loaded {len(ritual_history)} ritual invocations")
+    print(f"🕯️ Loaded {len(rituals_doc.data)} active rituals")
+    print(f"🌀 Loaded {len(symbols_doc.data)} living symbols") 
+    print(f"📿 Loaded {len(ritual_history_doc.data)} ritual invocations")
     print("🚀 Server running on http://localhost:5000")
     
     app.run(debug=True, host='0.0.0.0', port=5001)
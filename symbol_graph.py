@@ -0,0 +1,223 @@
+"""
+symbol_graph.py - Weighted Symbol Co-occurrence Graph
+
+Compact adjacency store for SymbolMemoryEngine's symbol networks. Symbols are
+interned to integer ids, edges live in per-node {neighbor_id: weight} maps, and
+traversal uses level-by-level weighted BFS with top-k pruning per hop so each
+node is reported once at its shallowest depth. Personalized PageRank (local
+push) scores which symbols resonate most with a set of seed symbols.
+"""
+
+import heapq
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class SymbolGraph:
+    """Undirected weighted graph over interned symbol ids"""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._adjacency: List[Dict[int, float]] = []
+        self._out_weight: List[float] = []
+        self.edge_count = 0
+        # Work done by traversals: nodes whose edges BFS scanned, and PageRank pushes
+        self.stats = {"bfs_expanded": 0, "ppr_pushes": 0}
+
+    @classmethod
+    def from_networks(cls, networks: Dict[str, Dict[str, float]]) -> 'SymbolGraph':
+        """Build a graph from SymbolMemoryEngine.symbol_networks"""
+        graph = cls()
+        for symbol, connections in networks.items():
+            for connected_symbol, weight in connections.items():
+                graph.set_edge(symbol, connected_symbol, weight, symmetric=False)
+        return graph
+
+    # Interning
+
+    def intern(self, symbol: str) -> int:
+        """Return the integer id for a symbol, allocating one if needed"""
+        symbol_id = self._ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = len(self._names)
+            self._ids[symbol] = symbol_id
+            self._names.append(symbol)
+            self._adjacency.append({})
+            self._out_weight.append(0.0)
+        return symbol_id
+
+    def symbol_id(self, symbol: str) -> Optional[int]:
+        return self._ids.get(symbol)
+
+    def symbol_name(self, symbol_id: int) -> str:
+        return self._names[symbol_id]
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self._ids
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    # Mutation
+
+    def set_edge(self, source: str, target: str, weight: float, symmetric: bool = True):
+        """Set the weight of an edge (and its reverse when symmetric)"""
+        if source == target:
+            return
+        source_id = self.intern(source)
+        target_id = self.intern(target)
+        self._set(source_id, target_id, weight)
+        if symmetric:
+            self._set(target_id, source_id, weight)
+
+    def _set(self, source_id: int, target_id: int, weight: float):
+        edges = self._adjacency[source_id]
+        previous = edges.get(target_id)
+        if previous is None:
+            self.edge_count += 1
+            previous = 0.0
+        edges[target_id] = weight
+        self._out_weight[source_id] += weight - previous
+
+    def weight(self, source: str, target: str) -> float:
+        source_id = self._ids.get(source)
+        target_id = self._ids.get(target)
+        if source_id is None or target_id is None:
+            return 0.0
+        return self._adjacency[source_id].get(target_id, 0.0)
+
+    # Traversal
+
+    def top_neighbors(self, symbol: str, k: int, min_weight: float = 0.0) -> List[Tuple[str, float]]:
+        """Strongest k neighbors of a symbol above min_weight"""
+        symbol_id = self._ids.get(symbol)
+        if symbol_id is None:
+            return []
+        best = heapq.nlargest(
+            k,
+            ((w, n) for n, w in self._adjacency[symbol_id].items() if w > min_weight)
+        )
+        return [(self._names[n], w) for w, n in best]
+
+    def weighted_bfs(self, source: str, depth: int = 2, top_k: Optional[int] = 10,
+                     min_weight: float = 0.1) -> List[Dict[str, float]]:
+        """
+        Explore outward from a symbol one hop at a time
+
+        Each reachable symbol is reported once, at its shallowest depth, via
+        the strongest path found at that depth. Per hop only the top_k
+        candidates by path strength are kept and expanded.
+
+        Args:
+            source: Center symbol
+            depth: Number of hops to explore
+            top_k: Maximum symbols kept per hop (None for no pruning)
+            min_weight: Edges at or below this weight are ignored
+
+        Returns:
+            List of dicts with symbol, weight (edge into the symbol),
+            strength (product of path weights) and depth
+        """
+        source_id = self._ids.get(source)
+        if source_id is None:
+            return []
+
+        seen = {source_id}
+        frontier = [(source_id, 1.0)]
+        results = []
+
+        for hop in range(1, depth + 1):
+            # node -> (path strength, incoming edge weight)
+            candidates: Dict[int, Tuple[float, float]] = {}
+            self.stats["bfs_expanded"] += len(frontier)
+            for node_id, strength in frontier:
+                edges = self._adjacency[node_id].items()
+                if top_k is not None:
+                    edges = heapq.nlargest(top_k, edges, key=lambda item: item[1])
+                for neighbor_id, weight in edges:
+                    if weight <= min_weight or neighbor_id in seen:
+                        continue
+                    path_strength = strength * weight
+                    current = candidates.get(neighbor_id)
+                    if current is None or path_strength > current[0]:
+                        candidates[neighbor_id] = (path_strength, weight)
+
+            if top_k is not None and len(candidates) > top_k:
+                kept = heapq.nlargest(top_k, candidates.items(), key=lambda item: item[1][0])
+            else:
+                kept = list(candidates.items())
+
+            frontier = []
+            for neighbor_id, (path_strength, weight) in kept:
+                seen.add(neighbor_id)
+                frontier.append((neighbor_id, path_strength))
+                results.append({
+                    'symbol': self._names[neighbor_id],
+                    'weight': weight,
+                    'strength': path_strength,
+                    'depth': hop
+                })
+
+            if not frontier:
+                break
+
+        return results
+
+    def personalized_pagerank(self, seeds: Iterable[str], alpha: float = 0.15,
+                              epsilon: float = 1e-4, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Approximate personalized PageRank by local push
+
+        Only the neighborhood where residual mass exceeds epsilon is touched,
+        so cost depends on the region around the seeds rather than the whole
+        graph.
+
+        Args:
+            seeds: Symbols the walk restarts from
+            alpha: Restart probability
+            epsilon: Residual threshold per unit of out-weight
+            limit: Maximum number of results
+
+        Returns:
+            (symbol, score) pairs sorted by score, seeds excluded
+        """
+        seed_ids = [self._ids[s] for s in seeds if s in self._ids]
+        if not seed_ids:
+            return []
+
+        scores: Dict[int, float] = defaultdict(float)
+        residual: Dict[int, float] = defaultdict(float)
+        for seed_id in seed_ids:
+            residual[seed_id] += 1.0 / len(seed_ids)
+
+        queue = list(residual.keys())
+        queued = set(queue)
+        while queue:
+            node_id = queue.pop()
+            queued.discard(node_id)
+            out_weight = self._out_weight[node_id]
+            mass = residual[node_id]
+            if out_weight <= 0:
+                scores[node_id] += mass
+                residual[node_id] = 0.0
+                continue
+            if mass < epsilon * out_weight:
+                continue
+
+            self.stats["ppr_pushes"] += 1
+            scores[node_id] += alpha * mass
+            spread = (1.0 - alpha) * mass / out_weight
+            residual[node_id] = 0.0
+            for neighbor_id, weight in self._adjacency[node_id].items():
+                residual[neighbor_id] += spread * weight
+                if neighbor_id not in queued and residual[neighbor_id] >= epsilon * self._out_weight[neighbor_id]:
+                    queue.append(neighbor_id)
+                    queued.add(neighbor_id)
+
+        seed_set = set(seed_ids)
+        ranked = sorted(
+            ((self._names[n], score) for n, score in scores.items() if n not in seed_set and score > 0),
+            key=lambda item: item[1], reverse=True
+        )
+        return ranked[:limit] if limit is not None else ranked
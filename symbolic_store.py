@@ -0,0 +1,273 @@
+"""
+symbolic_store.py - Incremental Persistence for Symbolic Engines
+
+SQLite-backed record store shared by SymbolMemoryEngine and DriftDreamEngine.
+Engines mark individual records dirty as they change and flush them in a single
+transaction, so only changed symbols and dreams are written and a crash
+mid-write never leaves a torn file behind. Cold records are loaded on demand.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+from dataclasses import asdict, is_dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+_DELETED = object()
+
+
+def store_path_for(json_path: str) -> str:
+    """Derive the SQLite store path that replaces a legacy JSON file"""
+    base, ext = os.path.splitext(json_path)
+    return (base if ext.lower() == '.json' else json_path) + '.db'
+
+
+def iso_to_epoch(timestamp: Optional[str]) -> float:
+    """Convert a stored ISO timestamp (optionally 'Z'-suffixed) to epoch seconds"""
+    if not timestamp:
+        return 0.0
+    try:
+        return datetime.fromisoformat(timestamp.replace('Z', '')).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def load_legacy_json(json_path: str) -> Optional[Dict[str, Any]]:
+    """Read a legacy JSON document, returning None if it is missing or unreadable"""
+    try:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"⚠️ Error reading legacy file {json_path}: {e}")
+        return None
+
+
+class SymbolicStore:
+    """Keyed record store with dirty tracking and atomic batched flushes"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+
+        # collection -> key -> (sort_key, live object or _DELETED)
+        self._dirty: Dict[str, Dict[str, Tuple[float, Any]]] = {}
+
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS records (
+                collection TEXT NOT NULL,
+                key TEXT NOT NULL,
+                sort_key REAL NOT NULL DEFAULT 0,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (collection, key)
+            )
+        ''')
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_records_sort ON records(collection, sort_key)'
+        )
+        self._conn.commit()
+
+    # Dirty tracking
+
+    def mark_dirty(self, collection: str, key: str, record: Any, sort_key: float = 0.0):
+        """
+        Mark a record as changed. Serialization is deferred until flush, so a
+        record mutated many times between flushes is only encoded once.
+
+        Args:
+            collection: Record collection name
+            key: Record key within the collection
+            record: Dataclass instance or JSON-serializable dict
+            sort_key: Ordering value (e.g. epoch timestamp) for range loads
+        """
+        with self._lock:
+            self._dirty.setdefault(collection, {})[key] = (sort_key, record)
+
+    def mark_deleted(self, collection: str, key: str):
+        """Mark a record for deletion on the next flush"""
+        with self._lock:
+            self._dirty.setdefault(collection, {})[key] = (0.0, _DELETED)
+
+    @property
+    def dirty_count(self) -> int:
+        """Number of records waiting to be flushed"""
+        with self._lock:
+            return sum(len(records) for records in self._dirty.values())
+
+    def flush(self) -> int:
+        """
+        Write all dirty records in one transaction
+
+        Returns:
+            int: Number of records written or deleted
+        """
+        with self._lock:
+            if not self._dirty:
+                return 0
+
+            upserts = []
+            deletes = []
+            for collection, records in self._dirty.items():
+                for key, (sort_key, record) in records.items():
+                    if record is _DELETED:
+                        deletes.append((collection, key))
+                    else:
+                        payload = asdict(record) if is_dataclass(record) else record
+                        upserts.append((
+                            collection, key, sort_key,
+                            json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+                        ))
+
+            with self._conn:
+                if upserts:
+                    self._conn.executemany(
+                        'INSERT OR REPLACE INTO records (collection, key, sort_key, payload) '
+                        'VALUES (?, ?, ?, ?)',
+                        upserts
+                    )
+                if deletes:
+                    self._conn.executemany(
+                        'DELETE FROM records WHERE collection = ? AND key = ?', deletes
+                    )
+
+            self._dirty.clear()
+            return len(upserts) + len(deletes)
+
+    # Reads
+
+    def keys(self, collection: str) -> List[str]:
+        """List persisted keys in a collection without decoding payloads"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT key FROM records WHERE collection = ? ORDER BY sort_key, key',
+                (collection,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get(self, collection: str, key: str) -> Optional[Dict[str, Any]]:
+        """Load a single record"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT payload FROM records WHERE collection = ? AND key = ?',
+                (collection, key)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def load_all(self, collection: str) -> Dict[str, Dict[str, Any]]:
+        """Load every record in a collection, ordered by sort key"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT key, payload FROM records WHERE collection = ? ORDER BY sort_key, key',
+                (collection,)
+            ).fetchall()
+        return {key: json.loads(payload) for key, payload in rows}
+
+    def load_recent(self, collection: str, limit: int) -> List[Dict[str, Any]]:
+        """Load the newest records by sort key, returned oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT payload FROM records WHERE collection = ? '
+                'ORDER BY sort_key DESC, key DESC LIMIT ?',
+                (collection, limit)
+            ).fetchall()
+        return [json.loads(row[0]) for row in reversed(rows)]
+
+    def count(self, collection: str) -> int:
+        """Number of persisted records in a collection"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT COUNT(*) FROM records WHERE collection = ?', (collection,)
+            ).fetchone()
+        return row[0]
+
+    def is_empty(self) -> bool:
+        """True if nothing has ever been persisted"""
+        with self._lock:
+            return self._conn.execute('SELECT 1 FROM records LIMIT 1').fetchone() is None
+
+    def close(self):
+        """Flush pending records and close the connection"""
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+
+class LazyRecordMap(MutableMapping):
+    """
+    Dict-like view over a store collection. Keys are known up front, values
+    are decoded on first access and assignments are marked dirty.
+    """
+
+    def __init__(self, store: SymbolicStore, collection: str,
+                 decode: Callable[[Dict[str, Any]], Any]):
+        self._store = store
+        self._collection = collection
+        self._decode = decode
+        self._keys: Dict[str, None] = dict.fromkeys(store.keys(collection))
+        self._loaded: Dict[str, Any] = {}
+
+    @property
+    def loaded_count(self) -> int:
+        """Number of records currently decoded in memory"""
+        return len(self._loaded)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._loaded:
+            return self._loaded[key]
+        if key not in self._keys:
+            raise KeyError(key)
+
+        data = self._store.get(self._collection, key)
+        if data is None:
+            raise KeyError(key)
+        value = self._decode(data)
+        self._loaded[key] = value
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        self._keys[key] = None
+        self._loaded[key] = value
+        self._store.mark_dirty(self._collection, key, value)
+
+    def __delitem__(self, key: str):
+        if key not in self._keys:
+            raise KeyError(key)
+        del self._keys[key]
+        self._loaded.pop(key, None)
+        self._store.mark_deleted(self._collection, key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._keys))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def load_all(self):
+        """Decode every cold record in one query"""
+        if len(self._loaded) == len(self._keys):
+            return
+        for key, data in self._store.load_all(self._collection).items():
+            if key in self._keys and key not in self._loaded:
+                self._loaded[key] = self._decode(data)
+
+    def values(self):
+        self.load_all()
+        return [self._loaded[key] for key in self._keys]
+
+    def items(self):
+        self.load_all()
+        return [(key, self._loaded[key]) for key in self._keys]
@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "quant_pass2"))
+
+from artifact_store import READ_BLOCK_SIZE, ArtifactStore, hash_file
+from replace_core import CoreModelReplacer
+from judge_model_quality import archive_old_model, swap_out_baseline
+
+
+def write_model(directory, weights=b"weights" * 1000, config=b'{"layers": 2}'):
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / "model.bin").write_bytes(weights)
+    (directory / "config.json").write_bytes(config)
+    return directory
+
+
+class TestArtifactStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.store = ArtifactStore(str(self.root / "store"))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_digest_is_plain_sha256(self):
+        content = os.urandom(2 * READ_BLOCK_SIZE + 100)
+        path = self.root / "large.bin"
+        path.write_bytes(content)
+        self.assertEqual(hash_file(path), hashlib.sha256(content).hexdigest())
+
+        manifest = self.store.ingest(str(path), "v1")
+        self.assertEqual(manifest["files"][0]["digest"], hashlib.sha256(content).hexdigest())
+        self.assertNotIn("chunks", manifest["files"][0])
+
+    def test_checkout_shares_inodes_with_stored_objects(self):
+        model = write_model(self.root / "model")
+        manifest = self.store.ingest(str(model), "v1")
+        checkout = self.store.checkout(manifest, str(self.root / "backup"))
+
+        self.assertEqual(manifest["file_count"], 2)
+        for entry in manifest["files"]:
+            self.assertTrue(os.path.samefile(checkout / entry["path"], self.store.object_path(entry["digest"])))
+            self.assertEqual((checkout / entry["path"]).read_bytes(), (model / entry["path"]).read_bytes())
+
+    def test_rewriting_the_source_leaves_stored_versions_intact(self):
+        model = write_model(self.root / "model")
+        mode = (model / "model.bin").stat().st_mode
+        manifest = self.store.ingest(str(model), "v1")
+        backup = self.store.checkout(manifest, str(self.root / "backup"))
+
+        self.assertEqual((model / "model.bin").stat().st_mode, mode)
+        with open(model / "model.bin", 'wb') as f:
+            f.write(b"CORRUPT")
+
+        for entry in manifest["files"]:
+            self.assertEqual(hash_file(backup / entry["path"]), entry["digest"])
+        self.assertNotEqual(self.store.ingest(str(model), "v2")["digest"], manifest["digest"])
+
+    def test_retired_source_is_moved_into_the_store(self):
+        model = write_model(self.root / "model")
+        inode = (model / "model.bin").stat().st_ino
+        manifest = self.store.ingest(str(model), "v1", retire=True)
+
+        self.assertFalse(model.exists())
+        digest = {entry["path"]: entry["digest"] for entry in manifest["files"]}["model.bin"]
+        self.assertEqual(self.store.object_path(digest).stat().st_ino, inode)
+
+    def test_identical_content_is_stored_once(self):
+        first = write_model(self.root / "first")
+        second = write_model(self.root / "second", config=b'{"layers": 3}')
+        one = self.store.ingest(str(first), "v1")
+        two = self.store.ingest(str(second), "v2")
+
+        self.assertEqual(self.store.stats["new_objects"], 3)
+        self.assertNotEqual(one["digest"], two["digest"])
+        weights = {entry["path"]: entry["digest"] for entry in one["files"]}["model.bin"]
+        self.assertIn(weights, [entry["digest"] for entry in two["files"]])
+
+    def test_known_files_are_not_hashed_again(self):
+        model = write_model(self.root / "model")
+        self.store.ingest(str(model), "v1")
+        hashed = self.store.stats["hashed_files"]
+
+        reopened = ArtifactStore(str(self.root / "store"))
+        manifest = reopened.ingest(str(model), "v2")
+        self.assertEqual(reopened.stats["hashed_files"], 0)
+        self.assertEqual(reopened.stats["index_hits"], 2)
+        self.assertEqual(manifest["digest"], self.store.load_manifest("v1")["digest"])
+        self.assertEqual(hashed, 2)
+
+    def test_activate_flips_symlink_and_replaces_plain_directory(self):
+        active = write_model(self.root / "active", weights=b"legacy")
+        self.store.ingest(str(write_model(self.root / "a", weights=b"a")), "a")
+        self.store.ingest(str(write_model(self.root / "b", weights=b"b")), "b")
+
+        self.store.activate("a", str(active))
+        self.assertTrue(active.is_symlink())
+        self.assertEqual((active / "model.bin").read_bytes(), b"a")
+
+        self.store.activate("b", str(active))
+        self.assertEqual((active / "model.bin").read_bytes(), b"b")
+        self.assertEqual([version["version"] for version in self.store.list_versions()], ["b", "a"])
+
+
+class TestCoreModelReplacer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.active = self.root / "active_core"
+        write_model(self.active, weights=b"original")
+
+        environment = mock.patch.dict(os.environ, {
+            "CANDIDATE_DIR": str(self.root / "candidates"),
+            "FINAL_MODEL_DIR": str(self.active),
+            "BACKUP_DIR": str(self.root / "backups"),
+            "MODEL_STORE_DIR": str(self.root / "store")
+        })
+        environment.start()
+        self.addCleanup(environment.stop)
+
+        self.replacer = CoreModelReplacer()
+        self.replacer.validate_candidate = lambda path: {
+            "valid": True, "errors": [], "warnings": [], "model_info": {}, "file_count": 2, "total_size_mb": 0.0
+        }
+        self.replacer.update_companion_manifest = lambda *args: None
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_replace_and_restore(self):
+        candidate = write_model(self.root / "candidates" / "q4", weights=b"quantized")
+        result = self.replacer.replace_model(str(candidate), "before_q4")
+
+        self.assertTrue(result["success"], result)
+        self.assertTrue(self.active.is_symlink())
+        self.assertEqual((self.active / "model.bin").read_bytes(), b"quantized")
+        metadata = json.loads(self.replacer.replacement_metadata_path.read_text())
+        self.assertEqual(metadata["checksum"], self.replacer.store.load_manifest(metadata["store_version"])["digest"])
+        self.assertFalse(self.replacer.store.manages(str(self.replacer.replacement_metadata_path)))
+        self.assertFalse((self.active / "replacement_metadata.json").exists())
+        self.assertEqual(self.replacer.get_replacement_status()["replacement_info"], metadata)
+
+        backup = Path(result["backup_path"])
+        self.assertEqual((backup / "model.bin").read_bytes(), b"original")
+        self.assertEqual(json.loads((backup / "backup_metadata.json").read_text())["store_version"], "before_q4")
+
+        with open(candidate / "model.bin", 'wb') as f:
+            f.write(b"requantized in place")
+        self.assertEqual((self.active / "model.bin").read_bytes(), b"quantized")
+
+        self.assertTrue(self.replacer.restore_from_backup(str(backup)))
+        self.assertEqual((self.active / "model.bin").read_bytes(), b"original")
+        self.assertFalse((self.active / "backup_metadata.json").exists())
+
+    def test_restore_legacy_backup(self):
+        legacy = write_model(self.root / "backups" / "old_backup", weights=b"legacy")
+        (legacy / "backup_metadata.json").write_text(json.dumps({"backup_name": "old_backup"}))
+
+        self.assertTrue(self.replacer.restore_from_backup(str(legacy)))
+        self.assertEqual((self.active / "model.bin").read_bytes(), b"legacy")
+        self.assertFalse((self.active / "backup_metadata.json").exists())
+
+
+class TestBaselineSwap(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.config_path = self.root / "models" / "config.json"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_swap_archives_previous_baseline_without_copying(self):
+        first = self.root / "first_q8_0.gguf"
+        first.write_bytes(b"first")
+        inode = first.stat().st_ino
+        second = self.root / "second_q4_k_m.gguf"
+        second.write_bytes(b"second")
+
+        swap_out_baseline(str(first), str(self.config_path))
+        config = json.loads(self.config_path.read_text())
+        first_hash = config["model_info"]["hash"]
+        self.assertEqual(first_hash, hashlib.sha256(b"first").hexdigest())
+        # The handed-over model is moved into the store, not copied next to itself
+        self.assertFalse(first.exists())
+        self.assertEqual(Path(config["baseline_path"]).stat().st_ino, inode)
+        self.assertEqual(Path(config["baseline_path"]).read_bytes(), b"first")
+        with mock.patch("judge_model_quality.archive_old_model",
+                        lambda path, store_dir: archive_old_model(path, str(self.root / "models" / "archive"),
+                                                                  store_dir)):
+            swap_out_baseline(str(second), str(self.config_path))
+
+        config = json.loads(self.config_path.read_text())
+        self.assertEqual(config["baseline_model"], "second_q4_k_m")
+        self.assertEqual(config["version_history"][0]["model"], "first_q8_0")
+        self.assertFalse(second.exists())
+
+        archived = list((self.root / "models" / "archive").glob("*.gguf"))
+        self.assertEqual(len(archived), 1)
+        self.assertEqual(archived[0].read_bytes(), b"first")
+        metadata = json.loads(Path(f"{archived[0]}.meta.json").read_text())
+        self.assertEqual(metadata["hash"], first_hash)
+        self.assertEqual(archived[0].stat().st_ino, inode)
+
+
+if __name__ == '__main__':
+    unittest.main()
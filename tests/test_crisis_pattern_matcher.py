@@ -0,0 +1,67 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.core.crisis_safety_override import (
+    CrisisPatternMatcher, CrisisSafetyOverride, CrisisLevel
+)
+
+
+class TestCrisisPatternMatcher(unittest.TestCase):
+    def setUp(self):
+        self.matcher = CrisisPatternMatcher({
+            CrisisLevel.CRITICAL: ["want to die", "end it all"],
+            CrisisLevel.HIGH: ["alone", "all alone"],
+            CrisisLevel.LOW: ["sad", "tired"]
+        })
+
+    def test_single_pass_groups_hits_by_level(self):
+        hits = self.matcher.match("I'm tired and I want to die")
+        self.assertEqual(hits, {
+            CrisisLevel.CRITICAL: ["want to die"],
+            CrisisLevel.LOW: ["tired"]
+        })
+
+    def test_word_boundaries(self):
+        self.assertEqual(self.matcher.match("Sadly the saddle broke"), {})
+        self.assertTrue(self.matcher.has_match("so SAD today"))
+
+    def test_overlapping_patterns_are_all_reported(self):
+        hits = self.matcher.match("I feel all alone")
+        self.assertEqual(hits[CrisisLevel.HIGH], ["alone", "all alone"])
+
+    def test_curly_apostrophes_match(self):
+        matcher = CrisisPatternMatcher({CrisisLevel.MEDIUM: ["can't cope"]})
+        self.assertTrue(matcher.has_match("I can’t cope"))
+
+
+class TestCrisisAssessmentMemoization(unittest.TestCase):
+    def setUp(self):
+        self.override = CrisisSafetyOverride({})
+
+    def test_assessment_is_shared_within_an_interaction(self):
+        context = {"interaction_id": "interaction-1"}
+
+        async def run():
+            interrupt = await self.override.check_interrupt_required("I want to kill myself", context)
+            first = await self.override.assess_crisis_level("I want to kill myself", context)
+            second = await self.override.assess_crisis_level("I want to kill myself", context)
+            return interrupt, first, second
+
+        interrupt, first, second = asyncio.run(run())
+        self.assertTrue(interrupt)
+        self.assertIs(first, second)
+        self.assertEqual(first.level, CrisisLevel.CRITICAL)
+
+    def test_assessment_without_interaction_id_is_not_cached(self):
+        first = asyncio.run(self.override.assess_crisis_level("I feel stressed", {}))
+        second = asyncio.run(self.override.assess_crisis_level("I feel stressed", {}))
+        self.assertIsNot(first, second)
+        self.assertEqual(first.detected_indicators, ["stressed"])
+
+
+if __name__ == '__main__':
+    unittest.main()
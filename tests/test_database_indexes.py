@@ -0,0 +1,144 @@
+import asyncio
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.database.database_interface import (
+    InMemoryDatabase, InteractionRecord, InteractionType, MemoryFragment, PsychologicalState
+)
+from modules.database.indexes import TimeOrderedCollection
+
+
+def make_interaction(index, user_id="user", when=None):
+    return InteractionRecord(
+        interaction_id=f"interaction_{index}",
+        user_id=user_id,
+        session_id=f"{user_id}_session",
+        timestamp=when or datetime(2025, 1, 1) + timedelta(minutes=index),
+        user_input="hello",
+        companion_response="hi",
+        interaction_type=InteractionType.GENERAL_CONVERSATION,
+        context_analysis={},
+        emotional_state={},
+        technical_context={},
+        creative_context={},
+        guidance_used={},
+        response_metrics={}
+    )
+
+
+def make_memory(memory_id, importance, tags, memory_type="emotional", user_id="user"):
+    now = datetime.now()
+    return MemoryFragment(
+        memory_id=memory_id,
+        user_id=user_id,
+        content=memory_id,
+        memory_type=memory_type,
+        importance_score=importance,
+        created_at=now,
+        last_accessed=now,
+        access_count=0,
+        related_interactions=[],
+        tags=tags
+    )
+
+
+class TestTimeOrderedCollection(unittest.TestCase):
+    def test_out_of_order_inserts_and_retention(self):
+        collection = TimeOrderedCollection(lambda record: record, max_per_user=3)
+        for value in (3, 1, 4, 2):
+            collection.add("user", value)
+        self.assertEqual(collection.all("user"), [2, 3, 4])
+        self.assertEqual(collection.recent("user", 2), [4, 3])
+        self.assertEqual(collection.since("user", 3), [3, 4])
+        self.assertEqual(collection.add("user", 5), [2])
+
+
+class TestIndexedInMemoryDatabase(unittest.TestCase):
+    def test_queries_only_return_the_users_records(self):
+        db = InMemoryDatabase()
+
+        async def run():
+            for i in range(5):
+                await db.save_interaction(make_interaction(i, "alice"))
+                await db.save_interaction(make_interaction(i, "bob"))
+            await db.save_interaction(make_interaction(99, "alice", datetime(2024, 12, 31)))
+            recent = await db.get_recent_interactions("alice", limit=3)
+            session = await db.get_session_interactions("alice_session")
+            return recent, session
+
+        recent, session = asyncio.run(run())
+        self.assertEqual([r.interaction_id for r in recent],
+                         ["interaction_4", "interaction_3", "interaction_2"])
+        self.assertEqual(session[0].interaction_id, "interaction_99")
+        self.assertEqual(len(db.interactions), 11)
+
+    def test_memory_filters_and_importance_order(self):
+        db = InMemoryDatabase()
+
+        async def run():
+            await db.save_memory_fragment(make_memory("low", 0.2, ["work"]))
+            await db.save_memory_fragment(make_memory("high", 0.9, ["family"]))
+            await db.save_memory_fragment(make_memory("mid", 0.5, ["work", "family"], "creative"))
+            await db.save_memory_fragment(make_memory("other_user", 1.0, ["work"], user_id="bob"))
+            return (
+                await db.get_relevant_memories("user"),
+                await db.get_relevant_memories("user", tags=["work"]),
+                await db.get_relevant_memories("user", memory_type="creative", tags=["family"]),
+            )
+
+        everything, work, creative_family = asyncio.run(run())
+        self.assertEqual([m.memory_id for m in everything], ["high", "mid", "low"])
+        self.assertEqual([m.memory_id for m in work], ["mid", "low"])
+        self.assertEqual([m.memory_id for m in creative_family], ["mid"])
+
+    def test_memory_access_keeps_indexes_consistent(self):
+        db = InMemoryDatabase()
+        memory = make_memory("rising", 0.1, ["a"])
+
+        async def run():
+            await db.save_memory_fragment(memory)
+            await db.save_memory_fragment(make_memory("steady", 0.5, ["a"]))
+            memory.importance_score = 0.8
+            memory.tags.append("b")
+            self.assertTrue(await db.update_memory_access("rising"))
+            return (
+                await db.get_relevant_memories("user", limit=1),
+                await db.get_relevant_memories("user", tags=["b"])
+            )
+
+        top, tagged = asyncio.run(run())
+        self.assertEqual(top[0].memory_id, "rising")
+        self.assertEqual(top[0].access_count, 1)
+        self.assertEqual([m.memory_id for m in tagged], ["rising"])
+
+    def test_bounded_retention_per_user(self):
+        db = InMemoryDatabase(max_records_per_user=2)
+
+        async def run():
+            for i in range(4):
+                await db.save_interaction(make_interaction(i))
+                await db.save_memory_fragment(make_memory(f"memory_{i}", i / 10, []))
+                await db.save_psychological_state(PsychologicalState(
+                    "user", datetime(2025, 1, 1) + timedelta(hours=i),
+                    {}, {}, {}, {}, {}, [], {}, {}
+                ))
+            return (
+                await db.get_recent_interactions("user"),
+                await db.get_session_interactions("user_session"),
+                await db.get_relevant_memories("user"),
+                await db.get_latest_psychological_state("user")
+            )
+
+        interactions, session, memories, latest = asyncio.run(run())
+        self.assertEqual([r.interaction_id for r in interactions], ["interaction_3", "interaction_2"])
+        self.assertEqual(len(session), 2)
+        self.assertEqual([m.memory_id for m in memories], ["memory_3", "memory_2"])
+        self.assertEqual(latest.timestamp.hour, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
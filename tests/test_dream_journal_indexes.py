@@ -0,0 +1,83 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from DriftDreamEngine import DriftDreamEngine, DreamEntry
+
+
+MOODS = ["awe", "melancholy", "yearning", "contemplative"]
+SYMBOLS = ["mirror", "river", "thread", "flame", "door"]
+
+
+class TestDreamJournalIndexes(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.engine = DriftDreamEngine(os.path.join(self.temp_dir, "dreams.json"))
+        rng = random.Random(7)
+        start = datetime.now() - timedelta(days=20)
+        for i in range(60):
+            self.engine._append_dream(DreamEntry(
+                id=f"dream_{i}",
+                scene_title=f"Dream {i}",
+                mood_palette=rng.sample(MOODS, 2),
+                symbolic_phrases=[],
+                metaphor_chain=[rng.choice(SYMBOLS), "threshold"],
+                echoed_phrase="",
+                resolution_state=rng.choice(["resolved", "unresolved", "transforming"]),
+                dream_timestamp=(start + timedelta(hours=8 * i)).isoformat() + "Z",
+                symbol_sources=rng.sample(SYMBOLS, 2),
+                emotional_intensity=rng.random(),
+                lucidity_level=rng.random()
+            ))
+
+    def tearDown(self):
+        self.engine.store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_mood_query_matches_full_scan(self):
+        expected = sorted(
+            [d for d in self.engine.dream_journal if "awe" in d.mood_palette],
+            key=lambda d: (d.dream_timestamp, d.emotional_intensity),
+            reverse=True
+        )[:5]
+        self.assertEqual(self.engine.get_dreams_by_mood("awe", 5), expected)
+
+    def test_symbol_query_matches_full_scan(self):
+        expected = sorted(
+            [d for d in self.engine.dream_journal if "river" in d.symbol_sources],
+            key=lambda d: d.dream_timestamp,
+            reverse=True
+        )[:7]
+        self.assertEqual(self.engine.get_dreams_by_symbol("river", 7), expected)
+
+    def test_blend_window_tracks_new_dreams(self):
+        first = self.engine.blend_dreams_over_time(days_back=7)
+        recent = [d for d in self.engine.dream_journal
+                  if datetime.fromisoformat(d.dream_timestamp.replace("Z", "")) >= datetime.now() - timedelta(days=7)]
+        self.assertEqual(first["total_dreams"], len(recent))
+        self.assertAlmostEqual(first["coherence_score"], self.engine._calculate_dream_coherence(recent))
+
+        self.engine._append_dream(DreamEntry(
+            id="dream_new",
+            scene_title="New",
+            mood_palette=["awe"],
+            symbolic_phrases=[],
+            metaphor_chain=["mirror"],
+            echoed_phrase="",
+            resolution_state="resolved",
+            dream_timestamp=datetime.now().isoformat() + "Z",
+            symbol_sources=["mirror"]
+        ))
+        second = self.engine.blend_dreams_over_time(days_back=7)
+        self.assertEqual(second["total_dreams"], len(recent) + 1)
+        self.assertAlmostEqual(
+            second["coherence_score"],
+            self.engine._calculate_dream_coherence(recent + [self.engine.dream_journal[-1]])
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
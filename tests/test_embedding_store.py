@@ -0,0 +1,80 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "quant_pass2"))
+
+from embedding_store import EmbeddingStore, KEYS_FILE, VECTORS_FILE
+
+
+class HashEncoder:
+    """Deterministic 8-d pseudo-embeddings, recording every batch it is asked for"""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        return np.stack([np.random.default_rng(sum(map(ord, text))).normal(size=8) for text in texts])
+
+
+class TestEmbeddingStore(unittest.TestCase):
+    def test_each_unique_text_is_encoded_once_in_batches(self):
+        store, encode = EmbeddingStore(), HashEncoder()
+        rows = store.ensure(["a", "b", "a", "c", "d", "e"], encode, batch_size=2)
+        store.ensure(["e", "b"], encode, batch_size=2)
+
+        self.assertEqual(encode.batches, [["a", "b"], ["c", "d"], ["e"]])
+        self.assertEqual(rows.tolist(), [0, 1, 0, 2, 3, 4])
+        self.assertEqual(store.get_stats()["hits"], 3)
+
+    def test_similarities_are_normalized_dot_products(self):
+        store, encode = EmbeddingStore(), HashEncoder()
+        texts = ["calm", "angry", "joyful"]
+        store.ensure(texts, encode)
+
+        raw = encode(texts)
+        raw = raw / np.linalg.norm(raw, axis=1, keepdims=True)
+        np.testing.assert_allclose(store.similarity_matrix(texts), raw @ raw.T, rtol=1e-5)
+        np.testing.assert_allclose(store.paired_similarity(texts, texts[::-1]),
+                                   [raw[0] @ raw[2], 1.0, raw[2] @ raw[0]], rtol=1e-5)
+
+    def test_vectors_persist_across_instances(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first = EmbeddingStore(temp_dir)
+            first.ensure(["a", "b"], HashEncoder())
+
+            encode = HashEncoder()
+            second = EmbeddingStore(temp_dir)
+            second.ensure(["b", "c"], encode)
+
+            self.assertEqual(encode.batches, [["c"]])
+            np.testing.assert_allclose(second.vectors(["a"]), first.vectors(["a"]))
+            self.assertEqual(len(EmbeddingStore(temp_dir)), 3)
+
+    def test_torn_write_is_trimmed_on_load(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            EmbeddingStore(temp_dir).ensure(["a", "b"], HashEncoder())
+            # Vectors of a third text were written, its key was not
+            with open(os.path.join(temp_dir, VECTORS_FILE), 'ab') as f:
+                f.write(np.ones(8, dtype=np.float32).tobytes())
+
+            store = EmbeddingStore(temp_dir)
+            self.assertEqual(len(store), 2)
+            self.assertEqual(os.path.getsize(os.path.join(temp_dir, VECTORS_FILE)), 2 * 8 * 4)
+            with open(os.path.join(temp_dir, KEYS_FILE)) as f:
+                self.assertEqual(len(f.read().split()), 2)
+
+    def test_dimension_mismatch_is_rejected(self):
+        store = EmbeddingStore()
+        store.ensure(["a"], HashEncoder())
+        with self.assertRaises(ValueError):
+            store.ensure(["b"], lambda texts: np.zeros((len(texts), 4)))
+
+
+if __name__ == '__main__':
+    unittest.main()
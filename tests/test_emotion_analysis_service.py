@@ -0,0 +1,123 @@
+import asyncio
+import gc
+import os
+import sys
+import tempfile
+import unittest
+import weakref
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from memory.emotion_tagger import EmotionTagger
+from memory_system import MemorySystem
+from modules.emotion.analysis_service import EmotionAnalysisService, get_analysis_service
+from modules.emotion.emotion_detection import EmotionDetector
+from modules.nlp.simple_tagger import extract_tags
+
+
+class TestEmotionAnalysisService(unittest.TestCase):
+    def test_each_analyzer_runs_once_per_message(self):
+        service = EmotionAnalysisService()
+        calls = []
+        service.register("words", lambda tokens: calls.append("words") or tuple(tokens.words))
+        service.register("count", lambda tokens: calls.append("count") or len(tokens.split_words))
+
+        first = service.analyze("I am so happy today")
+        second = service.analyze("I am so happy today")
+
+        self.assertEqual(first, second)
+        self.assertEqual(first["count"], 5)
+        self.assertEqual(sorted(calls), ["count", "words"])
+        stats = service.get_stats()
+        self.assertEqual(stats["tokenizations"], 1)
+        self.assertEqual(stats["duplicate_hits"], 2)
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_first_registration_wins_unless_replaced(self):
+        service = EmotionAnalysisService()
+        self.assertTrue(service.register("a", lambda tokens: 1))
+        self.assertFalse(service.register("a", lambda tokens: 2))
+        self.assertEqual(service.run("a", "text"), 1)
+        self.assertTrue(service.register("a", lambda tokens: 2, replace=True))
+        self.assertEqual(service.run("a", "text"), 2)
+
+    def test_instances_run_their_own_analyzers(self):
+        class Counter:
+            def __init__(self, word):
+                self.word = word
+
+            def count(self, tokens):
+                return tokens.word_counts[self.word]
+
+        service = EmotionAnalysisService()
+        first, second = Counter("happy"), Counter("sad")
+        first_key = service.register_method("count", first.count)
+        second_key = service.register_method("count", second.count)
+
+        self.assertEqual(service.run(first_key, "happy happy sad"), 2)
+        self.assertEqual(service.run(second_key, "happy happy sad"), 1)
+
+        service.run(first_key, "happy")
+        del first
+        gc.collect()
+        self.assertFalse(service.is_registered(first_key))
+        self.assertEqual(service.get_stats()["analyzers"], [second_key])
+        with self.assertRaises(KeyError):
+            service.run(first_key, "happy again")
+
+    def test_detectors_are_not_pinned_by_the_service(self):
+        detector = EmotionDetector()
+        detector.emotion_keywords = {"calm": ["zen"]}
+        other = EmotionDetector()
+        analysis = asyncio.run(other.analyze_text("I feel so zen and happy"))
+        self.assertEqual(analysis["primary_emotion"], "happy")
+
+        reference = weakref.ref(detector)
+        del detector
+        gc.collect()
+        self.assertIsNone(reference())
+
+    def test_lru_is_bounded(self):
+        service = EmotionAnalysisService(max_entries=2)
+        service.register("length", lambda tokens: len(tokens.text))
+        for text in ("one", "two", "three"):
+            service.run("length", text)
+        service.run("length", "one")
+        stats = service.get_stats()
+        self.assertEqual(stats["cached_messages"], 2)
+        self.assertEqual(stats["evictions"], 2)
+        self.assertEqual(stats["duplicate_hits"], 0)
+
+    def test_detectors_share_one_tokenization(self):
+        message = "I am really really happy and so grateful, thanks!"
+        detector = EmotionDetector()
+        tagger = EmotionTagger()
+        with tempfile.TemporaryDirectory() as memory_dir:
+            memory = MemorySystem(memory_dir=memory_dir)
+            service = get_analysis_service()
+            before = service.get_stats()["tokenizations"]
+
+            analysis = asyncio.run(detector.analyze_text(message))
+            tagged = asyncio.run(tagger.analyze_emotion(message, "user"))
+            score, tags = memory._analyze_sentiment(message)
+            repeated = extract_tags(message)
+            again = asyncio.run(detector.analyze_text(message))
+
+        self.assertEqual(service.get_stats()["tokenizations"], before + 1)
+        self.assertEqual(analysis["primary_emotion"], "happy")
+        self.assertEqual(again["emotions"], analysis["emotions"])
+        self.assertIn("joy", tagged["emotions"])
+        self.assertGreater(score, 0)
+        self.assertIn("positive:happy", tags)
+        self.assertEqual(repeated, ["really"])
+
+    def test_callers_get_their_own_copies(self):
+        detector = EmotionDetector()
+        first = asyncio.run(detector.analyze_text("I feel lonely and sad"))
+        first["emotions"]["sad"] = 0.0
+        second = asyncio.run(detector.analyze_text("I feel lonely and sad"))
+        self.assertEqual(second["emotions"]["sad"], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
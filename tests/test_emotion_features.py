@@ -0,0 +1,96 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "quant_pass1"))
+
+from emotion_features import (
+    METRIC_FIELDS, PARALLEL_MIN_RESPONSES, PhraseScanner, extract_feature_matrix, score_responses
+)
+from emotion_training_tracker import EmotionalMetrics
+from pass1_quantization_loop import Pass1QuantizationLoop, QuantizationConfig
+
+
+class TestPhraseScanner(unittest.TestCase):
+    def test_finds_substrings_including_shared_prefixes(self):
+        scanner = PhraseScanner(["pain", "painful", "like", "here for you", "absent"])
+        self.assertEqual(scanner.scan("so painful, likely. i'm here for you"),
+                         {"pain", "painful", "like", "here for you"})
+        self.assertEqual(PhraseScanner([]).scan("anything"), set())
+
+
+class TestScoreResponses(unittest.TestCase):
+    def test_scores_follow_metric_rules(self):
+        scores = score_responses(
+            ["ok", "I understand how deeply painful this loss must be. You might feel lost on this path."],
+            ["joy", "grief"]
+        )
+        self.assertEqual(scores.shape, (2, len(METRIC_FIELDS)))
+
+        short, grief = scores
+        self.assertAlmostEqual(short[0], 0.1)  # too short to be fluent
+        self.assertAlmostEqual(short[5], 0.6)  # no positive sentiment for joy
+
+        self.assertAlmostEqual(grief[0], 0.9)  # two sentences, punctuation, capitals
+        self.assertAlmostEqual(grief[1], 0.7)  # 'deeply', 'painful'
+        self.assertAlmostEqual(grief[2], 0.4 + 2 / 7 * 0.6)  # 'loss', 'pain'
+        self.assertAlmostEqual(grief[3], 0.8)  # 'understand', 'feel' + perspective-taking
+        self.assertAlmostEqual(grief[4], 0.8)  # 'path'
+        self.assertAlmostEqual(grief[5], 0.8)
+
+    def test_failed_prompts_score_nan(self):
+        responses = ["That sounds wonderful! I am so happy for you.", None]
+        scores = score_responses(responses, ["joy", "grief"])
+        self.assertEqual(scores.shape, (2, len(METRIC_FIELDS)))
+        self.assertTrue(np.isnan(scores[1]).all())
+        np.testing.assert_array_equal(scores[0], score_responses(responses[:1], ["joy"])[0])
+
+    def test_process_pool_matches_in_process_extraction(self):
+        responses = [f"Response {i} is like a wonderful journey!" for i in range(PARALLEL_MIN_RESPONSES)]
+        emotions = ["joy", "grief"] * (PARALLEL_MIN_RESPONSES // 2)
+        np.testing.assert_array_equal(extract_feature_matrix(responses, emotions, workers=2),
+                                      extract_feature_matrix(responses, emotions))
+
+
+class TestPass1Evaluation(unittest.TestCase):
+    def setUp(self):
+        self.loop = Pass1QuantizationLoop.__new__(Pass1QuantizationLoop)
+        self.loop.config = QuantizationConfig(base_model_path="unused")
+        self.loop.score_weights = np.array([0.20, 0.15, 0.25, 0.20, 0.10, 0.10])
+
+    def test_metrics_are_averaged_over_the_eval_set(self):
+        responses = [
+            {"response": "That sounds wonderful! I am so happy for you.", "expected_emotion": "joy"},
+            {"response": "I understand. Losing them is hard.", "expected_emotion": "grief"}
+        ]
+        metrics = self.loop._evaluate_emotional_responses(responses)
+        expected = self.loop._score_responses(responses).mean(axis=0)
+
+        self.assertAlmostEqual(metrics.emotional_match, expected[2])
+        self.assertAlmostEqual(metrics.overall_score(), float(expected @ self.loop.score_weights))
+
+    def test_failed_responses_are_left_out_of_the_averages(self):
+        responses = [
+            {"response": "That sounds wonderful! I am so happy for you.", "expected_emotion": "joy"},
+            {"response": "[Error generating response: out of memory]", "expected_emotion": "grief", "failed": True}
+        ]
+        scores = self.loop._score_responses(responses)
+        self.assertTrue(np.isnan(scores[1]).all())
+
+        metrics = self.loop._evaluate_emotional_responses(responses)
+        expected = self.loop._score_responses(responses[:1])[0]
+        self.assertAlmostEqual(metrics.overall_score(), float(expected @ self.loop.score_weights))
+
+    def test_degradation_relative_to_baseline(self):
+        baseline = EmotionalMetrics(0.8, 0.8, 0.8, 0.8, 0.8, 0.8)
+        current = EmotionalMetrics(0.6, 0.6, 0.6, 0.6, 0.6, 0.6)
+        self.assertAlmostEqual(self.loop._calculate_degradation(current, baseline), 0.25)
+        self.assertEqual(self.loop._calculate_degradation(baseline, current), 0.0)
+        self.assertEqual(self.loop._calculate_degradation(current, None), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
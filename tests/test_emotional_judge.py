@@ -0,0 +1,114 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "quant_pass2"))
+
+from generation_engine import GenerationEngine
+
+try:
+    from emotional_judge import EmotionalJudge, JudgeVote, VOTE_OPTIONS
+    JUDGE_AVAILABLE = True
+except ImportError:
+    JUDGE_AVAILABLE = False
+
+
+class StandInBackend:
+    """Judges always prefer response A; prompts containing ``fail_on`` fail their batch"""
+
+    def __init__(self, fail_on=None):
+        self.prompts = []
+        self.fail_on = fail_on
+
+    def count_tokens(self, prompts):
+        return [len(prompt.split()) for prompt in prompts]
+
+    def generate_batch(self, prompts, params):
+        self.prompts.extend(prompts)
+        if self.fail_on and any(self.fail_on in prompt for prompt in prompts):
+            raise RuntimeError("out of memory")
+        return [("Response A is clearly more empathetic and supportive.", 9) for _ in prompts]
+
+
+def make_comparisons(count):
+    return [{
+        "prompt": f"situation {i}",
+        "model_a": "alpha",
+        "model_b": "beta",
+        "response_a": f"warm reply {i}",
+        "response_b": f"cold reply {i}"
+    } for i in range(count)]
+
+
+def reference_consensus(votes):
+    """The per-comparison loop the batched consensus replaces"""
+    if not votes:
+        return "tie", 0.0, 1.0
+    vote_counts = {"a": 0, "b": 0, "tie": 0}
+    for vote in votes:
+        vote_counts[vote.vote] += 1
+    max_votes = max(vote_counts.values())
+    options = [v for v, count in vote_counts.items() if count == max_votes]
+    consensus = options[0] if len(options) == 1 else "tie"
+    return consensus, sum(v.confidence for v in votes) / len(votes), 1.0 - max_votes / len(votes)
+
+
+@unittest.skipUnless(JUDGE_AVAILABLE, "torch/transformers/psutil not installed")
+class TestEmotionalJudge(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.judge = EmotionalJudge(["judge-one", "judge-two"], checkpoint_dir=self.temp_dir.name)
+        self.backends = []
+
+        def judge_engine(judge_name, batch_size):
+            self.backends.append(StandInBackend(fail_on=getattr(self, "fail_on", None)))
+            return GenerationEngine(self.backends[-1], batch_size=batch_size)
+
+        self.judge._judge_engine = judge_engine
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_batched_consensus_matches_per_comparison_loop(self):
+        rng = random.Random(7)
+        votes_per_comparison = [
+            [JudgeVote(f"j{j}", "a", "b", "p", rng.choice(VOTE_OPTIONS), rng.random(), "", {})
+             for j in range(rng.randint(0, 4))]
+            for _ in range(200)
+        ]
+        consensus, confidence, disagreement = self.judge._calculate_consensus_batch(votes_per_comparison)
+
+        for i, votes in enumerate(votes_per_comparison):
+            expected = reference_consensus(votes)
+            self.assertEqual(consensus[i], expected[0])
+            self.assertAlmostEqual(confidence[i], expected[1])
+            self.assertAlmostEqual(disagreement[i], expected[2])
+
+    def test_each_judge_votes_on_all_comparisons_in_batches(self):
+        judgments = self.judge.batch_judge_comparisons(make_comparisons(5), batch_size=2, max_workers=1)
+
+        self.assertEqual(len(judgments), 5)
+        self.assertEqual([len(backend.prompts) for backend in self.backends], [5, 5])
+        self.assertTrue(all(j.consensus_vote == "a" and j.disagreement_level == 0.0 for j in judgments))
+        self.assertEqual(len(self.judge.judgment_history), 5)
+
+    def test_checkpointed_votes_are_not_regenerated(self):
+        comparisons = make_comparisons(4)
+        self.fail_on = "situation 3"
+        first = self.judge.judge_batch("judge-one", comparisons, batch_size=1,
+                                       checkpoint_dir=self.temp_dir.name)
+        self.assertEqual(first[3].reasoning, "Evaluation failed")
+
+        self.fail_on = None
+        second = self.judge.judge_batch("judge-one", comparisons, batch_size=1,
+                                        checkpoint_dir=self.temp_dir.name)
+        self.assertEqual(len(self.backends[-1].prompts), 1)
+        self.assertIn("situation 3", self.backends[-1].prompts[0])
+        self.assertEqual([vote.vote for vote in second], ["a"] * 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
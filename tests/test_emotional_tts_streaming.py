@@ -0,0 +1,134 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import numpy as np
+    from modules.voice.emotional_tts import (
+        EmotionalTTS, EmotionType, LookaheadNormalizer, ModelWarmPool, PersonaVoice, PRESENCE_EMOTIONS,
+        split_into_chunks
+    )
+    from modules.voice.phrase_cache import PhraseAudioCache
+    TTS_AVAILABLE = True
+except ImportError:
+    TTS_AVAILABLE = False
+
+
+def make_tts(**kwargs):
+    """TTS with a memory-only phrase cache and no whisper prewarming, unless overridden"""
+    kwargs.setdefault("phrase_cache", PhraseAudioCache())
+    kwargs.setdefault("prewarm_whispers", False)
+    tts = EmotionalTTS(**kwargs)
+    tts.model_pool.loader = lambda key: {"size_mb": 1.0}
+    return tts
+
+
+@unittest.skipUnless(TTS_AVAILABLE, "numpy/torch not installed")
+class TestEmotionalTTSStreaming(unittest.TestCase):
+    def setUp(self):
+        self.tts = make_tts()
+        self.tts._rng = np.random.default_rng(0)
+
+    def test_long_sentences_split_at_phrases(self):
+        chunks = split_into_chunks("Hi there. One long sentence, with a pause; and another, then the end. Ok!", 30)
+        self.assertEqual(chunks[0], "Hi there.")
+        self.assertEqual(chunks[-1], "Ok!")
+        self.assertTrue(all(len(chunk) <= 30 for chunk in chunks))
+
+    def test_normalizer_releases_every_sample_once(self):
+        normalizer = LookaheadNormalizer(block=4, lookahead=2)
+        samples = np.arange(1, 11, dtype=np.float32)
+        blocks = list(normalizer.push(samples)) + list(normalizer.flush())
+        self.assertEqual(sum(len(block) for block in blocks), 10)
+        self.assertAlmostEqual(float(blocks[0][-1]), 4 / 6, places=5)
+        self.assertLessEqual(max(float(np.abs(block).max()) for block in blocks), 1.0)
+
+    def test_stream_emits_wav_header_then_pcm(self):
+        frames = list(self.tts.synthesize_speech_stream(
+            "Hello. How are you?", PersonaVoice.MIA, EmotionType.LOVE, 0.7, audio_format="wav"
+        ))
+        self.assertTrue(frames[0].startswith(b"RIFF"))
+        self.assertGreater(len(frames), 2)
+        self.assertTrue(all(len(frame) % 2 == 0 for frame in frames[1:]))
+
+    def test_full_synthesis_returns_wav_container(self):
+        audio = self.tts.synthesize_speech("Hello.", PersonaVoice.DOC, EmotionType.CALM)
+        with wave.open(io.BytesIO(audio)) as wav_file:
+            self.assertEqual(wav_file.getframerate(), self.tts.config.sample_rate)
+            self.assertEqual(wav_file.getsampwidth(), 2)
+
+
+@unittest.skipUnless(TTS_AVAILABLE, "numpy/torch not installed")
+class TestModelWarmPool(unittest.TestCase):
+    def test_early_requests_use_fallback_until_models_are_ready(self):
+        tts = make_tts()
+        self.assertFalse(tts.models_ready(PersonaVoice.LYRA))
+
+        self.assertIsNotNone(tts.synthesize_speech("Hi.", PersonaVoice.LYRA, EmotionType.LOVE))
+        self.assertEqual(tts.fallback_requests, 1)
+
+        tts.ensure_models_loaded(PersonaVoice.LYRA).result(timeout=5)
+        tts.synthesize_speech("Hi.", PersonaVoice.LYRA, EmotionType.LOVE)
+        self.assertEqual(tts.fallback_requests, 1)
+        status = tts.get_voice_status()
+        self.assertTrue(status["models_loaded"]["lyra"])
+        self.assertIn(str(("lyra", tts.config.device)), status["model_pool"]["load_times_s"])
+
+    def test_prewarmed_whispers_are_served_from_phrase_cache(self):
+        tts = make_tts()
+        added = tts.prewarm_phrases([("longing", "I miss you"), ("unknown", "skipped")]).result(timeout=5)
+        self.assertEqual(added, 1)
+
+        tts.synthesize_speech("I miss you", PersonaVoice.MIA, EmotionType.LOVE, 0.4)
+        self.assertEqual(tts.get_voice_status()["phrase_cache"]["memory_hits"], 1)
+
+    def test_whispers_are_prewarmed_to_disk_when_models_are_ready(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, True)
+        tts = make_tts(phrase_cache=PhraseAudioCache(directory=temp_dir), prewarm_whispers=True)
+
+        tts.ensure_models_loaded(PersonaVoice.SOLENE).result(timeout=5)
+        # Prewarming is queued on the loader thread behind the load
+        tts.model_pool.submit(lambda: None).result(timeout=30)
+
+        emotion, phrase = tts._load_whisper_phrases()[0]
+        self.assertGreater(tts.phrase_cache.get_stats()["disk_entries"], 0)
+        reopened = PhraseAudioCache(directory=temp_dir)
+        self.assertIsNotNone(reopened.get(phrase, "solene", PRESENCE_EMOTIONS[emotion].value, 0.4))
+
+    def test_default_phrase_cache_uses_configured_directory(self):
+        tts = EmotionalTTS(prewarm_whispers=False)
+        self.assertEqual(tts.phrase_cache.directory, tts.config.phrase_cache_dir)
+
+    def test_concurrent_requests_share_one_load_and_evict_lru(self):
+        loads = []
+        release = threading.Event()
+
+        def loader(key):
+            release.wait(5)
+            loads.append(key)
+            return {"size_mb": 60.0}
+
+        pool = ModelWarmPool(loader, max_entries=3, memory_budget_mb=100)
+        first = pool.request("a")
+        self.assertIs(pool.request("a"), first)
+        release.set()
+        first.result(timeout=5)
+        pool.request("b").result(timeout=5)
+
+        self.assertEqual(loads, ["a", "b"])
+        self.assertFalse(pool.is_ready("a"))
+        self.assertTrue(pool.is_ready("b"))
+        self.assertEqual(pool.stats()["evictions"], 1)
+        pool.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
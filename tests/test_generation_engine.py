@@ -0,0 +1,93 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "quant_pass2"))
+
+from generation_engine import GenerationEngine, TransformersBackend
+
+try:
+    import torch  # noqa: F401
+    from tokenizers import Tokenizer, models, pre_tokenizers
+    from transformers import GPT2Config, GPT2LMHeadModel, PreTrainedTokenizerFast
+    TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    TRANSFORMERS_AVAILABLE = False
+
+
+class StandInBackend:
+    """Word-count tokens; the 'response' is the prompt upper-cased"""
+
+    def __init__(self, fail_on=None):
+        self.batches = []
+        self.fail_on = fail_on
+
+    def count_tokens(self, prompts):
+        return [len(prompt.split()) for prompt in prompts]
+
+    def generate_batch(self, prompts, params):
+        self.batches.append(list(prompts))
+        if self.fail_on in prompts:
+            raise RuntimeError("out of memory")
+        return [(prompt.upper(), len(prompt.split())) for prompt in prompts]
+
+
+PROMPTS = ["one two three four", "one", "one two", "one two three four five six", "one two three"]
+
+
+class TestGenerationEngine(unittest.TestCase):
+    def test_batches_group_prompts_of_similar_length(self):
+        backend = StandInBackend()
+        engine = GenerationEngine(backend, batch_size=2)
+        responses = engine.generate(PROMPTS, {"max_new_tokens": 8})
+
+        self.assertEqual(responses, [prompt.upper() for prompt in PROMPTS])
+        self.assertEqual(backend.batches, [["one", "one two"], ["one two three", "one two three four"],
+                                           ["one two three four five six"]])
+        self.assertEqual(engine.stats.generated_tokens, 16)
+        self.assertEqual(engine.stats.batches, 3)
+
+    def test_token_budget_splits_batches(self):
+        engine = GenerationEngine(StandInBackend(), batch_size=8, max_batch_tokens=6)
+        self.assertEqual(engine.buckets(PROMPTS), [[1, 2], [4], [0], [3]])
+
+    def test_results_stream_to_disk_and_failed_batches_are_empty(self):
+        engine = GenerationEngine(StandInBackend(fail_on="one"), batch_size=2)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "out", "responses.jsonl")
+            responses = engine.generate(PROMPTS, {}, output_path=output_path)
+            with open(output_path) as f:
+                records = [json.loads(line) for line in f]
+
+        self.assertEqual(responses[1], "")
+        self.assertEqual(responses[0], "ONE TWO THREE FOUR")
+        self.assertEqual([r["index"] for r in records], [1, 2, 4, 0, 3])
+
+
+@unittest.skipUnless(TRANSFORMERS_AVAILABLE, "torch/transformers not installed")
+class TestTransformersBackend(unittest.TestCase):
+    def test_tiny_model_generates_on_cpu(self):
+        words = "tell me about a time you felt truly understood by someone".split()
+        vocab = {"[PAD]": 0, "[EOS]": 1, "[UNK]": 2, **{w: i + 3 for i, w in enumerate(dict.fromkeys(words))}}
+        tokenizer_object = Tokenizer(models.WordLevel(vocab=vocab, unk_token="[UNK]"))
+        tokenizer_object.pre_tokenizer = pre_tokenizers.Whitespace()
+        tokenizer = PreTrainedTokenizerFast(tokenizer_object=tokenizer_object, pad_token="[PAD]",
+                                            eos_token="[EOS]", unk_token="[UNK]")
+        model = GPT2LMHeadModel(GPT2Config(vocab_size=len(vocab), n_positions=64, n_embd=16, n_layer=1,
+                                           n_head=2, eos_token_id=1, pad_token_id=0))
+
+        engine = GenerationEngine(TransformersBackend(model=model, tokenizer=tokenizer), batch_size=2)
+        prompts = ["tell me", "tell me about a time", "you felt truly understood"]
+        responses = engine.generate(prompts, {"max_new_tokens": 4, "do_sample": False})
+
+        self.assertEqual(len(responses), 3)
+        self.assertTrue(all(isinstance(response, str) for response in responses))
+        self.assertEqual(engine.stats.batches, 2)
+        self.assertEqual(tokenizer.padding_side, "left")
+
+
+if __name__ == '__main__':
+    unittest.main()
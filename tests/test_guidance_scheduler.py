@@ -0,0 +1,148 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.core.guidance_scheduler import GuidanceScheduler, LatencyHistogram, input_fingerprint, select_context
+
+try:
+    from modules.core.unified_companion import UnifiedCompanion
+    COMPANION_AVAILABLE = True
+except ImportError:
+    COMPANION_AVAILABLE = False
+
+
+class TestGuidanceScheduler(unittest.TestCase):
+    def test_unchanged_inputs_are_memoized(self):
+        scheduler = GuidanceScheduler(cache_ttl=60.0)
+        calls = []
+
+        async def attachment():
+            calls.append("attachment")
+            return {"type": "attachment"}
+
+        fingerprint = input_fingerprint("hello", {"mood": "calm"})
+
+        async def run():
+            first = await scheduler.run({"attachment": attachment}, fingerprint)
+            second = await scheduler.run({"attachment": attachment}, fingerprint)
+            third = await scheduler.run({"attachment": attachment}, input_fingerprint("other", {}))
+            return first, second, third
+
+        first, second, third = asyncio.run(run())
+        self.assertEqual(first, second)
+        self.assertEqual(third, first)
+        self.assertEqual(calls, ["attachment", "attachment"])
+        self.assertEqual(scheduler.get_stats()["modules"]["attachment"]["memo_hits"], 1)
+
+    def test_per_module_fingerprints_ignore_fields_the_module_does_not_read(self):
+        scheduler = GuidanceScheduler(cache_ttl=60.0)
+        fields = {"desire_system": (), "sensory_preferences": ("mood",)}
+        calls = []
+
+        def job(name):
+            async def run():
+                calls.append(name)
+                return {"type": name}
+            return run
+
+        turns = [
+            {"mood": "calm", "interaction_count": 1, "session_duration": 0.4, "conversation_history": []},
+            {"mood": "calm", "interaction_count": 2, "session_duration": 9.1, "conversation_history": ["hi"]},
+            {"mood": "tender", "interaction_count": 3, "session_duration": 12.6, "conversation_history": ["hi", "hey"]},
+        ]
+
+        async def run():
+            for context in turns:
+                fingerprints = {name: input_fingerprint("hello", select_context(context, module_fields))
+                                for name, module_fields in fields.items()}
+                await scheduler.run({name: job(name) for name in fields}, fingerprints)
+
+        asyncio.run(run())
+        self.assertEqual(select_context(turns[0], ("mood", "trust_level")), {"mood": "calm"})
+        self.assertEqual(calls.count("desire_system"), 1)
+        self.assertEqual(calls.count("sensory_preferences"), 2)
+        modules = scheduler.get_stats()["modules"]
+        self.assertEqual(modules["desire_system"]["memo_hits"], 2)
+        self.assertEqual(modules["sensory_preferences"]["memo_hits"], 1)
+
+    def test_late_module_is_filled_from_last_guidance(self):
+        scheduler = GuidanceScheduler(turn_budget=0.05, module_timeout=1.0, cache_ttl=0.0)
+        delays = iter([0.0, 0.3])
+
+        async def dream():
+            await asyncio.sleep(next(delays))
+            return {"type": "dream", "turn": "first"}
+
+        async def audio():
+            return {"type": "audio"}
+
+        async def run():
+            await scheduler.run({"dream_engine": dream, "audio": audio}, "turn-1")
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            results = await scheduler.run({"dream_engine": dream, "audio": audio}, "turn-2")
+            elapsed = loop.time() - start
+            await scheduler.drain()
+            return results, elapsed
+
+        results, elapsed = asyncio.run(run())
+        self.assertLess(elapsed, 0.2)
+        self.assertEqual(list(results), ["dream_engine", "audio"])
+        self.assertEqual(results["dream_engine"]["turn"], "first")
+        stats = scheduler.get_stats()["modules"]["dream_engine"]
+        self.assertEqual(stats["late"], 1)
+        self.assertEqual(stats["stale_fills"], 1)
+
+    def test_module_timeout_and_errors_are_counted(self):
+        scheduler = GuidanceScheduler(turn_budget=1.0, module_timeouts={"slow": 0.01})
+
+        async def slow():
+            await asyncio.sleep(0.5)
+
+        async def broken():
+            raise RuntimeError("boom")
+
+        results = asyncio.run(scheduler.run({"slow": slow, "broken": broken}, "turn"))
+        self.assertEqual(results, {})
+        modules = scheduler.get_stats()["modules"]
+        self.assertEqual(modules["slow"]["timeouts"], 1)
+        self.assertEqual(modules["broken"]["errors"], 1)
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles_use_bucket_bounds(self):
+        histogram = LatencyHistogram([10, 100])
+        for value in (1, 2, 3, 50, 500):
+            histogram.record(value)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["count"], 5)
+        self.assertEqual(snapshot["p50_ms"], 10.0)
+        self.assertEqual(snapshot["p95_ms"], 500)
+        self.assertEqual(snapshot["buckets"], {"<=10ms": 3, "<=100ms": 1, ">100ms": 1})
+
+
+@unittest.skipUnless(COMPANION_AVAILABLE, "unified companion dependencies not installed")
+class TestCompanionGuidanceReuse(unittest.TestCase):
+    def test_second_turn_hits_the_guidance_memo(self):
+        companion = UnifiedCompanion({"mythomax": {"use_mock": True, "model_path": "mock"},
+                                      "database": {"type": "inmemory"}})
+
+        async def run():
+            await companion.initialize()
+            for _ in range(2):
+                await companion.process_interaction("memo_user", "I missed you today")
+            await companion.background_stages.wait_for("memo_user")
+
+        asyncio.run(run())
+
+        self.assertEqual(len(companion.user_mode_coordinators), 1)
+        modules = companion.get_guidance_stats("memo_user")["modules"]
+        self.assertTrue(modules)
+        self.assertGreaterEqual(sum(stats["memo_hits"] for stats in modules.values()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
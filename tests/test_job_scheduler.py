@@ -0,0 +1,169 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "emotion_quant_autopilot"))
+
+try:
+    import psutil
+    from job_scheduler import JobFootprint, JobScheduler, estimate_job_footprint, worker_state
+    from quant_autopilot import AutopilotDatabase, QuantizationJob
+    SCHEDULER_AVAILABLE = True
+except ImportError:
+    SCHEDULER_AVAILABLE = False
+
+# Worker stand-in: counts for a while, writing a result file when done
+WORKER_SCRIPT = """
+import json, sys, time
+for _ in range(int(sys.argv[2])):
+    time.sleep(0.05)
+with open(sys.argv[1], 'w') as f:
+    json.dump({"success": True}, f)
+"""
+
+
+def make_job(job_id, base_model="llama-13b", method="q4_K_M", priority=5):
+    return QuantizationJob(job_id=job_id, base_model=base_model, quantization_method=method, priority=priority)
+
+
+@unittest.skipUnless(SCHEDULER_AVAILABLE, "psutil not installed")
+class TestJobScheduler(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config = {
+            "safety_limits": {"max_concurrent_processes": 3, "disk_space_threshold_gb": 0, "timeout_minutes": 1},
+            "scheduler": {"poll_interval_seconds": 0.05, "threads_per_job": 1},
+            "output_paths": {"temp_directory": self.temp_dir.name, "models_directory": self.temp_dir.name}
+        }
+        self.steps = 20
+        self.scheduler = JobScheduler(
+            self.config,
+            lambda job_id, result_path: [sys.executable, "-c", WORKER_SCRIPT, str(result_path), str(self.steps)]
+        )
+
+    def tearDown(self):
+        self.scheduler.stop_all()
+        self.temp_dir.cleanup()
+
+    def test_start_records_the_spawning_pid(self):
+        job_process = self.scheduler.start(make_job("job-1"))
+        self.assertEqual(job_process.scheduler_pid, os.getpid())
+        self.assertEqual(self.scheduler.wait("job-1"), 0)
+
+    def test_footprint_follows_model_size_and_method(self):
+        small = estimate_job_footprint("mistral-7b-instruct", "q4_K_M", threads=2)
+        large = estimate_job_footprint("llama-13b", "q8_0", threads=2)
+        self.assertLess(small.memory_gb, large.memory_gb)
+        self.assertAlmostEqual(large.disk_gb, 13 * 8.5 / 8 + 26)
+
+    def test_admits_only_jobs_that_fit(self):
+        jobs = [make_job("big", "llama-70b", "q8_0"), make_job("a"), make_job("b"), make_job("c"), make_job("d")]
+        per_job = self.scheduler.footprint(jobs[1])
+        self.scheduler.available_resources = lambda: JobFootprint(
+            memory_gb=per_job.memory_gb * 2.5, disk_gb=1e6, cpu_threads=8
+        )
+        self.assertEqual([job.job_id for job in self.scheduler.admit(jobs)], ["a", "b"])
+        self.assertEqual([job.job_id for job in self.scheduler.admit(jobs, limit=1)], ["a"])
+
+    def test_paused_job_resumes_and_completes(self):
+        job_process = self.scheduler.start(make_job("pausable"))
+        self.assertEqual(self.scheduler.pause_all(), ["pausable"])
+        time.sleep(0.2)
+        self.assertEqual(psutil.Process(job_process.process.pid).status(), psutil.STATUS_STOPPED)
+
+        self.assertEqual(self.scheduler.resume_all(), ["pausable"])
+        self.assertEqual(self.scheduler.wait("pausable"), 0)
+        self.assertTrue(job_process.result_path.exists())
+        self.assertEqual(self.scheduler.free_slots(), 3)
+
+    def test_stopped_job_is_interrupted_not_failed(self):
+        self.steps = 1000
+        self.scheduler.start(make_job("stoppable"))
+        self.scheduler.pause_all()
+        self.assertEqual(self.scheduler.stop_all(), ["stoppable"])
+        self.assertIsNone(self.scheduler.wait("stoppable"))
+
+    def test_timed_out_job_fails_instead_of_requeueing(self):
+        self.steps = 1000
+        self.scheduler.timeout_seconds = 0.2
+        job_process = self.scheduler.start(make_job("slow"))
+        exit_code = self.scheduler.wait("slow")
+        self.assertIsNotNone(exit_code)
+        self.assertNotEqual(exit_code, 0)
+        self.assertTrue(job_process.timed_out)
+        self.assertFalse(job_process.interrupted)
+
+
+@unittest.skipUnless(SCHEDULER_AVAILABLE, "psutil not installed")
+@unittest.skipUnless(SCHEDULER_AVAILABLE, "psutil not installed")
+class TestWorkerState(unittest.TestCase):
+    def setUp(self):
+        self.worker = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)", "job-7"])
+        # Until exec completes the child still shows the test runner's command line
+        deadline = time.monotonic() + 5
+        while "job-7" not in psutil.Process(self.worker.pid).cmdline() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def tearDown(self):
+        self.worker.kill()
+        self.worker.wait()
+
+    def test_owned_only_by_the_scheduler_that_spawned_it(self):
+        self.assertEqual(worker_state(self.worker.pid, "job-7", os.getpid()), "owned")
+        # A live parent other than the recorded scheduler is a subreaper that adopted the worker
+        self.assertEqual(worker_state(self.worker.pid, "job-7", os.getpid() + 1), "orphaned")
+        self.assertEqual(worker_state(self.worker.pid, "job-8", os.getpid()), "gone")
+
+
+class TestJobProgress(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.temp_dir.name) / "autopilot.db")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_interrupted_job_keeps_progress_when_requeued(self):
+        db = AutopilotDatabase(self.db_path)
+        db.add_quantization_job(make_job("job-1"))
+        db.mark_job_started("job-1", "run-1", pid=999999, scheduler_pid=4242)
+        db.update_job_progress("job-1", "quantized", {"model_path": "models/job-1.gguf"})
+        db.set_job_status("job-1", "paused")
+
+        interrupted = db.get_interrupted_jobs()
+        self.assertEqual([(job.job_id, pid, scheduler_pid) for job, pid, scheduler_pid in interrupted],
+                         [("job-1", 999999, 4242)])
+
+        db.requeue_job("job-1")
+        self.assertEqual([job.job_id for job in db.get_pending_jobs()], ["job-1"])
+        self.assertEqual(db.get_job_progress("job-1")["quantized"]["model_path"], "models/job-1.gguf")
+
+    def test_existing_queue_table_gains_progress_columns(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE quantization_queue (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, job_id TEXT UNIQUE NOT NULL,
+                    base_model TEXT NOT NULL, quantization_method TEXT NOT NULL,
+                    priority INTEGER DEFAULT 5, status TEXT DEFAULT 'pending',
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP, started_at TEXT NULL,
+                    completed_at TEXT NULL, run_id TEXT NULL
+                )
+            """)
+            conn.execute("INSERT INTO quantization_queue (job_id, base_model, quantization_method, created_at) "
+                         "VALUES ('old', 'llama-13b', 'q4_0', ?)", (datetime.now().isoformat(),))
+
+        db = AutopilotDatabase(self.db_path)
+        self.assertEqual(db.get_job_progress("old"), {})
+        db.update_job_progress("old", "quantized", {"model_path": "x"})
+        self.assertEqual(db.get_job_progress("old"), {"quantized": {"model_path": "x"}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+
+from json_state_store import JSONStateStore
+
+
+class TestJSONStateStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "history.json")
+        self.store = JSONStateStore(flush_interval=0.05, check_interval=0.0)
+
+    def tearDown(self):
+        self.store.flush()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_edits_are_flushed_in_background(self):
+        doc = self.store.document(self.path, [])
+        for i in range(10):
+            with doc.editing() as entries:
+                entries.append({"id": i})
+        self.assertFalse(os.path.exists(self.path))
+
+        deadline = time.time() + 2
+        while not os.path.exists(self.path) and time.time() < deadline:
+            time.sleep(0.02)
+        self.store.flush()
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)), 10)
+
+    def test_external_change_is_reloaded(self):
+        doc = self.store.document(self.path, [])
+        with doc.editing() as entries:
+            entries.append({"id": "local"})
+        self.store.flush()
+
+        time.sleep(0.01)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump([{"id": "other-process"}, {"id": "second"}], f)
+        os.utime(self.path, ns=(time.time_ns() + 10**9, time.time_ns() + 10**9))
+
+        self.assertEqual([e["id"] for e in doc.data], ["other-process", "second"])
+
+    def test_time_index_filters_and_orders(self):
+        now = datetime.now()
+        entries = [
+            {"id": "a", "timestamp": (now - timedelta(hours=1)).isoformat() + "Z"},
+            {"id": "b", "timestamp": (now - timedelta(days=3)).isoformat() + "Z"},
+            {"id": "c", "timestamp": (now - timedelta(minutes=5)).isoformat() + "Z"},
+        ]
+        doc = self.store.document(self.path, {"trace": entries})
+
+        recent = doc.since(now - timedelta(days=1), list_key="trace")
+        self.assertEqual([e["id"] for e in recent], ["a", "c"])
+        self.assertEqual([e["id"] for e in doc.newest_first(list_key="trace")], ["c", "a", "b"])
+
+        with doc.editing() as data:
+            data["trace"].append({"id": "d", "timestamp": now.isoformat() + "Z"})
+        self.assertEqual(doc.newest_first(list_key="trace")[0]["id"], "d")
+
+
+if __name__ == '__main__':
+    unittest.main()
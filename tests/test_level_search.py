@@ -0,0 +1,175 @@
+import os
+import sys
+import tempfile
+import unittest
+from collections import Counter
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "quant_pass1"))
+
+from level_search import (
+    DEGRADED, FAILED, PASS, TOO_LARGE, UNCERTAIN,
+    bisect_first_passing, estimate_degradation, stage_sizes, stratified_order
+)
+from pass1_quantization_loop import Pass1QuantizationLoop, QuantizationConfig
+
+LEVELS = ["q8_0", "q6_K", "q5_K_M", "q4_K_M", "q3_K_L", "q2_K"]
+
+
+class TestStagedEvaluation(unittest.TestCase):
+    def test_every_prefix_is_stratified(self):
+        labels = ["grief"] * 20 + ["joy"] * 10 + ["fear"] * 10
+        order = stratified_order(labels, seed=3)
+        self.assertEqual(sorted(order), list(range(len(labels))))
+
+        counts = Counter(labels[i] for i in order[:8])
+        self.assertEqual(counts, {"grief": 4, "joy": 2, "fear": 2})
+
+    def test_stage_sizes_grow_to_the_full_set(self):
+        self.assertEqual(stage_sizes(25), [5, 13, 25])
+        self.assertEqual(stage_sizes(4, minimum=2), [2, 4])
+        self.assertEqual(stage_sizes(1, minimum=2), [1])
+
+    def test_interval_collapses_onto_full_set_degradation(self):
+        rng = np.random.default_rng(0)
+        baseline = rng.uniform(0.6, 0.8, size=40)
+        scores = baseline - rng.uniform(0.0, 0.1, size=40)
+        scores[5] = np.nan
+
+        full = estimate_degradation(baseline, scores, total=40)
+        expected = (baseline.mean() - np.nanmean(scores)) / baseline.mean()
+        self.assertAlmostEqual(full.degradation, expected)
+        self.assertEqual((full.lower, full.upper), (full.degradation, full.degradation))
+
+        partial = estimate_degradation(baseline[:10], scores[:10], total=40)
+        self.assertLess(partial.lower, partial.degradation)
+        self.assertGreater(partial.upper, partial.degradation)
+
+    def test_decisions_follow_the_interval(self):
+        baseline = np.full(10, 0.8)
+        self.assertEqual(estimate_degradation(baseline, baseline * 0.5, total=50).decision(0.07), DEGRADED)
+        self.assertEqual(estimate_degradation(baseline, baseline, total=50).decision(0.07), PASS)
+
+        noisy = baseline - np.linspace(-0.1, 0.2, 10)
+        self.assertEqual(estimate_degradation(baseline, noisy, total=50).decision(0.07), UNCERTAIN)
+
+
+class TestBisection(unittest.TestCase):
+    def test_matches_linear_walk_on_ordered_levels(self):
+        for first_small in range(len(LEVELS) + 1):
+            for last_good in range(-1, len(LEVELS)):
+                def outcome(level):
+                    index = LEVELS.index(level)
+                    if index < first_small:
+                        return TOO_LARGE
+                    return PASS if index <= last_good else DEGRADED
+
+                linear = next((level for level in LEVELS if outcome(level) == PASS), None)
+                probed = []
+                found = bisect_first_passing(LEVELS, lambda level: probed.append(level) or outcome(level))
+
+                self.assertEqual(found, linear)
+                self.assertLessEqual(len(probed), 3)
+
+    def test_failed_levels_are_dropped(self):
+        outcomes = {"q8_0": TOO_LARGE, "q6_K": TOO_LARGE, "q5_K_M": FAILED, "q4_K_M": PASS,
+                    "q3_K_L": PASS, "q2_K": DEGRADED}
+        self.assertEqual(bisect_first_passing(LEVELS, outcomes.get), "q4_K_M")
+        self.assertIsNone(bisect_first_passing(LEVELS, lambda level: None))
+
+
+class TestPass1Search(unittest.TestCase):
+    """Linear walk and bisection over the same simulated levels"""
+
+    PROMPTS = 40
+
+    def make_loop(self, strategy, target_size_gb, threshold):
+        loop = Pass1QuantizationLoop.__new__(Pass1QuantizationLoop)
+        loop.config = QuantizationConfig(
+            base_model_path="unused", output_dir=self.temp_dir.name, target_size_gb=target_size_gb,
+            emotion_degradation_threshold=threshold, search_strategy=strategy
+        )
+        loop.evaluation_prompts = [
+            {"id": f"p{i}", "prompt": f"prompt {i}", "expected_emotion": ["grief", "joy", "fear", "love"][i % 4]}
+            for i in range(self.PROMPTS)
+        ]
+        loop.iteration_count = 0
+        loop.baseline_metrics = None
+        loop.best_result = None
+        loop._search_order = []
+        loop.score_weights = np.array([0.20, 0.15, 0.25, 0.20, 0.10, 0.10])
+        loop.generated = 0
+
+        rng = np.random.default_rng(11)
+        noise = rng.normal(0, 0.01, size=self.PROMPTS)
+
+        def quantize(quant_level, iteration):
+            # Each level is smaller and loses about 3% of the score
+            return f"model_{quant_level}", 16000 * 0.75 ** LEVELS.index(quant_level), True, ""
+
+        def generate(model_path, prompts):
+            loop.generated += len(prompts)
+            level = LEVELS.index(model_path[len("model_"):])
+            return [{"response": "", "expected_emotion": p["expected_emotion"],
+                     "score": 0.8 * (1 - 0.03 * level) + noise[int(p["id"][1:])]} for p in prompts]
+
+        loop._quantize_model = quantize
+        loop._generate_model_responses = generate
+        loop._score_responses = lambda responses: np.repeat(
+            np.array([[r["score"]] for r in responses]), 6, axis=1
+        )
+        loop._save_iteration_results = lambda result: None
+        return loop
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        patcher = mock.patch("pass1_quantization_loop.time.sleep")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_search_selects_the_linear_choice_with_fewer_responses(self):
+        generated = {"linear": 0, "bisect": 0}
+        for target_size_gb, threshold in [(15.0, 0.07), (8.0, 0.07), (5.0, 0.2), (5.0, 0.05), (2.0, 0.5)]:
+            linear = self.make_loop("linear", target_size_gb, threshold)
+            bisect = self.make_loop("bisect", target_size_gb, threshold)
+
+            linear_summary = linear.run_full_loop(force=True)
+            bisect_summary = bisect.run_full_loop(force=True)
+
+            self.assertEqual(bisect_summary["selected_level"], linear_summary["selected_level"])
+            self.assertEqual(bisect_summary["target_met"], linear_summary["target_met"])
+            self.assertEqual(bisect_summary["search"]["responses_generated"], bisect.generated)
+            generated["linear"] += linear.generated
+            generated["bisect"] += bisect.generated
+
+        self.assertLess(generated["bisect"], generated["linear"] / 2)
+
+
+class TestResponseGeneration(unittest.TestCase):
+    def test_unloadable_model_falls_back_to_mock_responses(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            model_path = os.path.join(temp_dir, "model_q4_K_M")
+            os.makedirs(model_path)
+            with open(os.path.join(model_path, "config.json"), 'w') as f:
+                f.write("{}")
+
+            loop = Pass1QuantizationLoop.__new__(Pass1QuantizationLoop)
+            loop.config = QuantizationConfig(base_model_path="unused", output_dir=temp_dir)
+            prompts = [{"id": "p0", "prompt": "I lost my dog", "expected_emotion": "grief"},
+                       {"id": "p1", "prompt": "I got the job", "expected_emotion": "joy"}]
+
+            with mock.patch("pass1_quantization_loop.TransformersBackend", side_effect=OSError("no weights")):
+                responses = loop._generate_model_responses(model_path, prompts)
+
+        self.assertEqual([r["prompt_id"] for r in responses], ["p0", "p1"])
+        self.assertTrue(all(r["response"] and not r["response"].startswith("[Error") for r in responses))
+
+
+if __name__ == '__main__':
+    unittest.main()
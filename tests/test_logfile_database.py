@@ -0,0 +1,155 @@
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.database.database_interface import (
+    create_database_interface, InteractionRecord, InteractionType, MemoryFragment, UserProfile
+)
+from modules.database.logfile_database import LogFileDatabase
+
+
+def make_interaction(index, user_id="user"):
+    return InteractionRecord(
+        interaction_id=f"interaction_{index}",
+        user_id=user_id,
+        session_id="session",
+        timestamp=datetime(2025, 1, 1) + timedelta(minutes=index),
+        user_input=f"message {index}",
+        companion_response="reply",
+        interaction_type=InteractionType.GENERAL_CONVERSATION,
+        context_analysis={},
+        emotional_state={},
+        technical_context={},
+        creative_context={},
+        guidance_used={},
+        response_metrics={}
+    )
+
+
+class TestLogFileDatabase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_factory_selects_logfile_backend(self):
+        db = create_database_interface(self.temp_dir, database_type="logfile")
+        self.assertIsInstance(db, LogFileDatabase)
+
+    def test_round_trip_through_log_replay(self):
+        async def write():
+            db = LogFileDatabase(self.temp_dir)
+            now = datetime.now()
+            await db.create_user_profile(UserProfile("user", now, now))
+            await db.update_user_profile("user", {"display_name": "Sam"})
+            for i in range(3):
+                await db.save_interaction(make_interaction(i))
+            await db.save_memory_fragment(MemoryFragment(
+                "memory", "user", "content", "emotional", 0.7, now, now, 0, [], ["home"]
+            ))
+            await db.update_memory_access("memory")
+            await db.close()
+
+        async def read():
+            db = LogFileDatabase(self.temp_dir)
+            result = (
+                await db.get_user_profile("user"),
+                await db.get_recent_interactions("user", limit=2),
+                await db.get_relevant_memories("user", tags=["home"])
+            )
+            await db.close()
+            return result
+
+        asyncio.run(write())
+        profile, recent, memories = asyncio.run(read())
+        self.assertEqual(profile.display_name, "Sam")
+        self.assertEqual([r.interaction_id for r in recent], ["interaction_2", "interaction_1"])
+        self.assertEqual(memories[0].access_count, 1)
+
+    def test_collections_load_lazily(self):
+        async def run():
+            db = LogFileDatabase(self.temp_dir)
+            await db.save_interaction(make_interaction(0))
+            await db.close()
+
+            reopened = LogFileDatabase(self.temp_dir)
+            await reopened.get_user_profile("user")
+            loaded = set(reopened._logs)
+            await reopened.close()
+            return loaded
+
+        self.assertEqual(asyncio.run(run()), {"users"})
+
+    def test_compaction_starts_new_generation(self):
+        async def run():
+            db = LogFileDatabase(self.temp_dir, compact_every=5)
+            for i in range(12):
+                await db.save_interaction(make_interaction(i))
+            generation = db._logs["interactions"].generation
+            await db.close()
+
+            reopened = LogFileDatabase(self.temp_dir)
+            recent = await reopened.get_recent_interactions("user", limit=50)
+            await reopened.close()
+            return generation, recent
+
+        generation, recent = asyncio.run(run())
+        self.assertGreaterEqual(generation, 1)
+        self.assertEqual(len(recent), 12)
+        logs = [name for name in os.listdir(self.temp_dir) if name.startswith("interactions.") and name.endswith(".log")]
+        self.assertEqual(len(logs), 1)
+
+    def test_appends_reach_the_file_before_fsync(self):
+        async def run():
+            db = LogFileDatabase(self.temp_dir, sync_every=100, sync_interval=0.05)
+            await db.save_interaction(make_interaction(0))
+            log = db._logs["interactions"]
+            with open(log.log_path(), encoding="utf-8") as f:
+                on_disk = f.read().count("\n")
+            unsynced = log._unsynced
+            await asyncio.sleep(0.1)
+            synced_later = log._unsynced
+            await db.close()
+            return on_disk, unsynced, synced_later
+
+        on_disk, unsynced, synced_later = asyncio.run(run())
+        self.assertEqual(on_disk, 1)
+        self.assertEqual(unsynced, 1)
+        self.assertEqual(synced_later, 0)
+
+    def test_torn_tail_is_truncated_on_recovery(self):
+        async def write():
+            db = LogFileDatabase(self.temp_dir)
+            await db.save_interaction(make_interaction(0))
+            await db.save_interaction(make_interaction(1))
+            await db.close()
+
+        asyncio.run(write())
+        log_path = os.path.join(self.temp_dir, "interactions.0.log")
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write('{"k": "interaction_2", "v": {"interac')
+
+        async def recover():
+            db = LogFileDatabase(self.temp_dir)
+            recent = await db.get_recent_interactions("user")
+            await db.save_interaction(make_interaction(3))
+            await db.close()
+            reopened = LogFileDatabase(self.temp_dir)
+            after = await reopened.get_recent_interactions("user")
+            await reopened.close()
+            return recent, after
+
+        recent, after = asyncio.run(recover())
+        self.assertEqual(len(recent), 2)
+        self.assertEqual([r.interaction_id for r in after], ["interaction_3", "interaction_1", "interaction_0"])
+
+
+if __name__ == '__main__':
+    unittest.main()
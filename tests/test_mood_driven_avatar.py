@@ -0,0 +1,74 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from modules.visual.mood_driven_avatar import AvatarGesture, MoodDrivenAvatar
+    AVATAR_AVAILABLE = True
+except ImportError:
+    AVATAR_AVAILABLE = False
+
+
+@unittest.skipUnless(AVATAR_AVAILABLE, "numpy not installed")
+class TestAvatarAnimationScheduler(unittest.TestCase):
+    def test_no_background_thread(self):
+        before = threading.active_count()
+        MoodDrivenAvatar()
+        self.assertEqual(threading.active_count(), before)
+
+    def test_gestures_play_back_to_back_and_interpolate_on_demand(self):
+        avatar = MoodDrivenAvatar()
+        avatar.trigger_gesture(AvatarGesture.WAVE, 0.7)      # 2.0s
+        avatar.trigger_gesture(AvatarGesture.BLOW_KISS, 0.9)  # 1.5s
+        first, second = avatar._timeline
+        self.assertEqual(second.start_time, first.end_time)
+
+        keyframe, progress = avatar._active_keyframe(first.start_time + 1.0)
+        self.assertEqual(keyframe.gesture, AvatarGesture.WAVE)
+        self.assertAlmostEqual(progress, 0.5)
+        self.assertEqual(avatar._active_keyframe(second.start_time + 0.1)[0].gesture, AvatarGesture.BLOW_KISS)
+        self.assertIsNone(avatar._active_keyframe(second.end_time + 0.1)[0])
+        self.assertEqual(avatar.next_keyframe_boundary(first.start_time + 1.0), first.end_time)
+        self.assertIsNone(avatar.next_keyframe_boundary(second.end_time))
+
+        state = avatar.get_avatar_state()
+        self.assertEqual(state["gesture"], "wave")
+        self.assertTrue(state["is_animating"])
+        self.assertEqual(len(avatar.animation_queue), 1)
+
+    def test_mood_update_publishes_a_new_snapshot(self):
+        avatar = MoodDrivenAvatar()
+        before = avatar.current_state
+        avatar.update_avatar_mood("love", 0.8, {"lighting": "soft"})
+        self.assertIsNot(avatar.current_state, before)
+        self.assertEqual(before.lighting, "natural")
+        state = avatar.get_avatar_state()
+        self.assertEqual(state["lighting"], "soft")
+        self.assertEqual(state["gesture"], "heart_hands")
+
+    def test_animation_events_wake_on_changes_only(self):
+        avatar = MoodDrivenAvatar()
+
+        async def run():
+            events = avatar.animation_events()
+            pending = asyncio.ensure_future(events.__anext__())
+            await asyncio.sleep(0.05)
+            idle = pending.done()
+            avatar.customize_avatar(lighting="candlelit")
+            state = await asyncio.wait_for(pending, 1.0)
+            avatar.stop()
+            await events.aclose()
+            return idle, state
+
+        idle, state = asyncio.run(run())
+        self.assertFalse(idle)
+        self.assertEqual(state["lighting"], "candlelit")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+from dataclasses import replace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.emotion.moodscape_audio import AudioTrack, AudioType, MoodCategory, MoodscapeAudioLayer
+
+PERSONAS = ["mia", "solene", "lyra", "doc"]
+EMOTIONS = ["love", "longing", "anger", "calm", "joy", "sadness"]
+INTERACTIONS = ["conversation", "singing", "argument", "meditation"]
+
+
+def make_track(index, rng):
+    return AudioTrack(
+        track_id=f"track_{index}",
+        name=f"Track {index}",
+        audio_type=AudioType.AMBIENT,
+        mood_categories=rng.sample(list(MoodCategory), 2),
+        file_path=f"audio/track_{index}.mp3",
+        duration=float(rng.choice([120, 240, 300, 600])),
+        volume_default=0.5,
+        fade_in_duration=1.0,
+        fade_out_duration=1.0,
+        loop=True,
+        persona_affinity={persona: round(rng.random(), 2) for persona in rng.sample(PERSONAS, 3)},
+        emotional_triggers=rng.sample(EMOTIONS, rng.randint(0, 3)),
+        interaction_triggers=rng.sample(INTERACTIONS, rng.randint(0, 2)),
+        metadata={}
+    )
+
+
+def reference_scores(layer, persona, emotional_state, context, user_preferences):
+    """Scores computed the way the per-track loop did"""
+    scores = {}
+    for track in layer.audio_library.values():
+        affinity = track.persona_affinity.get(persona, 0)
+        if affinity <= 0.3:
+            continue
+        emotion = sum(i for e, i in emotional_state.items() if e in track.emotional_triggers)
+        emotion = min(1.0, emotion / max(1, len(track.emotional_triggers)))
+        score = affinity * 0.4 + emotion * 0.3 + (0.2 if context in track.interaction_triggers else 0.0)
+        if user_preferences:
+            score += user_preferences.get(track.track_id, 0.5) * 0.1
+        scores[track.track_id] = score
+    return scores
+
+
+class TestMoodscapeFeatureMatrix(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.layer = MoodscapeAudioLayer()
+        self.layer.storage_path = os.path.join(self.temp_dir, "moodscape_config.json")
+        self.layer.mood_preferences = {}
+        rng = random.Random(7)
+        for index in range(200):
+            self.layer.add_audio_track(make_track(index, rng))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_selection_matches_per_track_scoring(self):
+        state = {"love": 0.8, "longing": 0.4, "anger": 0.1}
+        for persona in PERSONAS:
+            for context in INTERACTIONS:
+                preferences = {"track_3": 1.0, "track_50": 0.0}
+                expected = reference_scores(self.layer, persona, state, context, preferences)
+                selected = self.layer.select_audio_for_mood(persona, "romantic", state, context, preferences)
+                self.assertIsNotNone(selected)
+                self.assertAlmostEqual(expected[selected.track_id], max(expected.values()))
+
+    def test_recommendations_are_top_five_by_score(self):
+        state = {"calm": 0.9, "joy": 0.3}
+        recommendations = self.layer.get_mood_audio_recommendations("lyra", state)
+        self.assertEqual(len(recommendations), 5)
+        scores = [r["score"] for r in recommendations]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        best_affinity = max(t.persona_affinity.get("lyra", 0) for t in self.layer.audio_library.values())
+        self.assertGreaterEqual(scores[0], best_affinity * 0.6)
+
+    def test_playlist_only_uses_matching_tracks(self):
+        playlist = self.layer.create_mood_playlist("mia", "peaceful", duration_minutes=30)
+        self.assertTrue(playlist)
+        for track_id in playlist:
+            track = self.layer.audio_library[track_id]
+            self.assertGreater(track.persona_affinity["mia"], 0.4)
+            self.assertIn(MoodCategory.PEACEFUL, track.mood_categories)
+
+    def test_unlisted_tracks_score_a_neutral_preference(self):
+        state = {"love": 0.8, "calm": 0.5}
+        rng = random.Random(11)
+        for track_id in self.layer.audio_library:
+            self.layer.update_user_preferences(track_id, rng.random())
+        preferences = {"track_3": 1.0}
+        for persona in PERSONAS:
+            for context in INTERACTIONS:
+                expected = reference_scores(self.layer, persona, state, context, preferences)
+                selected = self.layer.select_audio_for_mood(persona, "romantic", state, context, preferences)
+                self.assertAlmostEqual(expected[selected.track_id], max(expected.values()))
+
+    def test_adding_tracks_grows_capacity_geometrically(self):
+        features = self.layer.features
+        buffer, reallocations = features._durations, 0
+        for index in range(200, 1200):
+            self.layer.add_audio_track(make_track(index, random.Random(index)))
+            if features._durations is not buffer:
+                buffer, reallocations = features._durations, reallocations + 1
+        self.assertEqual(len(features), len(self.layer.audio_library))
+        self.assertLessEqual(reallocations, 4)
+        self.assertEqual(list(features.durations), [t.duration for t in self.layer.audio_library.values()])
+
+    def test_library_changes_update_matrix(self):
+        features = self.layer.features
+        row = features.row_of["track_10"]
+
+        self.assertTrue(self.layer.remove_audio_track("track_0"))
+        self.assertIs(self.layer.features, features)
+        self.assertNotIn("track_0", features.row_of)
+        self.assertEqual(features.track_ids, list(self.layer.audio_library))
+        self.assertEqual(features.row_of["track_10"], row - 1)
+        self.assertFalse(self.layer.remove_audio_track("track_0"))
+
+    def test_direct_library_edits_are_picked_up(self):
+        self.layer.audio_library.pop("track_5")
+        self.layer.get_mood_audio_recommendations("doc", {"calm": 1.0})
+        self.assertEqual(self.layer.features.track_ids, list(self.layer.audio_library))
+
+    def test_track_replaced_under_the_same_id_is_picked_up(self):
+        original = self.layer.audio_library["track_7"]
+        self.layer.audio_library["track_7"] = replace(
+            original, persona_affinity={"mia": 1.0}, emotional_triggers=["bliss"], interaction_triggers=["humming"]
+        )
+        selected = self.layer.select_audio_for_mood("mia", "romantic", {"bliss": 1.0}, "humming")
+        self.assertEqual(selected.track_id, "track_7")
+        features = self.layer.features
+        self.assertEqual(features.track_ids, list(self.layer.audio_library))
+        self.assertEqual(features.persona_scores("solene")[features.row_of["track_7"]], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
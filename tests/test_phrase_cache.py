@@ -0,0 +1,75 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.voice.phrase_cache import PhraseAudioCache, intensity_bucket, phrase_key
+
+
+class TestPhraseAudioCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_key_normalizes_text_and_buckets_intensity(self):
+        self.assertEqual(intensity_bucket(0.0), 0)
+        self.assertEqual(intensity_bucket(1.0), 7)
+        self.assertEqual(phrase_key("I'm  here", "mia", "love", 0.41),
+                         phrase_key("i'm here", "mia", "love", 0.44))
+        self.assertNotEqual(phrase_key("I'm here", "mia", "love", 0.4),
+                            phrase_key("I'm here", "mia", "love", 0.9))
+
+    def test_synthesizes_once_then_serves_from_memory(self):
+        cache = PhraseAudioCache()
+        calls = []
+
+        def synthesize():
+            calls.append(1)
+            return b"audio"
+
+        for _ in range(3):
+            self.assertEqual(cache.get_or_synthesize("Hello", "mia", "love", 0.5, synthesize), b"audio")
+        stats = cache.get_stats()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(stats["memory_hits"], 2)
+        self.assertAlmostEqual(stats["hit_rate"], 2 / 3)
+
+    def test_memory_tier_respects_byte_budget(self):
+        cache = PhraseAudioCache(max_memory_bytes=10)
+        cache.put("a", "mia", "love", 0.5, b"12345")
+        cache.put("b", "mia", "love", 0.5, b"12345")
+        cache.get("a", "mia", "love", 0.5)
+        cache.put("c", "mia", "love", 0.5, b"12345")
+        self.assertIsNone(cache.get("b", "mia", "love", 0.5))
+        self.assertEqual(cache.get_stats()["memory_bytes"], 10)
+
+    def test_disk_tier_survives_restart_and_rotates_segments(self):
+        cache = PhraseAudioCache(directory=self.temp_dir, segment_bytes=8)
+        cache.put("first", "mia", "calm", 0.4, b"aaaaaa")
+        cache.put("second", "mia", "calm", 0.4, b"bbbbbb")
+        cache.close()
+
+        reopened = PhraseAudioCache(directory=self.temp_dir)
+        self.assertEqual(reopened.get("first", "mia", "calm", 0.4), b"aaaaaa")
+        self.assertEqual(reopened.get("second", "mia", "calm", 0.4), b"bbbbbb")
+        self.assertEqual(reopened.get_stats()["disk_hits"], 2)
+        reopened.close()
+        segments = [name for name in os.listdir(self.temp_dir) if name.startswith("segment_")]
+        self.assertEqual(len(segments), 2)
+
+    def test_prewarm_skips_cached_phrases(self):
+        cache = PhraseAudioCache()
+        cache.put("known", "mia", "love", 0.4, b"x")
+        phrases = [("known", "mia", "love", 0.4), ("new", "mia", "love", 0.4)]
+        added = cache.prewarm(phrases, lambda text, persona, emotion, intensity: text.encode())
+        self.assertEqual(added, 1)
+        self.assertEqual(cache.get("new", "mia", "love", 0.4), b"new")
+
+
+if __name__ == '__main__':
+    unittest.main()
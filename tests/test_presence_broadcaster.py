@@ -0,0 +1,106 @@
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.presence.presence_signal import BroadcastChannel, EmotionalBroadcaster, PresenceIntensity
+
+
+class TestEmotionalBroadcasterScheduling(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.broadcaster = EmotionalBroadcaster(self.temp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def make_signal(self, emotion, curve, duration, channels=None):
+        signal = self.broadcaster.create_presence_signal(
+            {"dominant_emotion": emotion}, PresenceIntensity.GENTLE, duration,
+            channels or [BroadcastChannel.UI_AMBIENT]
+        )
+        signal.signature.intensity_curve = curve
+        return signal
+
+    def test_next_change_time_solves_linear_segments(self):
+        signal = self.make_signal("joy", [0.0, 1.0], 10.0)
+        signal.started_at = 100.0
+        self.broadcaster.intensity_epsilon = 0.1
+        self.assertAlmostEqual(self.broadcaster._next_change_time(signal, 100.0, 0.0), 101.0)
+
+        flat = self.make_signal("peace", [0.5, 0.5, 0.5], 10.0)
+        flat.started_at = 100.0
+        self.assertEqual(self.broadcaster._next_change_time(flat, 100.0, 0.5), 110.0)
+
+        # Rising then falling: the crossing is found in the later segment
+        peak = self.make_signal("longing", [0.5, 0.52, 0.3], 10.0)
+        peak.started_at = 100.0
+        self.assertGreater(self.broadcaster._next_change_time(peak, 100.0, 0.5), 105.0)
+
+    def test_flat_signal_emits_once_and_expires(self):
+        async def run():
+            self.broadcaster.start_broadcasting(self.make_signal("peace", [0.4, 0.4], 0.3))
+            await self.broadcaster.broadcast_task
+
+        asyncio.run(run())
+        stats = self.broadcaster.broadcast_stats
+        self.assertEqual(stats["emissions"], 1)
+        self.assertLessEqual(stats["wakeups"], 2)
+        self.assertEqual(self.broadcaster.active_signals, [])
+        with open(os.path.join(self.temp_dir, "ui_presence_signal.json")) as f:
+            self.assertAlmostEqual(json.load(f)["intensity"], 0.4)
+
+    def test_stop_wakes_loop(self):
+        async def run():
+            channels = [BroadcastChannel.UI_AMBIENT, BroadcastChannel.VISUAL_EFFECTS]
+            self.broadcaster.start_broadcasting(self.make_signal("joy", [0.2, 1.0], 60.0, channels))
+            self.broadcaster.start_broadcasting(self.make_signal("warmth", [0.9, 0.9], 60.0, channels))
+            await asyncio.sleep(0.05)
+            started = time.monotonic()
+            self.broadcaster.stop_broadcasting()
+            await self.broadcaster.broadcast_task
+            return time.monotonic() - started
+
+        self.assertLess(asyncio.run(run()), 1.0)
+        self.assertFalse(self.broadcaster.is_broadcasting)
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, "visual_effects_signal.json")))
+
+    def test_signals_sharing_a_channel_keep_their_latest_state(self):
+        queued = {}
+        written = {channel: [] for channel in (BroadcastChannel.UI_AMBIENT, BroadcastChannel.NOTIFICATION)}
+        queue_update = self.broadcaster._broadcast_to_channels
+
+        async def record_queued(signal_id, signal, intensity):
+            queued[signal.primary_emotion] = intensity
+            await queue_update(signal_id, signal, intensity)
+
+        def slow_writer(channel):
+            async def write(signal, intensity):
+                await asyncio.sleep(0.08)
+                written[channel].append((signal.primary_emotion, intensity))
+            return write
+
+        self.broadcaster._broadcast_to_channels = record_queued
+        self.broadcaster._broadcast_ui_ambient = slow_writer(BroadcastChannel.UI_AMBIENT)
+        self.broadcaster._broadcast_notification = slow_writer(BroadcastChannel.NOTIFICATION)
+
+        async def run():
+            channels = list(written)
+            self.broadcaster.start_broadcasting(self.make_signal("joy", [0.2, 1.0], 0.4, channels))
+            self.broadcaster.start_broadcasting(self.make_signal("warmth", [0.9, 0.9], 0.4, channels))
+            await self.broadcaster.broadcast_task
+
+        asyncio.run(run())
+        self.assertGreater(self.broadcaster.broadcast_stats["coalesced"], 0)
+        for channel, updates in written.items():
+            self.assertEqual(dict(updates), queued, channel)
+        self.assertIn(("warmth", 0.9), written[BroadcastChannel.NOTIFICATION])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "quant_pass2"))
+
+from response_cache import ResponseCache, model_checksum
+
+PARAMS = {"max_length": 200, "do_sample": True, "temperature": 0.7, "top_p": 0.9}
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.temp_dir.name, "cache")
+        self.model_dir = os.path.join(self.temp_dir.name, "model")
+        os.makedirs(self.model_dir)
+        with open(os.path.join(self.model_dir, "config.json"), "w") as f:
+            json.dump({"model_type": "llama"}, f)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_each_prompt_is_generated_once(self):
+        cache = ResponseCache(self.cache_dir)
+        checksum = cache.checksum(self.model_dir)
+        generated = []
+
+        def generate(prompts):
+            generated.extend(prompts)
+            return [(p, f"reply to {p}") for p in prompts]
+
+        first = cache.get_or_generate(checksum, ["a", "b"], PARAMS, generate)
+        second = cache.get_or_generate(checksum, ["b", "c", "a"], PARAMS, generate)
+
+        self.assertEqual(generated, ["a", "b", "c"])
+        self.assertEqual(first["a"], second["a"])
+        self.assertEqual(cache.get_stats()["hits"], 2)
+
+    def test_params_are_part_of_the_key(self):
+        cache = ResponseCache(self.cache_dir)
+        checksum = cache.checksum(self.model_dir)
+        cache.put(checksum, "a", PARAMS, "warm")
+        self.assertIsNone(cache.get(checksum, "a", {**PARAMS, "temperature": 0.1}))
+        self.assertEqual(cache.get(checksum, "a", PARAMS), "warm")
+
+    def test_interrupted_generation_resumes_in_a_new_run(self):
+        cache = ResponseCache(self.cache_dir)
+        checksum = cache.checksum(self.model_dir)
+
+        def interrupted(prompts):
+            yield prompts[0], "first reply"
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            cache.get_or_generate(checksum, ["a", "b"], PARAMS, interrupted)
+
+        resumed = ResponseCache(self.cache_dir)
+        generated = []
+
+        def generate(prompts):
+            generated.extend(prompts)
+            return [(p, "second reply") for p in prompts]
+
+        responses = resumed.get_or_generate(resumed.checksum(self.model_dir), ["a", "b"], PARAMS, generate)
+        self.assertEqual(generated, ["b"])
+        self.assertEqual(responses, {"a": "first reply", "b": "second reply"})
+
+    def test_failed_generations_are_not_cached(self):
+        cache = ResponseCache(self.cache_dir)
+        checksum = cache.checksum(self.model_dir)
+        cache.get_or_generate(checksum, ["a"], PARAMS, lambda prompts: [("a", "")])
+        self.assertEqual(cache.missing(checksum, ["a"], PARAMS), ["a"])
+
+    def test_checksum_follows_model_contents(self):
+        before = model_checksum(self.model_dir)
+        with open(os.path.join(self.model_dir, "config.json"), "w") as f:
+            json.dump({"model_type": "mistral"}, f)
+        self.assertNotEqual(model_checksum(self.model_dir), before)
+        self.assertEqual(model_checksum("org/hub-model"), model_checksum("org/hub-model"))
+
+
+if __name__ == '__main__':
+    unittest.main()
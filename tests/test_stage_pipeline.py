@@ -0,0 +1,147 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.core.enhanced_logging import EnhancedLogger
+from modules.core.stage_pipeline import StagePipeline, BackgroundStageQueue
+
+
+def make_logger():
+    return EnhancedLogger("stage_pipeline_test", {"console_logging": False, "file_logging": False})
+
+
+class TestStagePipeline(unittest.TestCase):
+    def test_independent_stages_run_concurrently(self):
+        async def slow(value):
+            await asyncio.sleep(0.05)
+            return value
+
+        async def left():
+            return await slow(1)
+
+        async def right():
+            return await slow(2)
+
+        async def total(left, right, base):
+            return base + left + right
+
+        pipeline = (
+            StagePipeline()
+            .add_stage("left", left)
+            .add_stage("right", right)
+            .add_stage("total", total, ["left", "right", "base"])
+        )
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            values = await pipeline.run({"base": 10})
+            return values, loop.time() - start
+
+        values, elapsed = asyncio.run(run())
+        self.assertEqual(values["total"], 13)
+        self.assertLess(elapsed, 0.09)
+
+    def test_background_stages_run_after_return_and_record_timings(self):
+        logger = make_logger()
+        events = []
+
+        async def respond():
+            events.append("respond")
+            return "hello"
+
+        async def bookkeeping(respond):
+            events.append(f"store:{respond}")
+
+        pipeline = (
+            StagePipeline()
+            .add_stage("respond", respond)
+            .add_stage("store", bookkeeping, ["respond"], background=True)
+        )
+
+        async def run():
+            queue = BackgroundStageQueue(logger)
+            logger.start_interaction_trace("interaction-1", "user", "session")
+            await pipeline.run({}, logger=logger, background_queue=queue, queue_key="user")
+            self.assertEqual(events, ["respond"])
+            self.assertEqual(queue.pending_count, 1)
+            logger.finish_interaction_trace({"type": "test"})
+            await queue.wait_for("user")
+
+        asyncio.run(run())
+        self.assertEqual(events, ["respond", "store:hello"])
+        trace = logger.decision_history[-1]
+        self.assertIn("respond", trace.stage_timings)
+        self.assertIn("store", trace.background_stage_timings)
+
+    def test_close_runs_queued_stages(self):
+        events = []
+
+        async def store(reply):
+            await asyncio.sleep(0.01)
+            events.append(reply)
+
+        pipeline = StagePipeline().add_stage("store", store, ["reply"], background=True)
+
+        async def run():
+            queue = BackgroundStageQueue()
+            for reply in ("one", "two"):
+                await pipeline.run({"reply": reply}, background_queue=queue, queue_key="user")
+            await queue.close()
+            return queue.pending_count
+
+        self.assertEqual(asyncio.run(run()), 0)
+        self.assertEqual(events, ["one", "two"])
+
+    def test_queued_stages_survive_their_event_loop(self):
+        events = []
+
+        async def store(reply):
+            await asyncio.sleep(0.01)
+            events.append(reply)
+
+        pipeline = StagePipeline().add_stage("store", store, ["reply"], background=True)
+        queue = BackgroundStageQueue()
+
+        async def turn(reply):
+            await pipeline.run({"reply": reply}, background_queue=queue, queue_key="user")
+
+        # Each call runs its own loop, which ends before the stage gets to run
+        asyncio.run(turn("one"))
+        asyncio.run(turn("two"))
+        self.assertEqual(events, [])
+        self.assertEqual(queue.pending_count, 2)
+
+        asyncio.run(queue.wait_for("user"))
+        self.assertEqual(events, ["one", "two"])
+        asyncio.run(queue.close())
+
+    def test_foreground_stage_cannot_depend_on_background(self):
+        async def noop(**kwargs):
+            return None
+
+        pipeline = (
+            StagePipeline()
+            .add_stage("deferred", noop, background=True)
+            .add_stage("reply", noop, ["deferred"])
+        )
+        with self.assertRaises(ValueError):
+            asyncio.run(pipeline.run({}))
+
+    def test_failing_stage_propagates(self):
+        async def boom():
+            raise RuntimeError("boom")
+
+        async def after(boom):
+            return boom
+
+        pipeline = StagePipeline().add_stage("boom", boom).add_stage("after", after, ["boom"])
+        with self.assertRaises(RuntimeError):
+            asyncio.run(pipeline.run({}))
+
+
+if __name__ == '__main__':
+    unittest.main()
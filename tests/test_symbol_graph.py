@@ -0,0 +1,81 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from symbol_graph import SymbolGraph
+from SymbolMemoryEngine import SymbolMemoryEngine
+
+
+class TestSymbolGraph(unittest.TestCase):
+    def test_bfs_reports_each_symbol_at_shallowest_depth(self):
+        graph = SymbolGraph()
+        graph.set_edge("mirror", "river", 0.9)
+        graph.set_edge("mirror", "thread", 0.5)
+        graph.set_edge("river", "thread", 0.8)
+        graph.set_edge("thread", "door", 0.6)
+
+        result = {c["symbol"]: c for c in graph.weighted_bfs("mirror", depth=2)}
+        self.assertEqual(set(result), {"river", "thread", "door"})
+        self.assertEqual(result["thread"]["depth"], 1)
+        self.assertEqual(result["door"]["depth"], 2)
+        self.assertNotIn("mirror", result)
+
+    def test_top_k_prunes_each_hop(self):
+        graph = SymbolGraph()
+        for i in range(20):
+            graph.set_edge("center", f"s{i}", 0.2 + i * 0.01)
+        result = graph.weighted_bfs("center", depth=1, top_k=3)
+        self.assertEqual([c["symbol"] for c in result], ["s19", "s18", "s17"])
+
+    def test_personalized_pagerank_prefers_close_symbols(self):
+        graph = SymbolGraph()
+        graph.set_edge("mirror", "river", 1.0)
+        graph.set_edge("river", "flame", 0.2)
+        graph.set_edge("flame", "storm", 1.0)
+        ranked = [name for name, _ in graph.personalized_pagerank(["mirror"])]
+        self.assertEqual(ranked[0], "river")
+        self.assertLess(ranked.index("flame"), ranked.index("storm"))
+
+    def test_large_graph_stays_interactive(self):
+        rng = random.Random(3)
+        graph = SymbolGraph()
+        for _ in range(50000):
+            graph.set_edge(f"s{rng.randrange(5000)}", f"s{rng.randrange(5000)}", rng.random())
+        self.assertGreater(graph.edge_count, 90000)
+
+        # Work stays local to the seeds instead of growing with the graph
+        graph.weighted_bfs("s1", depth=3, top_k=10)
+        self.assertLessEqual(graph.stats["bfs_expanded"], 1 + 10 * 2)
+        self.assertEqual(len(graph.personalized_pagerank(["s1", "s2"], limit=10, epsilon=1e-3)), 10)
+        self.assertLess(graph.stats["ppr_pushes"], len(graph) // 10)
+
+
+class TestSymbolEngineNetwork(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.engine = SymbolMemoryEngine(os.path.join(self.temp_dir, "symbols.json"))
+
+    def tearDown(self):
+        self.engine.store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_network_uses_graph_and_meaning_cache_invalidates_on_drift(self):
+        for _ in range(3):
+            self.engine.record_symbol_use("mirror", {"dominant_emotion": "contemplative", "intensity": 0.6},
+                                          co_occurring_symbols=["river", "thread"])
+        network = self.engine.get_symbol_network("mirror", depth=2)
+        self.assertEqual({c["symbol"] for c in network["connections"]}, {"river", "thread"})
+
+        meaning = self.engine.get_symbol_meaning("mirror")
+        self.assertEqual(self.engine.get_symbol_meaning("mirror"), meaning)
+        self.engine.drift_symbol("mirror", "storming", "test")
+        self.assertEqual(self.engine.get_symbol_meaning("mirror"), self.engine.symbols["mirror"].symbolic_drift)
+
+        resonant = self.engine.get_resonant_symbols(["mirror"])
+        self.assertEqual({r["name"] for r in resonant}, {"river", "thread"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from symbolic_store import SymbolicStore, LazyRecordMap
+from SymbolMemoryEngine import SymbolMemoryEngine
+from DriftDreamEngine import DriftDreamEngine, DreamEntry
+
+
+class TestSymbolicStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "store.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_flush_writes_only_dirty_records(self):
+        store = SymbolicStore(self.db_path)
+        store.mark_dirty("symbols", "mirror", {"name": "mirror"})
+        store.mark_dirty("symbols", "river", {"name": "river"})
+        self.assertEqual(store.flush(), 2)
+        self.assertEqual(store.flush(), 0)
+
+        store.mark_dirty("symbols", "mirror", {"name": "mirror", "count": 2})
+        self.assertEqual(store.flush(), 1)
+        self.assertEqual(store.get("symbols", "mirror")["count"], 2)
+        store.close()
+
+    def test_lazy_map_decodes_on_access(self):
+        store = SymbolicStore(self.db_path)
+        for name in ("a", "b", "c"):
+            store.mark_dirty("symbols", name, {"name": name})
+        store.flush()
+
+        lazy = LazyRecordMap(store, "symbols", lambda data: data["name"].upper())
+        self.assertEqual(len(lazy), 3)
+        self.assertIn("b", lazy)
+        self.assertEqual(lazy.loaded_count, 0)
+        self.assertEqual(lazy["b"], "B")
+        self.assertEqual(lazy.loaded_count, 1)
+        self.assertEqual(sorted(lazy.values()), ["A", "B", "C"])
+        store.close()
+
+
+class TestEnginePersistence(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_symbol_memory_round_trip(self):
+        memory_file = os.path.join(self.temp_dir, "symbol_memory.json")
+        engine = SymbolMemoryEngine(memory_file)
+        engine.record_symbol_use("lantern", {"dominant_emotion": "awe", "intensity": 0.9},
+                                 co_occurring_symbols=["mirror"])
+        engine.save_memory()
+        engine.store.close()
+
+        reloaded = SymbolMemoryEngine(memory_file)
+        self.assertIn("lantern", reloaded.symbols)
+        self.assertEqual(reloaded.symbols["lantern"].recurrence_count, 1)
+        self.assertGreater(reloaded.symbol_networks["mirror"]["lantern"], 0)
+        reloaded.store.close()
+
+    def test_legacy_json_is_imported(self):
+        memory_file = os.path.join(self.temp_dir, "legacy.json")
+        with open(memory_file, "w", encoding="utf-8") as f:
+            json.dump({
+                "symbols": {
+                    "key": {
+                        "name": "key",
+                        "emotional_associations": [
+                            {"emotion": "awe", "weight": 0.5, "timestamp": "2025-01-01T00:00:00Z"}
+                        ],
+                        "recurrence_count": 3,
+                        "last_used": "2025-01-01T00:00:00Z"
+                    }
+                },
+                "emotion_symbol_map": {"awe": ["key"]},
+                "symbol_networks": {},
+                "drift_history": []
+            }, f)
+
+        engine = SymbolMemoryEngine(memory_file)
+        self.assertEqual(engine.symbols["key"].recurrence_count, 3)
+        self.assertEqual(engine.emotion_symbol_map["awe"], ["key"])
+        engine.store.close()
+
+    def test_dream_journal_loads_recent_window(self):
+        journal_file = os.path.join(self.temp_dir, "dream_journal.json")
+        engine = DriftDreamEngine(journal_file, max_dream_history=3)
+        for i in range(5):
+            engine.record_dream_to_journal(DreamEntry(
+                id=f"dream_{i}",
+                scene_title=f"Dream {i}",
+                mood_palette=["awe"],
+                symbolic_phrases=[],
+                metaphor_chain=[],
+                echoed_phrase="",
+                resolution_state="resolved",
+                dream_timestamp=f"2025-01-0{i + 1}T00:00:00Z"
+            ))
+        engine.store.close()
+
+        reloaded = DriftDreamEngine(journal_file, max_dream_history=3)
+        self.assertEqual([d.id for d in reloaded.dream_journal], ["dream_2", "dream_3", "dream_4"])
+        self.assertEqual(reloaded.store.count("dreams"), 5)
+        reloaded.store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,325 @@
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.database.database_interface import (
+    EmotionalRiskEntry, InMemoryDatabase, InteractionRecord, InteractionType, MemoryFragment
+)
+from modules.database.json_database import JSONDatabase
+from modules.database.logfile_database import LogFileDatabase
+from modules.database.write_behind import WriteBehindBuffer
+
+try:
+    from pymongo.errors import BulkWriteError
+    from modules.database.mongodb_database import MongoDatabase
+    MONGO_AVAILABLE = True
+except ImportError:
+    MONGO_AVAILABLE = False
+
+
+def make_interaction(index, user_id="user"):
+    return InteractionRecord(
+        interaction_id=f"{user_id}_interaction_{index}",
+        user_id=user_id,
+        session_id="session",
+        timestamp=datetime(2025, 1, 1) + timedelta(minutes=index),
+        user_input="hello",
+        companion_response="hi",
+        interaction_type=InteractionType.GENERAL_CONVERSATION,
+        context_analysis={},
+        emotional_state={},
+        technical_context={},
+        creative_context={},
+        guidance_used={},
+        response_metrics={}
+    )
+
+
+class CountingDatabase(InMemoryDatabase):
+    """In-memory backend that records which bulk calls reached it"""
+
+    def __init__(self):
+        super().__init__()
+        self.bulk_calls = []
+
+    async def save_interactions(self, interactions):
+        self.bulk_calls.append(("interactions", len(interactions)))
+        return await super().save_interactions(interactions)
+
+    async def log_emotional_risks(self, entries):
+        self.bulk_calls.append(("emotional_risk", len(entries)))
+        return await super().log_emotional_risks(entries)
+
+
+class SlowDatabase(InMemoryDatabase):
+    """In-memory backend whose bulk interaction writes take a while"""
+
+    async def save_interactions(self, interactions):
+        await asyncio.sleep(0.05)
+        return await super().save_interactions(interactions)
+
+
+class FlakyDatabase(InMemoryDatabase):
+    """
+    In-memory backend whose bulk interaction writes fail as scripted
+
+    Each flush pops "raise", a number of records to write before giving up,
+    or None to write everything. Records it already holds count as written.
+    """
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = list(failures)
+        self.saved_ids = set()
+
+    async def save_interactions(self, interactions):
+        failure = self.failures.pop(0) if self.failures else None
+        if failure == "raise":
+            raise ConnectionError("backend unavailable")
+        written = 0
+        for interaction in interactions:
+            if interaction.interaction_id not in self.saved_ids:
+                if failure is not None and written >= failure:
+                    continue
+                await self.save_interaction(interaction)
+                self.saved_ids.add(interaction.interaction_id)
+            written += 1
+        return written
+
+
+class FakeCollection:
+    """Collection stand-in: insert_many stores by _id and reports duplicates like MongoDB"""
+
+    def __init__(self, rejected_ids=()):
+        self.documents = {}
+        self.rejected_ids = set(rejected_ids)
+
+    async def insert_many(self, documents, ordered=True):
+        errors = []
+        for index, document in enumerate(documents):
+            if document["_id"] in self.rejected_ids:
+                errors.append({"index": index, "code": 121, "errmsg": "Document failed validation"})
+            elif document["_id"] in self.documents:
+                errors.append({"index": index, "code": 11000, "errmsg": "duplicate key"})
+            else:
+                self.documents[document["_id"]] = dict(document)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(documents) - len(errors)})
+
+
+class TestWriteBehindBuffer(unittest.TestCase):
+    def test_size_threshold_flushes_one_batch(self):
+        backend = CountingDatabase()
+        buffer = WriteBehindBuffer(backend, max_batch=3, flush_interval=60)
+
+        async def run():
+            for i in range(3):
+                await buffer.save_interaction(make_interaction(i))
+            await buffer.close()
+
+        asyncio.run(run())
+        self.assertEqual(backend.bulk_calls, [("interactions", 3)])
+
+    def test_interval_flushes_in_background(self):
+        backend = CountingDatabase()
+        buffer = WriteBehindBuffer(backend, max_batch=100, flush_interval=0.01)
+
+        async def run():
+            await buffer.log_emotional_risk(EmotionalRiskEntry("e", "user", datetime.now(), "help", ["alone"]))
+            self.assertEqual(backend.bulk_calls, [])
+            await asyncio.sleep(0.05)
+            return buffer.pending_count
+
+        self.assertEqual(asyncio.run(run()), 0)
+        self.assertEqual(backend.bulk_calls, [("emotional_risk", 1)])
+
+    def test_reads_see_the_users_own_pending_writes(self):
+        backend = CountingDatabase()
+        buffer = WriteBehindBuffer(backend, max_batch=100, flush_interval=60)
+
+        async def run():
+            await buffer.save_interaction(make_interaction(0, "alice"))
+            untouched = await buffer.get_recent_interactions("bob")
+            pending_after_other_user = buffer.pending_count
+            recent = await buffer.get_recent_interactions("alice")
+            await buffer.close()
+            return untouched, pending_after_other_user, recent
+
+        untouched, pending, recent = asyncio.run(run())
+        self.assertEqual(untouched, [])
+        self.assertEqual(pending, 1)
+        self.assertEqual([r.interaction_id for r in recent], ["alice_interaction_0"])
+
+    def test_pending_memory_is_flushed_before_access_update(self):
+        backend = InMemoryDatabase()
+        buffer = WriteBehindBuffer(backend, max_batch=100, flush_interval=60)
+        now = datetime.now()
+
+        async def run():
+            await buffer.save_memory_fragment(MemoryFragment("m", "user", "c", "emotional", 0.5, now, now, 0, [], []))
+            updated = await buffer.update_memory_access("m")
+            await buffer.close()
+            return updated
+
+        self.assertTrue(asyncio.run(run()))
+        self.assertEqual(backend.memory_index.get("m").access_count, 1)
+
+    def test_failed_batches_are_retried_not_lost(self):
+        for failures in (["raise"], [1]):
+            backend = FlakyDatabase(failures)
+            buffer = WriteBehindBuffer(backend, max_batch=100, flush_interval=60)
+
+            async def run():
+                for i in range(3):
+                    await buffer.save_interaction(make_interaction(i))
+                first = await buffer.flush()
+                pending = buffer.pending_count
+                recent = await buffer.get_recent_interactions("user", limit=10)
+                await buffer.close()
+                return first, pending, recent
+
+            first, pending, recent = asyncio.run(run())
+            self.assertLess(first, 3)
+            self.assertEqual(pending, 3)
+            self.assertEqual(sorted(r.interaction_id for r in recent),
+                             [f"user_interaction_{i}" for i in range(3)])
+            self.assertEqual(buffer.stats["requeued"], 3)
+
+    def test_reads_wait_for_a_flush_in_progress(self):
+        buffer = WriteBehindBuffer(SlowDatabase(), max_batch=100, flush_interval=60)
+
+        async def run():
+            await buffer.save_interaction(make_interaction(0))
+            flush = asyncio.create_task(buffer.flush())
+            await asyncio.sleep(0)
+            recent = await buffer.get_recent_interactions("user")
+            await flush
+            await buffer.close()
+            return recent
+
+        self.assertEqual([r.interaction_id for r in asyncio.run(run())], ["user_interaction_0"])
+
+    def test_batch_is_dropped_after_max_attempts(self):
+        backend = FlakyDatabase(["raise"] * 5)
+        buffer = WriteBehindBuffer(backend, max_batch=100, flush_interval=60, max_attempts=2)
+
+        async def run():
+            await buffer.save_interaction(make_interaction(0))
+            await buffer.close()
+
+        asyncio.run(run())
+        self.assertEqual(buffer.pending_count, 0)
+        self.assertEqual(buffer.stats["dropped"], 1)
+        self.assertEqual(backend.failures, ["raise"] * 3)
+
+
+@unittest.skipUnless(MONGO_AVAILABLE, "motor/pymongo not installed")
+class TestMongoBulkWrites(unittest.TestCase):
+    def test_partial_bulk_write_error_is_retried_without_duplicates(self):
+        collection = FakeCollection(rejected_ids={"user_interaction_1"})
+        database = MongoDatabase("mongodb://unused")
+        database.db = {"interactions": collection}
+        buffer = WriteBehindBuffer(database, max_batch=100, flush_interval=60)
+
+        async def run():
+            for i in range(3):
+                await buffer.save_interaction(make_interaction(i))
+            first = await buffer.flush()
+            pending = buffer.pending_count
+            collection.rejected_ids.clear()
+            second = await buffer.flush()
+            return first, pending, second
+
+        first, pending, second = asyncio.run(run())
+        self.assertEqual(first, 2)
+        self.assertEqual(pending, 3)
+        self.assertEqual(second, 3)
+        self.assertEqual(sorted(collection.documents), [f"user_interaction_{i}" for i in range(3)])
+        self.assertEqual(buffer.pending_count, 0)
+
+
+class TestBackendBulkWrites(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def retry_through_buffer(self, backend):
+        buffer = WriteBehindBuffer(backend, max_batch=100, flush_interval=60)
+
+        async def run():
+            for i in range(3):
+                await buffer.save_interaction(make_interaction(i))
+            first = await buffer.flush()
+            second = await buffer.flush()
+            recent = await buffer.get_recent_interactions("user", limit=10)
+            await buffer.close()
+            return first, second, recent
+
+        return asyncio.run(run())
+
+    def test_in_memory_retry_does_not_duplicate_written_records(self):
+        backend = InMemoryDatabase()
+        add = backend.interaction_index.add
+        failed = []
+
+        def fail_second_once(user_id, record):
+            if record.interaction_id == "user_interaction_1" and not failed:
+                failed.append(record)
+                raise RuntimeError("index unavailable")
+            return add(user_id, record)
+
+        backend.interaction_index.add = fail_second_once
+        first, second, recent = self.retry_through_buffer(backend)
+        self.assertEqual((first, second), (2, 3))
+        self.assertEqual(sorted(r.interaction_id for r in recent), [f"user_interaction_{i}" for i in range(3)])
+
+    def test_json_retry_after_failed_save_does_not_duplicate_records(self):
+        backend = JSONDatabase(os.path.join(self.temp_dir, "db.json"))
+        real_dump = json.dump
+        failures = [OSError("disk full")]
+
+        def dump_failing_once(*args, **kwargs):
+            if failures:
+                raise failures.pop()
+            return real_dump(*args, **kwargs)
+
+        with mock.patch("modules.database.json_database.json.dump", dump_failing_once):
+            first, second, recent = self.retry_through_buffer(backend)
+        self.assertEqual((first, second), (0, 3))
+        self.assertEqual(sorted(r.interaction_id for r in recent), [f"user_interaction_{i}" for i in range(3)])
+        self.assertEqual(len(backend._data["interactions"]), 3)
+
+    def test_file_backends_persist_batches(self):
+        batch = [make_interaction(i) for i in range(4)]
+
+        async def run(factory):
+            db = factory()
+            written = await db.save_interactions(batch)
+            await db.close()
+            reopened = factory()
+            if hasattr(reopened, "initialize"):
+                await reopened.initialize()
+            recent = await reopened.get_recent_interactions("user", limit=10)
+            await reopened.close()
+            return written, recent
+
+        for factory in (lambda: JSONDatabase(os.path.join(self.temp_dir, "db.json")),
+                        lambda: LogFileDatabase(os.path.join(self.temp_dir, "logs"))):
+            written, recent = asyncio.run(run(factory))
+            self.assertEqual(written, 4)
+            self.assertEqual(recent[0].interaction_id, "user_interaction_3")
+            self.assertEqual(len(recent), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()